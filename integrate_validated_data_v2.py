@@ -23,6 +23,8 @@ from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 import json
 
+from src.utils.residue_ingest import read_sheet
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -80,7 +82,7 @@ def load_references_catalog() -> pd.DataFrame:
     Returns:
         DataFrame with columns: reference_id, culture, citation_abnt, doi, functional_link
     """
-    df = pd.read_csv(CSV_REFS_PATH, encoding='utf-8')
+    df = read_sheet(CSV_REFS_PATH, encoding='utf-8')
     print(f"Loaded {len(df)} references from clean CSV catalog")
     print(f"Cultures: {df['culture'].unique()}")
     print(f"References per culture:\n{df.groupby('culture').size()}")
@@ -89,12 +91,13 @@ def load_references_catalog() -> pd.DataFrame:
 
 def load_excel_data() -> pd.DataFrame:
     """
-    Load Excel data with validated residue parameters.
+    Load Excel data with validated residue parameters (streamed in read-only
+    mode, cached per workbook hash).
 
     Returns:
         DataFrame with all AG_AGRICULTURA sheet data
     """
-    df_ag = pd.read_excel(EXCEL_PATH, sheet_name='AG_AGRICULTURA')
+    df_ag = read_sheet(EXCEL_PATH, 'AG_AGRICULTURA')
     print(f"\nLoaded {len(df_ag)} residues from Excel AG_AGRICULTURA sheet")
     print(f"Excel codes: {df_ag['Residuo_Codigo'].unique()}")
     return df_ag
@@ -227,7 +230,7 @@ def get_references_for_culture(refs_df: pd.DataFrame, culture: str) -> List[Dict
     culture_refs = refs_df[refs_df['culture'] == culture]
 
     references = []
-    for _, ref_row in culture_refs.iterrows():
+    for ref_row in culture_refs.to_dict('records'):
         ref = {
             'title': safe_str(ref_row['citation_abnt'], ''),
             'doi': safe_str(ref_row['doi'], ''),
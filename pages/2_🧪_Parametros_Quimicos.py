@@ -2,6 +2,12 @@
 Page 2: Parâmetros Químicos e Operacionais
 CP2B - Chemical composition analysis with literature ranges
 DATABASE INTEGRATED - Phase 1.1 Complete
+
+Rerun scopes:
+- Page:     the Setor → Subsetor → Resíduo selector (every section depends on it)
+- Fragment: overview charts, sector comparison, each parameter accordion and the
+            page actions rerun on their own; fragments receive only the residue
+            code and read data through the cached data_handler accessors
 """
 
 import streamlit as st
@@ -18,7 +24,9 @@ from src.data_handler import (
     get_residues_for_dropdown,
     load_residue_from_db,
     get_panorama_connection,
-    load_parameter_sources_for_residue
+    load_parameter_sources_for_residue,
+    get_parameter_stats_for_residue,
+    get_residue_hierarchy_tree
 )
 
 # New visualization components
@@ -75,12 +83,9 @@ def render_header():
 
 def render_hierarchical_residue_selector():
     """Render 3-level hierarchical selector: Setor → Subsetor → Resíduo"""
-    from src.data.hierarchy_helper import HierarchyHelper
-
     st.markdown("### 🎯 Selecione o Resíduo")
 
-    helper = HierarchyHelper()
-    tree = helper.get_hierarchy_tree()
+    tree = get_residue_hierarchy_tree()
 
     col1, col2, col3 = st.columns(3)
 
@@ -160,6 +165,7 @@ def render_parameter_sources_section(residue_data):
     pass
 
 
+@st.fragment
 def render_parameter_accordion(residue_codigo: str, param_info: dict):
     """
     Render a single parameter as an accordion-style expander with preview.
@@ -167,6 +173,8 @@ def render_parameter_accordion(residue_codigo: str, param_info: dict):
     Shows: Parameter name | Source count | Year range | Quality preview
     Expands to: Full source list with enhanced cards
 
+    Fragment: the year/quality filters rerun only this accordion.
+
     Args:
         residue_codigo: Residue code (e.g., 'CANA_VINHACA')
         param_info: Dict with 'emoji', 'name', 'label', 'code' keys
@@ -261,15 +269,15 @@ def render_parameter_accordion(residue_codigo: str, param_info: dict):
         st.caption(f"Mostrando {len(filtered_sources)} de {len(sources)} fonte(s)")
         st.markdown("---")
 
-        # Display sources (show first 5, then expandable for rest)
+        # Display sources (show first 5, then toggle for rest - expanders cannot be nested)
         display_limit = 5
 
         for idx, source in enumerate(filtered_sources[:display_limit]):
             render_enhanced_source_card(source, idx, parameter_code)
 
-        # Expandable section for remaining sources
         if len(filtered_sources) > display_limit:
-            with st.expander(f"📄 Ver mais {len(filtered_sources) - display_limit} fonte(s)"):
+            if st.toggle(f"📄 Ver mais {len(filtered_sources) - display_limit} fonte(s)",
+                         key=f"more_sources_{parameter_code}_{residue_codigo}"):
                 for idx, source in enumerate(filtered_sources[display_limit:], start=display_limit):
                     render_enhanced_source_card(source, idx, parameter_code)
 
@@ -579,7 +587,7 @@ def render_chemical_parameters_from_db(residue_data):
     st.info("""
     **📊 Tabela Completa de Parâmetros:**
     - **17 parâmetros** organizados por categoria
-    - **Valores validados** da literatura científica (mín/média/máx)
+    - **Valores validados** da literatura científica (mín/média ponderada/mediana/máx, IC 95%)
     - **Unidades padronizadas** conforme diretrizes CP2B
     - **Fontes rastreáveis** - clique em 📄 para ver o paper original
     - **Parâmetros sem dados** aparecem em cinza
@@ -597,77 +605,59 @@ def render_chemical_parameters_from_db(residue_data):
         key=lambda x: x[1]['priority']
     )
 
+    # Precomputed robust statistics (quality-weighted mean, median, IQR, bootstrap CI)
+    parameter_stats = get_parameter_stats_for_residue(residue_codigo)
+
     params_data = []
 
     for param_code, param_config in all_parameters:
         # Get standardized unit
         standard_unit = get_standard_unit(param_code, residue_type)
 
-        # Load parameter sources from precision DB
-        sources = load_parameter_sources_for_residue(residue_codigo, param_code)
-
-        # Determine if data is available
-        has_data = len(sources) > 0
-
-        if has_data:
-            # Calculate statistics from sources
-            values = [s.value_mean for s in sources if s.value_mean is not None]
-
-            if values:
-                min_val = min(values)
-                mean_val = sum(values) / len(values)
-                max_val = max(values)
-
-                # Quality summary
-                high_quality = sum(1 for s in sources if s.data_quality and s.data_quality.lower() == 'high')
-                quality_text = f"High" if high_quality / len(sources) > 0.7 else f"Medium" if high_quality / len(sources) > 0.3 else "Low"
-
-                # Get most recent source for link
-                sources_sorted = sorted(sources, key=lambda s: s.reference_publication_year or 0, reverse=True)
-                best_source = sources_sorted[0]
-
-                # Build link
-                pdf_path = Path(best_source.reference_pdf_path) if best_source.reference_pdf_path else None
-                if pdf_path and pdf_path.exists():
-                    link_url = pdf_path.as_uri()
-                    link_text = "📄 PDF"
-                elif best_source.reference_doi:
-                    link_url = f"https://doi.org/{best_source.reference_doi}"
-                    link_text = "🔗 DOI"
-                else:
-                    link_url = None
-                    link_text = "—"
-
-                params_data.append({
-                    "Parâmetro": param_config['display_name'],
-                    "Nome Completo": param_config['full_name'],
-                    "Mínimo": f"{min_val:.1f}",
-                    "Média": f"{mean_val:.1f}",
-                    "Máximo": f"{max_val:.1f}",
-                    "Unidade": standard_unit,
-                    "Fontes": f"{len(sources)}",
-                    "Qualidade": quality_text,
-                    "Principal": f"{best_source.reference_citation_short}",
-                    "Link": link_url,
-                    "Link_Display": link_text,
-                    "_has_data": True
-                })
+        stats = parameter_stats.get(param_code)
+
+        if stats and stats.get('n'):
+            # Sources are only needed for the main reference link
+            sources = load_parameter_sources_for_residue(residue_codigo, param_code)
+            sources_sorted = sorted(sources, key=lambda s: s.reference_publication_year or 0, reverse=True)
+            best_source = sources_sorted[0] if sources_sorted else None
+
+            # Build link
+            pdf_path = Path(best_source.reference_pdf_path) if best_source and best_source.reference_pdf_path else None
+            if pdf_path and pdf_path.exists():
+                link_url = pdf_path.as_uri()
+                link_text = "📄 PDF"
+            elif best_source and best_source.reference_doi:
+                link_url = f"https://doi.org/{best_source.reference_doi}"
+                link_text = "🔗 DOI"
             else:
-                # Sources exist but no values
-                params_data.append({
-                    "Parâmetro": param_config['display_name'],
-                    "Nome Completo": param_config['full_name'],
-                    "Mínimo": "—",
-                    "Média": "—",
-                    "Máximo": "—",
-                    "Unidade": standard_unit,
-                    "Fontes": f"{len(sources)}",
-                    "Qualidade": "—",
-                    "Principal": "—",
-                    "Link": None,
-                    "Link_Display": "—",
-                    "_has_data": False
-                })
+                link_url = None
+                link_text = "—"
+
+            avg_quality = stats.get('avg_quality') or 1.0
+            quality_text = "High" if avg_quality >= 2.5 else "Medium" if avg_quality >= 1.5 else "Low"
+
+            ci_text = "—"
+            if stats.get('ci_low') is not None and stats.get('ci_high') is not None:
+                ci_text = f"{stats['ci_low']:.1f}–{stats['ci_high']:.1f}"
+
+            params_data.append({
+                "Parâmetro": param_config['display_name'],
+                "Nome Completo": param_config['full_name'],
+                "Mínimo": f"{stats['min_value']:.1f}",
+                "Média": f"{stats['weighted_mean']:.1f}",
+                "Mediana": f"{stats['median']:.1f}",
+                "IC 95%": ci_text,
+                "Máximo": f"{stats['max_value']:.1f}",
+                "Unidade": stats.get('unit') or standard_unit,
+                "Fontes": f"{int(stats['n'])}",
+                "Outliers": f"{int(stats.get('n_outliers') or 0)}",
+                "Qualidade": quality_text,
+                "Principal": f"{best_source.reference_citation_short}" if best_source else "—",
+                "Link": link_url,
+                "Link_Display": link_text,
+                "_has_data": True
+            })
         else:
             # No data available
             params_data.append({
@@ -675,9 +665,12 @@ def render_chemical_parameters_from_db(residue_data):
                 "Nome Completo": param_config['full_name'],
                 "Mínimo": "—",
                 "Média": "—",
+                "Mediana": "—",
+                "IC 95%": "—",
                 "Máximo": "—",
                 "Unidade": standard_unit,
                 "Fontes": "0",
+                "Outliers": "—",
                 "Qualidade": "—",
                 "Principal": "—",
                 "Link": None,
@@ -707,10 +700,13 @@ def render_chemical_parameters_from_db(residue_data):
             "Parâmetro": st.column_config.TextColumn("Parâmetro", width="small"),
             "Nome Completo": st.column_config.TextColumn("Nome Completo", width="medium", help="Descrição completa do parâmetro"),
             "Mínimo": st.column_config.TextColumn("Mín", width="small"),
-            "Média": st.column_config.TextColumn("Média", width="small"),
+            "Média": st.column_config.TextColumn("Média", width="small", help="Média ponderada pela qualidade dos dados"),
+            "Mediana": st.column_config.TextColumn("Mediana", width="small"),
+            "IC 95%": st.column_config.TextColumn("IC 95%", width="small", help="Intervalo de confiança bootstrap da média ponderada"),
             "Máximo": st.column_config.TextColumn("Máx", width="small"),
             "Unidade": st.column_config.TextColumn("Unidade", width="small"),
             "Fontes": st.column_config.TextColumn("#", width="small", help="Número de fontes validadas"),
+            "Outliers": st.column_config.TextColumn("Outliers", width="small", help="Valores com z modificado (MAD) > 3,5"),
             "Qualidade": st.column_config.TextColumn("Quality", width="small"),
             "Principal": st.column_config.TextColumn("Fonte Principal", width="medium"),
             "Link": st.column_config.LinkColumn("Paper", width="small", display_text="Link_Display"),
@@ -722,9 +718,12 @@ def render_chemical_parameters_from_db(residue_data):
             "Nome Completo",
             "Mínimo",
             "Média",
+            "Mediana",
+            "IC 95%",
             "Máximo",
             "Unidade",
             "Fontes",
+            "Outliers",
             "Qualidade",
             "Principal",
             "Link"
@@ -734,32 +733,37 @@ def render_chemical_parameters_from_db(residue_data):
     # Legend
     st.caption("**Legenda:** Parâmetros em _cinza itálico_ ainda não possuem dados validados no banco de precisão.")
 
-    # Expandable details for sources
-    with st.expander("📖 Ver todas as fontes por parâmetro"):
-        st.caption("Expanda para ver lista completa de referências científicas para cada parâmetro.")
 
-        for param_code, param_config in all_parameters:
-            sources = load_parameter_sources_for_residue(residue_codigo, param_code)
-
-            if sources:
-                st.markdown(f"**{param_config['display_name']} ({param_config['full_name']})**")
 
-                for idx, source in enumerate(sources, 1):
-                    page_info = f", p. {source.page_number}" if source.page_number else ""
-                    year_info = f" ({source.reference_publication_year})" if source.reference_publication_year else ""
+def render_parameter_sources_accordions(residue_codigo: str):
+    """
+    One accordion per parameter with validated sources (each a fragment).
 
-                    # Build link
-                    pdf_path = Path(source.reference_pdf_path) if source.reference_pdf_path else None
-                    if pdf_path and pdf_path.exists():
-                        link_url = pdf_path.as_uri()
-                        st.markdown(f"{idx}. [{source.reference_citation_short}{year_info}]({link_url}){page_info} - **{source.value_mean} {source.unit}** ({source.data_quality})")
-                    elif source.reference_doi:
-                        link_url = f"https://doi.org/{source.reference_doi}"
-                        st.markdown(f"{idx}. [{source.reference_citation_short}{year_info}]({link_url}){page_info} - **{source.value_mean} {source.unit}** ({source.data_quality})")
-                    else:
-                        st.markdown(f"{idx}. {source.reference_citation_short}{year_info}{page_info} - **{source.value_mean} {source.unit}** ({source.data_quality})")
+    Args:
+        residue_codigo: Residue code (e.g., 'CANA_VINHACA')
+    """
+    from src.utils.unit_standards import PARAMETER_DISPLAY_CONFIG
+
+    st.markdown("### 📖 Fontes por Parâmetro")
+    st.caption("Expanda um parâmetro para ver e filtrar as referências científicas.")
+
+    parameter_stats = get_parameter_stats_for_residue(residue_codigo)
+    missing = []
+
+    for param_code, param_config in sorted(PARAMETER_DISPLAY_CONFIG.items(), key=lambda x: x[1]['priority']):
+        stats = parameter_stats.get(param_code)
+        if not (stats and stats.get('n')):
+            missing.append(param_config['display_name'])
+            continue
+        render_parameter_accordion(residue_codigo, {
+            'emoji': '🧪',
+            'name': param_config['full_name'],
+            'label': f"{param_config['display_name']} ({param_config['full_name']})",
+            'code': param_code,
+        })
 
-                st.markdown("---")
+    if missing:
+        st.caption(f"Sem fontes validadas: {', '.join(missing)}")
 
 
 # ============================================================================
@@ -1311,150 +1315,133 @@ def render_literature_references(residue_data):
 
 
 # ============================================================================
-# MAIN RENDER
+# PAGE SECTIONS (FRAGMENTS)
 # ============================================================================
 
-def main():
-    """Main page render function - Database Integrated"""
-    render_header()
-
-    # Main navigation bar
-    render_main_navigation(current_page="parametros")
-    render_navigation_divider()
-
-    # ========================================================================
-    # SECTION 1: INDIVIDUAL RESIDUE SELECTION (NOW FIRST!)
-    # ========================================================================
-
-    # Selector returns full residue data dict
-    residue_data = render_hierarchical_residue_selector()
-
-    if not residue_data:
-        st.info("👆 Selecione um setor e resíduo acima para visualizar os dados detalhados")
+@st.fragment
+def render_database_overview():
+    """Overview charts of all residues (shown when no residue is selected)"""
+    st.markdown("### 📊 Visão Geral do Banco de Dados")
 
-        # Show overview charts when no residue is selected
-        st.markdown("---")
-        st.markdown("### 📊 Visão Geral do Banco de Dados")
+    try:
+        df_all = get_all_residues_with_params()
+    except Exception as e:
+        st.error(f"Erro ao carregar dados: {e}")
+        return
 
-        # BMP Comparison Chart (ALL RESIDUES)
-        st.markdown("#### 📊 Comparação de BMP - Todos os Resíduos")
+    # BMP Comparison Chart (ALL RESIDUES)
+    st.markdown("#### 📊 Comparação de BMP - Todos os Resíduos")
 
-        st.info("""
-        **Visualização completa do banco de dados:** Todos os 38 resíduos catalogados com BMP validado.
-        Cores indicam o setor: 🌾 Agricultura (verde), 🐄 Pecuária (laranja), 🏙️ Urbano (roxo), 🏭 Industrial (azul)
-        """)
+    st.info("""
+    **Visualização completa do banco de dados:** Todos os 38 resíduos catalogados com BMP validado.
+    Cores indicam o setor: 🌾 Agricultura (verde), 🐄 Pecuária (laranja), 🏙️ Urbano (roxo), 🏭 Industrial (azul)
+    """)
 
-        try:
-            df_all = get_all_residues_with_params()
-            fig_bmp = create_bmp_comparison_bar(df_all)
-            st.plotly_chart(fig_bmp, use_container_width=True)
-        except Exception as e:
-            st.error(f"Erro ao carregar gráfico de comparação: {e}")
+    try:
+        fig_bmp = create_bmp_comparison_bar(df_all)
+        st.plotly_chart(fig_bmp, use_container_width=True)
+    except Exception as e:
+        st.error(f"Erro ao carregar gráfico de comparação: {e}")
 
-        st.markdown("---")
+    st.markdown("---")
 
-        # Parameter Box Plots by Sector
-        st.markdown("#### 📈 Distribuição de Parâmetros por Setor")
+    # Parameter Box Plots by Sector
+    st.markdown("#### 📈 Distribuição de Parâmetros por Setor")
 
-        col1, col2, col3 = st.columns(3)
+    col1, col2, col3 = st.columns(3)
 
-        try:
-            df_all = get_all_residues_with_params()
+    try:
+        with col1:
+            fig_bmp_box = create_parameter_boxplot(df_all, 'bmp', 'BMP', 'mL CH₄/g VS')
+            st.plotly_chart(fig_bmp_box, use_container_width=True)
 
-            with col1:
-                fig_bmp_box = create_parameter_boxplot(df_all, 'bmp', 'BMP', 'mL CH₄/g VS')
-                st.plotly_chart(fig_bmp_box, use_container_width=True)
+        with col2:
+            fig_ts_box = create_parameter_boxplot(df_all, 'ts', 'Sólidos Totais', '%')
+            st.plotly_chart(fig_ts_box, use_container_width=True)
 
-            with col2:
-                fig_ts_box = create_parameter_boxplot(df_all, 'ts', 'Sólidos Totais', '%')
-                st.plotly_chart(fig_ts_box, use_container_width=True)
+        with col3:
+            fig_vs_box = create_parameter_boxplot(df_all, 'vs', 'Sólidos Voláteis', '%')
+            st.plotly_chart(fig_vs_box, use_container_width=True)
 
-            with col3:
-                fig_vs_box = create_parameter_boxplot(df_all, 'vs', 'Sólidos Voláteis', '%')
-                st.plotly_chart(fig_vs_box, use_container_width=True)
+    except Exception as e:
+        st.error(f"Erro ao carregar box plots: {e}")
 
-        except Exception as e:
-            st.error(f"Erro ao carregar box plots: {e}")
 
-        # Show instructions
-        st.markdown("---")
-        st.markdown("### 📚 Sobre os Parâmetros Químicos")
+def render_parameters_about():
+    """Static explanation of the chemical parameters and the database"""
+    st.markdown("---")
+    st.markdown("### 📚 Sobre os Parâmetros Químicos")
 
-        col1, col2 = st.columns(2)
+    col1, col2 = st.columns(2)
 
-        with col1:
-            st.markdown("""
-            #### 🧬 Composição Química
+    with col1:
+        st.markdown("""
+        #### 🧬 Composição Química
 
-            A composição química é fundamental para entender o potencial de produção de biogás de cada resíduo.
+        A composição química é fundamental para entender o potencial de produção de biogás de cada resíduo.
 
-            **Parâmetros principais:**
-            - **BMP** (Biochemical Methane Potential): Potencial metanogênico
-            - **ST/SV** (Sólidos Totais/Voláteis): Conteúdo orgânico
-            - **C:N** (Relação Carbono:Nitrogênio): Equilíbrio nutricional
-            - **Nutrientes** (N, P, K): Composição do biofertilizante
+        **Parâmetros principais:**
+        - **BMP** (Biochemical Methane Potential): Potencial metanogênico
+        - **ST/SV** (Sólidos Totais/Voláteis): Conteúdo orgânico
+        - **C:N** (Relação Carbono:Nitrogênio): Equilíbrio nutricional
+        - **Nutrientes** (N, P, K): Composição do biofertilizante
 
-            Os valores apresentados são baseados em **revisão sistemática da literatura científica**,
-            com foco em estudos brasileiros e contexto tropical.
-            """)
+        Os valores apresentados são baseados em **revisão sistemática da literatura científica**,
+        com foco em estudos brasileiros e contexto tropical.
+        """)
 
-        with col2:
-            st.markdown("""
-            #### 🗄️ Banco de Dados Integrado
+    with col2:
+        st.markdown("""
+        #### 🗄️ Banco de Dados Integrado
 
-            Esta página agora carrega dados diretamente do banco de dados validado:
+        Esta página agora carrega dados diretamente do banco de dados validado:
 
-            **Estatísticas:**
-            - **38 resíduos** catalogados e validados
-            - **100% completude** - todos os resíduos têm BMP > 0
-            - **4 setores** (Agricultura, Pecuária, Urbano, Industrial)
-            - **Ranges validados** (mín/médio/máx) da literatura
+        **Estatísticas:**
+        - **38 resíduos** catalogados e validados
+        - **100% completude** - todos os resíduos têm BMP > 0
+        - **4 setores** (Agricultura, Pecuária, Urbano, Industrial)
+        - **Ranges validados** (mín/médio/máx) da literatura
 
-            **📊 Ranges MIN/MEAN/MAX:**
-            Os ranges mostram a variabilidade encontrada na literatura, permitindo
-            entender a robustez do processo e adaptar para condições locais.
-            """)
+        **📊 Ranges MIN/MEAN/MAX:**
+        Os ranges mostram a variabilidade encontrada na literatura, permitindo
+        entender a robustez do processo e adaptar para condições locais.
+        """)
 
-        return
 
-    st.markdown("---")
+@st.fragment
+def render_sector_comparison_section(residue_codigo: str):
+    """
+    Metrics, radar and bar comparisons of a residue against its sector.
 
-    # Data already loaded by selector - no need to load again!
-    # residue_data is already a dict with all fields from database
+    Args:
+        residue_codigo: Residue code (data is read through the cached accessors)
+    """
+    residue_data = load_residue_from_db(residue_codigo)
 
-    # Load all residues data for sector comparisons
     try:
         df_all = get_all_residues_with_params()
     except Exception as e:
         st.error(f"❌ Erro ao carregar dados: {e}")
-        df_all = pd.DataFrame()
-
-    # Render all sections
-    render_chemical_parameters_from_db(residue_data)
+        return
 
-    st.markdown("---")
+    if not residue_data or df_all.empty:
+        return
 
     # Enhanced metrics cards with sector comparison
-    if not df_all.empty:
-        render_enhanced_metrics(residue_data, df_all)
-        st.markdown("---")
+    render_enhanced_metrics(residue_data, df_all)
+    st.markdown("---")
 
     # Radar chart - multi-dimensional comparison
-    if not df_all.empty:
-        render_radar_chart(residue_data, df_all)
-        st.markdown("---")
+    render_radar_chart(residue_data, df_all)
+    st.markdown("---")
 
     # Sector comparison bars
-    if not df_all.empty:
-        render_sector_comparison_bars(residue_data, df_all)
-        st.markdown("---")
-
-    # Literature references section
-    render_literature_references(residue_data)
+    render_sector_comparison_bars(residue_data, df_all)
 
-    st.markdown("---")
 
-    # Link to lab comparison tool
+@st.fragment
+def render_page_actions():
+    """Link to the lab comparison tool and cache management"""
     st.markdown("### 🔬 Próximo Passo: Validação Laboratorial")
 
     col1, col2, col3 = st.columns([2, 1, 2])
@@ -1479,6 +1466,15 @@ def main():
             from datetime import datetime
             st.caption(f"📅 Última atualização desta página: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
+            from src.utils.figure_cache import get_figure_cache_stats
+            fig_stats = get_figure_cache_stats()
+            st.caption(
+                f"📊 Cache de gráficos: {fig_stats['entries']} gráficos, "
+                f"{fig_stats['bytes'] / 1024:.0f} KB, "
+                f"{fig_stats['hits']} acertos / {fig_stats['misses']} construções "
+                f"({fig_stats['hit_rate']:.0%})"
+            )
+
         with col2:
             if st.button("🔄 Limpar Cache", type="secondary", use_container_width=True):
                 from src.data_handler import clear_all_caches
@@ -1487,5 +1483,58 @@ def main():
                 st.rerun()
 
 
+# ============================================================================
+# MAIN RENDER
+# ============================================================================
+
+def main():
+    """Main page render function - Database Integrated"""
+    render_header()
+
+    # Main navigation bar
+    render_main_navigation(current_page="parametros")
+    render_navigation_divider()
+
+    # ========================================================================
+    # SECTION 1: INDIVIDUAL RESIDUE SELECTION (NOW FIRST!)
+    # ========================================================================
+
+    # Selector returns full residue data dict
+    residue_data = render_hierarchical_residue_selector()
+
+    if not residue_data:
+        st.info("👆 Selecione um setor e resíduo acima para visualizar os dados detalhados")
+
+        # Show overview charts when no residue is selected
+        st.markdown("---")
+        render_database_overview()
+        render_parameters_about()
+        return
+
+    st.markdown("---")
+
+    residue_codigo = residue_data.get('codigo', '')
+
+    # Render all sections
+    render_chemical_parameters_from_db(residue_data)
+
+    st.markdown("---")
+
+    render_parameter_sources_accordions(residue_codigo)
+
+    st.markdown("---")
+
+    render_sector_comparison_section(residue_codigo)
+
+    st.markdown("---")
+
+    # Literature references section
+    render_literature_references(residue_data)
+
+    st.markdown("---")
+
+    render_page_actions()
+
+
 if __name__ == "__main__":
     main()
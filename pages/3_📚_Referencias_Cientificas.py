@@ -11,15 +11,18 @@ Phase 2 Complete:
 
 import streamlit as st
 import pandas as pd
+import plotly.express as px
 from typing import List, Dict, Set
 from collections import defaultdict
 
 # Phase 2 - Database Integration
 from src.data_handler import (
     load_scientific_references,
-    get_panorama_connection
+    get_panorama_connection,
+    load_literature_coverage
 )
 from src.models.reference_models import ScientificReference
+from src.data.residue_registry import get_available_residues, get_residue_data
 from src.ui.reference_components import (
     render_reference_table,
     render_export_buttons,
@@ -393,6 +396,56 @@ def render_key_papers(references: List[ScientificReference]):
             st.markdown("---")
 
 
+# ============================================================================
+# LITERATURE COVERAGE
+# ============================================================================
+
+def render_literature_coverage():
+    """Residue × parameter coverage, gaps and papers-needed ranking"""
+    from src.services.literature_coverage import MIN_PAPERS
+
+    try:
+        coverage = load_literature_coverage()
+    except Exception as e:
+        st.warning(f"Cobertura da literatura indisponível: {e}")
+        return
+
+    st.markdown("### 🧭 Cobertura da Literatura")
+    st.caption(
+        f"Artigos validados por resíduo e parâmetro. Lacuna: parâmetro essencial com menos de "
+        f"{MIN_PAPERS} artigos. Cobertura ponderada pela qualidade dos dados (alta = 3, média = 2, baixa = 1)."
+    )
+
+    needed = coverage.papers_needed()
+    gaps = coverage.gaps()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Resíduos", len(coverage.residues))
+    col2.metric("Lacunas", len(gaps))
+    col3.metric("Artigos necessários", int(needed['artigos_necessarios'].sum()))
+
+    view = st.radio("Exibir", ["Artigos", "Cobertura ponderada"], horizontal=True, key="coverage_view")
+    matrix = coverage.matrix('papers' if view == "Artigos" else 'coverage')
+    fig = px.imshow(
+        matrix,
+        text_auto=True if view == "Artigos" else '.2f',
+        color_continuous_scale='YlOrBr',
+        aspect='auto',
+        labels={'x': 'Parâmetro', 'y': 'Resíduo', 'color': view}
+    )
+    fig.update_layout(height=max(300, 35 * len(matrix)), margin=dict(l=0, r=0, t=10, b=0))
+    st.plotly_chart(fig, use_container_width=True)
+
+    tab1, tab2, tab3 = st.tabs(["📉 Artigos necessários", "🕳️ Lacunas", "🧪 Por parâmetro"])
+    with tab1:
+        st.dataframe(needed, use_container_width=True, hide_index=True)
+    with tab2:
+        residue = st.selectbox("Resíduo", ['Todos'] + list(coverage.residue_names), key="coverage_gap_residue")
+        shown = gaps if residue == 'Todos' else gaps[gaps['residuo'] == residue]
+        st.dataframe(shown, use_container_width=True, hide_index=True)
+    with tab3:
+        st.dataframe(coverage.parameter_gaps(), use_container_width=True, hide_index=True)
+
+
 # ============================================================================
 # MAIN RENDER
 # ============================================================================
@@ -405,6 +458,9 @@ def main():
     render_main_navigation(current_page="referencias")
     render_navigation_divider()
 
+    with st.expander("🧭 Cobertura da Literatura e Lacunas", expanded=False):
+        render_literature_coverage()
+
     # Gather references by group (sector/culture)
     group_refs = gather_references_by_group()
 
@@ -16,11 +16,15 @@ from src.ui.tabs import render_sector_tabs, render_hierarchical_dropdowns
 from src.ui.main_navigation import render_main_navigation, render_navigation_divider
 from src.lab_comparison import (
     LabComparison,
+    BatchLabComparison,
+    read_lab_batch,
     initialize_lab_session,
-    save_lab_result,
+    save_lab_results,
     get_lab_results,
+    get_lab_repository,
     clear_lab_results,
-    export_comparison_report
+    export_comparison_report,
+    export_lab_sample
 )
 
 
@@ -236,10 +240,6 @@ def render_lab_input_tool(residue_name, residue_data):
             st.warning("⚠️ Por favor, insira pelo menos um valor para comparação")
             return
 
-        # Save to session state
-        for param, value in filtered_lab_data.items():
-            save_lab_result(residue_name, param, value)
-
         st.session_state.lab_metadata = {
             'lab_name': lab_name,
             'measurement_date': str(measurement_date),
@@ -249,7 +249,10 @@ def render_lab_input_tool(residue_name, residue_data):
             'notes': notes
         }
 
-        st.success("✅ Dados laboratoriais salvos! Veja a comparação abaixo.")
+        # Keep all parameters of the sample in the session
+        save_lab_results(residue_name, filtered_lab_data, st.session_state.lab_metadata)
+
+        st.success("✅ Dados laboratoriais salvos na sessão! Veja a comparação abaixo.")
 
     # Display comparison if data exists
     lab_results = get_lab_results(residue_name)
@@ -314,6 +317,9 @@ def render_lab_input_tool(residue_name, residue_data):
             error_count = status_counts.get('❌', 0)
             st.metric("❌ Fora da Faixa", error_count)
 
+        # Nearest known residues for the measured profile
+        render_similarity_matches(lab_results, residue_name)
+
         # Export and clear buttons
         st.markdown("---")
         col1, col2, col3, col4 = st.columns([1, 1, 1, 2])
@@ -338,6 +344,194 @@ def render_lab_input_tool(residue_name, residue_data):
                 clear_lab_results(residue_name)
                 st.rerun()
 
+        with col4:
+            sample_data = export_lab_sample(residue_name)
+            if sample_data:
+                st.download_button(
+                    label="📦 Exportar Amostra (lote)",
+                    data=sample_data,
+                    file_name=f"amostra_{residue_name}_{date.today()}.csv",
+                    mime="text/csv",
+                    width="stretch",
+                    help="Para incluir no histórico: python scripts/migrate_lab_results.py --import <arquivo>"
+                )
+
+
+# ============================================================================
+# RESIDUE IDENTIFICATION (NEAREST NEIGHBORS)
+# ============================================================================
+
+SIMILARITY_LABELS = {
+    'ts': 'TS', 'vs': 'VS', 'bmp': 'BMP', 'cn_ratio': 'C:N', 'ph': 'pH', 'cod': 'DQO'
+}
+
+
+def render_similarity_matches(lab_results, residue_name):
+    """Render the known residues whose profile is closest to the measured sample"""
+    from src.data_handler import identify_residues
+
+    sample = {key: value for key, value in lab_results.items() if key in SIMILARITY_LABELS}
+    if not sample:
+        return
+
+    try:
+        matches = identify_residues(pd.DataFrame([sample]), k=5)
+    except Exception as e:
+        st.info(f"ℹ️ Identificação por similaridade indisponível: {e}")
+        return
+    if matches.empty:
+        return
+
+    st.markdown("### 🔎 Com qual resíduo esta amostra se parece?")
+    best = matches.iloc[0]
+    if best['residuo'] != residue_name:
+        st.warning(
+            f"⚠️ O perfil medido está mais próximo de **{best['residuo']}** "
+            f"(similaridade {best['similaridade']:.0%}) do que do resíduo selecionado."
+        )
+
+    display = matches.drop(columns=['sample_id', 'codigo']).rename(columns={
+        'rank': '#', 'residuo': 'Resíduo', 'distancia': 'Distância',
+        'similaridade': 'Similaridade', 'parametros_comparados': 'Parâmetros Comparados',
+        **{f'concordancia_{key}': label for key, label in SIMILARITY_LABELS.items()}
+    })
+    st.dataframe(
+        display,
+        hide_index=True,
+        width="stretch",
+        column_config={
+            'Similaridade': st.column_config.ProgressColumn(format="%.2f", min_value=0.0, max_value=1.0),
+            'Distância': st.column_config.NumberColumn(format="%.2f"),
+        }
+    )
+    st.caption("Distância euclidiana em unidades padronizadas (z) sobre os parâmetros medidos "
+               "em comum; concordância por parâmetro: alta (≤1σ), média (≤2σ), baixa (>2σ).")
+
+
+# ============================================================================
+# HISTORY / CONTROL CHART
+# ============================================================================
+
+def render_control_chart(residue_name):
+    """Render persisted history of a residue as a control chart (running mean ±3σ)"""
+    import plotly.graph_objects as go
+
+    repository = get_lab_repository()
+    if repository is None:
+        return
+
+    parameters = repository.list_parameters(residue_name)
+    if not parameters:
+        return
+
+    st.markdown("---")
+    st.markdown("### 📈 Histórico e Carta de Controle")
+
+    parameter = st.selectbox("Parâmetro", parameters, key=f"lab_chart_{residue_name}")
+    chart = repository.get_control_chart(residue_name, parameter)
+    if chart.empty:
+        return
+
+    x = chart['data_medicao']
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=x, y=chart['valor'], mode='markers', name='Medições',
+                             marker=dict(color=chart['fora_controle'].map({0: '#3b82f6', 1: '#ef4444'}))))
+    fig.add_trace(go.Scatter(x=x, y=chart['media_acumulada'], mode='lines', name='Média acumulada'))
+    fig.add_trace(go.Scatter(x=x, y=chart['media_movel'], mode='lines', name='Média móvel',
+                             line=dict(dash='dot')))
+    fig.add_trace(go.Scatter(x=x, y=chart['lsc'], mode='lines', name='LSC (+3σ)',
+                             line=dict(color='#ef4444', dash='dash')))
+    fig.add_trace(go.Scatter(x=x, y=chart['lic'], mode='lines', name='LIC (-3σ)',
+                             line=dict(color='#ef4444', dash='dash')))
+    fig.update_layout(height=380, margin=dict(l=10, r=10, t=30, b=10), hovermode='x unified')
+    st.plotly_chart(fig, width="stretch")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("🧪 Medições", len(chart))
+    with col2:
+        st.metric("🚨 Fora de Controle", int(chart['fora_controle'].sum()))
+
+
+# ============================================================================
+# BATCH COMPARISON TOOL
+# ============================================================================
+
+def render_batch_comparison_tool():
+    """Render batch upload (CSV/Excel) and vectorized comparison"""
+    from src.data_handler import get_precision_parameter_distribution
+
+    st.markdown("""
+    Envie uma planilha com **uma linha por amostra** e colunas `amostra`, `residuo`
+    (ou `codigo`) e os parâmetros medidos (`BMP`, `ST`, `SV`, `pH`, `DQO`, `C:N`, ...),
+    ou no formato longo (`amostra`, `residuo`, `parametro`, `valor`, `unidade`).
+    """)
+
+    uploaded = st.file_uploader(
+        "📂 Arquivo de amostras",
+        type=['csv', 'xlsx', 'xls'],
+        key='lab_batch_upload'
+    )
+    if uploaded is None:
+        return
+
+    try:
+        samples = read_lab_batch(uploaded)
+    except ValueError as e:
+        st.error(f"⚠️ {e}")
+        return
+
+    references = BatchLabComparison.reference_values(samples['residue'].unique())
+    scored = BatchLabComparison.score(samples, references, get_precision_parameter_distribution())
+    summary = BatchLabComparison.summarize(scored)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("🧪 Amostras", samples['sample_id'].nunique())
+    with col2:
+        st.metric("📊 Medições", len(scored))
+    with col3:
+        st.metric("❌ Fora da Faixa", int((scored['status'].str.startswith('❌')).sum()))
+
+    st.dataframe(summary, hide_index=True, width="stretch")
+    st.dataframe(
+        scored[['sample_id', 'residue', 'parameter_label', 'measured', 'reference',
+                'deviation_pct', 'status', 'precision_mean', 'precision_unit', 'z_score']],
+        hide_index=True,
+        width="stretch",
+        height=400
+    )
+
+    # Closest known residue per sample (flags mislabeled samples)
+    from src.data_handler import identify_residues
+
+    wide = samples.pivot_table(index='sample_id', columns='parameter', values='measured', aggfunc='mean').reset_index()
+    try:
+        matches = identify_residues(wide, k=1)
+    except Exception as e:
+        matches = pd.DataFrame()
+        st.info(f"ℹ️ Identificação por similaridade indisponível: {e}")
+    if not matches.empty:
+        declared = samples.groupby('sample_id')['residue'].first()
+        matches['residuo_declarado'] = matches['sample_id'].map(declared)
+        st.markdown("#### 🔎 Resíduo mais semelhante por amostra")
+        st.dataframe(
+            matches[['sample_id', 'residuo_declarado', 'residuo', 'similaridade', 'parametros_comparados']].rename(
+                columns={'sample_id': 'Amostra', 'residuo_declarado': 'Declarado',
+                         'residuo': 'Mais Semelhante', 'similaridade': 'Similaridade',
+                         'parametros_comparados': 'Parâmetros Comparados'}
+            ),
+            hide_index=True,
+            width="stretch"
+        )
+
+    st.download_button(
+        label="📥 Exportar Relatório do Lote (CSV)",
+        data=export_comparison_report(scored, 'lote'),
+        file_name=f"comparacao_lote_{date.today()}.csv",
+        mime="text/csv"
+    )
+
 
 # ============================================================================
 # MAIN RENDER
@@ -351,6 +545,9 @@ def main():
     render_main_navigation(current_page="lab")
     render_navigation_divider()
 
+    with st.expander("📂 Comparação em Lote (CSV/Excel)", expanded=False):
+        render_batch_comparison_tool()
+
     # Sector and residue selection
     selected_residue = render_hierarchical_dropdowns(key_prefix="lab_comp")
 
@@ -404,6 +601,9 @@ def main():
     # Render lab input tool
     render_lab_input_tool(selected_residue, residue_data)
 
+    # Persisted history for the residue
+    render_control_chart(selected_residue)
+
 
 if __name__ == "__main__":
     main()
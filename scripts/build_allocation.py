@@ -0,0 +1,63 @@
+"""
+Residue Allocation Build Script
+
+Builds the residuos_municipios table (per-residue municipal CH4 potential, see
+src/services/residue_allocator.py) in cp2b_panorama.db. The app only reads the
+table, so run this after updating residuos, municipios or the maps database.
+
+When cp2b_panorama.db is served through blue/green deployments
+(src/utils/db_deploy.py), the table is built in a side copy and deployed as a
+new version; otherwise the database file is updated in place.
+
+Usage:
+    python scripts/build_allocation.py
+    python scripts/build_allocation.py --db data/cp2b_panorama.db --maps-db data/cp2b_maps.db
+"""
+
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.residue_allocator import ResidueAllocator
+from src.utils import db_deploy
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+def build(target: Path, maps_db: Path) -> bool:
+    """Compute the allocation and persist it into target. Returns True if rewritten."""
+    conn = sqlite3.connect(str(target))
+    maps_conn = sqlite3.connect(f"file:{db_deploy.resolve_db_path(maps_db)}?mode=ro", uri=True)
+    try:
+        return ResidueAllocator.persist(conn, ResidueAllocator.load(conn, maps_conn))
+    finally:
+        maps_conn.close()
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the residuos_municipios allocation table")
+    parser.add_argument('--db', default=str(DATA_DIR / "cp2b_panorama.db"), help="Logical path of cp2b_panorama.db")
+    parser.add_argument('--maps-db', default=str(DATA_DIR / "cp2b_maps.db"), help="Logical path of cp2b_maps.db")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"❌ Database not found: {args.db}")
+        sys.exit(1)
+
+    if db_deploy.read_pointer(args.db):
+        with db_deploy.build_version(args.db) as side:
+            written = build(side, Path(args.maps_db))
+        print(f"✅ residuos_municipios {'reconstruída' if written else 'inalterada'}; "
+              f"versão {db_deploy.current_version(args.db)} implantada")
+    else:
+        written = build(Path(args.db), Path(args.maps_db))
+        print(f"✅ residuos_municipios {'reconstruída' if written else 'já atualizada'} em {args.db}")
+
+
+if __name__ == '__main__':
+    main()
@@ -7,8 +7,10 @@ into the PanoramaCP2B database.
 Modules:
     data_loaders: Load CSV/Excel files from validation notebooks
     data_validators: Validate data quality and integrity
+    validation_executor: Run validation rules in parallel over memory-mapped frames
     data_transformers: Transform data to database schema
     database_inserters: Insert data into SQLite with transactions
+    integration_state: Content-hash change detection and step checkpoints
     integration_runner: Orchestrate the integration pipeline
 """
 
@@ -5,6 +5,8 @@ Validates data quality, integrity, and consistency.
 Each function performs ONE specific validation check.
 """
 
+import time
+
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple, Optional
@@ -278,59 +280,82 @@ def validate_positive_values(df: pd.DataFrame, columns: List[str]) -> Tuple[bool
     return is_valid, report
 
 
-def generate_validation_report(df: pd.DataFrame, data_type: str) -> Dict:
+def plan_validation_rules(df: pd.DataFrame, data_type: str) -> List[Tuple[str, str, tuple, List[str]]]:
     """
-    Generate comprehensive validation report for a DataFrame.
+    List the rule checks that apply to a DataFrame.
+
+    Single source of truth for generate_validation_report and the parallel
+    validation executor. Content rules are only planned when the required
+    columns are present.
 
     Args:
         df: DataFrame to validate
         data_type: Type of data ('scenarios', 'factors', 'complete_potential')
 
     Returns:
-        Dict: Comprehensive validation report with all checks
+        List of (rule name, validator function name, extra args, columns read)
     """
-    logger.info(f"Generating validation report for: {data_type}")
+    rules = []
 
-    report = {
-        'data_type': data_type,
-        'total_rows': len(df),
-        'total_columns': len(df.columns),
-        'columns': list(df.columns),
-        'validations': {}
-    }
-
-    # Scenario-specific validations
     if data_type == 'scenarios':
         required = ['codigo_municipio', 'nome_municipio', 'ch4_pes_total',
                     'ch4_rea_total', 'ch4_oti_total']
-        valid, result = validate_required_columns(df, required)
-        report['validations']['required_columns'] = result
+        rules.append(('required_columns', 'validate_required_columns', (required,), []))
 
-        if valid:
+        if all(col in df.columns for col in required):
             numeric_cols = ['ch4_pes_total', 'ch4_rea_total', 'ch4_oti_total',
                             'energia_pes_mwh', 'energia_rea_mwh', 'energia_oti_mwh']
             numeric_cols = [c for c in numeric_cols if c in df.columns]
-            valid, result = validate_numeric_columns(df, numeric_cols)
-            report['validations']['numeric_columns'] = result
-
-            valid, result = validate_positive_values(df, numeric_cols)
-            report['validations']['positive_values'] = result
-
-            valid, result = validate_no_duplicates(df, ['codigo_municipio'])
-            report['validations']['no_duplicates'] = result
+            rules.append(('numeric_columns', 'validate_numeric_columns', (numeric_cols,), numeric_cols))
+            rules.append(('positive_values', 'validate_positive_values', (numeric_cols,), numeric_cols))
+            rules.append(('no_duplicates', 'validate_no_duplicates', (['codigo_municipio'],), ['codigo_municipio']))
 
-    # Factors-specific validations
     elif data_type == 'factors':
         required = ['codigo', 'nome', 'setor', 'bmp_medio']
-        valid, result = validate_required_columns(df, required)
-        report['validations']['required_columns'] = result
+        rules.append(('required_columns', 'validate_required_columns', (required,), []))
 
-        if valid:
-            valid, result = validate_saf_factors(df)
-            report['validations']['saf_factors'] = result
+        if all(col in df.columns for col in required):
+            factor_cols = [c for c in ['fc_medio', 'fcp_medio', 'fs_medio', 'fl_medio'] if c in df.columns]
+            rules.append(('saf_factors', 'validate_saf_factors', (), factor_cols))
+            rules.append(('no_duplicates', 'validate_no_duplicates', (['codigo'],), ['codigo']))
+
+    return rules
+
+
+def generate_validation_report(df: pd.DataFrame, data_type: str,
+                               rule_results: Optional[Dict[str, Tuple[bool, Dict, float]]] = None) -> Dict:
+    """
+    Generate comprehensive validation report for a DataFrame.
+
+    Args:
+        df: DataFrame to validate
+        data_type: Type of data ('scenarios', 'factors', 'complete_potential')
+        rule_results: Optional precomputed {rule name: (is_valid, result, seconds)}
+                      (e.g. from validation_executor); rules not in it run here
+
+    Returns:
+        Dict: Comprehensive validation report with all checks and per-rule timings
+    """
+    logger.info(f"Generating validation report for: {data_type}")
+
+    report = {
+        'data_type': data_type,
+        'total_rows': len(df),
+        'total_columns': len(df.columns),
+        'columns': list(df.columns),
+        'validations': {},
+        'timings': {}
+    }
 
-            valid, result = validate_no_duplicates(df, ['codigo'])
-            report['validations']['no_duplicates'] = result
+    rule_results = rule_results or {}
+    for rule_name, func_name, args, _ in plan_validation_rules(df, data_type):
+        if rule_name not in rule_results:
+            start = time.perf_counter()
+            valid, result = globals()[func_name](df, *args)
+            rule_results[rule_name] = (valid, result, time.perf_counter() - start)
+        _, result, seconds = rule_results[rule_name]
+        report['validations'][rule_name] = result
+        report['timings'][rule_name] = round(seconds, 6)
 
     # Summary
     all_valid = all(
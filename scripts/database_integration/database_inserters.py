@@ -9,8 +9,6 @@ import pandas as pd
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Engine
 from pathlib import Path
-from datetime import datetime
-import shutil
 import logging
 from typing import Optional, Dict
 
@@ -18,19 +16,37 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def database_file(db_path: str = "data/cp2b_maps.db") -> Path:
+    """
+    Absolute path of a database (relative paths are taken from the project root).
+
+    Args:
+        db_path: Path to SQLite database file
+
+    Returns:
+        Path: Absolute database path
+    """
+    if not Path(db_path).is_absolute():
+        return Path(__file__).parent.parent.parent / db_path
+    return Path(db_path)
+
+
 def get_database_engine(db_path: str = "data/cp2b_maps.db") -> Engine:
     """
     Create SQLAlchemy engine for database connection.
 
+    Connects to the currently deployed version of the database when it is
+    served through src/utils/db_deploy.py.
+
     Args:
         db_path: Path to SQLite database file
 
     Returns:
         Engine: SQLAlchemy database engine
     """
-    # Convert to absolute path if relative
-    if not Path(db_path).is_absolute():
-        db_path = Path(__file__).parent.parent.parent / db_path
+    from src.utils.db_deploy import resolve_db_path
+
+    db_path = resolve_db_path(database_file(db_path))
 
     engine = create_engine(f"sqlite:///{db_path}")
     logger.info(f"Connected to database: {db_path}")
@@ -38,36 +54,34 @@ def get_database_engine(db_path: str = "data/cp2b_maps.db") -> Engine:
     return engine
 
 
-def backup_database(db_path: str = "data/cp2b_maps.db", backup_dir: Optional[str] = None) -> str:
+def backup_database(db_path: str = "data/cp2b_maps.db", backup_dir: Optional[str] = None,
+                    label: str = 'integration') -> str:
     """
-    Create timestamped backup of database file.
+    Snapshot the database into its page-deduplicated backup store.
+
+    Uses the SQLite online backup API (page batches, readers are not blocked)
+    and stores only pages not already present in an earlier snapshot.
+    Restore with: python scripts/db_backup.py restore <db> <snapshot_id>
 
     Args:
         db_path: Path to database file to backup
-        backup_dir: Optional directory for backups (default: same as db_path)
+        backup_dir: Optional page store directory (default: <db dir>/backups/<db name>)
+        label: Reason recorded in the snapshot manifest
 
     Returns:
-        str: Path to backup file
+        str: Path to the snapshot manifest
 
     Raises:
         FileNotFoundError: If database file doesn't exist
     """
-    db_file = Path(db_path)
-
-    if not db_file.exists():
-        raise FileNotFoundError(f"Database file not found: {db_path}")
-
-    if backup_dir is None:
-        backup_dir = db_file.parent
-
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_name = f"{db_file.stem}_backup_{timestamp}{db_file.suffix}"
-    backup_path = Path(backup_dir) / backup_name
+    from src.utils.db_backup import create_snapshot
 
-    shutil.copy2(db_file, backup_path)
-    logger.info(f"Database backup created: {backup_path}")
+    snapshot = create_snapshot(db_path, backup_dir, label=label)
+    logger.info(f"Database snapshot {snapshot['snapshot_id']} created: "
+                f"{snapshot['new_pages']}/{snapshot['page_count']} new pages "
+                f"({snapshot['new_bytes'] / 1024:.1f} KiB stored)")
 
-    return str(backup_path)
+    return snapshot['manifest_path']
 
 
 def add_scenario_columns_if_missing(engine: Engine) -> None:
@@ -117,10 +131,74 @@ def add_scenario_columns_if_missing(engine: Engine) -> None:
     logger.info("Scenario columns check complete")
 
 
+SCENARIO_PREFIXES = [
+    'ch4_pessimistic', 'ch4_realistic', 'ch4_optimistic',
+    'energia_pessimistic', 'energia_realistic', 'energia_optimistic',
+    'ch4_theoretical',
+]
+
+# Natural key per sector table: a re-loaded (municipality, year, type) replaces the old row
+SECTOR_TABLE_KEYS = {
+    'residuos_agricolas': ['codigo_municipio', 'ano', 'cultura'],
+    'residuos_pecuarios': ['codigo_municipio', 'ano', 'tipo_criacao'],
+    'residuos_urbanos': ['codigo_municipio', 'ano'],
+    'residuos_industriais': ['codigo_municipio', 'ano', 'setor_industrial', 'nome_estabelecimento', 'tipo_residuo'],
+}
+
+MISSING_CODES_LOGGED = 20
+
+
+def _table_columns(conn, table_name: str) -> Dict[str, tuple]:
+    """Column name → PRAGMA table_info row (cid, name, type, notnull, default, pk)."""
+    return {row[1]: tuple(row) for row in conn.exec_driver_sql(f"PRAGMA table_info({table_name})")}
+
+
+def _stage_dataframe(conn, df: pd.DataFrame, staging_table: str, column_types: Dict[str, str]) -> int:
+    """
+    Load a DataFrame into a TEMP table with one executemany call.
+
+    Declared column types follow the target table so SQLite applies the same
+    affinity (e.g., '3550308' → 3550308) on both sides of the join.
+
+    Returns:
+        int: Number of staged rows
+    """
+    columns = list(column_types)
+    conn.exec_driver_sql(f"DROP TABLE IF EXISTS temp.{staging_table}")
+    conn.exec_driver_sql(
+        f"CREATE TEMP TABLE {staging_table} ("
+        + ", ".join(f"{col} {column_types[col] or ''}" for col in columns) + ")"
+    )
+    values = df[columns].astype(object).where(df[columns].notna(), None)
+    rows = list(values.itertuples(index=False, name=None))
+    if rows:
+        conn.exec_driver_sql(
+            f"INSERT INTO {staging_table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+            rows
+        )
+    return len(rows)
+
+
+def _missing_municipalities(conn, staging_table: str) -> list:
+    """Staged municipality codes absent from municipalities (set difference in SQL)."""
+    result = conn.exec_driver_sql(f"""
+        SELECT DISTINCT s.codigo_municipio FROM {staging_table} AS s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM municipalities AS m WHERE m.codigo_municipio = s.codigo_municipio
+        )
+    """)
+    return [row[0] for row in result]
+
+
 def update_municipalities_with_scenarios(engine: Engine, df: pd.DataFrame, backup: bool = True) -> Dict:
     """
     Update municipalities table with scenario data.
 
+    Set-based: the DataFrame is staged into a TEMP table with executemany and
+    applied with one UPDATE ... FROM join inside a single transaction.
+    Updated/missing counts come from set differences between staged codes and
+    municipalities (duplicate codes in df: last row wins).
+
     Args:
         engine: SQLAlchemy database engine
         df: DataFrame with scenario data (must have codigo_municipio)
@@ -140,53 +218,49 @@ def update_municipalities_with_scenarios(engine: Engine, df: pd.DataFrame, backu
 
     # Get scenario columns from DataFrame
     scenario_cols = [col for col in df.columns
-                     if any(col.startswith(prefix) for prefix in
-                            ['ch4_pessimistic', 'ch4_realistic', 'ch4_optimistic',
-                             'energia_pessimistic', 'energia_realistic', 'energia_optimistic',
-                             'ch4_theoretical'])]
+                     if any(col.startswith(prefix) for prefix in SCENARIO_PREFIXES)]
 
     if not scenario_cols:
         logger.warning("No scenario columns found in DataFrame")
         return {'success': False, 'error': 'No scenario columns found'}
 
-    updated_count = 0
-    failed_count = 0
+    staged = df[['codigo_municipio'] + scenario_cols].drop_duplicates('codigo_municipio', keep='last')
 
     try:
         with engine.begin() as conn:  # Transaction context
-            for idx, row in df.iterrows():
-                codigo = row['codigo_municipio']
-
-                # Build UPDATE query
-                set_clauses = [f"{col} = :{col}" for col in scenario_cols]
-                update_sql = f"""
-                    UPDATE municipalities
-                    SET {', '.join(set_clauses)}
-                    WHERE codigo_municipio = :codigo_municipio
-                """
-
-                # Prepare parameters
-                params = {'codigo_municipio': codigo}
-                for col in scenario_cols:
-                    params[col] = row[col] if pd.notna(row[col]) else None
-
-                result = conn.execute(text(update_sql), params)
-
-                if result.rowcount > 0:
-                    updated_count += 1
-                else:
-                    failed_count += 1
-                    logger.warning(f"  Municipality not found: {codigo}")
+            columns = _table_columns(conn, 'municipalities')
+            unknown = [col for col in scenario_cols if col not in columns]
+            if unknown:
+                return {'success': False, 'error': f'Unknown municipalities columns: {unknown}'}
+
+            conn.exec_driver_sql(
+                "CREATE INDEX IF NOT EXISTS idx_codigo_municipio ON municipalities(codigo_municipio)"
+            )
+            _stage_dataframe(conn, staged, '_staging_scenarios',
+                             {col: columns[col][2] for col in ['codigo_municipio'] + scenario_cols})
+            missing = _missing_municipalities(conn, '_staging_scenarios')
+
+            set_clause = ', '.join(f"{col} = s.{col}" for col in scenario_cols)
+            result = conn.exec_driver_sql(f"""
+                UPDATE municipalities
+                SET {set_clause}
+                FROM _staging_scenarios AS s
+                WHERE municipalities.codigo_municipio = s.codigo_municipio
+            """)
+            updated_count = result.rowcount
+            conn.exec_driver_sql("DROP TABLE temp._staging_scenarios")
 
         logger.info(f"Successfully updated {updated_count} municipalities")
 
-        if failed_count > 0:
-            logger.warning(f"Failed to update {failed_count} municipalities (not found in database)")
+        if missing:
+            logger.warning(f"Failed to update {len(missing)} municipalities (not found in database): "
+                           f"{missing[:MISSING_CODES_LOGGED]}")
 
         return {
             'success': True,
             'updated_count': updated_count,
-            'failed_count': failed_count,
+            'failed_count': len(missing),
+            'missing_codes': missing,
             'total_rows': len(df)
         }
 
@@ -200,6 +274,13 @@ def insert_residues_by_sector(engine: Engine, sector_dfs: Dict[str, pd.DataFrame
     """
     Insert residue data into sector-specific tables.
 
+    DataFrame columns are matched to table columns by name. Each table is
+    staged into a TEMP table and loaded in one transaction: rows of unknown
+    municipalities are dropped, rows with the same natural key
+    (SECTOR_TABLE_KEYS) are replaced, then one INSERT ... SELECT adds the rest.
+    DataFrames lacking required (NOT NULL) columns - e.g. residue-level factor
+    tables without codigo_municipio/ano - are reported as 'skipped'.
+
     Args:
         engine: SQLAlchemy database engine
         sector_dfs: Dictionary mapping table names to DataFrames
@@ -207,7 +288,7 @@ def insert_residues_by_sector(engine: Engine, sector_dfs: Dict[str, pd.DataFrame
         backup: Whether to create backup before inserting
 
     Returns:
-        Dict: Operation report with success status and counts
+        Dict: Operation report with success status and counts per table
     """
     logger.info("Inserting residues by sector...")
 
@@ -218,30 +299,65 @@ def insert_residues_by_sector(engine: Engine, sector_dfs: Dict[str, pd.DataFrame
     results = {}
 
     try:
-        for table_name, df in sector_dfs.items():
-            logger.info(f"Processing table: {table_name} ({len(df)} rows)")
-
-            # For now, we'll store residue metadata (not municipality-level data)
-            # This is because the empty residue tables have municipality-specific schema
-            # We need to check the actual schema first
-
-            with engine.connect() as conn:
-                # Check table schema
-                result = conn.execute(text(f"PRAGMA table_info({table_name})"))
-                columns = {row[1] for row in result}
-
-            # Map DataFrame columns to table columns
-            # This mapping depends on the actual table schema
-            # For now, log what we would insert
-            logger.info(f"  Table {table_name} has columns: {columns}")
-            logger.info(f"  DataFrame has columns: {list(df.columns)}")
-
-            # Count as pending (will implement actual insert in next iteration)
-            results[table_name] = {
-                'status': 'pending',
-                'rows': len(df),
-                'message': 'Schema mapping needed'
-            }
+        with engine.begin() as conn:  # One transaction for all tables
+            for table_name, df in sector_dfs.items():
+                logger.info(f"Processing table: {table_name} ({len(df)} rows)")
+
+                columns = _table_columns(conn, table_name)
+                required = [name for name, (_, _, _, notnull, default, pk) in columns.items()
+                            if notnull and default is None and not pk]
+                missing_required = [col for col in required if col not in df.columns]
+                if missing_required:
+                    logger.warning(f"  Skipping {table_name}: missing required columns {missing_required}")
+                    results[table_name] = {
+                        'status': 'skipped',
+                        'rows': len(df),
+                        'message': f'Missing required columns: {missing_required}'
+                    }
+                    continue
+
+                insert_cols = [col for col in columns if col in df.columns and not columns[col][5]]
+                keys = [col for col in SECTOR_TABLE_KEYS.get(table_name, ['codigo_municipio', 'ano'])
+                        if col in insert_cols]
+                staging = f"_staging_{table_name}"
+
+                staged = df[insert_cols].drop_duplicates(keys, keep='last')
+                _stage_dataframe(conn, staged, staging, {col: columns[col][2] for col in insert_cols})
+
+                missing = _missing_municipalities(conn, staging)
+                if missing:
+                    conn.exec_driver_sql(f"""
+                        DELETE FROM {staging} WHERE NOT EXISTS (
+                            SELECT 1 FROM municipalities AS m WHERE m.codigo_municipio = {staging}.codigo_municipio
+                        )
+                    """)
+
+                conn.exec_driver_sql(
+                    f"CREATE INDEX IF NOT EXISTS idx_{table_name}_municipio_ano "
+                    f"ON {table_name}(codigo_municipio, ano)"
+                )
+                conn.exec_driver_sql(f"CREATE INDEX temp.idx{staging}_key ON {staging}({', '.join(keys)})")
+                key_match = ' AND '.join(f"s.{col} IS {table_name}.{col}" for col in keys)
+                replaced = conn.exec_driver_sql(f"""
+                    DELETE FROM {table_name}
+                    WHERE EXISTS (SELECT 1 FROM {staging} AS s WHERE {key_match})
+                """).rowcount
+                inserted = conn.exec_driver_sql(f"""
+                    INSERT INTO {table_name} ({', '.join(insert_cols)})
+                    SELECT {', '.join(insert_cols)} FROM {staging}
+                """).rowcount
+                conn.exec_driver_sql(f"DROP TABLE temp.{staging}")
+
+                logger.info(f"  {table_name}: {inserted} rows inserted ({replaced} replaced), "
+                            f"{len(missing)} unknown municipalities")
+                results[table_name] = {
+                    'status': 'inserted',
+                    'rows': len(df),
+                    'inserted': inserted,
+                    'replaced': replaced,
+                    'duplicates_dropped': len(df) - len(staged),
+                    'missing_municipalities': len(missing),
+                }
 
         return {
             'success': True,
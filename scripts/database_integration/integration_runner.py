@@ -10,7 +10,7 @@ import logging
 from datetime import datetime
 from pathlib import Path
 import json
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 
 # Import our SOLID modules
 try:
@@ -19,12 +19,16 @@ try:
     from . import data_validators
     from . import data_transformers
     from . import database_inserters
+    from . import integration_state
+    from . import validation_executor
 except ImportError:
     # Fall back to absolute import (when run directly)
     from scripts.database_integration import data_loaders
     from scripts.database_integration import data_validators
     from scripts.database_integration import data_transformers
     from scripts.database_integration import database_inserters
+    from scripts.database_integration import integration_state
+    from scripts.database_integration import validation_executor
 
 # Configure logging
 logging.basicConfig(
@@ -33,6 +37,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Pipeline steps per validation input, in execution order
+INPUT_STEPS = {
+    'scenarios': ['validate', 'municipality_check', 'transform', 'integrate'],
+    'factors': ['validate', 'transform', 'integrate'],
+}
+
+# Steps whose effect lives in the written database: in deploy mode their
+# checkpoints are only recorded once that version is live
+WRITE_STEPS = {'integrate'}
+
+# Inputs touched by each --step choice
+STEP_INPUTS = {
+    'all': ['scenarios', 'factors'],
+    'validate': ['scenarios', 'factors'],
+    'scenarios': ['scenarios'],
+    'factors': ['factors'],
+}
+
 
 class IntegrationRunner:
     """
@@ -40,11 +62,30 @@ class IntegrationRunner:
 
     Coordinates data loading, validation, transformation, and insertion
     following the SOLID principle of Dependency Inversion.
+
+    Incremental by default: inputs whose content hash already completed the
+    whole pipeline are skipped entirely (no validation, transformation or
+    write). With resume=True, a changed input also skips the individual steps
+    that already completed for its current hash (e.g. after a failed write).
+
+    With deploy=True (default) all writes of a run go into a side copy of the
+    database that is validated and swapped in atomically at the end
+    (src/utils/db_deploy.py), so the running app never reads a
+    half-integrated database. The side copy is only deployed when every step
+    succeeded.
+
+    Checkpoints are kept in a sidecar state file (integration_state.state_file)
+    that outlives discarded side copies, so --resume after a failure skips the
+    validation already done. Completed write steps are checkpointed only once
+    the version holding their writes is deployed.
     """
 
     def __init__(self, validation_base_dir: Optional[str] = None,
                  db_path: str = "data/cp2b_maps.db",
-                 dry_run: bool = False):
+                 dry_run: bool = False,
+                 incremental: bool = True,
+                 resume: bool = False,
+                 deploy: bool = True):
         """
         Initialize integration runner.
 
@@ -52,13 +93,32 @@ class IntegrationRunner:
             validation_base_dir: Base directory for validated data files
             db_path: Path to SQLite database
             dry_run: If True, validate data but don't modify database
+            incremental: Skip inputs unchanged since their last successful integration
+            resume: Also skip steps already completed for the current file content
+            deploy: Build into a side file and deploy it (False: write in place)
         """
         self.validation_base_dir = validation_base_dir or data_loaders.get_validation_base_dir()
         self.db_path = db_path
         self.dry_run = dry_run
+        self.incremental = incremental
+        self.resume = resume
+        self.deploy = deploy and not dry_run
+        self.db_file = database_inserters.database_file(db_path)
+        self.side_path: Optional[Path] = None
+        self.side_engine = None
+        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.hashes: Dict[str, str] = {}
+        self.checkpoints: Dict[tuple, Dict] = {}
+        self.state_engine = None
+        self.deferred_checkpoints: List[tuple] = []
+        self.files: Dict = {}
+        self.backup_path: Optional[str] = None
         self.report = {
             'start_time': datetime.now().isoformat(),
             'dry_run': dry_run,
+            'incremental': incremental,
+            'resume': resume,
+            'deploy': self.deploy,
             'steps': {}
         }
 
@@ -78,6 +138,7 @@ class IntegrationRunner:
         logger.info("=" * 60)
 
         files = data_loaders.discover_validation_files(self.validation_base_dir)
+        self.files = files
 
         self.report['steps']['discovery'] = {
             'success': True,
@@ -86,6 +147,144 @@ class IntegrationRunner:
 
         return files
 
+    def detect_changes(self, files: Dict, inputs: List[str]) -> Dict:
+        """
+        Hash the inputs and select the ones that still need work.
+
+        Args:
+            files: Dictionary of file paths
+            inputs: Inputs in scope for this run
+
+        Returns:
+            Dict: File paths of the inputs to process (subset of files)
+        """
+        logger.info("=" * 60)
+        logger.info("Detecting changed inputs")
+        logger.info("=" * 60)
+
+        self.checkpoints = {}
+        if self.incremental:
+            # Checkpoints stored in the database by earlier runs, overridden by the state file
+            engine = database_inserters.get_database_engine(self.db_path)
+            self.checkpoints.update(integration_state.load_checkpoints(engine))
+            engine.dispose()
+            if integration_state.state_file(self.db_file).exists():
+                self.checkpoints.update(integration_state.load_checkpoints(self._state_engine()))
+        self.hashes = integration_state.hash_inputs({key: files.get(key) for key in inputs})
+
+        pending = {}
+        for key in inputs:
+            if key not in self.hashes:
+                continue
+            final_step = INPUT_STEPS[key][-1]
+            if self.incremental and integration_state.is_current(
+                    self.checkpoints, key, final_step, self.hashes[key]):
+                logger.info(f"  {key}: unchanged ({self.hashes[key][:12]}), skipping")
+            else:
+                logger.info(f"  {key}: changed ({self.hashes[key][:12]})")
+                pending[key] = files[key]
+
+        self.report['steps']['change_detection'] = {
+            'success': True,
+            'hashes': self.hashes,
+            'pending': list(pending),
+            'skipped': [key for key in self.hashes if key not in pending]
+        }
+
+        return pending
+
+    def _todo(self, pending: Dict, step: str) -> Dict:
+        """Pending inputs that have this step and (in resume mode) haven't completed it."""
+        return {
+            key: path for key, path in pending.items()
+            if step in INPUT_STEPS[key]
+            and not (self.resume and integration_state.is_current(self.checkpoints, key, step, self.hashes[key]))
+        }
+
+    def _state_engine(self):
+        """Engine of the sidecar checkpoint store."""
+        if self.state_engine is None:
+            self.state_engine = database_inserters.get_database_engine(
+                str(integration_state.state_file(self.db_file))
+            )
+        return self.state_engine
+
+    def _checkpoint(self, input_key: str, step: str, success: bool, details: Optional[Dict] = None) -> None:
+        """Record a step outcome for an input (not in dry-run mode)."""
+        if self.dry_run:
+            return
+        checkpoint = (input_key, step, self.files.get(input_key), self.hashes[input_key],
+                      success, self.run_id, details)
+        if self.deploy and success and step in WRITE_STEPS:
+            # Only true once the side file is live (see deploy_side)
+            self.deferred_checkpoints.append(checkpoint)
+        else:
+            integration_state.save_checkpoint(self._state_engine(), *checkpoint)
+
+    def _ensure_backup(self) -> None:
+        """One database backup per run, taken before the first write."""
+        if self.backup_path is None:
+            from src.utils.db_backup import default_store
+
+            # Snapshot the version being served, into the logical database's store
+            self.backup_path = database_inserters.backup_database(
+                str(database_inserters.get_database_engine(self.db_path).url).replace('sqlite:///', ''),
+                str(default_store(self.db_file))
+            )
+            self.report['backup_path'] = self.backup_path
+
+    def _write_engine(self):
+        """Engine for this run's writes: the side file in deploy mode, else the database itself."""
+        if not self.deploy:
+            return database_inserters.get_database_engine(self.db_path)
+        if self.side_engine is None:
+            from src.utils import db_deploy
+            self.side_path = db_deploy.prepare_version(self.db_file)
+            self.side_engine = database_inserters.get_database_engine(str(self.side_path))
+            self.report['side_path'] = str(self.side_path)
+        return self.side_engine
+
+    def _verify_side(self, path: Path) -> Dict:
+        """Deployment validator: verify_database_integrity on the side file."""
+        engine = database_inserters.get_database_engine(str(path))
+        try:
+            return database_inserters.verify_database_integrity(engine)
+        finally:
+            engine.dispose()
+
+    def deploy_side(self, report: Dict) -> None:
+        """
+        Deploy the side file built by this run, or discard it unless every
+        step succeeded (failed steps that caught their own errors included).
+
+        Args:
+            report: Run report (updated with a 'deployment' entry)
+        """
+        from src.utils import db_deploy
+
+        self.side_engine.dispose()
+        if not report.get('summary', {}).get('overall_success', False):
+            self.side_path.unlink(missing_ok=True)
+            self.deferred_checkpoints.clear()
+            report['deployment'] = {'success': False, 'discarded': str(self.side_path)}
+            logger.error("Run failed - side database discarded, live database unchanged")
+            return
+
+        logger.info("=" * 60)
+        logger.info("Deploying new database version")
+        logger.info("=" * 60)
+
+        result = db_deploy.deploy_version(self.db_file, self.side_path, validators=[self._verify_side])
+        report['deployment'] = result
+        if result['success']:
+            logger.info(f"Deployed version {result['version']}")
+            for checkpoint in self.deferred_checkpoints:
+                integration_state.save_checkpoint(self._state_engine(), *checkpoint)
+            self.deferred_checkpoints.clear()
+        else:
+            logger.error(f"Deployment refused, side file kept at {self.side_path}: {result['checks']}")
+            report.setdefault('summary', {})['overall_success'] = False
+
     def validate_data(self, files: Dict) -> Dict:
         """
         Validate all data files.
@@ -100,31 +299,22 @@ class IntegrationRunner:
         logger.info("STEP 2: Validating data")
         logger.info("=" * 60)
 
-        validation_reports = {}
-
-        # Validate scenarios
+        frames = {}
         if files.get('scenarios'):
-            logger.info("Loading and validating scenario data...")
-            df_scenarios = data_loaders.load_scenario_data(files['scenarios'])
-            report = data_validators.generate_validation_report(df_scenarios, 'scenarios')
-            validation_reports['scenarios'] = report
-
-            if report['overall_valid']:
-                logger.info("  Scenario validation: PASSED")
-            else:
-                logger.warning("  Scenario validation: FAILED")
-
-        # Validate availability factors
+            logger.info("Loading scenario data...")
+            frames['scenarios'] = (data_loaders.load_scenario_data(files['scenarios']), 'scenarios')
         if files.get('factors'):
-            logger.info("Loading and validating availability factors...")
-            df_factors = data_loaders.load_availability_factors(files['factors'])
-            report = data_validators.generate_validation_report(df_factors, 'factors')
-            validation_reports['factors'] = report
+            logger.info("Loading availability factors...")
+            frames['factors'] = (data_loaders.load_availability_factors(files['factors']), 'factors')
+
+        # Per-file × per-rule checks (process pool for large inputs)
+        validation_reports = validation_executor.run_validation(frames)
 
+        for key, report in validation_reports.items():
             if report['overall_valid']:
-                logger.info("  Factors validation: PASSED")
+                logger.info(f"  {key.capitalize()} validation: PASSED")
             else:
-                logger.warning("  Factors validation: FAILED")
+                logger.warning(f"  {key.capitalize()} validation: FAILED")
 
         self.report['steps']['validation'] = {
             'success': all(r.get('overall_valid', False) for r in validation_reports.values()),
@@ -239,15 +429,46 @@ class IntegrationRunner:
                 'would_update': len(df_scenarios)
             }
 
-        engine = database_inserters.get_database_engine(self.db_path)
+        self._ensure_backup()
+        engine = self._write_engine()
         result = database_inserters.update_municipalities_with_scenarios(
-            engine, df_scenarios, backup=True
+            engine, df_scenarios, backup=False
         )
 
         self.report['steps']['scenario_integration'] = result
 
         return result
 
+    def integrate_sectors(self, sector_dfs: Dict) -> Dict:
+        """
+        Integrate per-sector residue data into the residuos_* tables.
+
+        Args:
+            sector_dfs: Table name → DataFrame (from split_by_sector)
+
+        Returns:
+            Dict: Integration result report
+        """
+        logger.info("=" * 60)
+        logger.info("STEP 6: Integrating sector residue data")
+        logger.info("=" * 60)
+
+        if self.dry_run:
+            logger.info("DRY RUN: Skipping actual database insert")
+            return {
+                'success': True,
+                'dry_run': True,
+                'would_insert': {table: len(df) for table, df in sector_dfs.items()}
+            }
+
+        self._ensure_backup()
+        engine = self._write_engine()
+        result = database_inserters.insert_residues_by_sector(engine, sector_dfs, backup=False)
+
+        self.report['steps']['sector_integration'] = result
+
+        return result
+
     def generate_report(self) -> Dict:
         """
         Generate final integration report.
@@ -287,6 +508,13 @@ class IntegrationRunner:
         Returns:
             Dict: Integration report
         """
+        report = self._run_pipeline(step)
+        if self.side_engine is not None:
+            self.deploy_side(report)
+        return report
+
+    def _run_pipeline(self, step: str) -> Dict:
+        """Pipeline steps of run() (writes go to _write_engine())."""
         logger.info("=" * 60)
         logger.info(f"STARTING INTEGRATION PIPELINE (step={step})")
         logger.info("=" * 60)
@@ -300,34 +528,54 @@ class IntegrationRunner:
                 self.report['summary'] = {'overall_success': False, 'error': 'Missing files'}
                 return self.report
 
+            # Change detection: only inputs whose content changed go through the pipeline
+            pending = self.detect_changes(files, STEP_INPUTS[step])
+            if not pending:
+                logger.info("No input changed since the last successful integration - nothing to do")
+                return self.generate_report()
+
             # Step 2: Validate
             if step in ['all', 'validate']:
-                validation_reports = self.validate_data(files)
-
-                if not all(r.get('overall_valid', False) for r in validation_reports.values()):
-                    logger.error("Validation failed! Cannot proceed.")
-                    if not self.dry_run:
-                        return self.report
+                todo = self._todo(pending, 'validate')
+                if todo:
+                    validation_reports = self.validate_data(todo)
+                    for key, report in validation_reports.items():
+                        self._checkpoint(key, 'validate', report.get('overall_valid', False),
+                                         {'overall_valid': report.get('overall_valid', False)})
+
+                    if not all(r.get('overall_valid', False) for r in validation_reports.values()):
+                        logger.error("Validation failed! Cannot proceed.")
+                        if not self.dry_run:
+                            return self.generate_report()
 
             # Step 3: Check municipality codes
-            if step in ['all', 'validate', 'scenarios']:
+            if step in ['all', 'validate', 'scenarios'] and self._todo(pending, 'municipality_check'):
                 mun_report = self.check_municipality_codes(files)
+                self._checkpoint('scenarios', 'municipality_check', True,
+                                 {'is_valid': mun_report.get('is_valid', False)})
 
                 if not mun_report.get('is_valid', False):
                     logger.warning("Municipality code validation failed - review unmatched codes")
 
-            # Step 4: Transform
+            # Step 4: Transform (in-memory; re-run for every input whose write is still pending)
+            transformed = {}
             if step in ['all', 'scenarios', 'factors']:
-                transformed = self.transform_data(files)
+                todo = self._todo(pending, 'integrate')
+                if todo:
+                    transformed = self.transform_data(todo)
+                    for key in todo:
+                        self._checkpoint(key, 'transform', True)
 
             # Step 5: Integrate scenarios
-            if step in ['all', 'scenarios']:
-                if 'scenarios' in transformed:
-                    self.integrate_scenarios(transformed['scenarios'])
+            if step in ['all', 'scenarios'] and 'scenarios' in transformed:
+                result = self.integrate_scenarios(transformed['scenarios'])
+                self._checkpoint('scenarios', 'integrate', result.get('success', False),
+                                 {k: v for k, v in result.items() if k != 'missing_codes'})
 
-            # Step 6: Integrate factors (placeholder for now)
-            if step in ['all', 'factors']:
-                logger.info("Factors integration: Not yet implemented")
+            # Step 6: Integrate per-sector residue data
+            if step in ['all', 'factors'] and 'factors' in transformed:
+                result = self.integrate_sectors(transformed.get('sectors', {}))
+                self._checkpoint('factors', 'integrate', result.get('success', False), result)
 
             # Generate final report
             return self.generate_report()
@@ -366,6 +614,12 @@ def main():
                         help='Path to database file')
     parser.add_argument('--report-output', type=str,
                         help='Path to save integration report JSON')
+    parser.add_argument('--full', action='store_true',
+                        help='Ignore checkpoints and process every input')
+    parser.add_argument('--resume', action='store_true',
+                        help='Resume after a failure, skipping steps already completed')
+    parser.add_argument('--in-place', action='store_true',
+                        help='Write directly into the live database instead of deploying a new version')
 
     args = parser.parse_args()
 
@@ -373,7 +627,10 @@ def main():
     runner = IntegrationRunner(
         validation_base_dir=args.validation_dir,
         db_path=args.db_path,
-        dry_run=args.dry_run
+        dry_run=args.dry_run,
+        incremental=not args.full,
+        resume=args.resume,
+        deploy=not args.in_place
     )
 
     report = runner.run(step=args.step)
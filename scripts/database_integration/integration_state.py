@@ -0,0 +1,167 @@
+"""
+Integration State Module - Single Responsibility Principle
+
+Tracks what the integration pipeline has already done, so that runs scale
+with what changed instead of with the whole dataset.
+
+Each validation input file is identified by a SHA-256 content hash. Every
+pipeline step records a checkpoint (input, step, hash, status) in the
+integration_state table of a sidecar state file next to the target database
+(state_file()), so checkpoints survive a side build that is discarded.
+Earlier runs stored the table in the database itself; it is still read.
+A step is current when its checkpoint is 'done' for the file's present hash.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+STATE_TABLE = 'integration_state'
+STATE_FILE_SUFFIX = '.integration_state.db'
+HASH_CHUNK_BYTES = 1 << 20
+
+
+def state_file(db_file: Path) -> Path:
+    """
+    Sidecar checkpoint store of a database: <db dir>/<db name>.integration_state.db.
+
+    Args:
+        db_file: Logical database path (not a deployed version file)
+
+    Returns:
+        Path: State file path
+    """
+    db_file = Path(db_file)
+    return db_file.with_name(f"{db_file.stem}{STATE_FILE_SUFFIX}")
+
+
+def file_hash(file_path: str) -> str:
+    """
+    SHA-256 of a file's content (streamed in 1 MiB chunks).
+
+    Args:
+        file_path: Path to the input file
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_inputs(files: Dict[str, Optional[str]]) -> Dict[str, str]:
+    """
+    Content hash per discovered input file.
+
+    Args:
+        files: Output of data_loaders.discover_validation_files
+
+    Returns:
+        Dict[str, str]: input key → hash (inputs without a file are omitted)
+    """
+    return {key: file_hash(path) for key, path in files.items() if path and Path(path).exists()}
+
+
+def ensure_state_table(engine: Engine) -> None:
+    """
+    Create the integration_state table if it doesn't exist.
+
+    Args:
+        engine: SQLAlchemy database engine
+    """
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+                input_key TEXT NOT NULL,
+                step TEXT NOT NULL,
+                file_path TEXT,
+                content_hash TEXT NOT NULL,
+                status TEXT NOT NULL,
+                run_id TEXT,
+                updated_at TEXT,
+                details TEXT,
+                PRIMARY KEY (input_key, step)
+            )
+        """))
+
+
+def load_checkpoints(engine: Engine) -> Dict[tuple, Dict]:
+    """
+    Load all checkpoints.
+
+    Args:
+        engine: SQLAlchemy database engine
+
+    Returns:
+        Dict[tuple, Dict]: (input_key, step) → checkpoint row (empty before the first run)
+    """
+    with engine.connect() as conn:
+        exists = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+        ), {'name': STATE_TABLE}).fetchone()
+        if not exists:
+            return {}
+        result = conn.execute(text(f"SELECT * FROM {STATE_TABLE}"))
+        return {(row['input_key'], row['step']): dict(row) for row in result.mappings()}
+
+
+def is_current(checkpoints: Dict[tuple, Dict], input_key: str, step: str, content_hash: str) -> bool:
+    """
+    Whether a step already completed for this exact file content.
+
+    Args:
+        checkpoints: Output of load_checkpoints
+        input_key: Input name (e.g., 'scenarios')
+        step: Step name (e.g., 'validate')
+        content_hash: Current hash of the input file
+
+    Returns:
+        bool: True if the checkpoint is 'done' with the same hash
+    """
+    checkpoint = checkpoints.get((input_key, step))
+    return bool(checkpoint and checkpoint['status'] == 'done' and checkpoint['content_hash'] == content_hash)
+
+
+def save_checkpoint(engine: Engine, input_key: str, step: str, file_path: str, content_hash: str,
+                    success: bool, run_id: str, details: Optional[Dict] = None) -> None:
+    """
+    Record the outcome of a step for an input.
+
+    Args:
+        engine: SQLAlchemy database engine
+        input_key: Input name
+        step: Step name
+        file_path: Input file path
+        content_hash: Hash of the file content the step ran on
+        success: Step outcome ('done' / 'failed')
+        run_id: Identifier of the current run
+        details: Optional JSON-serializable summary
+    """
+    ensure_state_table(engine)
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+            INSERT OR REPLACE INTO {STATE_TABLE}
+                (input_key, step, file_path, content_hash, status, run_id, updated_at, details)
+            VALUES (:input_key, :step, :file_path, :content_hash, :status, :run_id, :updated_at, :details)
+        """), {
+            'input_key': input_key,
+            'step': step,
+            'file_path': file_path,
+            'content_hash': content_hash,
+            'status': 'done' if success else 'failed',
+            'run_id': run_id,
+            'updated_at': datetime.now().isoformat(),
+            'details': json.dumps(details, default=str) if details is not None else None,
+        })
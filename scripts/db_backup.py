@@ -0,0 +1,71 @@
+"""
+Database Snapshot Tool
+
+Incremental, page-deduplicated backups of the CP2B SQLite databases
+(see src/utils/db_backup.py). Replaces timestamped full copies and ad-hoc
+*_backup tables.
+
+Usage:
+    python scripts/db_backup.py snapshot data/cp2b_maps.db [--label pre-update]
+    python scripts/db_backup.py list data/cp2b_maps.db
+    python scripts/db_backup.py restore data/cp2b_maps.db <snapshot_id|latest> [--target copy.db]
+    python scripts/db_backup.py diff data/cp2b_maps.db <old_id> [<new_id>]   # default: vs live DB
+    python scripts/db_backup.py prune data/cp2b_maps.db --keep 10
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.db_backup import (
+    create_snapshot, default_store, diff_snapshots, list_snapshots, prune_snapshots, restore_snapshot
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental SQLite snapshots")
+    parser.add_argument('command', choices=['snapshot', 'list', 'restore', 'diff', 'prune'])
+    parser.add_argument('db', help="Database file")
+    parser.add_argument('snapshots', nargs='*', help="Snapshot id(s) for restore/diff")
+    parser.add_argument('--store', help="Page store directory (default: <db dir>/backups/<db name>)")
+    parser.add_argument('--label', default='manual', help="Snapshot label")
+    parser.add_argument('--target', help="Restore into this file instead of the database itself")
+    parser.add_argument('--keep', type=int, default=10, help="Snapshots kept by prune")
+    args = parser.parse_args()
+
+    store = Path(args.store) if args.store else default_store(args.db)
+
+    if args.command == 'snapshot':
+        snapshot = create_snapshot(args.db, store, label=args.label)
+        print(f"Snapshot {snapshot['snapshot_id']}: {snapshot['new_pages']}/{snapshot['page_count']} "
+              f"páginas novas ({snapshot['new_bytes'] / 1024:.1f} KiB)")
+
+    elif args.command == 'list':
+        for snapshot in list_snapshots(store):
+            print(f"{snapshot['snapshot_id']}  {snapshot['created_at']}  "
+                  f"{snapshot['size_bytes'] / 1024:>10.1f} KiB  {snapshot['label']}")
+
+    elif args.command == 'restore':
+        if not args.snapshots:
+            parser.error("restore requires a snapshot id (or 'latest')")
+        result = restore_snapshot(store, args.snapshots[0], args.target or args.db)
+        print(f"Snapshot {result['snapshot_id']} restaurado em {result['target']} ({result['page_count']} páginas)")
+
+    elif args.command == 'diff':
+        if not args.snapshots:
+            parser.error("diff requires at least one snapshot id")
+        new_id = args.snapshots[1] if len(args.snapshots) > 1 else None
+        print(json.dumps(diff_snapshots(store, args.snapshots[0], new_id, db_path=args.db),
+                         indent=2, ensure_ascii=False))
+
+    elif args.command == 'prune':
+        result = prune_snapshots(store, args.keep)
+        print(f"{result['snapshots_removed']} snapshots e {result['pages_removed']} páginas removidos")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Database Deployment Tool
+
+Blue/green deployment of the databases served by the app (see
+src/utils/db_deploy.py). New versions are validated and swapped in atomically;
+running Streamlit workers switch at their next request.
+
+Usage:
+    python scripts/db_deploy.py status data/cp2b_maps.db
+    python scripts/db_deploy.py deploy data/cp2b_maps.db --from rebuilt_maps.db
+    python scripts/db_deploy.py rollback data/cp2b_maps.db
+    python scripts/db_deploy.py gc data/cp2b_maps.db [--keep 2] [--drain-seconds 900]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils import db_deploy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blue/green SQLite deployment")
+    parser.add_argument('command', choices=['status', 'deploy', 'rollback', 'gc'])
+    parser.add_argument('db', help="Logical database path (e.g. data/cp2b_maps.db)")
+    parser.add_argument('--from', dest='source', help="Database file to deploy (deploy)")
+    parser.add_argument('--keep', type=int, default=db_deploy.KEEP_VERSIONS, help="Versions kept for rollback (gc)")
+    parser.add_argument('--drain-seconds', type=int, default=db_deploy.DRAIN_SECONDS,
+                        help="Minimum age of a retired version before deletion (gc)")
+    args = parser.parse_args()
+
+    if args.command == 'status':
+        result = db_deploy.status(args.db)
+    elif args.command == 'deploy':
+        if not args.source:
+            parser.error("deploy requires --from <file>")
+        result = db_deploy.deploy_version(args.db, args.source)
+    elif args.command == 'rollback':
+        result = db_deploy.rollback(args.db)
+    else:
+        result = {'removed': db_deploy.collect_versions(args.db, args.keep, args.drain_seconds)}
+
+    print(json.dumps(result, indent=2, ensure_ascii=False, default=str))
+    sys.exit(0 if result.get('success', True) else 1)
+
+
+if __name__ == '__main__':
+    main()
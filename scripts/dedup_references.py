@@ -0,0 +1,80 @@
+"""
+Reference Deduplication Script
+Finds duplicate references across the residue modules and the reference tables
+of the databases (see src/services/reference_dedup.py) and stores merge
+clusters in the precision database.
+
+Runs are incremental: only references added or changed since the last run are
+signed and compared, so run it after every ingestion of new papers.
+
+Usage:
+    python scripts/dedup_references.py
+    python scripts/dedup_references.py --extra-db data/cp2b_panorama.db
+    python scripts/dedup_references.py --rebuild --min-confidence 0.7
+    python scripts/dedup_references.py --json > clusters.json
+"""
+
+import argparse
+import contextlib
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.adapters.precision_db_adapter import PrecisionDatabaseAdapter
+from src.services.reference_dedup import MIN_CONFIDENCE, ReferenceDeduplicator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzzy duplicate detection for references (MinHash/LSH)")
+    parser.add_argument('--db', default=str(PrecisionDatabaseAdapter.DB_PATH),
+                        help="Precision database (scientific_papers; stores the results)")
+    parser.add_argument('--extra-db', action='append', default=[],
+                        help="Other database with scientific_references/referencias (repeatable)")
+    parser.add_argument('--no-modules', action='store_true', help="Skip references of the residue modules")
+    parser.add_argument('--rebuild', action='store_true', help="Recompute all signatures and pairs")
+    parser.add_argument('--min-confidence', type=float, default=MIN_CONFIDENCE, help="Minimum pair confidence")
+    parser.add_argument('--json', action='store_true', help="Print clusters as JSON")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"❌ Database not found: {args.db}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    references = ReferenceDeduplicator.load_database_references(Path(args.db))
+    for extra in args.extra_db:
+        references.extend(ReferenceDeduplicator.load_database_references(Path(extra)))
+    if not args.no_modules:
+        # The residue registry prints validation warnings on import
+        with contextlib.redirect_stdout(sys.stderr if args.json else sys.stdout):
+            references.extend(ReferenceDeduplicator.load_module_references())
+
+    summary = ReferenceDeduplicator.run(Path(args.db), references, rebuild=args.rebuild,
+                                        min_confidence=args.min_confidence)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(ReferenceDeduplicator.load_clusters(Path(args.db)), indent=2, ensure_ascii=False))
+        return
+
+    print(f"📚 {summary['references']} referências, {summary['signed']} novas/alteradas, "
+          f"{summary['removed']} removidas")
+    print(f"🔎 {summary['candidate_pairs']} pares candidatos, {summary['pairs_added']} confirmados "
+          f"({summary['pairs_total']} no total)")
+    print(f"🧩 {len(summary['clusters'])} grupos de duplicatas, {summary['duplicates']} referências redundantes "
+          f"({elapsed:.1f}s)")
+
+    for cluster in ReferenceDeduplicator.load_clusters(Path(args.db))[:20]:
+        print(f"\n  [{cluster['confidence']:.2f}] {cluster['size']} referências")
+        for member in cluster['members']:
+            marker = '→' if member['ref_key'] == cluster['canonical_key'] else ' '
+            title = (member['title'] or '')[:70]
+            print(f"   {marker} {member['ref_key']:<28} {member['year'] or '----'} {member['doi'] or '-':<32} {title}")
+
+
+if __name__ == '__main__':
+    main()
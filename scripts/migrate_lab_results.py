@@ -0,0 +1,133 @@
+"""
+Lab Results Migration Script
+
+Creates the lab results schema in cp2b_maps.db (see
+src/services/lab_results_repository.py): the measurement columns added to
+dados_laboratoriais, its indexes and the dados_laboratoriais_estatisticas
+control-chart table. Optionally imports lab batches (CSV/Excel, same layout
+as the batch upload of the lab comparison page) with batched upserts.
+
+The web app only reads these tables. When cp2b_maps.db is served through
+blue/green deployments (src/utils/db_deploy.py), the migration runs in a side
+copy deployed as a new version; otherwise the database file is updated in place.
+
+Usage:
+    python scripts/migrate_lab_results.py
+    python scripts/migrate_lab_results.py --import amostras_2025.xlsx amostras_extra.csv
+    python scripts/migrate_lab_results.py --db data/cp2b_maps.db
+"""
+
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+from typing import List
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.lab_results_repository import (
+    LabResultsRepository, RESULT_COLUMNS, RESULTS_TABLE, STATS_TABLE
+)
+from src.utils import db_deploy
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+def migrate(conn: sqlite3.Connection) -> None:
+    """Add result columns to dados_laboratoriais, indexes and the stats table."""
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {RESULTS_TABLE} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tipo_residuo TEXT NOT NULL,
+            parametro TEXT NOT NULL,
+            valor_tipico TEXT,
+            valor_min REAL,
+            valor_max REAL,
+            unidade TEXT,
+            metodo TEXT,
+            referencia TEXT,
+            observacoes TEXT,
+            data_atualizacao DATE DEFAULT CURRENT_DATE
+        )
+    """)
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({RESULTS_TABLE})")}
+    for column, sql_type in RESULT_COLUMNS.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {RESULTS_TABLE} ADD COLUMN {column} {sql_type}")
+
+    conn.executescript(f"""
+        CREATE INDEX IF NOT EXISTS idx_lab_residuo_param_data_lab
+            ON {RESULTS_TABLE}(tipo_residuo, parametro, data_medicao, laboratorio);
+        CREATE INDEX IF NOT EXISTS idx_lab_amostra
+            ON {RESULTS_TABLE}(tipo_residuo, amostra);
+        CREATE TABLE IF NOT EXISTS {STATS_TABLE} (
+            resultado_id INTEGER PRIMARY KEY,
+            tipo_residuo TEXT NOT NULL,
+            parametro TEXT NOT NULL,
+            data_medicao DATE,
+            laboratorio TEXT,
+            valor REAL,
+            n INTEGER,
+            media_acumulada REAL,
+            desvio_acumulado REAL,
+            media_movel REAL,
+            lsc REAL,
+            lic REAL,
+            fora_controle INTEGER DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_lab_stats_series
+            ON {STATS_TABLE}(tipo_residuo, parametro, data_medicao);
+    """)
+    conn.commit()
+
+
+def build(target: Path, batches: List[Path]) -> int:
+    """Migrate target and import the batches into it. Returns rows imported."""
+    conn = sqlite3.connect(str(target))
+    try:
+        migrate(conn)
+    finally:
+        conn.close()
+
+    if not batches:
+        return 0
+
+    from src.lab_comparison import read_lab_batch
+
+    repository = LabResultsRepository(target)
+    imported = 0
+    for batch in batches:
+        rows = repository.insert_results(read_lab_batch(str(batch)))
+        print(f"   {batch.name}: {rows} medições")
+        imported += rows
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create the lab results schema and import lab batches")
+    parser.add_argument('--db', default=str(DATA_DIR / "cp2b_maps.db"), help="Logical path of cp2b_maps.db")
+    parser.add_argument('--import', dest='batches', nargs='*', default=[], type=Path,
+                        help="CSV/Excel lab batches to import")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"❌ Database not found: {args.db}")
+        sys.exit(1)
+    missing = [str(batch) for batch in args.batches if not batch.exists()]
+    if missing:
+        print(f"❌ Batch files not found: {', '.join(missing)}")
+        sys.exit(1)
+
+    if db_deploy.read_pointer(args.db):
+        with db_deploy.build_version(args.db) as side:
+            imported = build(side, args.batches)
+        print(f"✅ Esquema laboratorial atualizado, {imported} medições importadas; "
+              f"versão {db_deploy.current_version(args.db)} implantada")
+    else:
+        imported = build(Path(args.db), args.batches)
+        print(f"✅ Esquema laboratorial atualizado, {imported} medições importadas em {args.db}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+PDF Mining Script
+Extracts BMP/TS/VS/C:N/CH4 candidates and DOIs from the literature PDF library
+into staging tables of the precision database (see src/utils/pdf_mining.py).
+
+Only new or changed PDFs are processed; extraction results are cached per
+file content hash. Requires pdfplumber.
+
+Usage:
+    python scripts/mine_pdfs.py "C:/Users/Lucas/Documents/CP2B/Validacao_dados/02_LITERATURA"
+    python scripts/mine_pdfs.py <pdf_dir> --db data/CP2B_Precision_Biogas.db --workers 8
+    python scripts/mine_pdfs.py <pdf_dir> --force   # re-stage everything (cache still used)
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.adapters.precision_db_adapter import PrecisionDatabaseAdapter
+from src.utils.pdf_mining import mine_directory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel PDF parameter mining")
+    parser.add_argument('pdf_dir', help="PDF library directory (searched recursively)")
+    parser.add_argument('--db', default=str(PrecisionDatabaseAdapter.DB_PATH), help="Precision database")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="Re-stage PDFs even if unchanged")
+    parser.add_argument('--quiet', action='store_true', help="No per-file output")
+    args = parser.parse_args()
+
+    if not Path(args.pdf_dir).is_dir():
+        print(f"❌ Directory not found: {args.pdf_dir}")
+        sys.exit(1)
+
+    def progress(info):
+        if args.quiet:
+            return
+        status = f"❌ {info['error']}" if info['error'] else f"{info['candidates']} valores"
+        origin = " (cache)" if info['cached'] else ""
+        print(f"  {Path(info['file']).name}: {status}{origin}")
+
+    start = time.perf_counter()
+    summary = mine_directory(args.pdf_dir, args.db, max_workers=args.workers, force=args.force, progress=progress)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n📄 {summary['files']} PDFs: {summary['extracted']} extraídos, {summary['from_cache']} do cache, "
+          f"{summary['skipped_unchanged']} inalterados, {summary['errors']} erros")
+    print(f"🧪 {summary['candidates']} valores candidatos em pdf_extraction_staging ({elapsed:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Parameter Statistics Refresh Script
+
+Builds or refreshes the parameter_statistics summary table (robust,
+quality-weighted statistics with bootstrap CIs, see
+src/services/parameter_statistics.py) in CP2B_Precision_Biogas.db. Only groups
+whose validated measurements changed are recomputed. The app only reads the
+table, so run this after ingesting or validating chemical_parameters
+(after scripts/standardize_precision_units.py and
+scripts/screen_precision_quality.py).
+
+When the database is served through blue/green deployments
+(src/utils/db_deploy.py), the table is refreshed in a side copy and deployed
+as a new version; otherwise the database file is updated in place.
+
+Usage:
+    python scripts/refresh_parameter_statistics.py
+    python scripts/refresh_parameter_statistics.py --db data/CP2B_Precision_Biogas.db --bootstrap 2000
+"""
+
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.parameter_statistics import BOOTSTRAP_SAMPLES, ParameterStatisticsEngine
+from src.utils import db_deploy
+
+DB_PATH = Path(__file__).parent.parent / "data" / "CP2B_Precision_Biogas.db"
+
+
+def refresh(target: Path, n_bootstrap: int = BOOTSTRAP_SAMPLES) -> dict:
+    """Refresh the summary table in target. Returns written/unchanged/dropped counts."""
+    conn = sqlite3.connect(str(target))
+    try:
+        return ParameterStatisticsEngine.refresh(conn, n_bootstrap=n_bootstrap)
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the parameter_statistics summary table")
+    parser.add_argument('--db', default=str(DB_PATH), help="Logical path of CP2B_Precision_Biogas.db")
+    parser.add_argument('--bootstrap', type=int, default=BOOTSTRAP_SAMPLES, help="Bootstrap resamples per group")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"❌ Database not found: {args.db}")
+        sys.exit(1)
+
+    if db_deploy.read_pointer(args.db):
+        with db_deploy.build_version(args.db) as side:
+            stats = refresh(side, args.bootstrap)
+        target = f"versão {db_deploy.current_version(args.db)} implantada"
+    else:
+        stats = refresh(Path(args.db), args.bootstrap)
+        target = args.db
+    print(f"✅ parameter_statistics: {stats['written']} grupos recalculados, "
+          f"{stats['unchanged']} inalterados, {stats['dropped']} removidos ({target})")
+
+
+if __name__ == '__main__':
+    main()
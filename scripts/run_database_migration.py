@@ -12,11 +12,14 @@ Usage:
 
 import sqlite3
 import os
-import shutil
 from datetime import datetime
 from pathlib import Path
 import argparse
 import json
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
 # Paths
 VALIDATION_DB = r"C:\Users\Lucas\Documents\CP2B\Validacao_dados\CP2B_Chemical_Parameters.db"
@@ -32,17 +35,16 @@ MIGRATION_FILES = [
 
 
 def create_backup(db_path: str) -> str:
-    """Create timestamped backup of database"""
-    BACKUP_DIR.mkdir(exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    db_name = Path(db_path).stem
-    backup_path = BACKUP_DIR / f"{db_name}_backup_{timestamp}.db"
+    """Snapshot the database into the page-deduplicated backup store"""
+    from src.utils.db_backup import create_snapshot
 
-    print(f"📦 Creating backup: {backup_path.name}")
-    shutil.copy2(db_path, backup_path)
-    print(f"✅ Backup created: {backup_path}")
+    print(f"📦 Creating snapshot of: {Path(db_path).name}")
+    snapshot = create_snapshot(db_path, BACKUP_DIR / Path(db_path).stem, label='migration')
+    print(f"✅ Snapshot {snapshot['snapshot_id']}: {snapshot['new_pages']}/{snapshot['page_count']} new pages")
+    print(f"   Restore: python scripts/db_backup.py restore {db_path} {snapshot['snapshot_id']} "
+          f"--store {BACKUP_DIR / Path(db_path).stem}")
 
-    return str(backup_path)
+    return snapshot['manifest_path']
 
 
 def verify_databases():
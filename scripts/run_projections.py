@@ -0,0 +1,68 @@
+"""
+Projection Refresh Script
+
+Re-projects municipal biogas potential from the latest base year loaded in
+cp2b_maps.db and persists the year partitions that changed.
+
+When cp2b_maps.db is served through blue/green deployments
+(src/utils/db_deploy.py), the projections are written to a side copy deployed
+as a new version; otherwise the database file is updated in place.
+
+Usage:
+    python scripts/run_projections.py [--scenarios Tendencial "Alto Crescimento"] [--end-year 2050]
+"""
+
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data.growth_trajectories import DEFAULT_END_YEAR, SCENARIO_OVERLAYS
+from src.services.projection_engine import ProjectionEngine
+from src.utils import db_deploy
+
+DB_PATH = Path(__file__).parent.parent / "data" / "cp2b_maps.db"
+
+
+def build(target: Path, scenarios: List[str], end_year: int) -> Dict[str, Dict[str, int]]:
+    """Project and persist the changed year partitions into target."""
+    conn = sqlite3.connect(str(target))
+    try:
+        df = pd.read_sql("SELECT * FROM municipalities", conn)
+        return ProjectionEngine.refresh(conn, df, scenarios, end_year)
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh multi-year municipal projections")
+    parser.add_argument('--db', default=str(DB_PATH), help="Logical path of cp2b_maps.db")
+    parser.add_argument('--scenarios', nargs='+', default=list(SCENARIO_OVERLAYS), help="Scenario overlays")
+    parser.add_argument('--end-year', type=int, default=DEFAULT_END_YEAR, help="Last projected year")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"❌ Database not found: {args.db}")
+        sys.exit(1)
+
+    if db_deploy.read_pointer(args.db):
+        with db_deploy.build_version(args.db) as side:
+            stats = build(side, args.scenarios, args.end_year)
+        print(f"✅ Projeções implantadas na versão {db_deploy.current_version(args.db)}")
+    else:
+        stats = build(Path(args.db), args.scenarios, args.end_year)
+        print(f"✅ Projeções gravadas em {args.db}")
+
+    for scenario, counts in stats.items():
+        print(f"{scenario}: {counts['written']} anos gravados, "
+              f"{counts['unchanged']} inalterados, {counts['dropped']} removidos")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Precision Quality Screening Script
+
+Scans every chemical_parameters row of CP2B_Precision_Biogas.db in one
+vectorized pass (physical bounds, VS > TS, unit/magnitude mismatches,
+MAD outliers per residue/parameter) and writes the result to the indexed
+qc_status / qc_flags / qc_reasons columns. The manual
+validation_classification / validation_reason columns are not touched.
+
+Run scripts/standardize_precision_units.py first so that conversion checks
+compare against up-to-date standardized values.
+
+Usage:
+    python scripts/screen_precision_quality.py [--db path] [--k 3.5] [--dry-run]
+"""
+
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.parameter_quality import ParameterQualityScreener
+from src.services.parameter_statistics import MAD_THRESHOLD
+
+DB_PATH = Path(__file__).parent.parent / "data" / "CP2B_Precision_Biogas.db"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Automatic quality screening of chemical_parameters")
+    parser.add_argument('--db', default=str(DB_PATH), help="Path to CP2B_Precision_Biogas.db")
+    parser.add_argument('--k', type=float, default=MAD_THRESHOLD, help="MAD outlier threshold (modified z)")
+    parser.add_argument('--dry-run', action='store_true', help="Show flagged rows without writing")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        df = ParameterQualityScreener.load(conn)
+        flags = ParameterQualityScreener.screen(df, k=args.k)
+        if args.dry_run:
+            flagged = df.merge(flags, on='param_id')
+            flagged = flagged[flagged['qc_status'] != 'ok']
+            with pd.option_context('display.max_colwidth', 120, 'display.width', 200):
+                print(flagged[['param_id', 'residue_id', 'parameter_name', 'value', 'unit',
+                               'qc_status', 'qc_reasons']].to_string(index=False))
+            print()
+            print(ParameterQualityScreener.summary(flags).to_string(index=False))
+            return
+        stats = ParameterQualityScreener.persist(conn, flags)
+    finally:
+        conn.close()
+
+    print(f"{stats['ok']} ok, {stats['warning']} alertas, {stats['error']} erros "
+          f"({stats['updated']} linhas atualizadas)")
+
+
+if __name__ == '__main__':
+    main()
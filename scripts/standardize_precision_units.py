@@ -0,0 +1,57 @@
+"""
+Precision Unit Standardization Script
+
+Ingestion stage for CP2B_Precision_Biogas.db: parses every raw unit of
+chemical_parameters once with the unit registry and backfills
+unit_original / unit_standardized / value_standardized in bulk.
+Replaces the regex rewriting of scripts/fix_bmp_units.py and fix_bmp_unit_field.py
+for the precision database.
+
+Usage:
+    python scripts/standardize_precision_units.py [--db path] [--only-missing] [--dry-run]
+"""
+
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.unit_registry import backfill_precision_db, standardize
+
+DB_PATH = Path(__file__).parent.parent / "data" / "CP2B_Precision_Biogas.db"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill standardized units of chemical_parameters")
+    parser.add_argument('--db', default=str(DB_PATH), help="Path to CP2B_Precision_Biogas.db")
+    parser.add_argument('--only-missing', action='store_true', help="Only rows without value_standardized")
+    parser.add_argument('--dry-run', action='store_true', help="Show the unit mapping without writing")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        if args.dry_run:
+            df = pd.read_sql("""
+                SELECT residue_id, parameter_name, value_mean,
+                       COALESCE(NULLIF(unit_original, ''), unit) AS raw_unit
+                FROM chemical_parameters
+            """, conn)
+            df = df.join(standardize(df, unit_column='raw_unit'))
+            mapping = df.groupby(['parameter_name', 'raw_unit', 'unit_standardized'], dropna=False).size()
+            print(mapping.to_string())
+            return
+        stats = backfill_precision_db(conn, only_missing=args.only_missing)
+    finally:
+        conn.close()
+
+    print(f"{stats['rows']} linhas avaliadas: {stats['updated']} atualizadas, "
+          f"{stats['unchanged']} inalteradas, {stats['unparsed']} com unidade não reconhecida")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Database Sync Tool
+
+Incremental, non-interactive sync of one SQLite database into another
+(validation → webapp, or between webapp copies). Only inserted, updated and
+deleted rows are written, in a single transaction, after a snapshot of the
+target (see scripts/db_backup.py). Replaces scripts/sync_precision_db.sh and
+the hand-written webapp_*.sql / fix_webapp_*.sql update files.
+
+Usage:
+    python scripts/sync_databases.py <source.db> <target.db> --dry-run
+    python scripts/sync_databases.py data/cp2b_panorama.db webapp/panorama_cp2b_final.db --apply-schema
+    python scripts/sync_databases.py ../Validacao_dados/CP2B_Precision_Biogas.db data/CP2B_Precision_Biogas.db
+    python scripts/sync_databases.py a.db b.db --tables residuos municipios --json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.db_sync import sync_databases
+
+
+def print_report(result: dict) -> None:
+    """Print schema drift and per-table row changes"""
+    drift = result['drift']
+    print(f"📊 {result['source']} → {result['target']}")
+
+    if any([drift['missing_tables'], drift['extra_tables'], drift['columns'], drift['missing_indexes']]):
+        print("\n⚠️  Schema drift:")
+        for table in drift['missing_tables']:
+            print(f"   - tabela ausente no destino: {table}")
+        for table in drift['extra_tables']:
+            print(f"   - tabela só no destino: {table}")
+        for table, entry in drift['columns'].items():
+            for col in entry['missing']:
+                print(f"   - coluna ausente no destino: {table}.{col}")
+            for col in entry['extra']:
+                print(f"   - coluna só no destino: {table}.{col}")
+            for col, (src_type, dst_type) in entry['type_changed'].items():
+                print(f"   - tipo diferente: {table}.{col} ({src_type} → {dst_type})")
+        for index in drift['missing_indexes']:
+            print(f"   - índice ausente no destino: {index}")
+    for sql in result['schema_statements']:
+        print(f"   + {' '.join(sql.split())[:100]}")
+
+    print(f"\n{'Tabela':<28}{'Chave':<22}{'+ins':>8}{'~upd':>8}{'-del':>8}")
+    for table in result['tables']:
+        key = ','.join(table['key']) if table['key'] else '(linha inteira)'
+        print(f"{table['table']:<28}{key:<22}{table['inserted']:>8}{table['updated']:>8}{table['deleted']:>8}")
+
+    totals = result['totals']
+    print(f"\nTotal: {totals['inserted']} inseridas, {totals['updated']} atualizadas, {totals['deleted']} removidas")
+    if result['dry_run']:
+        print("ℹ️  Dry run - nenhuma alteração gravada")
+    elif result['verified'] is not None:
+        print("✅ Sync verificado" if result['verified'] else "❌ Verificação falhou: hashes diferentes após o sync")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Row-hash incremental database sync")
+    parser.add_argument('source', help="Source database")
+    parser.add_argument('target', help="Target database (updated in place)")
+    parser.add_argument('--dry-run', action='store_true', help="Report differences without writing")
+    parser.add_argument('--tables', nargs='+', help="Only sync these tables")
+    parser.add_argument('--apply-schema', action='store_true',
+                        help="Create missing tables/columns/indexes on the target")
+    parser.add_argument('--no-backup', action='store_true', help="Skip the pre-sync snapshot of the target")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if not args.dry_run and not args.no_backup:
+        from src.utils.db_backup import create_snapshot
+        snapshot = create_snapshot(args.target, label='pre-sync')
+        if not args.json:
+            print(f"💾 Snapshot {snapshot['snapshot_id']} ({snapshot['new_pages']} páginas novas)")
+
+    result = sync_databases(args.source, args.target, dry_run=args.dry_run,
+                            tables=args.tables, apply_schema=args.apply_schema)
+
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False, default=str))
+    else:
+        print_report(result)
+
+    sys.exit(0 if result['verified'] in (True, None) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -29,30 +29,6 @@ class PrecisionDatabaseAdapter:
     # Path to validated precision database
     DB_PATH = Path(__file__).parent.parent.parent / "data" / "CP2B_Precision_Biogas.db"
 
-    # Webapp residue codes → Precision DB residue_id mapping
-    RESIDUE_MAPPING = {
-        'VINHACA': 4,           # Legacy code
-        'CANA_VINHACA': 4,      # Standard webapp code
-        'BAGACO': 6,            # Webapp code for sugarcane bagasse
-        'CANA_BAGACO': 6,       # Alternative code
-        'PALHA': 5,             # Webapp code for sugarcane straw
-        'CANA_PALHA': 5,        # Alternative code
-        'TORTA': 7,             # Webapp code for filter cake
-        'CANA_TORTA_FILTRO': 7, # Alternative code
-        'CASCAS_CITROS': 8,     # Webapp code for citrus peel
-        'CITRUS_CASCA': 8,      # Precision DB code
-        'BAGACO_CITROS': 9,     # Webapp code for citrus bagasse
-        'CITRUS_BAGACO': 9,     # Precision DB code
-        'POLPA_CITROS': 8,      # Webapp code (map to peel for now)
-        'EUCALIPTO': 1,
-        'EUCALIPTO_CASCA': 1,
-        'CAMA_FRANGO': 2,
-        'AVES_CAMA': 2,         # Legacy code
-        'DEJETOS_SUINO': 3,
-        'SUINO_DEJETO': 3,      # Legacy code
-        # Future residues will be added as validated
-    }
-
     # Parameter categories for webapp display
     PARAMETER_CATEGORIES = {
         'BMP': 'Biogas',
@@ -81,6 +57,17 @@ class PrecisionDatabaseAdapter:
         'ASH': 'Chemical',
     }
 
+    @classmethod
+    def resolve_residue_id(cls, residue_code: str) -> Optional[int]:
+        """
+        Precision DB residue_id for a webapp code or name.
+
+        Resolved through the unified residue resolver, so hierarchical codes
+        ('CANA_VINHACA'), legacy codes ('VINHACA') and names all map to the same id.
+        """
+        from src.utils.residue_resolver import precision_id
+        return precision_id(residue_code)
+
     @classmethod
     def load_parameter_sources(
         cls,
@@ -113,7 +100,7 @@ class PrecisionDatabaseAdapter:
             46.12
         """
         # Map webapp code to database residue_id
-        residue_id = cls.RESIDUE_MAPPING.get(residue_code)
+        residue_id = cls.resolve_residue_id(residue_code)
 
         if residue_id is None:
             # Residue not yet validated in precision database
@@ -271,7 +258,7 @@ class PrecisionDatabaseAdapter:
             >>> 'COD' in params
             True
         """
-        residue_id = cls.RESIDUE_MAPPING.get(residue_code)
+        residue_id = cls.resolve_residue_id(residue_code)
 
         if residue_id is None:
             return []
@@ -304,7 +291,7 @@ class PrecisionDatabaseAdapter:
         Returns:
             int: Number of validated measurements
         """
-        residue_id = cls.RESIDUE_MAPPING.get(residue_code)
+        residue_id = cls.resolve_residue_id(residue_code)
 
         if residue_id is None:
             return 0
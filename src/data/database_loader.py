@@ -3,6 +3,7 @@ Database Loader - Carrega residuos do banco cp2b_panorama.db
 Substitui dados hardcoded por dados atualizados do banco
 """
 
+import logging
 import sqlite3
 import streamlit as st
 from pathlib import Path
@@ -15,6 +16,9 @@ from src.models.residue_models import (
     ScientificReference,
     ParameterRange
 )
+from src.utils.db_deploy import resolve_db_path
+
+logger = logging.getLogger(__name__)
 
 
 class DatabaseLoader:
@@ -22,12 +26,15 @@ class DatabaseLoader:
     
     def __init__(self):
         self.db_path = Path(__file__).parent.parent.parent / "data" / "cp2b_panorama.db"
+        self.maps_db_path = Path(__file__).parent.parent.parent / "data" / "cp2b_maps.db"
         if not self.db_path.exists():
             raise FileNotFoundError(f"Banco de dados não encontrado: {self.db_path}")
+        self._allocation_table = None
+        self._allocation = None
     
     def _get_connection(self):
         """Cria conexão com o banco"""
-        conn = sqlite3.connect(str(self.db_path))
+        conn = sqlite3.connect(str(resolve_db_path(self.db_path)))
         conn.row_factory = sqlite3.Row
         return conn
     
@@ -229,8 +236,59 @@ class DatabaseLoader:
         conn.close()
         return references
     
+    def _has_allocation_table(self) -> bool:
+        """Verifica se a tabela residuos_municipios foi gerada (scripts/build_allocation.py)"""
+        if self._allocation_table is None:
+            from src.services.residue_allocator import ALLOCATION_TABLE
+
+            conn = self._get_connection()
+            try:
+                self._allocation_table = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (ALLOCATION_TABLE,)
+                ).fetchone() is not None
+            finally:
+                conn.close()
+            if not self._allocation_table:
+                logger.info("Tabela residuos_municipios ausente; alocação calculada em memória "
+                            "(gere-a com scripts/build_allocation.py)")
+        return self._allocation_table
+
+    def _get_allocation(self):
+        """Alocação por driver de produção calculada em memória (sem escrita no banco)"""
+        if self._allocation is None:
+            try:
+                from src.services.residue_allocator import ResidueAllocator
+
+                conn = self._get_connection()
+                maps_conn = sqlite3.connect(str(resolve_db_path(self.maps_db_path)))
+                try:
+                    allocation = ResidueAllocator.load(conn, maps_conn)
+                    names = dict(conn.execute("SELECT codigo_municipio, nome_municipio FROM municipios").fetchall())
+                finally:
+                    maps_conn.close()
+                    conn.close()
+                self._allocation = (allocation, names)
+            except Exception as e:
+                logger.warning("Alocação por resíduo indisponível, usando coluna do setor: %s", e)
+                self._allocation = False
+        return self._allocation
+
     def _load_top_municipalities(self, residuo_codigo: str, setor: str, limit: int = 20) -> List[Dict]:
-        """Carrega top N municípios para um resíduo específico baseado no setor"""
+        """Carrega top N municípios para um resíduo a partir do seu driver de produção"""
+        from src.services.residue_allocator import ResidueAllocator
+
+        if self._has_allocation_table():
+            conn = self._get_connection()
+            try:
+                return ResidueAllocator.top_municipalities(conn, residuo_codigo, 'Realista', limit)
+            finally:
+                conn.close()
+
+        allocation = self._get_allocation()
+        if allocation:
+            return ResidueAllocator.rank_municipalities(allocation[0], allocation[1], residuo_codigo, 'Realista', limit)
+
+        # Fallback: ranking pela coluna agregada do setor
         conn = self._get_connection()
         cursor = conn.cursor()
         
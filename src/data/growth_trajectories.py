@@ -0,0 +1,103 @@
+"""
+Growth Trajectories - Annual Growth Rates of Residue Drivers
+CP2B (Centro Paulista de Estudos em Biogás e Bioprodutos)
+
+Single Responsibility: Store growth assumptions for multi-year projections.
+
+Each driver is one municipal biogas column in cp2b_maps.db (municipalities
+table). Trajectories are piecewise constant annual rates (% a.a.) keyed by the
+first year in which the rate applies. Scenario overlays scale every rate and may
+override single drivers.
+
+Sources: IBGE (Projeções da População 2024), CONAB/MAPA (Projeções do
+Agronegócio 2023/24-2033/34), UNICA, SEADE.
+"""
+
+from typing import Dict, List, Tuple
+
+BASE_YEAR = 2022
+DEFAULT_END_YEAR = 2050
+
+# ==============================================================================
+# DRIVERS: driver → (coluna base em municipalities, setor, cultura/criação)
+# ==============================================================================
+
+DRIVERS: Dict[str, Tuple[str, str, str]] = {
+    'cana': ('biogas_cana_m_ano', 'Agricultura', 'Cana-de-Açúcar'),
+    'soja': ('biogas_soja_m_ano', 'Agricultura', 'Soja'),
+    'milho': ('biogas_milho_m_ano', 'Agricultura', 'Milho'),
+    'cafe': ('biogas_cafe_m_ano', 'Agricultura', 'Café'),
+    'citros': ('biogas_citros_m_ano', 'Agricultura', 'Citros'),
+    'silvicultura': ('biogas_silvicultura_m_ano', 'Agricultura', 'Silvicultura'),
+    'bovinos': ('biogas_bovinos_m_ano', 'Pecuária', 'Bovinos'),
+    'suinos': ('biogas_suino_m_ano', 'Pecuária', 'Suínos'),
+    'aves': ('biogas_aves_m_ano', 'Pecuária', 'Aves'),
+    'piscicultura': ('biogas_piscicultura_m_ano', 'Pecuária', 'Piscicultura'),
+    'rsu': ('rsu_potencial_m_ano', 'Urbano', 'População'),
+    'rpo': ('rpo_potencial_m_ano', 'Urbano', 'População'),
+}
+
+SECTORS: List[str] = ['Agricultura', 'Pecuária', 'Urbano']
+
+# ==============================================================================
+# TRAJECTORIES: driver → {ano inicial: taxa % a.a.}
+# ==============================================================================
+
+GROWTH_TRAJECTORIES: Dict[str, Dict[int, float]] = {
+    'cana': {2023: 1.2, 2035: 0.8},
+    'soja': {2023: 2.5, 2035: 1.5},
+    'milho': {2023: 1.8, 2035: 1.0},
+    'cafe': {2023: -0.3},
+    'citros': {2023: -0.5, 2030: 0.0},
+    'silvicultura': {2023: 2.0, 2035: 1.2},
+    'bovinos': {2023: -0.8},
+    'suinos': {2023: 1.5, 2035: 0.8},
+    'aves': {2023: 2.0, 2035: 1.2},
+    'piscicultura': {2023: 3.5, 2035: 2.0},
+    # População SP: crescimento desacelerando, pico ~2040
+    'rsu': {2023: 0.45, 2030: 0.2, 2040: -0.1},
+    'rpo': {2023: 0.45, 2030: 0.2, 2040: -0.1},
+}
+
+# ==============================================================================
+# SCENARIO OVERLAYS
+# ==============================================================================
+
+SCENARIO_OVERLAYS: Dict[str, Dict] = {
+    'Tendencial': {'rate_multiplier': 1.0, 'overrides': {}},
+    'Baixo Crescimento': {'rate_multiplier': 0.5, 'overrides': {}},
+    'Alto Crescimento': {'rate_multiplier': 1.5, 'overrides': {}},
+    # Expansão do etanol/SAF e da proteína animal para exportação
+    'Transição Energética': {
+        'rate_multiplier': 1.0,
+        'overrides': {'cana': {2023: 2.5, 2035: 1.5}, 'aves': {2023: 2.5}, 'suinos': {2023: 2.0}},
+    },
+}
+
+DEFAULT_SCENARIO = 'Tendencial'
+
+
+def get_trajectory(driver: str, scenario: str = DEFAULT_SCENARIO) -> Dict[int, float]:
+    """
+    Resolve the trajectory of a driver under a scenario overlay.
+
+    Raises:
+        ValueError: If the scenario is unknown
+    """
+    if scenario not in SCENARIO_OVERLAYS:
+        raise ValueError(f"Unknown projection scenario '{scenario}'. Use one of {list(SCENARIO_OVERLAYS)}")
+    overlay = SCENARIO_OVERLAYS[scenario]
+    trajectory = overlay['overrides'].get(driver, GROWTH_TRAJECTORIES.get(driver, {}))
+    return {year: rate * overlay['rate_multiplier'] for year, rate in trajectory.items()}
+
+
+__all__ = [
+    'BASE_YEAR',
+    'DEFAULT_END_YEAR',
+    'DRIVERS',
+    'SECTORS',
+    'GROWTH_TRAJECTORIES',
+    'SCENARIO_OVERLAYS',
+    'DEFAULT_SCENARIO',
+    'get_trajectory',
+]
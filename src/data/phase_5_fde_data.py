@@ -4,6 +4,9 @@ CP2B (Centro Paulista de Estudos em Biogás e Bioprodutos)
 
 Maps validated FDE data from cp2b_analise_fatores_residuos.md to residues
 Format: {residue_name: {fde_real, priority_tier, fc, fcp, fs, fl, rank, culture, recommendation}}
+
+One entry per residue: alternative names (registry names, database codes) are
+resolved by src.utils.residue_resolver in get_fde_data().
 """
 
 # Complete FDE ranking from cp2b_analise_fatores_residuos.md
@@ -34,31 +37,6 @@ FDE_VALIDATION_DATA = {
         "culture_group": "Laticínios",
         "recommendation": "MÁXIMA PRIORIDADE - Melhor oportunidade (exceto bagaço cana)"
     },
-    # Alternative names for database mapping
-    "Soro de Laticínios (Leite)": {
-        "fde_real": 30.40,
-        "priority_tier": "EXCELENTE",
-        "fc": 0.95,
-        "fcp": 1.5,
-        "fs": 1.0,
-        "fl": 0.80,
-        "bmp": 500,
-        "fde_rank": 2,
-        "culture_group": "Laticínios",
-        "recommendation": "MÁXIMA PRIORIDADE - Melhor oportunidade (exceto bagaço cana)"
-    },
-    "Soro de Laticínios (Derivados)": {
-        "fde_real": 30.40,
-        "priority_tier": "EXCELENTE",
-        "fc": 0.95,
-        "fcp": 1.5,
-        "fs": 1.0,
-        "fl": 0.80,
-        "bmp": 500,
-        "fde_rank": 2,
-        "culture_group": "Laticínios",
-        "recommendation": "MÁXIMA PRIORIDADE - Melhor oportunidade (exceto bagaço cana)"
-    },
 
     # ===== RANK 3-8: EXCELENTE/BOM (FDE > 8%) =====
     "Torta de Filtro (Filter Cake)": {
@@ -109,18 +87,6 @@ FDE_VALIDATION_DATA = {
         "culture_group": "Urbano",
         "recommendation": "Potencial em RMSP; coleta seletiva necessária"
     },
-    "RSU - Resíduo Sólido Urbano": {
-        "fde_real": 9.88,
-        "priority_tier": "BOM",
-        "fc": 0.65,
-        "fcp": 2.5,
-        "fs": 1.0,
-        "fl": 0.95,
-        "bmp": 40,
-        "fde_rank": 6,
-        "culture_group": "Urbano",
-        "recommendation": "Potencial em RMSP; coleta seletiva necessária"
-    },
     "Resíduo alimentício": {
         "fde_real": 9.33,
         "priority_tier": "BOM",
@@ -410,12 +376,17 @@ def get_fde_data(residue_name: str) -> dict:
     Get FDE validation data for a residue.
 
     Args:
-        residue_name: Name of the residue
+        residue_name: Name, code or alias of the residue
 
     Returns:
         Dictionary with FDE data or empty dict if not found
     """
-    return FDE_VALIDATION_DATA.get(residue_name, {})
+    if residue_name in FDE_VALIDATION_DATA:
+        return FDE_VALIDATION_DATA[residue_name]
+
+    from src.utils.residue_resolver import fde_name
+    key = fde_name(residue_name)
+    return FDE_VALIDATION_DATA.get(key, {}) if key else {}
 
 def apply_fde_to_residue(residue_data, residue_name: str) -> None:
     """
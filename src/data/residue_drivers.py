@@ -0,0 +1,77 @@
+"""
+Residue Drivers - Municipal Production Proxies per Residue
+CP2B (Centro Paulista de Estudos em Biogás e Bioprodutos)
+
+Single Responsibility: Map each residue to the municipal column that drives its generation.
+
+Keys are residue codes of cp2b_panorama.db (residuos.codigo); values are columns
+of the municipalities table in cp2b_maps.db. Tonnage columns are preferred;
+where the snapshot has no tonnage (citros, café, silvicultura, rebanhos) the
+culture/herd biogas column is used, which is proportional to production.
+Industrial residues follow the activity that supplies them (abate → bovinos,
+alimentos/bebidas → população).
+"""
+
+from typing import Dict
+
+DEFAULT_DRIVER = 'populacao_2022'
+
+RESIDUE_DRIVERS: Dict[str, str] = {
+    # Cana-de-açúcar
+    'BAGACO': 'residuos_cana_ton_ano',
+    'PALHA': 'residuos_cana_ton_ano',
+    'TORTA_FILTRO': 'residuos_cana_ton_ano',
+    'VINHACA': 'residuos_cana_ton_ano',
+    # Citros
+    'BAGACO_CITROS': 'biogas_citros_m_ano',
+    'CASCAS_CITROS': 'biogas_citros_m_ano',
+    'POLPA_CITROS': 'biogas_citros_m_ano',
+    # Café
+    'CASCA_CAFE': 'biogas_cafe_m_ano',
+    'MUCILAGEM_CAFE': 'biogas_cafe_m_ano',
+    'POLPA_CAFE': 'biogas_cafe_m_ano',
+    # Milho
+    'CASCA_MILHO': 'residuos_milho_ton_ano',
+    'PALHA_MILHO': 'residuos_milho_ton_ano',
+    'SABUGO': 'residuos_milho_ton_ano',
+    # Soja
+    'CASCA_SOJA': 'residuos_soja_ton_ano',
+    'PALHA_SOJA': 'residuos_soja_ton_ano',
+    'VAGEM_SOJA': 'residuos_soja_ton_ano',
+    # Silvicultura
+    'CASCA_EUCALIPTO': 'biogas_silvicultura_m_ano',
+    'FOLHAS_EUCALIPTO': 'biogas_silvicultura_m_ano',
+    'GALHOS_EUCALIPTO': 'biogas_silvicultura_m_ano',
+    # Avicultura
+    'CAMA_AVIARIO': 'biogas_aves_m_ano',
+    'CARCACAS_AVES': 'biogas_aves_m_ano',
+    'DEJETOS_AVES': 'biogas_aves_m_ano',
+    # Bovinocultura
+    'DEJETOS_BOVINO': 'biogas_bovinos_m_ano',
+    'ESTERCO_BOVINO': 'biogas_bovinos_m_ano',
+    # Suinocultura
+    'DEJETOS_SUINO': 'biogas_suino_m_ano',
+    'ESTERCO_SUINO': 'biogas_suino_m_ano',
+    # Urbano
+    'FORSU': 'populacao_2022',
+    'ORGANICO_RSU': 'populacao_2022',
+    'LODO_PRIMARIO': 'populacao_2022',
+    'LODO_SECUNDARIO': 'populacao_2022',
+    # Industrial
+    'SANGUE': 'biogas_bovinos_m_ano',
+    'VISCERAS': 'biogas_bovinos_m_ano',
+    'GORDURA': 'biogas_bovinos_m_ano',
+    'BAGACO_MALTE': 'populacao_2022',
+    'LEVEDO_CERVEJA': 'populacao_2022',
+    'APARAS_ALIMENTOS': 'populacao_2022',
+    'CASCAS_ALIMENTOS': 'populacao_2022',
+    'REJEITOS': 'populacao_2022',
+}
+
+
+def get_residue_driver(residue_code: str) -> str:
+    """Driver column for a residue code (population when unmapped)."""
+    return RESIDUE_DRIVERS.get(residue_code, DEFAULT_DRIVER)
+
+
+__all__ = ['RESIDUE_DRIVERS', 'DEFAULT_DRIVER', 'get_residue_driver']
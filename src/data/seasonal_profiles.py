@@ -0,0 +1,138 @@
+"""
+Seasonal Availability Profiles - Monthly Generation Shares
+CP2B (Centro Paulista de Estudos em Biogás e Bioprodutos)
+
+Single Responsibility: Store 12-month generation profiles per culture/residue.
+
+Each profile lists the share of annual generation in each month (Jan..Dec).
+Profiles are normalized on access, so they only need to be proportional.
+The scalar FS factor still discounts the annual availability; these profiles
+distribute the available amount over the year.
+
+Sources: UNICA (moagem mensal Centro-Sul), CONAB (calendário agrícola SP),
+Fundecitrus (processamento de laranja).
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+MONTHS = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+
+FLAT_PROFILE = [1.0] * 12
+
+# ==============================================================================
+# CULTURE PROFILES (keys follow culture_hierarchy.CULTURE_METADATA)
+# ==============================================================================
+
+CULTURE_PROFILES: Dict[str, List[float]] = {
+    # Safra Centro-Sul: moagem abril-novembro, pico julho-agosto
+    "Cana-de-Açúcar": [0.3, 0.2, 1.5, 7.0, 12.0, 13.5, 15.0, 15.0, 13.0, 11.0, 7.0, 2.5],
+    # Processamento de laranja: maio-janeiro, pico agosto-setembro
+    "Citros": [6.0, 3.0, 2.0, 2.0, 5.0, 9.0, 12.0, 14.0, 14.0, 13.0, 11.0, 9.0],
+    # Colheita de café: maio-setembro
+    "Café": [0.0, 0.0, 0.0, 3.0, 15.0, 22.0, 25.0, 20.0, 10.0, 5.0, 0.0, 0.0],
+    # Milho verão (fev-abr) + safrinha (jun-ago)
+    "Milho": [2.0, 10.0, 15.0, 10.0, 5.0, 12.0, 18.0, 15.0, 6.0, 3.0, 2.0, 2.0],
+    # Colheita de soja: janeiro-abril
+    "Soja": [10.0, 30.0, 35.0, 15.0, 3.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0],
+    # Colheita florestal contínua
+    "Silvicultura": FLAT_PROFILE,
+    "Cervejaria": FLAT_PROFILE,
+    # Pecuária: geração contínua
+    "Avicultura": FLAT_PROFILE,
+    "Bovinocultura": FLAT_PROFILE,
+    "Suinocultura": FLAT_PROFILE,
+    "Piscicultura": FLAT_PROFILE,
+}
+
+# ==============================================================================
+# RESIDUE OVERRIDES (keys follow residue_registry names)
+# ==============================================================================
+
+RESIDUE_PROFILES: Dict[str, List[float]] = {
+    # Poda urbana concentrada na primavera/verão (período chuvoso)
+    "RPO - Poda Urbana": [11.0, 10.0, 9.0, 7.0, 6.0, 5.0, 5.0, 6.0, 8.0, 10.0, 11.0, 12.0],
+    "Galhos e folhas": [11.0, 10.0, 9.0, 7.0, 6.0, 5.0, 5.0, 6.0, 8.0, 10.0, 11.0, 12.0],
+    "Grama cortada": [13.0, 12.0, 11.0, 8.0, 5.0, 3.0, 3.0, 4.0, 7.0, 10.0, 12.0, 12.0],
+}
+
+
+# Case-insensitive culture lookup ('Cana-de-açúcar' in cp2b_panorama.db)
+_CULTURE_KEYS = {culture.casefold(): culture for culture in CULTURE_PROFILES}
+
+
+def normalize_profile(values: Sequence[float]) -> List[float]:
+    """
+    Normalize a 12-month profile so that it sums to 1.
+
+    Raises:
+        ValueError: If the profile does not have 12 non-negative values
+    """
+    if len(values) != 12:
+        raise ValueError(f"Seasonal profile must have 12 values, got {len(values)}")
+    if any(v < 0 for v in values):
+        raise ValueError("Seasonal profile values must be non-negative")
+    total = float(sum(values))
+    if total == 0:
+        return [1.0 / 12] * 12
+    return [v / total for v in values]
+
+
+def profile_from_fs(fs: float, start_month: int = 4) -> List[float]:
+    """
+    Derive a profile from the scalar FS factor when no explicit profile exists.
+
+    FS is read as the fraction of the year in which the residue is generated:
+    round(12 × FS) consecutive months, starting at `start_month` (default: April,
+    start of the Centro-Sul agricultural season), share the annual amount.
+
+    Args:
+        fs: Seasonal factor (0-1)
+        start_month: First month of the season (1-12)
+
+    Returns:
+        Normalized 12-month profile
+    """
+    active = min(12, max(1, round(12 * fs)))
+    values = [0.0] * 12
+    for offset in range(active):
+        values[(start_month - 1 + offset) % 12] = 1.0
+    return normalize_profile(values)
+
+
+def get_seasonal_profile(
+    residue_name: str,
+    culture: Optional[str] = None,
+    fs: Optional[float] = None
+) -> List[float]:
+    """
+    Resolve the monthly profile for a residue.
+
+    Order: residue override → culture profile → FS-derived profile → flat.
+
+    Args:
+        residue_name: Residue name (registry key)
+        culture: Culture group (e.g. "Cana-de-Açúcar", matched case-insensitively)
+        fs: Scalar seasonal factor for the FS fallback
+
+    Returns:
+        Normalized 12-month profile
+    """
+    if residue_name in RESIDUE_PROFILES:
+        return normalize_profile(RESIDUE_PROFILES[residue_name])
+    if culture:
+        key = _CULTURE_KEYS.get(str(culture).casefold())
+        if key:
+            return normalize_profile(CULTURE_PROFILES[key])
+    if fs is not None and 0 < fs < 1:
+        return profile_from_fs(fs)
+    return normalize_profile(FLAT_PROFILE)
+
+
+__all__ = [
+    'MONTHS',
+    'CULTURE_PROFILES',
+    'RESIDUE_PROFILES',
+    'normalize_profile',
+    'profile_from_fs',
+    'get_seasonal_profile',
+]
@@ -8,6 +8,9 @@ import pandas as pd
 from sqlalchemy import create_engine
 from pathlib import Path
 
+# Logical database path → (served file, engine)
+_ENGINES = {}
+
 
 def get_db_connection(db_type="municipalities"):
     """
@@ -20,7 +23,8 @@ def get_db_connection(db_type="municipalities"):
         db_type: Type of database - "municipalities" or "residues"
 
     Returns:
-        sqlalchemy.engine.Engine: Database connection engine
+        sqlalchemy.engine.Engine: Database connection engine (pooled; reopened
+        when a new database version is deployed)
     """
     # Default database paths (used when secrets don't exist - e.g., Streamlit Cloud)
     DEFAULT_PATHS = {
@@ -52,7 +56,23 @@ def get_db_connection(db_type="municipalities"):
     if not Path(db_path).is_absolute():
         db_path = Path(__file__).parent.parent / db_path
 
-    engine = create_engine(f"sqlite:///{db_path}")
+    # Blue/green deployments (src/utils/db_deploy.py): serve the deployed version
+    # and reopen the pooled engine when a new version goes live
+    from src.utils.db_deploy import resolve_db_path
+
+    live_path = str(resolve_db_path(db_path))
+    cached = _ENGINES.get(str(db_path))
+    if cached and cached[0] == live_path:
+        return cached[1]
+
+    engine = create_engine(f"sqlite:///{live_path}")
+    _ENGINES[str(db_path)] = (live_path, engine)
+    if cached:
+        cached[1].dispose()
+        st.cache_data.clear()
+
+        from src.utils.figure_cache import clear_figure_cache
+        clear_figure_cache()
     return engine
 
 
@@ -606,6 +626,19 @@ def load_residue_from_db(residue_code: str):
     return residue.iloc[0].to_dict()
 
 
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_residue_hierarchy_tree() -> dict:
+    """
+    Setor → Subsetor → Resíduo tree of the hierarchical selectors.
+
+    Returns:
+        dict: HierarchyHelper.get_hierarchy_tree() output
+    """
+    from src.data.hierarchy_helper import HierarchyHelper
+
+    return HierarchyHelper().get_hierarchy_tree()
+
+
 def clear_all_caches():
     """
     Clear all Streamlit caches for data handlers.
@@ -618,6 +651,9 @@ def clear_all_caches():
     get_sector_summary.clear()
     st.cache_data.clear()
 
+    from src.utils.figure_cache import clear_figure_cache
+    clear_figure_cache()
+
 
 @st.cache_data(ttl=3600, show_spinner="Carregando lista de resíduos...")
 def get_residues_for_dropdown():
@@ -675,215 +711,457 @@ calculate_saf = calculate_fde
 
 
 # ============================================================================
-# PANORAMA DATABASE ACCESS (Phase 2 - Reference Integration)
+# TECHNO-ECONOMIC FEASIBILITY (cached per parameter set)
 # ============================================================================
 
-def get_panorama_connection():
+@st.cache_data(ttl=3600, show_spinner="Calculando viabilidade econômica...")
+def get_feasibility_results(
+    scenario: str = 'Realista',
+    tariffs: tuple = (350.0, 450.0, 550.0),
+    discount_rates: tuple = (0.08, 0.10, 0.12),
+    scale_exponents: tuple = (0.6, 0.7, 0.8),
+    capex_reference: float = 12_000_000.0,
+    electrical_efficiency: float = 0.38
+):
     """
-    Get connection to CP2B_Precision_Biogas.db (NEW validated database).
+    Screen all municipalities under an economic parameter sweep.
 
-    MIGRATION: Switched from old cp2b_panorama.db to NEW validated database.
+    Cached per parameter set: every distinct combination of arguments is
+    computed once per hour and reused across reruns and sessions.
 
-    This NEW database contains:
-    - 22 validated scientific papers (scientific_papers table)
-    - 102 validated chemical parameters (chemical_parameters table)
-    - 4 residue types with clean mapping (residue_types table)
-    - 15 parameter definitions (parameter_definitions table)
+    Args:
+        scenario: CH4 scenario ('Pessimista', 'Realista', 'Otimista', 'Teórico (100%)')
+        tariffs: Electricity tariffs to sweep (R$/MWh)
+        discount_rates: Discount rates to sweep (fraction)
+        scale_exponents: CAPEX scale-curve exponents to sweep
+        capex_reference: CAPEX of the 1 MW reference plant (R$)
+        electrical_efficiency: CHP electrical efficiency
 
-    OLD database had schema mismatches causing serialization errors.
-    NEW database has clean schema with simple foreign keys.
+    Returns:
+        FeasibilityResult: (municipality × case) NPV, LCOE and payback arrays
+    """
+    from src.services.feasibility_analyzer import (
+        FeasibilityAnalyzer, FeasibilitySweep, EnergyConversion
+    )
+
+    sweep = FeasibilitySweep(
+        tariffs_brl_mwh=tuple(tariffs),
+        discount_rates=tuple(discount_rates),
+        scale_exponents=tuple(scale_exponents),
+        capex_reference_brl=capex_reference
+    )
+    conversion = EnergyConversion(electrical_efficiency=electrical_efficiency)
+
+    df = load_all_municipalities()
+    return FeasibilityAnalyzer.evaluate_municipalities(df, sweep, conversion, scenario)
+
+
+# ============================================================================
+# AVOIDED EMISSIONS & DIGESTATE NUTRIENTS (cached per factor set)
+# ============================================================================
+
+@st.cache_data(ttl=3600, show_spinner="Calculando balanço de emissões e nutrientes...")
+def get_environmental_balance(
+    gwp_ch4: float = 28.0,
+    grid_emission_factor: float = 0.20,
+    leakage_fraction: float = 0.02,
+    baseline_methane_fraction: tuple = (
+        ('Agricultura', 0.0), ('Pecuária', 0.35), ('Urbano', 0.50), ('Industrial', 0.30)
+    ),
+    recovery_n: float = 0.85,
+    recovery_p2o5: float = 0.95,
+    recovery_k2o: float = 0.95
+):
+    """
+    Avoided CO2e and digestate N-P-K per municipality × residue × scenario.
+
+    The CH4 cube is the per-residue municipal allocation (residuos_municipios,
+    see get_residue_municipal_allocation). Cached per emission-factor /
+    recovery-rate combination.
+
+    Args:
+        gwp_ch4: Global warming potential of CH4 (100 anos)
+        grid_emission_factor: Displaced grid emission factor (t CO2/MWh)
+        leakage_fraction: Fugitive CH4 fraction at the plant
+        baseline_methane_fraction: ((setor, fração), ...) emitted under baseline
+        recovery_n, recovery_p2o5, recovery_k2o: Nutrient recovery in digestate
 
     Returns:
-        sqlalchemy.engine.Engine: Connection to precision biogas database
+        EnvironmentalBalance: Result cube with to_long_frame() for export
     """
-    from pathlib import Path
+    from src.services.environmental_balance import (
+        EnvironmentalBalanceCalculator, EmissionFactors, NutrientRecovery
+    )
 
-    # NEW VALIDATED DATABASE PATH
-    db_path = Path("C:/Users/Lucas/Documents/CP2B/Validacao_dados/CP2B_Precision_Biogas.db")
+    factors = EmissionFactors(
+        gwp_ch4=gwp_ch4,
+        grid_emission_factor_t_mwh=grid_emission_factor,
+        leakage_fraction=leakage_fraction,
+        baseline_methane_fraction=tuple(baseline_methane_fraction)
+    )
+    recovery = NutrientRecovery(n=recovery_n, p2o5=recovery_p2o5, k2o=recovery_k2o)
 
-    if not db_path.exists():
-        raise FileNotFoundError(
-            f"Precision biogas database not found at: {db_path}\n"
-            f"Please ensure the validated database is available."
-        )
+    df = load_all_municipalities()
+    residues = get_allocation_residue_profiles()
+    scenarios = list(EnvironmentalBalanceCalculator.SCENARIOS)
+    ch4 = get_residue_municipal_allocation().municipal_cube(df['codigo_municipio'], scenarios)
+    return EnvironmentalBalanceCalculator.calculate(
+        ch4, residues, df, scenarios=scenarios, factors=factors, recovery=recovery
+    )
 
-    engine = create_engine(f"sqlite:///{db_path}")
-    return engine
+
+# ============================================================================
+# SEASONAL AVAILABILITY (cached per scenario)
+# ============================================================================
+
+@st.cache_data(ttl=3600, show_spinner="Calculando sazonalidade mensal...")
+def get_monthly_availability(scenario: str = 'Realista'):
+    """
+    Monthly CH4 availability per municipality × residue for one scenario.
+
+    Annual amounts come from the per-residue municipal allocation
+    (residuos_municipios), spread over the months by each residue's profile.
+
+    Args:
+        scenario: 'Pessimista', 'Realista' or 'Otimista'
+
+    Returns:
+        tuple: (municipalities DataFrame, residues DataFrame, cube of shape
+               (municipality, residue, 12) in m³ CH4/mês)
+    """
+    from src.services.seasonality_analyzer import SeasonalityAnalyzer
+
+    df = load_all_municipalities()
+    residues = get_allocation_residue_profiles()
+    annual = get_residue_municipal_allocation().municipal_cube(df['codigo_municipio'], [scenario])[:, :, 0]
+    profiles = SeasonalityAnalyzer.build_profile_matrix(residues)
+    monthly = SeasonalityAnalyzer.expand_monthly(annual, profiles)
+    return df[['codigo_municipio', 'nome_municipio']], residues, monthly
 
 
 @st.cache_data(ttl=3600)
-def _load_residue_id_mapping() -> dict:
+def get_seasonal_hub_sizing(
+    scenario: str = 'Realista',
+    cell_km: float = 50.0,
+    design_capacity_fraction: float = 1.0
+):
     """
-    Load residue code → residue_id mapping from NEW precision database.
+    Peak-month capacity and storage needs per hub, cached per scenario.
 
-    This function queries the residue_types table and creates a mapping
-    dictionary for quick lookups.
+    Hubs are square grid cells of `cell_km` over the municipality centroids.
+
+    Args:
+        scenario: 'Pessimista', 'Realista' or 'Otimista'
+        cell_km: Hub cell size (km)
+        design_capacity_fraction: Plant capacity as fraction of peak-month flow
 
     Returns:
-        dict: {residue_code: residue_id, ...}
-              e.g., {'CANA_VINHACA': 4, 'SUINO_DEJETO': 3, ...}
+        SeasonalHubSizing: (hub × month) flows and sizing summary
+    """
+    from src.services.seasonality_analyzer import SeasonalityAnalyzer
 
-    Examples:
-        >>> mapping = _load_residue_id_mapping()
-        >>> mapping['CANA_VINHACA']
-        4
+    _, _, monthly = get_monthly_availability(scenario)
+    df = load_all_municipalities()
+    hubs = SeasonalityAnalyzer.grid_hubs(df['lat'], df['lon'], cell_km=cell_km)
+    return SeasonalityAnalyzer.size_hubs(monthly, hubs, design_capacity_fraction)
+
+
+# ============================================================================
+# CO-DIGESTION BLENDS (cached per constraint set)
+# ============================================================================
+
+@st.cache_data(ttl=3600, show_spinner="Otimizando misturas de co-digestão...")
+def get_codigestion_blends(
+    scenario: str = 'Realista',
+    digestion_mode: str = 'umida',
+    cn_min: float = 20.0,
+    cn_max: float = 30.0,
+    olr_max: float = 4.0,
+    hrt_days: float = 30.0,
+    max_residues: int = None
+):
     """
-    try:
-        conn = get_panorama_connection()
+    Optimal co-digestion blend for all 645 municipalities, cached per constraint set.
+
+    Available tonnages per residue are derived from the per-residue municipal
+    allocation (see get_monthly_availability) and each residue's CH4 yield per tonne.
+    Chemistry comes from cp2b_panorama.db; gaps are filled from the precision DB
+    distribution before falling back to sector medians.
+
+    Args:
+        scenario: 'Pessimista', 'Realista' or 'Otimista'
+        digestion_mode: 'umida' (ST ≤ 15%) or 'seca' (20-40% ST)
+        cn_min, cn_max: C:N window of the blend
+        olr_max: Maximum organic loading rate (kg SV/m³·dia)
+        hrt_days: Hydraulic retention time (dias)
+        max_residues: Maximum residues per recipe (None = unrestricted)
+
+    Returns:
+        BlendResult: Feed per residue and blend indicators per municipality
+    """
+    from src.services.codigestion_optimizer import BlendConstraints, CoDigestionOptimizer
+    from src.utils.residue_resolver import precision_id
+
+    df = load_all_municipalities()
+    profiles = get_allocation_residue_profiles()
+    profiles['precision_id'] = profiles['codigo'].map(precision_id)
+    residues = CoDigestionOptimizer.prepare_residues(profiles, get_precision_parameter_distribution())
+    ch4 = get_residue_municipal_allocation().municipal_cube(df['codigo_municipio'], [scenario])[:, :, 0]
+    available = CoDigestionOptimizer.tonnage_from_ch4(ch4, residues)
+
+    constraints = BlendConstraints.for_mode(
+        digestion_mode,
+        cn_min=cn_min,
+        cn_max=cn_max,
+        olr_max_kg_vs_m3_d=olr_max,
+        hrt_days=hrt_days,
+        max_residues=max_residues
+    )
+    return CoDigestionOptimizer.optimize_batch(
+        available, residues, constraints, site_ids=df['nome_municipio'].to_numpy()
+    )
+
+
+# ============================================================================
+# MULTI-YEAR PROJECTIONS (cached per scenario)
+# ============================================================================
+
+@st.cache_data(ttl=3600, show_spinner="Projetando potencial até 2050...")
+def get_municipal_projection(scenario: str = 'Tendencial', end_year: int = 2050):
+    """
+    Year × municipality × sector projection of biogas potential.
+
+    The base year is the latest year loaded in the yearly residue tables
+    (residuos_agricolas / residuos_pecuarios / residuos_urbanos), or the
+    2022 municipalities snapshot when those tables are empty.
+
+    Args:
+        scenario: Projection overlay ('Tendencial', 'Baixo Crescimento',
+                  'Alto Crescimento', 'Transição Energética')
+        end_year: Last projected year
+
+    Returns:
+        ProjectionResult: by_driver (ano, município, driver) and by_sector arrays
+    """
+    from src.services.projection_engine import ProjectionEngine
+
+    df = load_all_municipalities()
+    with get_municipality_db_connection().connect() as conn:
+        base_year, codes, base = ProjectionEngine.load_base_year(conn.connection, df)
+    return ProjectionEngine.project(base, codes, base_year, end_year, scenario)
+
+
+# ============================================================================
+# PER-RESIDUE MUNICIPAL ALLOCATION (cached)
+# ============================================================================
+
+@st.cache_data(ttl=3600, show_spinner="Distribuindo resíduos por município...")
+def get_residue_municipal_allocation():
+    """
+    Sparse (residue × municipality) allocation driven by each residue's production proxy.
+
+    Each residue's state potential is split by its own driver (cana ton/ano,
+    rebanhos, população) instead of the sector column.
+
+    Returns:
+        ResidueAllocation: weights, totals and per-scenario potentials
+    """
+    from src.services.residue_allocator import ResidueAllocator
+
+    with get_residue_db_connection().connect() as panorama, get_municipality_db_connection().connect() as maps:
+        return ResidueAllocator.load(panorama.connection, maps.connection)
+
+
+@st.cache_data(ttl=3600)
+def get_allocation_residue_profiles():
+    """
+    Residue properties aligned with get_residue_municipal_allocation().
+
+    One row per residuos.codigo, with chemistry from cp2b_panorama.db and
+    N-P-K from the residue registry entries resolved to each code.
 
-        query = "SELECT residue_id, residue_code FROM residue_types"
-        df = pd.read_sql_query(query, conn)
+    Returns:
+        pd.DataFrame: see EnvironmentalBalanceCalculator.build_allocation_profiles
+    """
+    from src.data.residue_registry import RESIDUES_REGISTRY, SECTORS
+    from src.services.environmental_balance import EnvironmentalBalanceCalculator
+    from src.utils.residue_resolver import canonical_code
+
+    registry = EnvironmentalBalanceCalculator.build_residue_profiles(RESIDUES_REGISTRY, SECTORS)
+    registry['codigo'] = [canonical_code(name) for name in registry['name']]
+    with get_residue_db_connection().connect() as panorama:
+        df_residuos = pd.read_sql("SELECT * FROM residuos", panorama)
+    profiles = EnvironmentalBalanceCalculator.build_allocation_profiles(df_residuos, registry)
+
+    order = pd.Index(profiles['codigo']).get_indexer(get_residue_municipal_allocation().residue_codes)
+    return profiles.iloc[order].reset_index(drop=True)
+
+
+@st.cache_data(ttl=3600)
+def get_residue_municipal_potential(scenario: str = 'Realista'):
+    """
+    Long table of per-residue municipal CH4 potential for one scenario.
+
+    Returns:
+        pd.DataFrame: residuo_codigo, codigo_municipio, cenario, peso, ch4_m3_ano
+    """
+    frame = get_residue_municipal_allocation().to_long_frame()
+    return frame[frame['cenario'] == scenario].reset_index(drop=True)
+
+
+# ============================================================================
+# LAB BATCH COMPARISON (cached precision distribution)
+# ============================================================================
 
-        # Create base mapping from database
-        mapping = dict(zip(df['residue_code'], df['residue_id']))
+@st.cache_data(ttl=3600)
+def get_precision_parameter_distribution():
+    """
+    Mean/std per (residue, parameter, unit) of the validated precision DB.
 
-        # Add webapp aliases for backward compatibility
-        mapping['VINHACA'] = mapping.get('CANA_VINHACA')  # Legacy
-        mapping['DEJETOS_SUINO'] = mapping.get('SUINO_DEJETO')  # Variation
-        mapping['CAMA_AVIARIO'] = mapping.get('CAMA_FRANGO')  # Legacy
+    Used for z-scores in the batch lab comparison and to fill gaps in the
+    co-digestion chemistry.
+
+    Returns:
+        pd.DataFrame: residue_id, parameter_name, unit, unit_key, mean, std, n
+    """
+    from src.lab_comparison import BatchLabComparison
 
-        return mapping
+    try:
+        return BatchLabComparison.precision_distribution()
     except Exception as e:
-        st.error(f"Erro ao carregar mapeamento de resíduos: {e}")
-        return {}
+        st.warning(f"Distribuição do banco de precisão indisponível: {e}")
+        return pd.DataFrame()
 
 
-def _map_residue_code_for_references(residue_codigo: str) -> str:
+# ============================================================================
+# RESIDUE SIMILARITY (cached index per database version)
+# ============================================================================
+
+def get_knowledge_base_version() -> str:
     """
-    DEPRECATED: This function is for OLD database only.
+    Version tag of the residue knowledge base (mtime/size of the residue and precision DBs).
 
-    NEW database uses residue_id mapping via _load_residue_id_mapping().
-    Keeping this for backward compatibility but it won't be used.
+    Used as cache key so the similarity index is rebuilt only when a database changes.
+    """
+    from src.adapters.precision_db_adapter import PrecisionDatabaseAdapter
+
+    parts = []
+    for path in (Path(get_residue_db_connection().url.database), Path(PrecisionDatabaseAdapter.DB_PATH)):
+        if path.exists():
+            stat = path.stat()
+            parts.append(f"{path.name}:{stat.st_mtime_ns}:{stat.st_size}")
+    return '|'.join(parts)
+
+
+@st.cache_resource(show_spinner="Indexando resíduos de referência...")
+def get_residue_similarity_index(db_version: str):
+    """
+    Standardized residue knowledge base for nearest-neighbor identification.
 
     Args:
-        residue_codigo: Webapp code
+        db_version: Output of get_knowledge_base_version() (cache key)
 
     Returns:
-        str: Database code (pass-through now)
+        SimilarityIndex (KD-trees are cached inside the index)
     """
-    # For NEW database, just return as-is
-    # The actual mapping happens via residue_id in new functions
-    return residue_codigo
+    from src.services.residue_similarity import ResidueSimilarity
 
+    return ResidueSimilarity.load_index(Path(get_residue_db_connection().url.database), version=db_version)
 
-def _old_map_residue_code_for_references_DEPRECATED(residue_codigo: str) -> str:
+
+def identify_residues(samples: pd.DataFrame, k: int = 5) -> pd.DataFrame:
     """
-    OLD mapping function for deprecated cp2b_panorama.db database.
+    Top-k most similar known residues for each lab sample.
+
+    Args:
+        samples: Wide table, one row per sample, columns ts, vs, bmp, cn_ratio, ph, cod
+                 (cod in mg/L, as in the lab form) and optional sample_id
+        k: Matches per sample
 
-    DEPRECATED - DO NOT USE. Kept for reference only.
+    Returns:
+        pd.DataFrame: sample_id, rank, codigo, residuo, distancia, similaridade,
+        parametros_comparados, concordancia_<parâmetro>
+    """
+    from src.services.residue_similarity import ResidueSimilarity
 
-    The webapp uses hierarchical codes (SECTOR_CULTURE_RESIDUE) but the
-    references database uses simpler codes (RESIDUE only).
+    index = get_residue_similarity_index(get_knowledge_base_version())
+    return ResidueSimilarity.query_batch(index, samples, k=k)
 
-    This mapping bridges the two naming conventions.
+
+@st.cache_resource(show_spinner="Calculando cobertura da literatura...")
+def get_literature_coverage(db_version: str):
+    """
+    Sparse residue × parameter × paper coverage matrix.
 
     Args:
-        residue_codigo: Webapp code (e.g., 'CANA_VINHACA')
+        db_version: Output of get_knowledge_base_version() (cache key)
 
     Returns:
-        str: Database code (e.g., 'VINHACA')
+        CoverageMatrix (gaps, papers_needed, matrix views are computed on demand)
+    """
+    from src.services.literature_coverage import LiteratureCoverage
 
-    Examples:
-        >>> _map_residue_code_for_references('CANA_VINHACA')
-        'VINHACA'
-        >>> _map_residue_code_for_references('SUINO_DEJETO')
-        'DEJETOS_SUINO'
-        >>> _map_residue_code_for_references('UNKNOWN_CODE')
-        'UNKNOWN_CODE'  # Pass through if no mapping
-    """
-    code_mapping = {
-        # ============================================================================
-        # CANA-DE-AÇÚCAR (Top parameters in database)
-        # ============================================================================
-        'CANA_VINHACA': 'VINHACA',           # 1,007 parameters
-        'CANA_BAGACO': 'BAGACO',             # 396 parameters
-        'CANA_TORTA_FILTRO': 'TORTA_FILTRO',
-        'CANA_PALHA': 'PALHA_CANA',
-
-        # ============================================================================
-        # PECUÁRIA - SUÍNOS (Top in database)
-        # ============================================================================
-        'SUINO_DEJETO': 'DEJETOS_SUINO',     # 1,246 parameters
-        'SUINO_DEJETOS': 'DEJETOS_SUINO',
-
-        # ============================================================================
-        # PECUÁRIA - BOVINOS
-        # ============================================================================
-        'BOVINO_DEJETO': 'DEJETOS_BOVINO',
-        'BOVINO_DEJETOS': 'DEJETOS_BOVINO',
-        'BOVINO_ESTERCO': 'DEJETOS_BOVINO',
-
-        # ============================================================================
-        # PECUÁRIA - AVES
-        # ============================================================================
-        'AVES_CAMA': 'CAMA_AVIARIO',         # 805 parameters
-        'AVES_DEJETO': 'DEJETOS_AVES',
-        'AVES_DEJETOS': 'DEJETOS_AVES',
-        'FRANGO_CAMA': 'CAMA_AVIARIO',
-
-        # ============================================================================
-        # CAFÉ
-        # ============================================================================
-        'CAFE_CASCA': 'CASCA_CAFE',          # 982 parameters
-        'CAFE_CASCAS': 'CASCA_CAFE',
-        'CAFE_POLPA': 'POLPA_CAFE',
-
-        # ============================================================================
-        # CITROS
-        # ============================================================================
-        'CITROS_BAGACO': 'BAGACO_CITROS',    # 246 parameters
-        'CITROS_CASCAS': 'CASCAS_CITROS',
-        'CITROS_POLPA': 'POLPA_CITROS',
-
-        # ============================================================================
-        # EUCALIPTO
-        # ============================================================================
-        'EUCALIPTO_CASCA': 'CASCA_EUCALIPTO', # 335 parameters
-        'EUCALIPTO_CASCAS': 'CASCA_EUCALIPTO',
-
-        # ============================================================================
-        # INDUSTRIAL - FRIGORÍFICO
-        # ============================================================================
-        'FRIGORIF_VISCERAS': 'VISCERAS',     # 953 parameters
-        'FRIGORIF_SANGUE': 'SANGUE',
-        'FRIGORIF_REJEITOS': 'REJEITOS',     # 608 parameters
-        'ABATE_VISCERAS': 'VISCERAS',
-        'ABATE_SANGUE': 'SANGUE',
-
-        # ============================================================================
-        # INDUSTRIAL - CERVEJARIA
-        # ============================================================================
-        'CERVEJA_MALTE': 'BAGACO_MALTE',
-        'CERVEJA_LEVEDO': 'LEVEDO_CERVEJA',
-        'CERVEJA_BAGACO': 'BAGACO_MALTE',
-        'LEVEDO_CERVEJA': 'LEVEDO_CERVEJA',
-
-        # ============================================================================
-        # URBANO
-        # ============================================================================
-        'LODO_ETE': 'LODO_SECUNDARIO',       # 875 parameters
-        'ETE_LODO': 'LODO_SECUNDARIO',
-        'RSU': 'RSU',
-        'RPO': 'RPO',
-        'RESIDUO_SOLIDO_URBANO': 'RSU',
-
-        # ============================================================================
-        # MILHO
-        # ============================================================================
-        'MILHO_PALHA': 'PALHA_MILHO',
-        'MILHO_SABUGO': 'SABUGO_MILHO',
-        'MILHO_BAGACO': 'BAGACO_MILHO',
-        'MILHO_SILAGEM': 'SILAGEM_MILHO',
-
-        # ============================================================================
-        # SOJA
-        # ============================================================================
-        'SOJA_PALHA': 'PALHA_SOJA',
-        'SOJA_CASCA': 'CASCA_SOJA',
-    }
+    return LiteratureCoverage.load(webapp_db=Path(get_residue_db_connection().url.database), version=db_version)
+
+
+def load_literature_coverage():
+    """Coverage matrix of the current database version (see get_literature_coverage)."""
+    return get_literature_coverage(get_knowledge_base_version())
+
+
+# ============================================================================
+# PANORAMA DATABASE ACCESS (Phase 2 - Reference Integration)
+# ============================================================================
+
+def get_panorama_connection():
+    """
+    Get connection to CP2B_Precision_Biogas.db (NEW validated database).
+
+    MIGRATION: Switched from old cp2b_panorama.db to NEW validated database.
+
+    This NEW database contains:
+    - 22 validated scientific papers (scientific_papers table)
+    - 102 validated chemical parameters (chemical_parameters table)
+    - 4 residue types with clean mapping (residue_types table)
+    - 15 parameter definitions (parameter_definitions table)
+
+    OLD database had schema mismatches causing serialization errors.
+    NEW database has clean schema with simple foreign keys.
+
+    Returns:
+        sqlalchemy.engine.Engine: Connection to precision biogas database
+    """
+    from pathlib import Path
+
+    # NEW VALIDATED DATABASE PATH
+    db_path = Path("C:/Users/Lucas/Documents/CP2B/Validacao_dados/CP2B_Precision_Biogas.db")
+
+    if not db_path.exists():
+        raise FileNotFoundError(
+            f"Precision biogas database not found at: {db_path}\n"
+            f"Please ensure the validated database is available."
+        )
 
-    # Return mapped code or original if no mapping exists
-    return code_mapping.get(residue_codigo, residue_codigo)
+    engine = create_engine(f"sqlite:///{db_path}")
+    return engine
+
+
+def _map_residue_code_for_references(residue_codigo: str) -> str:
+    """
+    Map a webapp code to the residuos.codigo used by the reference tables.
+
+    Resolved through the unified residue resolver (e.g., CAFE_CASCA → CASCA_CAFE,
+    SUINO_DEJETO → DEJETOS_SUINO). Unknown codes pass through unchanged.
+
+    Args:
+        residue_codigo: Webapp code
+
+    Returns:
+        str: Database code
+    """
+    from src.utils.residue_resolver import canonical_code
+
+    return canonical_code(residue_codigo) or residue_codigo
 
 
 def _load_scientific_references_dict() -> list:
@@ -1074,6 +1352,22 @@ def _load_parameter_sources_dict(residue_codigo: str, parameter_name: str) -> li
     return [_parameter_source_to_dict(s) for s in sources]
 
 
+@st.cache_data(ttl=3600, show_spinner=False)
+def _load_precision_sources_dict(residue_codigo: str, parameter_name: str, db_version: str) -> list:
+    """
+    INTERNAL: Validated sources of one residue × parameter as serializable dicts.
+
+    Args:
+        residue_codigo: Webapp residue code
+        parameter_name: Parameter name
+        db_version: Output of get_knowledge_base_version() (cache key)
+    """
+    from src.adapters.precision_db_adapter import PrecisionDatabaseAdapter
+
+    sources = PrecisionDatabaseAdapter.load_parameter_sources(residue_codigo, parameter_name)
+    return [_parameter_source_to_dict(s) for s in sources]
+
+
 def load_parameter_sources_for_residue(residue_codigo: str, parameter_name: str) -> list:
     """
     PUBLIC API: Load validated parameter sources from precision database.
@@ -1106,18 +1400,9 @@ def load_parameter_sources_for_residue(residue_codigo: str, parameter_name: str)
         'España-Gamboa et al. (2012)'
     """
     try:
-        from src.adapters.precision_db_adapter import PrecisionDatabaseAdapter
-        from src.models.reference_models import ParameterSource
-
-        # Load sources from precision database
-        sources = PrecisionDatabaseAdapter.load_parameter_sources(residue_codigo, parameter_name)
-
-        # Type safety check (prevents caching issues)
-        if sources and not isinstance(sources[0], ParameterSource):
-            st.error(f"⚠️ Erro interno: tipo de dados incorreto. Por favor, limpe o cache (tecla 'C').")
-            return []
-
-        return sources
+        # Cached as dicts per database version, converted back to dataclasses
+        source_dicts = _load_precision_sources_dict(residue_codigo, parameter_name, get_knowledge_base_version())
+        return [_dict_to_parameter_source(d) for d in source_dicts]
 
     except Exception as e:
         st.error(f"Erro ao carregar fontes de {parameter_name} para {residue_codigo}: {str(e)}")
@@ -1173,12 +1458,43 @@ def get_all_parameters_for_residue(residue_codigo: str):
     }
 
 
+@st.cache_data(ttl=3600, show_spinner="Carregando estatísticas dos parâmetros...")
+def get_parameter_statistics_table(db_version: str) -> pd.DataFrame:
+    """
+    Precomputed robust statistics of all residue × parameter groups.
+
+    Reads the `parameter_statistics` summary table from the live precision
+    database (read-only). The table is built offline by
+    scripts/refresh_parameter_statistics.py; before that the result is empty.
+
+    Args:
+        db_version: Output of get_knowledge_base_version() (cache key)
+
+    Returns:
+        pd.DataFrame: residue_id, parameter_name, unit, n, paper_count, min/max/mean,
+        weighted_mean, median, q1, q3, iqr, mad, n_outliers, ci_low, ci_high, avg_quality
+    """
+    import sqlite3
+    from src.adapters.precision_db_adapter import PrecisionDatabaseAdapter
+    from src.services.parameter_statistics import ParameterStatisticsEngine
+    from src.utils.db_deploy import resolve_db_path
+
+    live = resolve_db_path(PrecisionDatabaseAdapter.DB_PATH).resolve()
+    conn = sqlite3.connect(f"{live.as_uri()}?mode=ro", uri=True)
+    try:
+        return ParameterStatisticsEngine.read(conn)
+    finally:
+        conn.close()
+
+
 @st.cache_data(ttl=3600)
 def get_parameter_stats_for_residue(residue_codigo: str):
     """
     Get statistical summary of all parameters for a residue.
 
-    Useful for parameter overview tables in UI.
+    Useful for parameter overview tables in UI. Values come from the
+    precomputed summary table (quality-weighted mean, median, IQR, MAD
+    outliers, bootstrap CI) instead of live aggregation.
 
     Args:
         residue_codigo: Residue code
@@ -1186,10 +1502,17 @@ def get_parameter_stats_for_residue(residue_codigo: str):
     Returns:
         Dict[str, Dict]: Parameter statistics including paper_count, min/mean/max values
     """
-    from src.services.parameter_service import load_parameter_statistics
+    from src.adapters.precision_db_adapter import PrecisionDatabaseAdapter
+    from src.services.parameter_statistics import ParameterStatisticsEngine
 
-    conn = get_panorama_connection()
-    return load_parameter_statistics(conn, residue_codigo)
+    residue_id = PrecisionDatabaseAdapter.resolve_residue_id(residue_codigo)
+    if residue_id is None:
+        return {}
+
+    # Empty until scripts/refresh_parameter_statistics.py has run: the page then
+    # lists every parameter without data
+    table = get_parameter_statistics_table(get_knowledge_base_version())
+    return ParameterStatisticsEngine.to_parameter_dict(table[table['residue_id'] == residue_id])
 
 
 def clear_panorama_caches():
@@ -1203,4 +1526,5 @@ def clear_panorama_caches():
     load_parameter_sources_for_residue.clear()
     get_all_parameters_for_residue.clear()
     get_parameter_stats_for_residue.clear()
+    get_parameter_statistics_table.clear()
 
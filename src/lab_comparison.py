@@ -3,13 +3,25 @@ Laboratory Data Comparison Module
 CP2B - Tool for comparing empirical lab results with validated literature references
 """
 
+import io
+import logging
+import re
+import sqlite3
+import unicodedata
+import uuid
+from datetime import date
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, Optional, Tuple
+from dataclasses import dataclass
+
+import numpy as np
 import streamlit as st
 import pandas as pd
-from typing import Dict, Optional, Tuple
-from dataclasses import dataclass
 
 from src.models.residue_models import ChemicalParameters, ResidueData
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class LabResult:
@@ -41,6 +53,8 @@ class LabComparison:
         'ch4_content': 10.0  # ±10% for CH₄ content
     }
 
+    DEFAULT_THRESHOLD = 15.0
+
     def __init__(self, residue_data: ResidueData):
         """Initialize with residue reference data"""
         self.residue_data = residue_data
@@ -59,7 +73,7 @@ class LabComparison:
         Returns:
             Tuple of (status_emoji, status_text)
         """
-        threshold = self.THRESHOLDS.get(parameter, 15.0)
+        threshold = self.THRESHOLDS.get(parameter, self.DEFAULT_THRESHOLD)
         abs_deviation = abs(deviation)
 
         if abs_deviation <= threshold:
@@ -171,10 +185,31 @@ class LabComparison:
 # SESSION STATE MANAGEMENT
 # ============================================================================
 
+@st.cache_resource
+def get_lab_repository():
+    """
+    Shared read-only lab results repository (live version of cp2b_maps.db).
+
+    Results are imported with scripts/migrate_lab_results.py. Returns None
+    when the database cannot be opened or has not been migrated yet.
+    """
+    try:
+        from src.services.lab_results_repository import LabResultsRepository
+        repository = LabResultsRepository(read_only=True)
+        if repository.has_schema():
+            return repository
+        logger.info("Tabelas laboratoriais ausentes (execute scripts/migrate_lab_results.py)")
+    except sqlite3.Error as e:
+        logger.warning("Repositório laboratorial indisponível: %s", e)
+    return None
+
+
 def initialize_lab_session():
     """Initialize session state for lab data storage"""
     if 'lab_results' not in st.session_state:
         st.session_state.lab_results = {}
+    if 'lab_samples' not in st.session_state:
+        st.session_state.lab_samples = {}
     if 'lab_metadata' not in st.session_state:
         st.session_state.lab_metadata = {
             'lab_name': '',
@@ -184,22 +219,118 @@ def initialize_lab_session():
         }
 
 
+def _current_sample_id(residue_name: str, sample_id: Optional[str] = None) -> str:
+    """Sample being edited for a residue (new id on first save)"""
+    if sample_id:
+        st.session_state.lab_samples[residue_name] = sample_id
+    elif residue_name not in st.session_state.lab_samples:
+        st.session_state.lab_samples[residue_name] = f"{date.today():%Y%m%d}-{uuid.uuid4().hex[:8]}"
+    return st.session_state.lab_samples[residue_name]
+
+
+def save_lab_results(residue_name: str, values: Dict[str, float], metadata: Optional[Dict] = None) -> int:
+    """
+    Save several parameters of one sample to session state
+
+    The app does not write to the database; export_lab_sample() produces a
+    batch file for scripts/migrate_lab_results.py --import.
+
+    Args:
+        residue_name: Residue name
+        values: parameter -> measured value
+        metadata: Optional lab_name, measurement_date, operator, method, sample_id, notes
+
+    Returns:
+        Number of values saved
+    """
+    _current_sample_id(residue_name, (metadata or {}).get('sample_id'))
+    st.session_state.lab_results.setdefault(residue_name, {}).update(values)
+    return len(values)
+
+
 def save_lab_result(residue_name: str, parameter: str, value: float):
     """Save a lab result to session state"""
-    if residue_name not in st.session_state.lab_results:
-        st.session_state.lab_results[residue_name] = {}
-    st.session_state.lab_results[residue_name][parameter] = value
+    save_lab_results(residue_name, {parameter: value})
 
 
 def get_lab_results(residue_name: str) -> Optional[Dict[str, float]]:
-    """Get all lab results for a specific residue"""
-    return st.session_state.lab_results.get(residue_name)
+    """
+    Get all lab results of the current sample for a specific residue
+
+    Values imported for the same sample id are completed by the values
+    entered in this session.
+    """
+    results = {}
+    repository = get_lab_repository()
+    sample_id = st.session_state.lab_samples.get(residue_name)
+    if repository is not None and sample_id:
+        results.update(repository.get_sample(residue_name, sample_id))
+    results.update(st.session_state.lab_results.get(residue_name, {}))
+    return results or None
+
+
+def export_lab_sample(residue_name: str) -> bytes:
+    """
+    Current sample of a residue as a long-layout batch CSV (read_lab_batch format)
+
+    Returns:
+        CSV data as bytes (empty when nothing was saved)
+    """
+    values = st.session_state.lab_results.get(residue_name, {})
+    if not values:
+        return b''
+    metadata = st.session_state.lab_metadata
+    frame = pd.DataFrame({
+        'amostra': _current_sample_id(residue_name, metadata.get('sample_id')),
+        'residuo': residue_name,
+        'parametro': list(values.keys()),
+        'valor': list(values.values()),
+        'unidade': [DEFAULT_UNITS.get(parameter) for parameter in values],
+        'laboratorio': metadata.get('lab_name') or None,
+        'data': metadata.get('measurement_date') or None,
+    })
+    return frame.to_csv(index=False).encode('utf-8')
 
 
 def clear_lab_results(residue_name: str):
-    """Clear all lab results for a specific residue"""
-    if residue_name in st.session_state.lab_results:
-        del st.session_state.lab_results[residue_name]
+    """Start a new sample for a residue (imported results are kept)"""
+    st.session_state.lab_samples.pop(residue_name, None)
+    st.session_state.lab_results.pop(residue_name, None)
+
+
+def write_comparison_report(
+    frames: Iterable[pd.DataFrame],
+    sink: BinaryIO,
+    chunk_rows: int = 5000
+) -> int:
+    """
+    Stream report frames to a binary sink as one CSV.
+
+    The header (with UTF-8 BOM, for Excel) is written once; every frame is
+    encoded in chunks of `chunk_rows`, so the full report never has to be
+    materialized as a single string.
+
+    Args:
+        frames: Iterable of DataFrames with the same columns
+        sink: Writable binary stream (file, BytesIO, HTTP response)
+        chunk_rows: Rows encoded per write
+
+    Returns:
+        Number of data rows written
+    """
+    written = 0
+    header_done = False
+    for frame in frames:
+        for start in range(0, len(frame), chunk_rows):
+            chunk = frame.iloc[start:start + chunk_rows]
+            text = chunk.to_csv(index=False, header=not header_done)
+            sink.write(text.encode('utf-8-sig' if not header_done else 'utf-8'))
+            header_done = True
+            written += len(chunk)
+        if not header_done and len(frame.columns):
+            sink.write(frame.head(0).to_csv(index=False).encode('utf-8-sig'))
+            header_done = True
+    return written
 
 
 def export_comparison_report(comparison_df: pd.DataFrame, residue_name: str) -> bytes:
@@ -207,10 +338,397 @@ def export_comparison_report(comparison_df: pd.DataFrame, residue_name: str) ->
     Export comparison report as CSV
 
     Args:
-        comparison_df: DataFrame with comparison results
+        comparison_df: DataFrame with comparison results (single residue or
+                       a scored batch from BatchLabComparison.score)
         residue_name: Name of the residue
 
     Returns:
         CSV data as bytes
     """
-    return comparison_df.to_csv(index=False).encode('utf-8-sig')
+    buffer = io.BytesIO()
+    if 'sample_id' in comparison_df.columns:
+        frames = (group for _, group in comparison_df.groupby('sample_id', sort=False))
+    else:
+        frames = [comparison_df]
+    write_comparison_report(frames, buffer)
+    return buffer.getvalue()
+
+
+# ============================================================================
+# BATCH COMPARISON (many samples × parameters)
+# ============================================================================
+
+# Column headers accepted in batch files → parameter key
+PARAMETER_ALIASES = {
+    'bmp': 'bmp', 'ts': 'ts', 'st': 'ts', 'solidos_totais': 'ts',
+    'vs': 'vs', 'sv': 'vs', 'solidos_volateis': 'vs',
+    'moisture': 'moisture', 'umidade': 'moisture',
+    'cn_ratio': 'cn_ratio', 'cn': 'cn_ratio', 'c:n': 'cn_ratio', 'relacao_cn': 'cn_ratio',
+    'ph': 'ph', 'cod': 'cod', 'dqo': 'cod',
+    'nitrogen': 'nitrogen', 'nitrogenio': 'nitrogen', 'n': 'nitrogen',
+    'carbon': 'carbon', 'carbono': 'carbon', 'c': 'carbon',
+    'ch4_content': 'ch4_content', 'ch4': 'ch4_content', 'metano': 'ch4_content',
+    'phosphorus': 'phosphorus', 'fosforo': 'phosphorus',
+    'potassium': 'potassium', 'potassio': 'potassium',
+}
+
+# Identifier columns of batch files → canonical name
+ID_ALIASES = {
+    'sample_id': 'sample_id', 'amostra': 'sample_id', 'id_amostra': 'sample_id', 'sample': 'sample_id',
+    'residue': 'residue', 'residuo': 'residue',
+    'codigo': 'residue_code', 'residue_code': 'residue_code',
+    'lab_name': 'lab_name', 'laboratorio': 'lab_name', 'lab': 'lab_name',
+    'measurement_date': 'measurement_date', 'data': 'measurement_date', 'date': 'measurement_date',
+    'parameter': 'parameter', 'parametro': 'parameter',
+    'value': 'measured', 'valor': 'measured', 'measured': 'measured',
+    'unit': 'unit', 'unidade': 'unit',
+}
+
+# Reference attribute of ChemicalParameters: parameter → (attribute, label)
+REFERENCE_FIELDS = {
+    'bmp': ('bmp', "BMP (Potencial Metanogênico)"),
+    'ts': ('ts', "Sólidos Totais (TS)"),
+    'vs': ('vs', "Sólidos Voláteis (VS)"),
+    'moisture': ('moisture', "Umidade"),
+    'cn_ratio': ('cn_ratio', "Relação C:N"),
+    'ph': ('ph', "pH"),
+    'cod': ('cod', "DQO"),
+    'nitrogen': ('nitrogen', "Nitrogênio (N)"),
+    'carbon': ('carbon', "Carbono (C)"),
+    'ch4_content': ('ch4_content', "Conteúdo CH₄"),
+    'phosphorus': ('phosphorus', "Fósforo (P₂O₅)"),
+    'potassium': ('potassium', "Potássio (K₂O)"),
+}
+
+# Parameter key → parameter_name in CP2B_Precision_Biogas.db
+PRECISION_PARAMETERS = {
+    'bmp': 'BMP', 'ts': 'TS', 'vs': 'VS', 'ph': 'pH', 'cod': 'COD',
+    'cn_ratio': 'CN_RATIO', 'nitrogen': 'NITROGEN', 'carbon': 'CARBON',
+    'ch4_content': 'METHANE_CONTENT', 'phosphorus': 'PHOSPHORUS', 'potassium': 'POTASSIUM',
+}
+
+# Units assumed for batch values without a unit column (same as the input form);
+# values are converted to the precision DB units with src/utils/unit_registry
+DEFAULT_UNITS = {
+    'bmp': 'mL CH₄/g VS', 'ts': '%', 'vs': '% TS', 'ph': 'unitless', 'cod': 'mg/L',
+    'cn_ratio': 'unitless', 'nitrogen': '% DW', 'carbon': '% DW', 'ch4_content': '%',
+    'phosphorus': '% DW', 'potassium': '% DW',
+}
+
+
+def _unit_key(unit) -> str:
+    """Comparable form of a unit string ('mL CH₄/g VS' == 'ml ch4/g vs')."""
+    return str(unit).lower().replace(' ', '').replace('₄', '4')
+
+
+def _reference_unit(parameter: str, unit) -> str:
+    """
+    Unit of a literature reference in unit_registry syntax.
+
+    Registry references carry a unit only for BMP ('Nm³ CH₄/ton (wet basis) |
+    ...'); the other parameters use DEFAULT_UNITS. Per-tonne BMPs without a
+    basis are on fresh mass, as in EnvironmentalBalanceCalculator.parse_bmp.
+    """
+    text = str(unit or '').split('|')[0].strip()
+    if not text:
+        return DEFAULT_UNITS.get(parameter, '')
+    hint = re.search(r'\((wet|dry)\s*basis\)', text, re.IGNORECASE)
+    text = re.sub(r'\s*\((wet|dry)\s*basis\)', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'/\s*ton\b', '/t', text)
+    if parameter == 'bmp':
+        from src.utils.unit_registry import parse_unit
+
+        parsed = parse_unit(text, 'BMP')
+        if parsed is not None and parsed.dimension == 'specific_yield' and parsed.basis is None:
+            if hint:
+                text = f"{text} {'FM' if hint.group(1).lower() == 'wet' else 'MS'}"
+            elif re.search(r'/\s*t$', text):
+                text = f'{text} FM'
+    return text
+
+
+DECIMAL_COMMA = r'^[+-]?(\d{1,3}(\.\d{3})+|\d+),\d+$'
+
+
+def _to_number(values: pd.Series) -> pd.Series:
+    """
+    Numeric column from lab-sheet text ('3,5' and '1.234,5' use a decimal comma).
+
+    Returns:
+        pd.Series of floats (NaN where the text is not a number)
+    """
+    if values.dtype == object or pd.api.types.is_string_dtype(values):
+        text = values.astype(str).str.strip()
+        comma = text.str.match(DECIMAL_COMMA)
+        text = text.where(~comma, text.str.replace('.', '', regex=False).str.replace(',', '.', regex=False))
+        values = text.where(values.notna())
+    return pd.to_numeric(values, errors='coerce')
+
+
+def _normalize_header(text: str) -> str:
+    """Lowercase, strip accents and spaces of a column header."""
+    text = unicodedata.normalize('NFD', str(text).strip().lower())
+    text = ''.join(char for char in text if unicodedata.category(char) != 'Mn')
+    return text.replace(' ', '_').split('(')[0].rstrip('_')
+
+
+def read_lab_batch(source, filename: Optional[str] = None) -> pd.DataFrame:
+    """
+    Read a CSV or Excel file of lab samples into long format.
+
+    Accepts a wide layout (one row per sample, one column per parameter) or a
+    long layout (sample_id, residue, parameter, value[, unit]). Values with a
+    decimal comma ('3,5', usual in ';'-separated sheets) are accepted.
+
+    Args:
+        source: Path or file-like object (e.g. st.file_uploader result)
+        filename: Name used to detect the format when `source` has no name
+
+    Returns:
+        DataFrame with columns: sample_id, residue, residue_code, parameter,
+        measured, unit, lab_name, measurement_date
+
+    Raises:
+        ValueError: If no residue column or no recognized parameter is found
+    """
+    name = str(filename or getattr(source, 'name', source)).lower()
+    if name.endswith(('.xlsx', '.xls')):
+        raw = pd.read_excel(source)
+    else:
+        raw = pd.read_csv(source, sep=None, engine='python', encoding='utf-8-sig')
+
+    headers = {col: _normalize_header(col) for col in raw.columns}
+    raw = raw.rename(columns={col: ID_ALIASES.get(norm, PARAMETER_ALIASES.get(norm, col))
+                              for col, norm in headers.items()})
+
+    if 'residue' not in raw.columns and 'residue_code' not in raw.columns:
+        raise ValueError("Arquivo sem coluna de resíduo ('residuo' ou 'codigo')")
+    if 'sample_id' not in raw.columns:
+        raw['sample_id'] = [f"AMOSTRA-{i + 1:03d}" for i in range(len(raw))]
+
+    id_columns = [col for col in ('sample_id', 'residue', 'residue_code', 'lab_name', 'measurement_date')
+                  if col in raw.columns]
+
+    if {'parameter', 'measured'} <= set(raw.columns):
+        long = raw.copy()
+        long['parameter'] = long['parameter'].map(lambda p: PARAMETER_ALIASES.get(_normalize_header(p)))
+    else:
+        value_columns = [col for col in raw.columns if col in REFERENCE_FIELDS]
+        if not value_columns:
+            raise ValueError("Nenhum parâmetro reconhecido nas colunas do arquivo")
+        long = raw.melt(id_vars=id_columns, value_vars=value_columns,
+                        var_name='parameter', value_name='measured')
+
+    long['measured'] = _to_number(long['measured'])
+    long = long.dropna(subset=['parameter', 'measured'])
+    long = long[long['measured'] > 0]
+
+    for col in ('residue', 'residue_code', 'unit', 'lab_name', 'measurement_date'):
+        if col not in long.columns:
+            long[col] = None
+    long['residue'] = long['residue'].fillna(long['residue_code'])
+
+    return long[['sample_id', 'residue', 'residue_code', 'parameter', 'measured',
+                 'unit', 'lab_name', 'measurement_date']].reset_index(drop=True)
+
+
+class BatchLabComparison:
+    """
+    Vectorized comparison of many lab samples against literature and the precision DB.
+
+    Example:
+        >>> samples = read_lab_batch(uploaded_file)
+        >>> references = BatchLabComparison.reference_values(samples['residue'].unique())
+        >>> distribution = BatchLabComparison.precision_distribution()
+        >>> scored = BatchLabComparison.score(samples, references, distribution)
+        >>> export_comparison_report(scored, 'lote')
+    """
+
+    STATUS = np.array(["✅ Dentro da faixa", "⚠️ Desvio aceitável", "❌ Fora da faixa"], dtype=object)
+
+    @staticmethod
+    def reference_values(
+        residues: Iterable[str],
+        residue_lookup: Optional[Callable[[str], Optional[ResidueData]]] = None
+    ) -> pd.DataFrame:
+        """
+        Literature reference per (residue, parameter).
+
+        Args:
+            residues: Residue names present in the batch
+            residue_lookup: name → ResidueData (default: residue_registry.get_residue_data)
+
+        Returns:
+            DataFrame: residue, parameter, parameter_label, reference, reference_unit
+        """
+        if residue_lookup is None:
+            from src.data.residue_registry import get_residue_data
+            residue_lookup = get_residue_data
+
+        rows = []
+        for residue in pd.unique(pd.Series(list(residues)).dropna()):
+            data = residue_lookup(residue)
+            if data is None:
+                continue
+            params = data.chemical_params
+            for parameter, (attribute, label) in REFERENCE_FIELDS.items():
+                value = getattr(params, attribute, None)
+                if value:
+                    unit = params.bmp_unit if parameter == 'bmp' else ''
+                    rows.append({'residue': residue, 'parameter': parameter, 'parameter_label': label,
+                                 'reference': float(value), 'reference_unit': unit})
+        return pd.DataFrame(rows, columns=['residue', 'parameter', 'parameter_label', 'reference', 'reference_unit'])
+
+    @staticmethod
+    def precision_distribution(db_path: Optional[Path] = None) -> pd.DataFrame:
+        """
+        Mean/std of each (residue_id, parameter, unit) in CP2B_Precision_Biogas.db.
+
+        Uses value_standardized (fallback value_mean) grouped by standardized
+        unit, so measurements in different units are never mixed.
+
+        Returns:
+            DataFrame: residue_id, parameter_name, unit, unit_key, mean, std, n
+        """
+        if db_path is None:
+            from src.adapters.precision_db_adapter import PrecisionDatabaseAdapter
+            db_path = PrecisionDatabaseAdapter.DB_PATH
+
+        conn = sqlite3.connect(str(db_path))
+        try:
+            values = pd.read_sql("""
+                SELECT residue_id, parameter_name,
+                       COALESCE(unit_standardized, unit) AS unit,
+                       COALESCE(value_standardized, value_mean) AS value
+                FROM chemical_parameters
+                WHERE COALESCE(value_standardized, value_mean) IS NOT NULL
+            """, conn)
+        finally:
+            conn.close()
+
+        stats = values.groupby(['residue_id', 'parameter_name', 'unit'])['value'].agg(['mean', 'std', 'count'])
+        stats = stats.rename(columns={'count': 'n'}).reset_index()
+        stats['residue_id'] = stats['residue_id'].astype(float)
+        stats['unit_key'] = stats['unit'].map(_unit_key)
+        return stats
+
+    @staticmethod
+    def resolve_precision_ids(samples: pd.DataFrame) -> pd.Series:
+        """Precision DB residue_id per sample row (NaN when the residue is not covered)."""
+        from src.utils.residue_resolver import precision_id
+
+        by_code = samples['residue_code'].map(precision_id)
+        by_name = samples['residue'].map(lambda name: precision_id(name, fuzzy=True))
+        return pd.to_numeric(by_code.fillna(by_name), errors='coerce')
+
+    @staticmethod
+    def score(
+        samples: pd.DataFrame,
+        references: pd.DataFrame,
+        distribution: Optional[pd.DataFrame] = None
+    ) -> pd.DataFrame:
+        """
+        Score all deviations in one pass.
+
+        Deviation (%) = (medido - referência) / referência × 100, with the
+        measured value converted to the reference unit first (unit_registry);
+        incompatible units (e.g. mL CH₄/g VS against a fresh-mass BMP) have
+        no deviation and are reported as "Sem referência". Deviations are
+        classified against LabComparison.THRESHOLDS (≤ t ✅, ≤ 1.5t ⚠️, else ❌). When a
+        precision distribution is given, the measured value (unit column, or
+        DEFAULT_UNITS) is converted with unit_registry to the unit of the
+        residue's validated measurements, and z = (medido - média) / desvio
+        padrão in that unit. When the DB holds several compatible units, the
+        one with most measurements is used.
+
+        Args:
+            samples: Output of read_lab_batch()
+            references: Output of reference_values()
+            distribution: Output of precision_distribution() (optional)
+
+        Returns:
+            Scored long DataFrame (one row per sample × parameter)
+        """
+        from src.utils.unit_registry import conversion_factor
+
+        scored = samples.merge(references, on=['residue', 'parameter'], how='left')
+        from_units = scored['unit'].fillna(scored['parameter'].map(DEFAULT_UNITS))
+
+        # Measured value in the reference unit, one factor per distinct (from, to, parameter)
+        to_reference = pd.DataFrame({
+            'from_unit': from_units,
+            'to_unit': [_reference_unit(parameter, unit)
+                        for parameter, unit in zip(scored['parameter'], scored['reference_unit'])],
+            'parameter_name': scored['parameter'].map(PRECISION_PARAMETERS),
+        })
+        pairs = to_reference.drop_duplicates()
+        pairs['factor'] = [
+            conversion_factor(from_unit, to_unit, parameter)
+            for from_unit, to_unit, parameter in pairs.itertuples(index=False, name=None)
+        ]
+        factor = to_reference.merge(pairs, on=['from_unit', 'to_unit', 'parameter_name'], how='left')['factor']
+
+        measured = scored['measured'].to_numpy(dtype=float)
+        reference = scored['reference'].to_numpy(dtype=float)
+        scored['measured_reference_unit'] = measured * factor.to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            deviation = np.where(
+                reference > 0, (scored['measured_reference_unit'].to_numpy() - reference) / reference * 100.0, np.nan
+            )
+
+        threshold = scored['parameter'].map(LabComparison.THRESHOLDS).fillna(LabComparison.DEFAULT_THRESHOLD).to_numpy()
+        abs_dev = np.abs(deviation)
+        level = np.select([abs_dev <= threshold, abs_dev <= threshold * 1.5], [0, 1], default=2)
+
+        scored['deviation_pct'] = deviation
+        scored['threshold_pct'] = threshold
+        scored['status'] = np.where(np.isnan(deviation), "— Sem referência", BatchLabComparison.STATUS[level])
+
+        scored['precision_mean'] = np.nan
+        scored['precision_std'] = np.nan
+        scored['precision_unit'] = None
+        scored['precision_n'] = 0
+        scored['z_score'] = np.nan
+        if distribution is not None and not distribution.empty:
+            keys = pd.DataFrame({
+                'row': np.arange(len(scored)),
+                'residue_id': BatchLabComparison.resolve_precision_ids(scored),
+                'parameter_name': scored['parameter'].map(PRECISION_PARAMETERS),
+                'from_unit': from_units,
+            })
+            candidates = keys.merge(
+                distribution[['residue_id', 'parameter_name', 'unit', 'mean', 'std', 'n']],
+                on=['residue_id', 'parameter_name'], how='inner'
+            )
+            # One conversion factor per distinct (from, to, parameter)
+            conversions = candidates[['from_unit', 'unit', 'parameter_name']].drop_duplicates()
+            conversions['factor'] = [
+                conversion_factor(from_unit, to_unit, parameter)
+                for from_unit, to_unit, parameter in conversions.itertuples(index=False, name=None)
+            ]
+            candidates = candidates.merge(conversions, on=['from_unit', 'unit', 'parameter_name'], how='left')
+            best = (candidates[np.isfinite(candidates['factor'])]
+                    .sort_values(['row', 'n'], ascending=[True, False])
+                    .drop_duplicates('row')
+                    .set_index('row')
+                    .reindex(np.arange(len(scored))))
+
+            mean = best['mean'].to_numpy(dtype=float)
+            std = best['std'].to_numpy(dtype=float)
+            converted = measured * best['factor'].to_numpy(dtype=float)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scored['z_score'] = np.where(std > 0, (converted - mean) / std, np.nan)
+            scored['precision_mean'] = mean
+            scored['precision_std'] = std
+            scored['precision_unit'] = best['unit'].to_numpy(dtype=object)
+            scored['precision_n'] = best['n'].fillna(0).to_numpy().astype(int)
+
+        return scored
+
+    @staticmethod
+    def summarize(scored: pd.DataFrame) -> pd.DataFrame:
+        """Per-sample counts of each status and the largest |z|."""
+        status_key = scored['status'].str.split(' ').str[0]
+        summary = pd.crosstab(scored['sample_id'], status_key)
+        summary['max_abs_z'] = scored.assign(abs_z=scored['z_score'].abs()).groupby('sample_id')['abs_z'].max()
+        return summary.reset_index()
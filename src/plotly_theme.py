@@ -6,6 +6,8 @@ Matches the premium UI/UX design system
 import plotly.graph_objects as go
 import plotly.express as px
 
+from src.utils.figure_cache import cached_figure, theme_fingerprint
+
 # Design System Colors
 COLORS = {
     # Primary
@@ -131,6 +133,11 @@ def get_custom_layout(title="", height=500, show_legend=True):
     }
 
 
+# Invalidates cached figures whenever the design system changes
+THEME_VERSION = theme_fingerprint(COLORS, SEQUENTIAL_GREEN, DIVERGING_RWG, CATEGORICAL, get_custom_layout())
+
+
+@cached_figure(THEME_VERSION)
 def create_donut_chart(values, labels, title="", colors=None):
     """
     Creates a professional donut chart for composition data.
@@ -181,6 +188,7 @@ def create_donut_chart(values, labels, title="", colors=None):
     return fig
 
 
+@cached_figure(THEME_VERSION)
 def create_radar_chart(categories, values, title="", name=""):
     """
     Creates a radar chart for chemical composition profile.
@@ -234,6 +242,7 @@ def create_radar_chart(categories, values, title="", name=""):
     return fig
 
 
+@cached_figure(THEME_VERSION)
 def create_bar_chart(x, y, title="", x_label="", y_label="", orientation='v', color=None):
     """
     Creates a professional bar chart.
@@ -286,6 +295,7 @@ def create_bar_chart(x, y, title="", x_label="", y_label="", orientation='v', co
     return fig
 
 
+@cached_figure(THEME_VERSION)
 def create_box_plot(data, labels, title="", y_label=""):
     """
     Creates a box plot showing literature ranges.
@@ -320,6 +330,7 @@ def create_box_plot(data, labels, title="", y_label=""):
     return fig
 
 
+@cached_figure(THEME_VERSION)
 def create_metric_comparison_chart(categories, values1, values2, label1="", label2="", title="", x_label="", y_label=""):
     """
     Creates a grouped bar chart for comparing metrics.
@@ -365,6 +376,7 @@ def create_metric_comparison_chart(categories, values1, values2, label1="", labe
     return fig
 
 
+@cached_figure(THEME_VERSION)
 def create_scatter_plot(x, y, labels=None, title="", x_label="", y_label="", size=None, color=None):
     """
     Creates a professional scatter plot.
@@ -8,6 +8,7 @@ import plotly.graph_objects as go
 import pandas as pd
 import json
 from src import plotly_theme as theme
+from src.utils.figure_cache import cached_figure, theme_fingerprint
 
 
 # Color scheme for biogas theme (green palette)
@@ -27,7 +28,11 @@ SECTOR_COLORS = {
     'Urbano': COLORS['urbano']
 }
 
+# Invalidates cached figures whenever the colors or the base theme change
+THEME_VERSION = theme_fingerprint(COLORS, SECTOR_COLORS, theme.THEME_VERSION)
 
+
+@cached_figure(THEME_VERSION)
 def criar_mapa_coropleth_sp(df: pd.DataFrame, geojson_path: str) -> go.Figure:
     """
     Creates an interactive choropleth map of São Paulo municipalities.
@@ -88,6 +93,7 @@ def criar_mapa_coropleth_sp(df: pd.DataFrame, geojson_path: str) -> go.Figure:
     return fig
 
 
+@cached_figure(THEME_VERSION)
 def criar_grafico_donut_setor(df_setor: pd.DataFrame) -> go.Figure:
     """
     Creates a donut chart showing biogas distribution by sector.
@@ -132,6 +138,7 @@ def criar_grafico_donut_setor(df_setor: pd.DataFrame) -> go.Figure:
     return fig
 
 
+@cached_figure(THEME_VERSION)
 def criar_grafico_barras_substrato(df_substrato: pd.DataFrame) -> go.Figure:
     """
     Creates a horizontal bar chart for substrate breakdown.
@@ -172,6 +179,7 @@ def criar_grafico_barras_substrato(df_substrato: pd.DataFrame) -> go.Figure:
     return fig
 
 
+@cached_figure(THEME_VERSION)
 def criar_grafico_top_municipios(df_top: pd.DataFrame, top_n: int = 10) -> go.Figure:
     """
     Creates a stacked bar chart of top municipalities by biogas potential.
@@ -237,6 +245,7 @@ def criar_grafico_top_municipios(df_top: pd.DataFrame, top_n: int = 10) -> go.Fi
     return fig
 
 
+@cached_figure(THEME_VERSION)
 def criar_grafico_dispersao(df: pd.DataFrame, x_col: str, y_col: str, 
                             labels: dict = None) -> go.Figure:
     """
@@ -277,6 +286,7 @@ def criar_grafico_dispersao(df: pd.DataFrame, x_col: str, y_col: str,
     return fig
 
 
+@cached_figure(THEME_VERSION)
 def criar_grafico_evolucao_categoria(df: pd.DataFrame) -> go.Figure:
     """
     Creates a bar chart showing distribution by potential category.
@@ -330,6 +340,7 @@ def criar_grafico_evolucao_categoria(df: pd.DataFrame) -> go.Figure:
     return fig
 
 
+@cached_figure(THEME_VERSION)
 def criar_grafico_radar_municipio(mun_data: pd.Series) -> go.Figure:
     """
     Creates a radar chart showing all substrate contributions for a municipality.
@@ -9,9 +9,49 @@ This layer contains pure calculation and analysis logic, following SOLID princip
 from .availability_calculator import AvailabilityCalculator
 from .scenario_manager import ScenarioManager
 from .contribution_analyzer import ContributionAnalyzer
+from .feasibility_analyzer import (
+    FeasibilityAnalyzer,
+    FeasibilitySweep,
+    FeasibilityResult,
+    EnergyConversion
+)
+from .environmental_balance import (
+    EnvironmentalBalanceCalculator,
+    EnvironmentalBalance,
+    EmissionFactors,
+    NutrientRecovery
+)
+from .seasonality_analyzer import SeasonalityAnalyzer, SeasonalHubSizing
+from .codigestion_optimizer import CoDigestionOptimizer, BlendConstraints, BlendResult
+from .projection_engine import ProjectionEngine, ProjectionResult
+from .residue_allocator import ResidueAllocator, ResidueAllocation
+from .residue_similarity import ResidueSimilarity, SimilarityIndex
+from .parameter_statistics import ParameterStatisticsEngine
+from .parameter_quality import ParameterQualityScreener
 
 __all__ = [
     'AvailabilityCalculator',
     'ScenarioManager',
-    'ContributionAnalyzer'
+    'ContributionAnalyzer',
+    'FeasibilityAnalyzer',
+    'FeasibilitySweep',
+    'FeasibilityResult',
+    'EnergyConversion',
+    'EnvironmentalBalanceCalculator',
+    'EnvironmentalBalance',
+    'EmissionFactors',
+    'NutrientRecovery',
+    'SeasonalityAnalyzer',
+    'SeasonalHubSizing',
+    'CoDigestionOptimizer',
+    'BlendConstraints',
+    'BlendResult',
+    'ProjectionEngine',
+    'ProjectionResult',
+    'ResidueAllocator',
+    'ResidueAllocation',
+    'ResidueSimilarity',
+    'SimilarityIndex',
+    'ParameterStatisticsEngine',
+    'ParameterQualityScreener'
 ]
@@ -0,0 +1,427 @@
+"""
+Co-digestion Optimizer Service
+CP2B (Centro Paulista de Estudos em Biogás e Bioprodutos)
+
+Single Responsibility: Solve co-digestion blends that maximize CH4 under process limits.
+Given the tonnages available per residue at a site (municipality or hub), finds
+how much of each residue to feed so that methane production is maximal while the
+blend stays inside the operating window of the digester.
+
+Formulation (per site, x_r = t/ano of residue r fed, 0 ≤ x_r ≤ disponível_r):
+- Objective:  max Σ y_r x_r,  y_r = BMP_r × TS_r × VS_r      [m³ CH4/t]
+              (biogas reported as Σ y_r x_r / CH4%_r when CH4 content is known)
+- C:N window: C:N_min ≤ Σ C_r x_r / Σ N_r x_r ≤ C:N_max       (linearized)
+              C_r = TS_r × VS_r × f_C,  N_r = C_r / (C:N)_r
+- TS window:  TS_min ≤ Σ TS_r x_r / (Σ x_r + água) ≤ TS_max   (água = dilution water)
+- OLR bound:  Σ VS_r x_r / Σ volume ≤ OLR_max × TRH           (VS concentration)
+              Σ VS_r x_r / 365 ≤ OLR_max × V_reator           (when V is given)
+- Cardinality (optional): at most K residues in the recipe → solved as MILP
+
+Continuous problems go to scipy.optimize.linprog (HiGHS); the cardinality
+variant goes to scipy.optimize.milp. The batched mode splits sites into chunks
+and solves them in a process pool.
+
+SOLID Compliance:
+- Single Responsibility: Only blend optimization, no data access
+- Open/Closed: New process limits are fields of BlendConstraints
+- Dependency Inversion: Works on a residue table + tonnage matrix
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import Bounds, LinearConstraint, linprog, milp
+
+
+CARBON_FRACTION_OF_VS = 0.55  # Carbono orgânico ≈ SV / 1.8
+WATER_DENSITY_T_M3 = 1.0
+
+REQUIRED_COLUMNS = ('bmp_m3_t_vs', 'ts_pct', 'vs_pct_ts', 'cn_ratio')
+OPTIONAL_COLUMNS = ('ch4_pct',)
+
+# Residue column → (parameter_name, unit) in CP2B_Precision_Biogas.db
+PRECISION_PARAMETERS = {
+    'bmp_m3_t_vs': ('BMP', 'mL CH₄/g VS'),
+    'ts_pct': ('TS', '%'),
+    'vs_pct_ts': ('VS', '% TS'),
+    'cn_ratio': ('CN_RATIO', 'unitless'),
+    'ch4_pct': ('METHANE_CONTENT', '%'),
+}
+
+DIGESTION_MODES = {
+    # Digestão úmida (CSTR): ST ≤ 15%
+    'umida': {'ts_min_pct': 0.0, 'ts_max_pct': 15.0, 'allow_dilution': True},
+    # Digestão seca (garagem/plug-flow): 20% ≤ ST ≤ 40%
+    'seca': {'ts_min_pct': 20.0, 'ts_max_pct': 40.0, 'allow_dilution': False},
+}
+
+
+@dataclass(frozen=True)
+class BlendConstraints:
+    """
+    Operating window of the digester.
+
+    Frozen (hashable) so it can be part of a cache key.
+    """
+    cn_min: float = 20.0
+    cn_max: float = 30.0
+    ts_min_pct: float = 0.0
+    ts_max_pct: float = 15.0
+    olr_max_kg_vs_m3_d: float = 4.0
+    hrt_days: float = 30.0
+    reactor_volume_m3: Optional[float] = None
+    allow_dilution: bool = True
+    max_residues: Optional[int] = None
+
+    @classmethod
+    def for_mode(cls, mode: str = 'umida', **overrides) -> 'BlendConstraints':
+        """Build constraints from a digestion mode preset ('umida' or 'seca')."""
+        if mode not in DIGESTION_MODES:
+            raise ValueError(f"Unknown digestion mode '{mode}'. Use one of {list(DIGESTION_MODES)}")
+        return cls(**{**DIGESTION_MODES[mode], **overrides})
+
+
+@dataclass
+class BlendResult:
+    """
+    Optimal blends for a batch of sites.
+
+    `feed_t` and `fractions` have shape (n_sites, n_residues); the per-site
+    indicators are 1-D arrays. Status follows scipy: 0 = optimal,
+    2 = infeasible, other values = solver failure; sites with nothing
+    available get status -1.
+    """
+    residues: List[str]
+    site_ids: np.ndarray
+    feed_t: np.ndarray
+    fractions: np.ndarray
+    ch4_m3: np.ndarray
+    water_t: np.ndarray
+    cn_ratio: np.ndarray
+    ts_pct: np.ndarray
+    vs_kg_m3: np.ndarray
+    status: np.ndarray
+    biogas_m3: Optional[np.ndarray] = None
+    metadata: Dict[str, object] = field(default_factory=dict)
+
+    def summary(self) -> pd.DataFrame:
+        """One row per site with the blend indicators and the main residue."""
+        main_idx = self.fractions.argmax(axis=1)
+        fed = self.feed_t.sum(axis=1)
+        frame = pd.DataFrame({
+            'site': self.site_ids,
+            'status': self.status,
+            'ch4_m3_ano': self.ch4_m3,
+            'alimentacao_t_ano': fed,
+            'agua_diluicao_t_ano': self.water_t,
+            'cn_mistura': self.cn_ratio,
+            'ts_mistura_pct': self.ts_pct,
+            'sv_kg_m3': self.vs_kg_m3,
+            'n_residuos': (self.feed_t > 0).sum(axis=1),
+            'residuo_principal': np.where(fed > 0, np.asarray(self.residues, dtype=object)[main_idx], None),
+        })
+        if self.biogas_m3 is not None:
+            frame.insert(3, 'biogas_m3_ano', self.biogas_m3)
+        return frame
+
+    def recipe(self, site_index: int) -> pd.DataFrame:
+        """Blend of one site: residue, t/ano, fraction of the fed mass."""
+        mask = self.feed_t[site_index] > 0
+        return pd.DataFrame({
+            'residuo': np.asarray(self.residues, dtype=object)[mask],
+            'alimentacao_t_ano': self.feed_t[site_index, mask],
+            'fracao': self.fractions[site_index, mask],
+        }).sort_values('fracao', ascending=False).reset_index(drop=True)
+
+
+class CoDigestionOptimizer:
+    """
+    Linear / mixed-integer co-digestion blend optimizer.
+
+    Example:
+        >>> residues = CoDigestionOptimizer.prepare_residues(profiles)
+        >>> available = CoDigestionOptimizer.tonnage_from_ch4(ch4_cube, residues)  # (m, r)
+        >>> result = CoDigestionOptimizer.optimize_batch(available, residues, BlendConstraints())
+        >>> result.summary().nlargest(10, 'ch4_m3_ano')
+    """
+
+    @staticmethod
+    def prepare_residues(residues: pd.DataFrame, distribution: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Fill missing chemistry so every residue can enter the LP.
+
+        Values already in the table (cp2b_panorama.db residuos, see
+        EnvironmentalBalanceCalculator.build_allocation_profiles) are kept.
+        Gaps are filled, in order, with the mean measured in the precision DB
+        for the residue (`precision_id` column, same unit only), the median
+        of the residue's sector, then the overall median. Imputed rows are
+        flagged in 'imputado'; 'imputado_de' lists column ← source.
+
+        Args:
+            residues: Residue table with 'name', 'setor' and REQUIRED_COLUMNS
+            distribution: Output of BatchLabComparison.precision_distribution()
+                          (residue_id, parameter_name, unit, mean)
+
+        Returns:
+            Copy of the table with complete chemistry and the imputation flags
+        """
+        missing = [col for col in REQUIRED_COLUMNS if col not in residues.columns]
+        if missing:
+            raise ValueError(f"Residue table is missing columns: {missing}")
+
+        table = residues.copy()
+        columns = list(REQUIRED_COLUMNS) + [col for col in OPTIONAL_COLUMNS if col in table.columns]
+        table[columns] = table[columns].apply(pd.to_numeric, errors='coerce')
+        sources = pd.DataFrame('', index=table.index, columns=columns)
+
+        def fill(col: str, values: pd.Series, source: str) -> None:
+            gap = table[col].isna() & values.notna()
+            table.loc[gap, col] = values[gap]
+            sources.loc[gap, col] = source
+
+        if distribution is not None and not distribution.empty and 'precision_id' in table.columns:
+            precision_id = pd.to_numeric(table['precision_id'], errors='coerce')
+            for col in columns:
+                parameter, unit = PRECISION_PARAMETERS[col]
+                means = distribution[(distribution['parameter_name'] == parameter) & (distribution['unit'] == unit)]
+                fill(col, precision_id.map(means.groupby('residue_id')['mean'].mean()), 'precisao')
+
+        for col in columns:
+            if 'setor' in table.columns:
+                fill(col, table.groupby('setor')[col].transform('median'), 'setor')
+            fill(col, pd.Series(table[col].median(), index=table.index), 'geral')
+
+        table['imputado'] = (sources[list(REQUIRED_COLUMNS)] != '').any(axis=1)
+        table['imputado_de'] = [
+            ', '.join(f'{col} ← {source}' for col, source in row.items() if source)
+            for _, row in sources.iterrows()
+        ]
+        return table
+
+    @staticmethod
+    def residue_coefficients(residues: pd.DataFrame, carbon_fraction: float = CARBON_FRACTION_OF_VS) -> Dict[str, np.ndarray]:
+        """
+        Per-tonne coefficients of each residue (fresh matter basis).
+
+        Returns:
+            dict with arrays of length n_residues:
+                yield (m³ CH4/t), ts (t ST/t), vs (t SV/t), carbon (t C/t), nitrogen (t N/t)
+        """
+        ts = residues['ts_pct'].to_numpy(dtype=float) / 100.0
+        vs = ts * residues['vs_pct_ts'].to_numpy(dtype=float) / 100.0
+        carbon = vs * carbon_fraction
+        return {
+            'yield': residues['bmp_m3_t_vs'].to_numpy(dtype=float) * vs,
+            'ts': ts,
+            'vs': vs,
+            'carbon': carbon,
+            'nitrogen': carbon / residues['cn_ratio'].to_numpy(dtype=float),
+        }
+
+    @staticmethod
+    def tonnage_from_ch4(ch4: np.ndarray, residues: pd.DataFrame) -> np.ndarray:
+        """
+        Convert a (site × residue) CH4 potential matrix [m³/ano] into tonnages [t/ano].
+
+        Args:
+            ch4: (n_sites, n_residues) CH4 potential
+            residues: Output of prepare_residues()
+
+        Returns:
+            (n_sites, n_residues) fresh-matter tonnages
+        """
+        yields = CoDigestionOptimizer.residue_coefficients(residues)['yield']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tonnage = np.where(yields > 0, np.asarray(ch4, dtype=float) / yields, 0.0)
+        return np.nan_to_num(tonnage, nan=0.0, posinf=0.0)
+
+    @staticmethod
+    def _constraint_matrix(coef: Dict[str, np.ndarray], constraints: BlendConstraints) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Build A_ub, b_ub (A x ≤ b) over variables [x_1..x_r, água].
+
+        The last column is the dilution water variable (zero when dilution
+        is not allowed, enforced through its upper bound).
+        """
+        c = constraints
+        n = len(coef['yield'])
+        rows = []
+        rhs = []
+
+        # C:N ≥ min  →  Σ (cn_min·N - C) x ≤ 0 ;  C:N ≤ max  →  Σ (C - cn_max·N) x ≤ 0
+        rows.append(np.append(c.cn_min * coef['nitrogen'] - coef['carbon'], 0.0))
+        rows.append(np.append(coef['carbon'] - c.cn_max * coef['nitrogen'], 0.0))
+        rhs += [0.0, 0.0]
+
+        # TS ≤ max  →  Σ (ts - ts_max) x - ts_max·w ≤ 0
+        ts_max = c.ts_max_pct / 100.0
+        rows.append(np.append(coef['ts'] - ts_max, -ts_max))
+        rhs.append(0.0)
+
+        # TS ≥ min  →  Σ (ts_min - ts) x + ts_min·w ≤ 0
+        if c.ts_min_pct > 0:
+            ts_min = c.ts_min_pct / 100.0
+            rows.append(np.append(ts_min - coef['ts'], ts_min))
+            rhs.append(0.0)
+
+        # VS concentration ≤ OLR·TRH (kg/m³ → t/t with ρ = 1 t/m³)
+        vs_max = c.olr_max_kg_vs_m3_d * c.hrt_days / 1000.0 * WATER_DENSITY_T_M3
+        rows.append(np.append(coef['vs'] - vs_max, -vs_max))
+        rhs.append(0.0)
+
+        # Absolute OLR for a given reactor volume
+        if c.reactor_volume_m3:
+            rows.append(np.append(coef['vs'] * 1000.0 / 365.0, 0.0))
+            rhs.append(c.olr_max_kg_vs_m3_d * c.reactor_volume_m3)
+
+        return np.vstack(rows), np.asarray(rhs)
+
+    @staticmethod
+    def solve_site(
+        available: np.ndarray,
+        coef: Dict[str, np.ndarray],
+        constraints: BlendConstraints
+    ) -> Tuple[np.ndarray, float, int]:
+        """
+        Solve the blend for one site.
+
+        Args:
+            available: (n_residues,) t/ano available
+            coef: Output of residue_coefficients()
+            constraints: Operating window
+
+        Returns:
+            tuple: (feed t/ano per residue, dilution water t/ano, solver status)
+        """
+        available = np.nan_to_num(np.asarray(available, dtype=float), nan=0.0).clip(min=0.0)
+        n = available.size
+        if not available.any():
+            return np.zeros(n), 0.0, -1
+
+        a_ub, b_ub = CoDigestionOptimizer._constraint_matrix(coef, constraints)
+        objective = -np.append(coef['yield'], 0.0)
+        water_cap = np.inf if constraints.allow_dilution else 0.0
+        upper = np.append(available, water_cap)
+
+        if constraints.max_residues:
+            # Variables: [x (n), água (1), z (n)];  x_r ≤ disp_r · z_r ;  Σ z ≤ K
+            big_m = np.diag(-available)
+            link = np.hstack([np.eye(n), np.zeros((n, 1)), big_m])
+            card = np.append(np.zeros(n + 1), np.ones(n))
+            a_full = np.hstack([a_ub, np.zeros((a_ub.shape[0], n))])
+            res = milp(
+                c=np.append(objective, np.zeros(n)),
+                constraints=[
+                    LinearConstraint(a_full, -np.inf, b_ub),
+                    LinearConstraint(link, -np.inf, 0.0),
+                    LinearConstraint(card, 0.0, constraints.max_residues),
+                ],
+                integrality=np.append(np.zeros(n + 1), np.ones(n)),
+                bounds=Bounds(np.zeros(2 * n + 1), np.append(upper, np.ones(n))),
+            )
+            status = int(res.status)
+            solution = res.x[:n + 1] if res.x is not None else None
+        else:
+            res = linprog(objective, A_ub=a_ub, b_ub=b_ub, bounds=list(zip(np.zeros(n + 1), upper)), method='highs')
+            status = int(res.status)
+            solution = res.x if res.status == 0 else None
+
+        if solution is None:
+            return np.zeros(n), 0.0, status if status != 0 else 2
+
+        feed = np.where(solution[:n] > 1e-9, solution[:n], 0.0)
+        return feed, float(max(solution[n], 0.0)), status
+
+    @staticmethod
+    def _solve_chunk(args) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Process-pool worker: solve a block of sites."""
+        available, coef, constraints = args
+        n_sites, n_res = available.shape
+        feed = np.zeros((n_sites, n_res))
+        water = np.zeros(n_sites)
+        status = np.zeros(n_sites, dtype=int)
+        for i in range(n_sites):
+            feed[i], water[i], status[i] = CoDigestionOptimizer.solve_site(available[i], coef, constraints)
+        return feed, water, status
+
+    @staticmethod
+    def optimize_batch(
+        available: np.ndarray,
+        residues: pd.DataFrame,
+        constraints: BlendConstraints = BlendConstraints(),
+        site_ids: Optional[Sequence] = None,
+        n_workers: Optional[int] = None,
+        chunk_size: int = 64
+    ) -> BlendResult:
+        """
+        Solve the blend for every site.
+
+        Args:
+            available: (n_sites, n_residues) tonnages [t/ano]
+            residues: Output of prepare_residues() (row order = columns of `available`)
+            constraints: Operating window
+            site_ids: Identifier per site (default: row index)
+            n_workers: Process pool size (None = CPU count, 1 = solve in-process)
+            chunk_size: Sites per worker task
+
+        Returns:
+            BlendResult with feed, fractions and blend indicators per site
+        """
+        available = np.atleast_2d(np.asarray(available, dtype=float))
+        n_sites = available.shape[0]
+        if available.shape[1] != len(residues):
+            raise ValueError(
+                f"Tonnage matrix has {available.shape[1]} residues, residue table has {len(residues)}"
+            )
+
+        coef = CoDigestionOptimizer.residue_coefficients(residues)
+        chunks = [
+            (available[start:start + chunk_size], coef, constraints)
+            for start in range(0, n_sites, chunk_size)
+        ]
+
+        if n_workers == 1 or len(chunks) == 1:
+            parts = [CoDigestionOptimizer._solve_chunk(chunk) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                parts = list(pool.map(CoDigestionOptimizer._solve_chunk, chunks))
+
+        feed = np.vstack([p[0] for p in parts]) if parts else np.zeros_like(available)
+        water = np.concatenate([p[1] for p in parts]) if parts else np.zeros(n_sites)
+        status = np.concatenate([p[2] for p in parts]) if parts else np.zeros(n_sites, dtype=int)
+
+        fed = feed.sum(axis=1)
+        total_mass = fed + water
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fractions = np.where(fed[:, None] > 0, feed / fed[:, None], 0.0)
+            cn_blend = (feed @ coef['carbon']) / (feed @ coef['nitrogen'])
+            ts_blend = np.where(total_mass > 0, 100.0 * (feed @ coef['ts']) / total_mass, np.nan)
+            vs_conc = np.where(total_mass > 0, 1000.0 * (feed @ coef['vs']) / total_mass, np.nan)
+
+        biogas = None
+        if 'ch4_pct' in residues.columns:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                biogas_yield = coef['yield'] / (residues['ch4_pct'].to_numpy(dtype=float) / 100.0)
+            biogas = feed @ np.nan_to_num(biogas_yield, nan=0.0, posinf=0.0)
+
+        return BlendResult(
+            residues=residues['name'].tolist(),
+            site_ids=np.asarray(site_ids if site_ids is not None else np.arange(n_sites)),
+            feed_t=feed,
+            fractions=fractions,
+            ch4_m3=feed @ coef['yield'],
+            water_t=water,
+            cn_ratio=np.where(fed > 0, cn_blend, np.nan),
+            ts_pct=ts_blend,
+            vs_kg_m3=vs_conc,
+            status=status,
+            biogas_m3=biogas,
+            metadata={
+                'constraints': constraints,
+                'imputed_residues': residues.loc[residues['imputado'], 'name'].tolist()
+                if 'imputado' in residues.columns else [],
+            }
+        )
@@ -15,6 +15,7 @@ SOLID Compliance:
 
 from typing import List, Dict, Optional
 from src.models.residue_models import ResidueData
+from src.services.feasibility_analyzer import FeasibilityAnalyzer, FeasibilityResult
 
 
 class ContributionAnalyzer:
@@ -185,6 +186,60 @@ class ContributionAnalyzer:
 
         return results
 
+    @staticmethod
+    def rank_municipalities_by_feasibility(
+        feasibility: FeasibilityResult,
+        top_n: int = 10,
+        metric: str = 'vpl_mediano'
+    ) -> List[Dict[str, any]]:
+        """
+        Rank municipalities by techno-economic feasibility instead of raw CH4.
+
+        Uses the output of FeasibilityAnalyzer as ranking input, so the same
+        ranking UI can order sites by NPV, LCOE, payback or share of viable cases.
+
+        Args:
+            feasibility: FeasibilityResult from FeasibilityAnalyzer.evaluate_municipalities()
+            top_n: Number of top municipalities to return (default: 10)
+            metric: Summary metric to rank by (default: 'vpl_mediano')
+
+        Returns:
+            List of dictionaries (top N municipalities), each containing:
+                {
+                    'rank': int,
+                    'name': str,
+                    'code': int,
+                    'ch4': float,           # CH4 potential (m³/ano)
+                    'electricity': float,   # Electricity (MWh/ano)
+                    'npv': float,           # Median NPV (R$)
+                    'lcoe': float,          # Median LCOE (R$/MWh)
+                    'payback': float,       # Median payback (anos)
+                    'viable_share': float   # % of economic cases with NPV > 0
+                }
+
+        Example:
+            >>> result = FeasibilityAnalyzer.evaluate_municipalities(df, sweep)
+            >>> ContributionAnalyzer.rank_municipalities_by_feasibility(result, top_n=5)[0]['name']
+            'Barretos'
+        """
+        ranked = FeasibilityAnalyzer.rank_sites(feasibility, metric=metric, top_n=top_n)
+
+        results = []
+        for site in ranked:
+            results.append({
+                'rank': int(site['rank']),
+                'name': site['nome_municipio'],
+                'code': site['codigo_municipio'],
+                'ch4': round(float(site['ch4_m3_ano']), 2),
+                'electricity': round(float(site['energia_mwh_ano']), 2),
+                'npv': round(float(site.get('vpl_mediano', 0.0)), 2),
+                'lcoe': round(float(site.get('lcoe_mediano', 0.0)), 2),
+                'payback': round(float(site.get('payback_mediano', 0.0)), 2),
+                'viable_share': round(float(site.get('fracao_viavel', 0.0)) * 100, 2)
+            })
+
+        return results
+
     @staticmethod
     def aggregate_by_sector(
         all_residues: Dict[str, List[ResidueData]],
@@ -0,0 +1,479 @@
+"""
+Environmental Balance Service
+CP2B (Centro Paulista de Estudos em Biogás e Bioprodutos)
+
+Single Responsibility: Avoided GHG emissions (CO2e) and digestate N-P-K output.
+Turns municipal CH4 potential into carbon-credit and fertilizer-substitution
+indicators, evaluated for every (municipality × residue × scenario) cell in
+one broadcast NumPy pass.
+
+Methodology (per cell):
+- Fed VS [t]         = CH4 [m³] / BMP [m³ CH4/t VS]   (TS- and fresh-mass-basis
+                       BMPs converted to VS basis with the residue's TS and VS/TS)
+- Fed TS [t]         = VS / (VS%TS / 100)
+- Digestate N [t]    = TS × N% / 100 × recovery_N          (idem P₂O₅, K₂O)
+- Baseline avoided   = CH4 × f_baseline(setor) × ρ_CH4 × GWP_CH4
+- Energy displaced   = CH4 × PCI × η_el / 1000 × FE_rede
+- Leakage            = CH4 × f_vazamento × ρ_CH4 × GWP_CH4
+- Fertilizer credit  = N × FE_N + P₂O₅ × FE_P + K₂O × FE_K
+- Net avoided CO2e   = baseline + energy + fertilizer - leakage
+
+Nutrient contents follow ChemicalParameters: N (% ST), P as P₂O₅ (% ST),
+K as K₂O (% ST). Values outside 0-100% are treated as missing.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data.culture_hierarchy import SECTOR_CULTURE_MAPPING
+from src.models.residue_models import ResidueData
+from src.services.feasibility_analyzer import CH4_LHV_KWH_PER_M3
+from src.services.residue_allocator import SCENARIO_FACTOR_COLUMNS
+from src.utils.unit_registry import parse_unit
+
+
+NUTRIENTS = ('n', 'p2o5', 'k2o')
+
+# Sector code of residuos (cp2b_panorama.db) → sector label used by the engine
+SECTOR_NAMES = {
+    'AG_AGRICULTURA': 'Agricultura',
+    'PC_PECUARIA': 'Pecuária',
+    'UR_URBANO': 'Urbano',
+    'IN_INDUSTRIAL': 'Industrial',
+}
+
+# Theoretical (Buswell) CH4 yield of lipids, m³ CH4/t VS; converted BMPs above
+# it point to inconsistent TS/VS data
+BMP_MAX_M3_T_VS = 1014.0
+
+
+@dataclass(frozen=True)
+class EmissionFactors:
+    """
+    Configurable emission factors.
+
+    Tuple-of-pairs fields keep the dataclass hashable (usable as cache key).
+    """
+    gwp_ch4: float = 28.0                      # IPCC AR5, 100 anos
+    ch4_density_kg_m3: float = 0.716           # CNTP
+    electrical_efficiency: float = 0.38
+    # SIN combined margin (MCTI, projetos MDL), t CO2/MWh. The ~0.04 average
+    # factor is for inventories; with it the grid credit falls below plant
+    # leakage and residues without baseline emissions come out net negative.
+    grid_emission_factor_t_mwh: float = 0.20
+    leakage_fraction: float = 0.02             # Perdas fugitivas na planta
+    # Fraction of the CH4 potential emitted under baseline management, by sector
+    baseline_methane_fraction: Tuple[Tuple[str, float], ...] = (
+        ('Agricultura', 0.0),
+        ('Pecuária', 0.35),     # Lagoas/esterqueiras abertas
+        ('Urbano', 0.50),       # Aterro sem captura
+        ('Industrial', 0.30),   # Lagoas anaeróbias abertas
+    )
+    # Avoided mineral fertilizer production, t CO2e per t nutrient
+    fertilizer_factors_t_co2e: Tuple[Tuple[str, float], ...] = (
+        ('n', 4.0),
+        ('p2o5', 1.0),
+        ('k2o', 0.6),
+    )
+
+    def baseline_fraction(self, sector: str) -> float:
+        """Baseline CH4 emission fraction for a sector (0 if unknown)."""
+        return dict(self.baseline_methane_fraction).get(sector, 0.0)
+
+
+@dataclass(frozen=True)
+class NutrientRecovery:
+    """Fraction of each feedstock nutrient recovered in the digestate"""
+    n: float = 0.85
+    p2o5: float = 0.95
+    k2o: float = 0.95
+
+    def as_array(self) -> np.ndarray:
+        return np.array([self.n, self.p2o5, self.k2o], dtype=float)
+
+
+@dataclass
+class EnvironmentalBalance:
+    """
+    Result cube of the environmental balance.
+
+    Every array has shape (n_municipalities, n_residues, n_scenarios),
+    aligned with `municipalities`, `residues['name']` and `scenarios`.
+    """
+    municipalities: pd.DataFrame
+    residues: pd.DataFrame
+    scenarios: List[str]
+    ch4_m3: np.ndarray
+    avoided_baseline_t_co2e: np.ndarray
+    displaced_energy_t_co2e: np.ndarray
+    fertilizer_credit_t_co2e: np.ndarray
+    leakage_t_co2e: np.ndarray
+    net_avoided_t_co2e: np.ndarray
+    digestate_n_t: np.ndarray
+    digestate_p2o5_t: np.ndarray
+    digestate_k2o_t: np.ndarray
+    metadata: Dict[str, object] = field(default_factory=dict)
+
+    INDICATORS = (
+        'ch4_m3',
+        'avoided_baseline_t_co2e',
+        'displaced_energy_t_co2e',
+        'fertilizer_credit_t_co2e',
+        'leakage_t_co2e',
+        'net_avoided_t_co2e',
+        'digestate_n_t',
+        'digestate_p2o5_t',
+        'digestate_k2o_t',
+    )
+
+    def to_long_frame(self) -> pd.DataFrame:
+        """
+        Flatten the cube into a long table (one row per municipality × residue × scenario).
+
+        Returns:
+            pd.DataFrame ready for export to the carbon-credit and fertilizer reports
+        """
+        n_mun, n_res, n_scen = self.ch4_m3.shape
+        mun_idx, res_idx, scen_idx = np.meshgrid(
+            np.arange(n_mun), np.arange(n_res), np.arange(n_scen), indexing='ij'
+        )
+        frame = pd.DataFrame({
+            'codigo_municipio': self.municipalities['codigo_municipio'].to_numpy()[mun_idx.ravel()],
+            'nome_municipio': self.municipalities['nome_municipio'].to_numpy()[mun_idx.ravel()],
+            'residuo': self.residues['name'].to_numpy()[res_idx.ravel()],
+            'setor': self.residues['setor'].to_numpy()[res_idx.ravel()],
+            'cenario': np.asarray(self.scenarios, dtype=object)[scen_idx.ravel()],
+        })
+        for indicator in self.INDICATORS:
+            frame[indicator] = getattr(self, indicator).ravel()
+        return frame
+
+
+class EnvironmentalBalanceCalculator:
+    """
+    Vectorized avoided-emission and digestate nutrient engine.
+
+    Works on a CH4 cube (municipality × residue × scenario) and a residue
+    profile table. Residue properties broadcast as (1, r, 1) against the cube.
+
+    Example:
+        >>> residues = EnvironmentalBalanceCalculator.build_allocation_profiles(df_residuos, registry_profiles)
+        >>> ch4 = allocation.municipal_cube(df_mun['codigo_municipio'], EnvironmentalBalanceCalculator.SCENARIOS)
+        >>> balance = EnvironmentalBalanceCalculator.calculate(ch4, residues, df_mun)
+        >>> EnvironmentalBalanceCalculator.aggregate_by_hierarchy(balance, level='setor')
+    """
+
+    SCENARIOS = ('Pessimista', 'Realista', 'Otimista')
+
+    @staticmethod
+    def parse_bmp(value: Optional[float], unit: Optional[str]) -> Tuple[float, Optional[str]]:
+        """
+        BMP in m³ CH4 per tonne of its reporting basis.
+
+        The basis comes from unit_registry.parse_unit: 'vs' (kg VS/SV), 'dry'
+        (kg TS/MS) or 'wet' (fresh mass, also assumed for per-tonne units
+        without a basis, e.g. 'Nm³ CH₄/t'). Biogas yields and placeholders are
+        rejected before any scaling. Values labelled m³/kg that are clearly
+        L/kg (> 5) are kept as reported.
+
+        Returns:
+            (BMP in m³/t of the basis, basis), or (NaN, None) if not usable
+        """
+        if value is None or not np.isfinite(value) or value <= 0:
+            return np.nan, None
+        text = (unit or '').split('|')[0].strip().lower()
+        if not text or 'biogas' in text or 'n/a' in text:
+            return np.nan, None
+
+        basis_hint = None
+        hint = re.search(r'\((wet|dry)\s*basis\)', text)
+        if hint:
+            basis_hint = hint.group(1)
+            text = text[:hint.start()].strip()
+        text = re.sub(r'/\s*ton\b', '/t', text)
+
+        parsed = parse_unit(text, 'BMP')
+        if parsed is None or parsed.dimension != 'specific_yield':
+            return np.nan, None
+        basis = parsed.basis or basis_hint or ('wet' if re.search(r'/\s*t$', text) else 'vs')
+
+        m3_per_t = value * parsed.factor * 1000.0
+        if parsed.factor == 1.0 and value >= 5:
+            m3_per_t = float(value)
+        return float(m3_per_t), basis
+
+    @staticmethod
+    def normalize_bmp(
+        value: Optional[float],
+        unit: Optional[str],
+        ts_pct: float = np.nan,
+        vs_pct_ts: float = np.nan
+    ) -> float:
+        """
+        Normalize a BMP value to m³ CH4 / t VS (equivalent to L CH4 / kg VS).
+
+        TS-basis values are divided by VS/TS and fresh-mass values by
+        TS × VS/TS of the residue; without those fractions, or above the
+        theoretical maximum (BMP_MAX_M3_T_VS), they are unusable.
+
+        Returns:
+            BMP in m³/t VS, or NaN if not usable
+        """
+        bmp, basis = EnvironmentalBalanceCalculator.parse_bmp(value, unit)
+        vs_frac = vs_pct_ts / 100.0
+        if basis == 'dry':
+            bmp = bmp / vs_frac
+        elif basis == 'wet':
+            bmp = bmp / (ts_pct / 100.0 * vs_frac)
+        return float(bmp) if np.isfinite(bmp) and 0 < bmp <= BMP_MAX_M3_T_VS else np.nan
+
+    @staticmethod
+    def _percent_or_nan(value: Optional[float]) -> float:
+        """Accept only physically meaningful percentages."""
+        if value is None or not np.isfinite(value) or value <= 0 or value > 100:
+            return np.nan
+        return float(value)
+
+    @staticmethod
+    def build_residue_profiles(
+        residues: Mapping[str, ResidueData],
+        sectors: Optional[Mapping[str, Dict]] = None
+    ) -> pd.DataFrame:
+        """
+        Build the residue property table used by the engine.
+
+        Args:
+            residues: Residue registry (name → ResidueData)
+            sectors: Sector registry (sector → {'residues': [...]}); used to
+                     assign each residue to its sector. Falls back to category.
+
+        Returns:
+            pd.DataFrame with one row per residue and columns:
+                name, setor, subsetor, fs, bmp_m3_t_vs, bmp_basis, ts_pct, vs_pct_ts,
+                n_pct_ts, p2o5_pct_ts, k2o_pct_ts, cn_ratio, weight_<scenario>
+        """
+        sector_of = {}
+        for sector_name, info in (sectors or {}).items():
+            for residue_name in info.get('residues', []):
+                sector_of[residue_name] = sector_name
+
+        culture_of = {
+            residue_name: culture
+            for cultures in SECTOR_CULTURE_MAPPING.values()
+            for culture, residue_names in cultures.items()
+            for residue_name in residue_names
+        }
+
+        calc = EnvironmentalBalanceCalculator
+        rows = []
+        for name, residue in residues.items():
+            params = residue.chemical_params
+            ts_pct = calc._percent_or_nan(params.ts)
+            vs_pct_ts = calc._percent_or_nan(params.vs)
+            row = {
+                'name': name,
+                'setor': sector_of.get(name, residue.category),
+                'subsetor': residue.culture_group or culture_of.get(name) or residue.category,
+                'fs': float(residue.availability.fs),
+                'bmp_m3_t_vs': calc.normalize_bmp(params.bmp, params.bmp_unit, ts_pct, vs_pct_ts),
+                'bmp_basis': calc.parse_bmp(params.bmp, params.bmp_unit)[1],
+                'ts_pct': ts_pct,
+                'vs_pct_ts': vs_pct_ts,
+                'n_pct_ts': calc._percent_or_nan(params.nitrogen),
+                'p2o5_pct_ts': calc._percent_or_nan(params.phosphorus),
+                'k2o_pct_ts': calc._percent_or_nan(params.potassium),
+                'cn_ratio': float(params.cn_ratio) if params.cn_ratio and params.cn_ratio > 0 else np.nan,
+            }
+            for scenario in calc.SCENARIOS:
+                row[f'weight_{scenario}'] = max(float(residue.scenarios.get(scenario, 0.0) or 0.0), 0.0)
+            rows.append(row)
+
+        return pd.DataFrame(rows)
+
+    @staticmethod
+    def build_allocation_profiles(
+        df_residuos: pd.DataFrame,
+        registry_profiles: Optional[pd.DataFrame] = None
+    ) -> pd.DataFrame:
+        """
+        Residue property table aligned with the municipal residue allocation.
+
+        One row per residuos.codigo (cp2b_panorama.db), in the table's order,
+        so it matches ResidueAllocation.residue_codes. Chemistry comes from
+        the residuos columns (bmp_medio in m³ CH4/t VS, ts_medio, vs_medio,
+        chemical_cn_ratio, chemical_ch4_content); N-P-K, which residuos does
+        not carry, is averaged from the registry profiles resolved to each code.
+
+        Args:
+            df_residuos: residuos table of cp2b_panorama.db
+            registry_profiles: Output of build_residue_profiles() with a
+                               'codigo' column (optional, for nutrients)
+
+        Returns:
+            pd.DataFrame with the build_residue_profiles() columns plus
+            codigo and ch4_pct
+        """
+        calc = EnvironmentalBalanceCalculator
+
+        def numeric(col: str) -> pd.Series:
+            if col not in df_residuos.columns:
+                return pd.Series(np.nan, index=df_residuos.index)
+            return pd.to_numeric(df_residuos[col], errors='coerce')
+
+        table = pd.DataFrame({
+            'name': df_residuos['nome'].astype(str).to_numpy(),
+            'codigo': df_residuos['codigo'].astype(str).to_numpy(),
+            'setor': df_residuos['setor'].map(SECTOR_NAMES).fillna('Industrial').to_numpy(),
+            'subsetor': df_residuos.get('subsetor_nome', df_residuos['setor']).to_numpy(),
+            'fs': numeric('fs_medio').fillna(1.0).to_numpy(),
+            'bmp_m3_t_vs': [calc.normalize_bmp(v, 'L CH₄/kg VS') for v in numeric('bmp_medio')],
+            'bmp_basis': 'vs',
+            'ts_pct': [calc._percent_or_nan(v) for v in numeric('ts_medio')],
+            'vs_pct_ts': [calc._percent_or_nan(v) for v in numeric('vs_medio')],
+            'cn_ratio': numeric('chemical_cn_ratio').where(lambda v: v > 0).to_numpy(),
+            'ch4_pct': [calc._percent_or_nan(v) for v in numeric('chemical_ch4_content')],
+        })
+
+        nutrient_columns = [f'{nutrient}_pct_ts' for nutrient in NUTRIENTS]
+        if registry_profiles is not None and 'codigo' in registry_profiles.columns:
+            by_code = registry_profiles.dropna(subset=['codigo']).groupby('codigo')[nutrient_columns].mean()
+            table = table.join(by_code, on='codigo')
+        else:
+            for col in nutrient_columns:
+                table[col] = np.nan
+
+        for scenario in calc.SCENARIOS:
+            factor = numeric(SCENARIO_FACTOR_COLUMNS[scenario]).fillna(0.0).clip(lower=0.0)
+            table[f'weight_{scenario}'] = factor.to_numpy()
+        return table
+
+    @staticmethod
+    def calculate(
+        ch4_m3: np.ndarray,
+        residues: pd.DataFrame,
+        municipalities: pd.DataFrame,
+        scenarios: Sequence[str] = SCENARIOS,
+        factors: EmissionFactors = EmissionFactors(),
+        recovery: NutrientRecovery = NutrientRecovery()
+    ) -> EnvironmentalBalance:
+        """
+        Compute avoided CO2e and digestate N-P-K for every cube cell.
+
+        Args:
+            ch4_m3: CH4 cube (municipality × residue × scenario), m³/ano
+            residues: Residue profiles (build_residue_profiles())
+            municipalities: DataFrame aligned with axis 0 (needs codigo/nome_municipio)
+            scenarios: Scenario labels aligned with axis 2
+            factors: Emission factors
+            recovery: Nutrient recovery rates
+
+        Returns:
+            EnvironmentalBalance with all indicators as (m, r, s) arrays
+        """
+        ch4 = np.nan_to_num(np.asarray(ch4_m3, dtype=float), nan=0.0)
+        if ch4.shape[1] != len(residues) or ch4.shape[2] != len(scenarios):
+            raise ValueError(
+                f"CH4 cube shape {ch4.shape} does not match "
+                f"{len(residues)} residues × {len(scenarios)} scenarios"
+            )
+
+        # Residue properties broadcast as (1, r, 1)
+        def residue_axis(values) -> np.ndarray:
+            return np.asarray(values, dtype=float)[None, :, None]
+
+        bmp = residue_axis(residues['bmp_m3_t_vs'])
+        vs_frac = residue_axis(residues['vs_pct_ts']) / 100.0
+        nutrient_pct = np.stack([
+            residues['n_pct_ts'].to_numpy(dtype=float),
+            residues['p2o5_pct_ts'].to_numpy(dtype=float),
+            residues['k2o_pct_ts'].to_numpy(dtype=float),
+        ])  # (3, r)
+        nutrient_frac = np.nan_to_num(nutrient_pct / 100.0, nan=0.0) * recovery.as_array()[:, None]
+
+        # Mass balance: CH4 → VS → TS → nutrients
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vs_t = ch4 / bmp
+            ts_t = vs_t / vs_frac
+        ts_t = np.nan_to_num(ts_t, nan=0.0, posinf=0.0, neginf=0.0)
+        nutrients = ts_t[None, :, :, :] * nutrient_frac[:, None, :, None]  # (3, m, r, s)
+
+        # GHG
+        ch4_to_co2e = factors.ch4_density_kg_m3 / 1000.0 * factors.gwp_ch4  # t CO2e per m³ CH4
+        baseline = residue_axis([factors.baseline_fraction(s) for s in residues['setor']])
+        avoided_baseline = ch4 * baseline * ch4_to_co2e
+        energy_mwh = ch4 * CH4_LHV_KWH_PER_M3 * factors.electrical_efficiency / 1000.0
+        displaced_energy = energy_mwh * factors.grid_emission_factor_t_mwh
+        leakage = ch4 * factors.leakage_fraction * ch4_to_co2e
+
+        fert = dict(factors.fertilizer_factors_t_co2e)
+        fert_factors = np.array([fert.get(n, 0.0) for n in NUTRIENTS])
+        fertilizer_credit = np.tensordot(fert_factors, nutrients, axes=(0, 0))
+
+        net = avoided_baseline + displaced_energy + fertilizer_credit - leakage
+
+        return EnvironmentalBalance(
+            municipalities=municipalities[['codigo_municipio', 'nome_municipio']].reset_index(drop=True),
+            residues=residues.reset_index(drop=True),
+            scenarios=list(scenarios),
+            ch4_m3=ch4,
+            avoided_baseline_t_co2e=avoided_baseline,
+            displaced_energy_t_co2e=displaced_energy,
+            fertilizer_credit_t_co2e=fertilizer_credit,
+            leakage_t_co2e=leakage,
+            net_avoided_t_co2e=net,
+            digestate_n_t=nutrients[0],
+            digestate_p2o5_t=nutrients[1],
+            digestate_k2o_t=nutrients[2],
+            metadata={'factors': factors, 'recovery': recovery}
+        )
+
+    @staticmethod
+    def aggregate_by_hierarchy(
+        balance: EnvironmentalBalance,
+        level: str = 'setor',
+        by_municipality: bool = False
+    ) -> pd.DataFrame:
+        """
+        Aggregate indicators through the sector hierarchy.
+
+        Uses a (residue × group) indicator matrix, so every indicator is
+        reduced with one tensor contraction instead of per-group loops.
+
+        Args:
+            balance: Output from calculate()
+            level: Residue column to group by ('setor' or 'subsetor')
+            by_municipality: Keep the municipality axis (default: state totals)
+
+        Returns:
+            pd.DataFrame with one row per group × scenario (× municipality)
+        """
+        groups, group_idx = np.unique(balance.residues[level].astype(str).to_numpy(), return_inverse=True)
+        membership = np.zeros((len(balance.residues), len(groups)))
+        membership[np.arange(len(balance.residues)), group_idx] = 1.0
+
+        frames = []
+        for indicator in EnvironmentalBalance.INDICATORS:
+            cube = getattr(balance, indicator)
+            grouped = np.einsum('mrs,rg->mgs', cube, membership)  # (m, g, s)
+            if not by_municipality:
+                grouped = grouped.sum(axis=0, keepdims=True)
+            frames.append(grouped)
+
+        n_mun = frames[0].shape[0]
+        mun_idx, grp_idx, scen_idx = np.meshgrid(
+            np.arange(n_mun), np.arange(len(groups)), np.arange(len(balance.scenarios)), indexing='ij'
+        )
+        result = pd.DataFrame({
+            level: groups[grp_idx.ravel()],
+            'cenario': np.asarray(balance.scenarios, dtype=object)[scen_idx.ravel()],
+        })
+        if by_municipality:
+            result.insert(0, 'codigo_municipio', balance.municipalities['codigo_municipio'].to_numpy()[mun_idx.ravel()])
+            result.insert(1, 'nome_municipio', balance.municipalities['nome_municipio'].to_numpy()[mun_idx.ravel()])
+        for indicator, grouped in zip(EnvironmentalBalance.INDICATORS, frames):
+            result[indicator] = grouped.ravel()
+        return result
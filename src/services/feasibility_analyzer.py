@@ -0,0 +1,414 @@
+"""
+Feasibility Analyzer Service
+CP2B (Centro Paulista de Estudos em Biogás e Bioprodutos)
+
+Single Responsibility: Techno-economic screening (CAPEX/OPEX/NPV/LCOE) of biogas plants.
+Converts municipal CH4 potential into electricity and evaluates every site against
+a grid of economic cases (tariff × discount rate × plant scale curve) in one
+broadcast NumPy pass: arrays are shaped (n_sites, n_cases).
+
+Methodology:
+- Energy:   E [MWh/ano] = CH4 [m³/ano] × PCI_CH4 [kWh/m³] × η_el / 1000
+- Capacity: P [kW]      = E × 1000 / (8760 × FC_planta)
+- CAPEX:    CAPEX [R$]  = CAPEX_ref × (P / P_ref) ^ b        (curva de escala)
+- OPEX:     OPEX [R$/ano] = f_om × CAPEX + c_var × E
+- NPV:      VPL = -CAPEX + (Receita - OPEX) × FA(r, N)
+- LCOE:     LCOE [R$/MWh] = (CAPEX × FRC(r, N) + OPEX) / E
+- Payback:  discounted payback in years (closed form), NaN when not reached within N
+
+SOLID Compliance:
+- Single Responsibility: Only performs economic evaluation, no data access
+- Open/Closed: New sweep dimensions are added to FeasibilitySweep, not to the math
+- Dependency Inversion: Works on plain arrays; DataFrame helpers are thin adapters
+"""
+
+import warnings
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================================
+# ENERGY CONVERSION CONSTANTS
+# ============================================================================
+
+CH4_LHV_KWH_PER_M3 = 9.97  # Poder calorífico inferior do metano (kWh/Nm³)
+HOURS_PER_YEAR = 8760.0
+
+# Scenario → municipal CH4 column in cp2b_maps.db (municipalities table)
+SCENARIO_CH4_COLUMNS = {
+    'Pessimista': 'ch4_pessimistic_total',
+    'Realista': 'ch4_realistic_total',
+    'Otimista': 'ch4_optimistic_total',
+    'Teórico (100%)': 'ch4_theoretical',
+}
+
+
+@dataclass(frozen=True)
+class EnergyConversion:
+    """CHP conversion assumptions (motor-gerador a biogás)"""
+    electrical_efficiency: float = 0.38   # η elétrico do motor-gerador
+    capacity_factor: float = 0.90         # Fração do ano em operação
+    lhv_kwh_per_m3: float = CH4_LHV_KWH_PER_M3
+
+
+@dataclass(frozen=True)
+class FeasibilitySweep:
+    """
+    Economic parameter sweep. Every combination of the tuple-valued fields
+    becomes one economic case (cartesian product).
+
+    Frozen and tuple-based so it is hashable and can be used as a cache key.
+    """
+    tariffs_brl_mwh: Tuple[float, ...] = (350.0, 450.0, 550.0)
+    discount_rates: Tuple[float, ...] = (0.08, 0.10, 0.12)
+    scale_exponents: Tuple[float, ...] = (0.6, 0.7, 0.8)
+    capex_reference_brl: float = 12_000_000.0   # CAPEX of the reference plant
+    reference_capacity_kw: float = 1_000.0      # Reference plant size
+    fixed_om_fraction: float = 0.04             # O&M fixo (% do CAPEX ao ano)
+    variable_om_brl_mwh: float = 60.0           # O&M variável
+    lifetime_years: int = 20
+    min_capacity_kw: float = 0.0                # Sites below this size are not evaluated
+
+    def cases(self) -> pd.DataFrame:
+        """
+        Expand the sweep into a flat table of cases.
+
+        Returns:
+            pd.DataFrame with columns ['case_id', 'tariff', 'discount_rate', 'scale_exponent']
+        """
+        tariff, rate, exponent = np.meshgrid(
+            np.asarray(self.tariffs_brl_mwh, dtype=float),
+            np.asarray(self.discount_rates, dtype=float),
+            np.asarray(self.scale_exponents, dtype=float),
+            indexing='ij'
+        )
+        cases = pd.DataFrame({
+            'tariff': tariff.ravel(),
+            'discount_rate': rate.ravel(),
+            'scale_exponent': exponent.ravel(),
+        })
+        cases.insert(0, 'case_id', np.arange(len(cases)))
+        return cases
+
+
+@dataclass
+class FeasibilityResult:
+    """
+    Output of a feasibility screening.
+
+    Site-level arrays have shape (n_sites,); economic metrics have shape
+    (n_sites, n_cases) aligned with `cases`.
+    """
+    site_codes: np.ndarray
+    site_names: np.ndarray
+    ch4_m3_year: np.ndarray
+    energy_mwh_year: np.ndarray
+    capacity_kw: np.ndarray
+    cases: pd.DataFrame
+    capex: np.ndarray
+    opex: np.ndarray
+    npv: np.ndarray
+    lcoe: np.ndarray
+    payback_years: np.ndarray
+    metadata: Dict[str, object] = field(default_factory=dict)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """(n_sites, n_cases)"""
+        return self.npv.shape
+
+    def viable_share(self) -> np.ndarray:
+        """Fraction of economic cases with NPV > 0, per site."""
+        if self.npv.size == 0:
+            return np.zeros(len(self.site_codes))
+        return (self.npv > 0).mean(axis=1)
+
+    def case_summary(self, case_id: int) -> pd.DataFrame:
+        """
+        Per-site metrics for a single economic case.
+
+        Args:
+            case_id: Row of `cases` to extract
+
+        Returns:
+            pd.DataFrame indexed by site with energy, capacity and economics
+        """
+        return pd.DataFrame({
+            'codigo_municipio': self.site_codes,
+            'nome_municipio': self.site_names,
+            'ch4_m3_ano': self.ch4_m3_year,
+            'energia_mwh_ano': self.energy_mwh_year,
+            'potencia_kw': self.capacity_kw,
+            'capex_brl': self.capex[:, case_id],
+            'opex_brl_ano': self.opex[:, case_id],
+            'vpl_brl': self.npv[:, case_id],
+            'lcoe_brl_mwh': self.lcoe[:, case_id],
+            'payback_anos': self.payback_years[:, case_id],
+        })
+
+    def site_summary(self) -> pd.DataFrame:
+        """
+        Aggregate each site over all economic cases.
+
+        Returns:
+            pd.DataFrame with median/P10/P90 NPV, median LCOE, median payback
+            (inf when most cases never pay back) and share of viable cases (NPV > 0)
+        """
+        summary = pd.DataFrame({
+            'codigo_municipio': self.site_codes,
+            'nome_municipio': self.site_names,
+            'ch4_m3_ano': self.ch4_m3_year,
+            'energia_mwh_ano': self.energy_mwh_year,
+            'potencia_kw': self.capacity_kw,
+        })
+        if self.npv.shape[1] == 0:
+            return summary
+
+        # Sites without capacity are all-NaN rows; their summaries stay NaN
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            summary['vpl_mediano'] = np.nanmedian(self.npv, axis=1)
+            summary['vpl_p10'] = np.nanpercentile(self.npv, 10, axis=1)
+            summary['vpl_p90'] = np.nanpercentile(self.npv, 90, axis=1)
+            summary['lcoe_mediano'] = np.nanmedian(self.lcoe, axis=1)
+            # Evaluated cases that never pay back count as infinitely long
+            payback = np.where(np.isnan(self.payback_years) & np.isfinite(self.npv), np.inf, self.payback_years)
+            summary['payback_mediano'] = np.nanmedian(payback, axis=1)
+        summary['fracao_viavel'] = self.viable_share()
+        return summary
+
+
+class FeasibilityAnalyzer:
+    """
+    Vectorized techno-economic screening of biogas plants.
+
+    All economic metrics are evaluated for every (site, case) pair at once by
+    broadcasting site vectors (n, 1) against case vectors (1, k). Screening
+    645 municipalities × several hundred cases is a few million float
+    operations and completes in well under a second.
+
+    Example:
+        >>> sweep = FeasibilitySweep(tariffs_brl_mwh=(400.0, 500.0))
+        >>> result = FeasibilityAnalyzer.evaluate_municipalities(df_municipios, sweep)
+        >>> result.site_summary().nlargest(10, 'vpl_mediano')
+    """
+
+    @staticmethod
+    def convert_to_energy(
+        ch4_m3_year: np.ndarray,
+        conversion: EnergyConversion = EnergyConversion()
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Convert annual CH4 volume into electricity and installed capacity.
+
+        Args:
+            ch4_m3_year: Annual CH4 volume per site (m³/ano)
+            conversion: CHP conversion assumptions
+
+        Returns:
+            Tuple of (energy_mwh_year, capacity_kw)
+
+        Example:
+            >>> energy, power = FeasibilityAnalyzer.convert_to_energy(np.array([1e6]))
+            >>> round(float(energy[0]))
+            3789
+        """
+        ch4 = np.clip(np.asarray(ch4_m3_year, dtype=float), 0.0, None)
+        energy_mwh = ch4 * conversion.lhv_kwh_per_m3 * conversion.electrical_efficiency / 1000.0
+        capacity_kw = energy_mwh * 1000.0 / (HOURS_PER_YEAR * conversion.capacity_factor)
+        return energy_mwh, capacity_kw
+
+    @staticmethod
+    def annuity_factor(rate: np.ndarray, years: int) -> np.ndarray:
+        """
+        Present value of 1 R$/ano received for `years` years.
+
+        FA = (1 - (1 + r)^-N) / r, with the limit FA = N when r = 0.
+        """
+        rate = np.asarray(rate, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            factor = (1.0 - (1.0 + rate) ** -years) / rate
+        return np.where(np.isclose(rate, 0.0), float(years), factor)
+
+    @staticmethod
+    def evaluate(
+        ch4_m3_year: Sequence[float],
+        sweep: FeasibilitySweep = FeasibilitySweep(),
+        conversion: EnergyConversion = EnergyConversion(),
+        site_codes: Optional[Sequence] = None,
+        site_names: Optional[Sequence] = None
+    ) -> FeasibilityResult:
+        """
+        Evaluate NPV, LCOE and payback for every site × economic case.
+
+        Args:
+            ch4_m3_year: Annual CH4 volume per site (municipality or hub)
+            sweep: Economic parameter sweep
+            conversion: CHP conversion assumptions
+            site_codes: Optional identifiers (default: positional index)
+            site_names: Optional display names (default: codes)
+
+        Returns:
+            FeasibilityResult with (n_sites, n_cases) metric arrays.
+            Sites below `sweep.min_capacity_kw` or without energy get NaN metrics.
+        """
+        ch4 = np.asarray(ch4_m3_year, dtype=float)
+        ch4 = np.nan_to_num(ch4, nan=0.0)
+        n_sites = ch4.shape[0]
+
+        codes = np.asarray(site_codes if site_codes is not None else np.arange(n_sites))
+        names = np.asarray(site_names if site_names is not None else codes.astype(str))
+
+        energy, capacity = FeasibilityAnalyzer.convert_to_energy(ch4, conversion)
+        cases = sweep.cases()
+
+        # Broadcast shapes: sites (n, 1) × cases (1, k)
+        e = energy[:, None]
+        p = capacity[:, None]
+        tariff = cases['tariff'].to_numpy()[None, :]
+        rate = cases['discount_rate'].to_numpy()[None, :]
+        exponent = cases['scale_exponent'].to_numpy()[None, :]
+
+        evaluable = (capacity > 0) & (capacity >= sweep.min_capacity_kw)
+        mask = evaluable[:, None]
+
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            capex = sweep.capex_reference_brl * (p / sweep.reference_capacity_kw) ** exponent
+            opex = sweep.fixed_om_fraction * capex + sweep.variable_om_brl_mwh * e
+            revenue = tariff * e
+            cash_flow = revenue - opex
+
+            annuity = FeasibilityAnalyzer.annuity_factor(rate, sweep.lifetime_years)
+            npv = -capex + cash_flow * annuity
+            lcoe = (capex / annuity + opex) / e
+
+            # Discounted payback: t = -ln(1 - CAPEX·r / CF) / ln(1 + r)
+            ratio = capex * rate / cash_flow
+            payback_discounted = -np.log1p(-ratio) / np.log1p(rate)
+            payback_simple = capex / cash_flow
+            payback = np.where(np.isclose(rate, 0.0), payback_simple, payback_discounted)
+            reached = (cash_flow > 0) & (ratio < 1.0) & (payback <= sweep.lifetime_years)
+            payback = np.where(reached, payback, np.nan)
+
+        nan = np.nan
+        return FeasibilityResult(
+            site_codes=codes,
+            site_names=names,
+            ch4_m3_year=ch4,
+            energy_mwh_year=energy,
+            capacity_kw=capacity,
+            cases=cases,
+            capex=np.where(mask, capex, nan),
+            opex=np.where(mask, opex, nan),
+            npv=np.where(mask, npv, nan),
+            lcoe=np.where(mask, lcoe, nan),
+            payback_years=np.where(mask, payback, nan),
+            metadata={
+                'sweep': sweep,
+                'conversion': conversion,
+                'n_sites': n_sites,
+                'n_cases': len(cases),
+            }
+        )
+
+    @staticmethod
+    def evaluate_municipalities(
+        df: pd.DataFrame,
+        sweep: FeasibilitySweep = FeasibilitySweep(),
+        conversion: EnergyConversion = EnergyConversion(),
+        scenario: str = 'Realista'
+    ) -> FeasibilityResult:
+        """
+        Evaluate all municipalities of a municipalities DataFrame.
+
+        Args:
+            df: DataFrame from load_all_municipalities() (cp2b_maps.db)
+            sweep: Economic parameter sweep
+            conversion: CHP conversion assumptions
+            scenario: Which CH4 scenario column to use
+
+        Returns:
+            FeasibilityResult with one site per municipality
+
+        Raises:
+            ValueError: If scenario is unknown or its column is missing
+        """
+        column = SCENARIO_CH4_COLUMNS.get(scenario)
+        if column is None:
+            raise ValueError(
+                f"Invalid scenario '{scenario}'. "
+                f"Must be one of: {', '.join(SCENARIO_CH4_COLUMNS.keys())}"
+            )
+        if column not in df.columns:
+            raise ValueError(f"Column '{column}' not found in municipalities data")
+
+        ch4 = pd.to_numeric(df[column], errors='coerce').fillna(0.0).to_numpy()
+        result = FeasibilityAnalyzer.evaluate(
+            ch4,
+            sweep=sweep,
+            conversion=conversion,
+            site_codes=df['codigo_municipio'].to_numpy() if 'codigo_municipio' in df.columns else None,
+            site_names=df['nome_municipio'].to_numpy() if 'nome_municipio' in df.columns else None
+        )
+        result.metadata['scenario'] = scenario
+        return result
+
+    @staticmethod
+    def aggregate_hubs(
+        df: pd.DataFrame,
+        hub_column: str,
+        scenario: str = 'Realista'
+    ) -> pd.DataFrame:
+        """
+        Sum municipal CH4 into hubs so they can be screened as single plants.
+
+        Args:
+            df: Municipalities DataFrame
+            hub_column: Column assigning each municipality to a hub
+            scenario: Which CH4 scenario column to sum
+
+        Returns:
+            pd.DataFrame with columns ['codigo_municipio', 'nome_municipio', <ch4 column>],
+            one row per hub, ready for evaluate_municipalities()
+        """
+        column = SCENARIO_CH4_COLUMNS[scenario]
+        hubs = df.groupby(hub_column, as_index=False)[column].sum()
+        hubs['codigo_municipio'] = hubs[hub_column]
+        hubs['nome_municipio'] = hubs[hub_column].astype(str)
+        return hubs[['codigo_municipio', 'nome_municipio', column]]
+
+    @staticmethod
+    def rank_sites(
+        result: FeasibilityResult,
+        metric: str = 'vpl_mediano',
+        top_n: Optional[int] = None
+    ) -> List[Dict[str, object]]:
+        """
+        Rank sites by a summary metric.
+
+        Args:
+            result: Output from evaluate()/evaluate_municipalities()
+            metric: Column of site_summary() ('vpl_mediano', 'lcoe_mediano',
+                    'payback_mediano', 'fracao_viavel', ...)
+            top_n: Number of sites to return (None = all)
+
+        Returns:
+            List of dicts sorted best-first. LCOE and payback rank ascending
+            (sites that mostly never pay back last), everything else
+            descending. Sites without a value are dropped.
+        """
+        summary = result.site_summary()
+        if metric not in summary.columns:
+            raise ValueError(f"Unknown metric '{metric}'. Available: {', '.join(summary.columns)}")
+
+        ascending = metric in ('lcoe_mediano', 'payback_mediano')
+        ranked = summary.dropna(subset=[metric]).sort_values(metric, ascending=ascending)
+        if top_n is not None:
+            ranked = ranked.head(top_n)
+
+        ranked = ranked.reset_index(drop=True)
+        ranked.insert(0, 'rank', np.arange(1, len(ranked) + 1))
+        return ranked.to_dict(orient='records')
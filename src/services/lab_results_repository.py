@@ -0,0 +1,369 @@
+"""
+Lab Results Repository - SOLID SRP (Single Responsibility Principle)
+CP2B (Centro Paulista de Estudos em Biogás e Bioprodutos)
+
+Persistent store of laboratory measurements in cp2b_maps.db (dados_laboratoriais).
+
+- Batched upserts (one transaction, executemany): saving a sample again
+  replaces its (tipo_residuo, amostra, parametro) rows instead of duplicating them
+- Indexes on (residue, parameter, date, lab) for trend and control-chart queries
+- Precomputed running statistics per (residue, parameter) series in
+  dados_laboratoriais_estatisticas: running mean/σ, rolling mean and the
+  ±3σ control limits, refreshed only for the series touched by an insert
+
+The schema (columns, indexes, stats table) is created at build time by
+scripts/migrate_lab_results.py, which also imports lab batches into a new
+deployed version. The app opens the live version read-only.
+
+NOTE: Caching is handled at data_handler.py level; this class only talks to SQLite.
+"""
+
+import sqlite3
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.utils.db_deploy import resolve_db_path
+
+
+DEFAULT_DB_PATH = Path(__file__).parent.parent.parent / "data" / "cp2b_maps.db"
+
+RESULTS_TABLE = 'dados_laboratoriais'
+STATS_TABLE = 'dados_laboratoriais_estatisticas'
+
+# Columns added to the original dados_laboratoriais schema (literature-style table)
+RESULT_COLUMNS = {
+    'amostra': 'TEXT',
+    'valor': 'REAL',
+    'laboratorio': 'TEXT',
+    'data_medicao': 'DATE',
+    'operador': 'TEXT',
+    'codigo_residuo': 'TEXT',
+}
+
+ROLLING_WINDOW = 10
+CONTROL_SIGMA = 3.0
+
+
+class LabResultsRepository:
+    """
+    SQLite-backed repository of lab measurements.
+
+    Example:
+        >>> repo = LabResultsRepository()
+        >>> repo.insert_results(samples_df)                        # batched
+        >>> repo.get_sample('Vinhaça de Cana-de-açúcar', 'A-001')  # {'bmp': 310.0, ...}
+        >>> repo.get_control_chart('Vinhaça de Cana-de-açúcar', 'bmp')
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, read_only: bool = False):
+        """
+        Initialize repository.
+
+        Args:
+            db_path: Path to cp2b_maps.db (default: data/cp2b_maps.db)
+            read_only: Query the deployed version of db_path without write
+                access (web app); otherwise db_path itself is opened (build
+                scripts pass the side file of a new version)
+        """
+        self.db_path = Path(db_path) if db_path else DEFAULT_DB_PATH
+        self.read_only = read_only
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.read_only:
+            live = resolve_db_path(self.db_path).resolve()
+            return sqlite3.connect(f"{live.as_uri()}?mode=ro", uri=True)
+        return sqlite3.connect(str(self.db_path))
+
+    def has_schema(self) -> bool:
+        """Whether the migration has created the results and stats tables."""
+        conn = self._connect()
+        try:
+            tables = {row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN (?, ?)",
+                (RESULTS_TABLE, STATS_TABLE)
+            )}
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({RESULTS_TABLE})")}
+        finally:
+            conn.close()
+        return tables == {RESULTS_TABLE, STATS_TABLE} and set(RESULT_COLUMNS) <= columns
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def insert_results(self, results: pd.DataFrame, batch_size: int = 1000) -> int:
+        """
+        Upsert measurements in batches and refresh the touched series.
+
+        Rows with a sample_id replace any stored row with the same
+        (residue, sample_id, parameter); rows without one are appended.
+
+        Args:
+            results: DataFrame with columns residue, parameter, measured and
+                     optionally sample_id, unit, lab_name, measurement_date,
+                     operator, method, notes, residue_code
+                     (same layout as lab_comparison.read_lab_batch)
+            batch_size: Rows per executemany call
+
+        Returns:
+            Number of rows written
+        """
+        if results.empty:
+            return 0
+
+        frame = results.copy()
+        for column in ('sample_id', 'unit', 'lab_name', 'measurement_date', 'operator',
+                       'method', 'notes', 'residue_code'):
+            if column not in frame.columns:
+                frame[column] = None
+        frame['measurement_date'] = frame['measurement_date'].fillna(date.today().isoformat()).astype(str)
+        frame = frame.dropna(subset=['residue', 'parameter', 'measured'])
+        frame['residue'] = frame['residue'].astype(str)
+        frame['parameter'] = frame['parameter'].astype(str)
+
+        # Within the batch, the last row of a (residue, sample, parameter) key wins
+        keyed = frame['sample_id'].notna()
+        frame = pd.concat([
+            frame[keyed].drop_duplicates(subset=['residue', 'sample_id', 'parameter'], keep='last'),
+            frame[~keyed],
+        ])
+        replaced = list(frame.loc[frame['sample_id'].notna(), ['residue', 'sample_id', 'parameter']]
+                        .itertuples(index=False, name=None))
+
+        rows = list(zip(
+            frame['residue'],
+            frame['parameter'],
+            frame['measured'].astype(float),
+            frame['unit'],
+            frame['method'],
+            frame['notes'],
+            frame['sample_id'],
+            frame['lab_name'],
+            frame['measurement_date'],
+            frame['operator'],
+            frame['residue_code'],
+        ))
+
+        conn = self._connect()
+        try:
+            with conn:
+                for start in range(0, len(replaced), batch_size):
+                    conn.executemany(f"""
+                        DELETE FROM {RESULTS_TABLE}
+                        WHERE tipo_residuo = ? AND amostra = ? AND parametro = ?
+                    """, replaced[start:start + batch_size])
+                for start in range(0, len(rows), batch_size):
+                    conn.executemany(f"""
+                        INSERT INTO {RESULTS_TABLE}
+                            (tipo_residuo, parametro, valor, unidade, metodo, observacoes,
+                             amostra, laboratorio, data_medicao, operador, codigo_residuo)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, rows[start:start + batch_size])
+                series = frame[['residue', 'parameter']].drop_duplicates().itertuples(index=False, name=None)
+                self._refresh_statistics(conn, list(series))
+        finally:
+            conn.close()
+        return len(rows)
+
+    def delete_sample(self, residue: str, sample_id: str) -> int:
+        """Delete one sample and refresh its series. Returns rows deleted."""
+        conn = self._connect()
+        try:
+            with conn:
+                params = [row[0] for row in conn.execute(
+                    f"SELECT DISTINCT parametro FROM {RESULTS_TABLE} WHERE tipo_residuo = ? AND amostra = ?",
+                    (residue, sample_id)
+                )]
+                deleted = conn.execute(
+                    f"DELETE FROM {RESULTS_TABLE} WHERE tipo_residuo = ? AND amostra = ?", (residue, sample_id)
+                ).rowcount
+                self._refresh_statistics(conn, [(residue, p) for p in params])
+        finally:
+            conn.close()
+        return deleted
+
+    def _refresh_statistics(self, conn: sqlite3.Connection, series: Sequence[Tuple[str, str]]) -> None:
+        """
+        Recompute running statistics for the given (residue, parameter) series.
+
+        Running mean/σ use cumulative sums (no Python loop over rows); the ±3σ
+        limits at each point come from all previous points of the series.
+        """
+        for residue, parameter in series:
+            values = pd.read_sql(f"""
+                SELECT id, tipo_residuo, parametro, data_medicao, laboratorio, valor
+                FROM {RESULTS_TABLE}
+                WHERE tipo_residuo = ? AND parametro = ? AND valor IS NOT NULL
+                ORDER BY data_medicao, id
+            """, conn, params=(residue, parameter))
+
+            conn.execute(f"DELETE FROM {STATS_TABLE} WHERE tipo_residuo = ? AND parametro = ?", (residue, parameter))
+            if values.empty:
+                continue
+
+            stats = LabResultsRepository.running_statistics(values['valor'].to_numpy(dtype=float))
+            table = pd.DataFrame({
+                'resultado_id': values['id'].astype(int),
+                'tipo_residuo': values['tipo_residuo'],
+                'parametro': values['parametro'],
+                'data_medicao': values['data_medicao'],
+                'laboratorio': values['laboratorio'],
+                'valor': values['valor'].astype(float),
+                'n': stats['n'],
+                'media_acumulada': stats['mean'],
+                'desvio_acumulado': stats['std'],
+                'media_movel': stats['rolling_mean'],
+                'lsc': stats['ucl'],
+                'lic': stats['lcl'],
+                'fora_controle': stats['out_of_control'].astype(int),
+            }).astype(object)
+            table = table.where(pd.notna(table), None)
+            conn.executemany(f"""
+                INSERT INTO {STATS_TABLE}
+                    (resultado_id, tipo_residuo, parametro, data_medicao, laboratorio, valor,
+                     n, media_acumulada, desvio_acumulado, media_movel, lsc, lic, fora_controle)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, table.itertuples(index=False, name=None))
+
+    @staticmethod
+    def running_statistics(values: np.ndarray, window: int = ROLLING_WINDOW,
+                           sigma: float = CONTROL_SIGMA) -> Dict[str, np.ndarray]:
+        """
+        Running and rolling statistics of an ordered series.
+
+        Control limits for point i use points 0..i-1 (phase-II chart), so a
+        new outlier does not widen its own limits.
+
+        Returns:
+            dict of arrays: n, mean, std, rolling_mean, ucl, lcl, out_of_control
+        """
+        values = np.asarray(values, dtype=float)
+        n = np.arange(1, values.size + 1)
+        csum = np.cumsum(values)
+        csq = np.cumsum(values ** 2)
+        mean = csum / n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = np.where(n > 1, (csq - n * mean ** 2) / (n - 1), np.nan)
+        std = np.sqrt(np.clip(var, 0.0, None))
+
+        padded = np.concatenate([[0.0], csum])
+        lo = np.maximum(0, n - window)
+        rolling = (padded[n] - padded[lo]) / (n - lo)
+
+        prev_mean = np.concatenate([[np.nan], mean[:-1]])
+        prev_std = np.concatenate([[np.nan], std[:-1]])
+        ucl = prev_mean + sigma * prev_std
+        lcl = prev_mean - sigma * prev_std
+        out = (values > ucl) | (values < lcl)
+
+        return {'n': n, 'mean': mean, 'std': std, 'rolling_mean': rolling,
+                'ucl': ucl, 'lcl': lcl, 'out_of_control': out}
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get_sample(self, residue: str, sample_id: str) -> Dict[str, float]:
+        """Latest value per parameter of one sample."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(f"""
+                SELECT parametro, valor FROM {RESULTS_TABLE}
+                WHERE tipo_residuo = ? AND amostra = ? AND valor IS NOT NULL
+                ORDER BY id
+            """, (residue, sample_id)).fetchall()
+        finally:
+            conn.close()
+        return {parameter: value for parameter, value in rows}
+
+    def get_results(
+        self,
+        residue: str,
+        parameter: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        lab: Optional[str] = None
+    ) -> pd.DataFrame:
+        """Measurements of a residue filtered by parameter, date range and lab."""
+        clauses, params = ["tipo_residuo = ?", "valor IS NOT NULL"], [residue]
+        for column, value, op in (('parametro', parameter, '='), ('data_medicao', start, '>='),
+                                  ('data_medicao', end, '<='), ('laboratorio', lab, '=')):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+
+        conn = self._connect()
+        try:
+            return pd.read_sql(f"""
+                SELECT id, amostra, tipo_residuo, parametro, valor, unidade, laboratorio,
+                       data_medicao, operador, metodo, observacoes
+                FROM {RESULTS_TABLE}
+                WHERE {' AND '.join(clauses)}
+                ORDER BY data_medicao, id
+            """, conn, params=params)
+        finally:
+            conn.close()
+
+    def get_control_chart(self, residue: str, parameter: str, lab: Optional[str] = None) -> pd.DataFrame:
+        """
+        Precomputed control-chart series (value, running mean, rolling mean, ±3σ).
+
+        Returns:
+            DataFrame: resultado_id, data_medicao, laboratorio, valor, n,
+                       media_acumulada, desvio_acumulado, media_movel, lsc, lic, fora_controle
+        """
+        query = f"""
+            SELECT resultado_id, data_medicao, laboratorio, valor, n, media_acumulada,
+                   desvio_acumulado, media_movel, lsc, lic, fora_controle
+            FROM {STATS_TABLE}
+            WHERE tipo_residuo = ? AND parametro = ?
+        """
+        params: List = [residue, parameter]
+        if lab is not None:
+            query += " AND laboratorio = ?"
+            params.append(lab)
+
+        conn = self._connect()
+        try:
+            return pd.read_sql(query + " ORDER BY data_medicao, resultado_id", conn, params=params)
+        finally:
+            conn.close()
+
+    def get_trend(self, residue: str, parameter: str, period: str = 'month') -> pd.DataFrame:
+        """
+        Aggregated trend per period ('day', 'month' or 'year').
+
+        Returns:
+            DataFrame: periodo, n, media, minimo, maximo
+        """
+        formats = {'day': '%Y-%m-%d', 'month': '%Y-%m', 'year': '%Y'}
+        if period not in formats:
+            raise ValueError(f"Unknown period '{period}'. Use one of {list(formats)}")
+
+        conn = self._connect()
+        try:
+            return pd.read_sql(f"""
+                SELECT strftime('{formats[period]}', data_medicao) AS periodo,
+                       COUNT(*) AS n, AVG(valor) AS media, MIN(valor) AS minimo, MAX(valor) AS maximo
+                FROM {RESULTS_TABLE}
+                WHERE tipo_residuo = ? AND parametro = ? AND valor IS NOT NULL
+                GROUP BY periodo
+                ORDER BY periodo
+            """, conn, params=(residue, parameter))
+        finally:
+            conn.close()
+
+    def list_parameters(self, residue: str) -> List[str]:
+        """Parameters with at least one measurement for a residue."""
+        conn = self._connect()
+        try:
+            return [row[0] for row in conn.execute(
+                f"SELECT DISTINCT parametro FROM {RESULTS_TABLE} WHERE tipo_residuo = ? AND valor IS NOT NULL",
+                (residue,)
+            )]
+        finally:
+            conn.close()
@@ -0,0 +1,290 @@
+"""
+Literature Coverage Service
+CP2B (Centro Paulista de Estudos em Biogás e Bioprodutos)
+
+Single Responsibility: How well the literature covers each residue × parameter.
+Builds one sparse incidence matrix (residue × parameter) × paper from
+chemical_parameters (CP2B_Precision_Biogas.db) and, when available,
+residue_references (webapp database), and derives every coverage figure from
+sparse reductions over it instead of looping over residues and fields.
+
+Methodology:
+- Incidence: cell (r, p) × paper k holds the best quality weight of the paper's
+  measurements for residue r and parameter p (3 high, 2 medium, 1 low, as in
+  parameter_statistics); rows flagged qc_status = 'error' are left out;
+  residue_references links count with weight 1 for the parameters they list
+- Papers per cell:      nnz of each matrix row
+- Weighted coverage:    min(Σ weights / TARGET_WEIGHT, 1) per cell
+- Gap:                  expected parameter with fewer than MIN_PAPERS papers
+- Papers needed:        Σ max(0, MIN_PAPERS - papers) over a residue's expected parameters
+
+SOLID Compliance:
+- Single Responsibility: Only coverage accounting (no UI, no writes)
+- Open/Closed: Expected parameters and targets are module constants
+- Dependency Inversion: Matrix is built from a DataFrame; SQLite access is isolated
+"""
+
+import json
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from src.services.parameter_statistics import ParameterStatisticsEngine
+
+
+EXPECTED_PARAMETERS = ['BMP', 'TS', 'VS', 'CN_RATIO', 'METHANE_CONTENT', 'pH', 'COD']
+MIN_PAPERS = 3
+TARGET_WEIGHT = 3 * MIN_PAPERS  # MIN_PAPERS high-quality papers
+REFERENCE_LINK_WEIGHT = 1.0
+
+INCIDENCE_COLUMNS = ['residue_code', 'parameter_name', 'paper_key', 'weight']
+
+
+@dataclass
+class CoverageMatrix:
+    """
+    Sparse (residue × parameter) × paper incidence with derived coverage views.
+
+    Row r·P + p of `incidence` is residue r, parameter p; columns are papers.
+    """
+    residues: List[str]
+    residue_names: List[str]
+    parameters: List[str]
+    papers: List[str]
+    incidence: sparse.csr_matrix
+    version: str = ''
+
+    @property
+    def shape(self):
+        return len(self.residues), len(self.parameters)
+
+    def paper_counts(self) -> np.ndarray:
+        """Distinct papers per residue × parameter (R × P)."""
+        return np.diff(self.incidence.indptr).reshape(self.shape)
+
+    def weight_sums(self) -> np.ndarray:
+        """Σ quality weights per residue × parameter (R × P)."""
+        return np.asarray(self.incidence.sum(axis=1)).reshape(self.shape)
+
+    def weighted_coverage(self) -> np.ndarray:
+        """Quality-weighted coverage 0-1 per residue × parameter (R × P)."""
+        return np.minimum(self.weight_sums() / TARGET_WEIGHT, 1.0)
+
+    def _expected_mask(self) -> np.ndarray:
+        return np.isin(self.parameters, EXPECTED_PARAMETERS)
+
+    def papers_per_residue(self) -> np.ndarray:
+        """Distinct papers per residue (any parameter)."""
+        rows, cols = self.shape
+        # Residue aggregation: (R × R·P) selector @ incidence, then nnz per row
+        selector = sparse.csr_matrix(
+            (np.ones(rows * cols), (np.repeat(np.arange(rows), cols), np.arange(rows * cols))),
+            shape=(rows, rows * cols)
+        )
+        per_residue = (selector @ self.incidence).tocsr()
+        return np.diff(per_residue.indptr)
+
+    def matrix(self, values: str = 'papers') -> pd.DataFrame:
+        """
+        Residue × parameter table of 'papers' (counts) or 'coverage' (0-1).
+        """
+        data = self.paper_counts() if values == 'papers' else self.weighted_coverage()
+        return pd.DataFrame(data, index=self.residue_names, columns=self.parameters)
+
+    def gaps(self) -> pd.DataFrame:
+        """
+        Expected residue × parameter cells with fewer than MIN_PAPERS papers.
+
+        Returns:
+            DataFrame: codigo, residuo, parametro, artigos, cobertura, faltam, status
+        """
+        counts, coverage = self.paper_counts(), self.weighted_coverage()
+        expected = self._expected_mask()
+        r, p = np.nonzero((counts < MIN_PAPERS) & expected[None, :])
+        missing = MIN_PAPERS - counts[r, p]
+        return pd.DataFrame({
+            'codigo': np.asarray(self.residues, dtype=object)[r],
+            'residuo': np.asarray(self.residue_names, dtype=object)[r],
+            'parametro': np.asarray(self.parameters, dtype=object)[p],
+            'artigos': counts[r, p],
+            'cobertura': coverage[r, p].round(2),
+            'faltam': missing,
+            'status': np.where(counts[r, p] == 0, 'sem dados', 'insuficiente'),
+        }).sort_values(['faltam', 'codigo', 'parametro'], ascending=[False, True, True]).reset_index(drop=True)
+
+    def parameter_gaps(self) -> pd.DataFrame:
+        """
+        Per parameter: residues without data, with insufficient data, and mean coverage.
+        """
+        counts, coverage = self.paper_counts(), self.weighted_coverage()
+        return pd.DataFrame({
+            'parametro': self.parameters,
+            'esperado': self._expected_mask(),
+            'residuos_sem_dados': (counts == 0).sum(axis=0),
+            'residuos_insuficientes': ((counts > 0) & (counts < MIN_PAPERS)).sum(axis=0),
+            'cobertura_media': coverage.mean(axis=0).round(2) if len(self.residues) else 0.0,
+        }).sort_values(['esperado', 'residuos_sem_dados'], ascending=[False, False]).reset_index(drop=True)
+
+    def papers_needed(self) -> pd.DataFrame:
+        """
+        Residues ranked by papers still needed to reach MIN_PAPERS per expected parameter.
+
+        Returns:
+            DataFrame: codigo, residuo, artigos, parametros_cobertos, lacunas,
+            artigos_necessarios, cobertura_ponderada
+        """
+        counts, coverage = self.paper_counts(), self.weighted_coverage()
+        expected = self._expected_mask()
+        needed = np.maximum(MIN_PAPERS - counts[:, expected], 0)
+        return pd.DataFrame({
+            'codigo': self.residues,
+            'residuo': self.residue_names,
+            'artigos': self.papers_per_residue(),
+            'parametros_cobertos': (counts[:, expected] >= MIN_PAPERS).sum(axis=1),
+            'lacunas': (needed > 0).sum(axis=1),
+            'artigos_necessarios': needed.sum(axis=1),
+            'cobertura_ponderada': coverage[:, expected].mean(axis=1).round(2) if expected.any() else 0.0,
+        }).sort_values(['artigos_necessarios', 'cobertura_ponderada'], ascending=[False, True]).reset_index(drop=True)
+
+    def papers_for(self, residue_code: str, parameter: str) -> List[str]:
+        """Paper keys backing one residue × parameter cell."""
+        row = self.residues.index(residue_code) * len(self.parameters) + self.parameters.index(parameter)
+        start, end = self.incidence.indptr[row], self.incidence.indptr[row + 1]
+        return [self.papers[k] for k in self.incidence.indices[start:end]]
+
+
+class LiteratureCoverage:
+    """
+    Builds CoverageMatrix from the databases.
+
+    Example:
+        >>> coverage = LiteratureCoverage.load()
+        >>> coverage.papers_needed().head()
+        >>> coverage.gaps()
+    """
+
+    @staticmethod
+    def build(incidence: pd.DataFrame, residues: Optional[pd.DataFrame] = None,
+              parameters: Optional[List[str]] = None, version: str = '') -> CoverageMatrix:
+        """
+        Matrix from incidence rows.
+
+        Args:
+            incidence: residue_code, parameter_name, paper_key, weight (duplicates allowed)
+            residues: residue_code, residue_name of every residue to show, including
+                residues without any paper (default: residues of `incidence`)
+            parameters: Parameter order (default: EXPECTED_PARAMETERS, then the others)
+        """
+        incidence = incidence.dropna(subset=['residue_code', 'parameter_name', 'paper_key'])
+        if residues is None:
+            residues = pd.DataFrame({'residue_code': incidence['residue_code'].unique(), 'residue_name': None})
+        residues = residues.drop_duplicates('residue_code')
+        extra = sorted(set(incidence['residue_code']) - set(residues['residue_code']))
+        residue_codes = list(residues['residue_code']) + extra
+        names = dict(zip(residues['residue_code'], residues['residue_name']))
+        residue_names = [names.get(code) or code for code in residue_codes]
+
+        if parameters is None:
+            observed = sorted(set(incidence['parameter_name']) - set(EXPECTED_PARAMETERS))
+            parameters = EXPECTED_PARAMETERS + observed
+
+        residue_index = pd.Index(residue_codes)
+        parameter_index = pd.Index(parameters)
+        paper_codes, papers = pd.factorize(incidence['paper_key'], sort=True)
+
+        r = residue_index.get_indexer(incidence['residue_code'])
+        p = parameter_index.get_indexer(incidence['parameter_name'])
+        keep = p >= 0
+        rows = r[keep] * len(parameters) + p[keep]
+
+        # Best weight per cell × paper: COO duplicates are reduced with a max
+        cells = pd.DataFrame({'row': rows, 'col': paper_codes[keep], 'w': incidence['weight'].to_numpy(dtype=float)[keep]})
+        cells = cells.groupby(['row', 'col'], sort=False)['w'].max().reset_index()
+        matrix = sparse.csr_matrix(
+            (cells['w'].to_numpy(), (cells['row'].to_numpy(), cells['col'].to_numpy())),
+            shape=(len(residue_codes) * len(parameters), len(papers))
+        )
+        matrix.sort_indices()
+        return CoverageMatrix(residue_codes, residue_names, list(parameters), list(papers), matrix, version)
+
+    @staticmethod
+    def load_precision_incidence(conn: sqlite3.Connection) -> pd.DataFrame:
+        """Incidence rows from chemical_parameters (quality-weighted, QC errors excluded)."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(chemical_parameters)")}
+        qc_filter = "AND COALESCE(cp.qc_status, '') != 'error'" if 'qc_status' in columns else ""
+        df = pd.read_sql(f"""
+            SELECT rt.residue_code, cp.parameter_name, cp.paper_id, cp.data_quality, cp.is_validated
+            FROM chemical_parameters cp
+            JOIN (SELECT DISTINCT residue_id, residue_code FROM residue_types) rt
+              ON rt.residue_id = cp.residue_id
+            WHERE cp.paper_id IS NOT NULL {qc_filter}
+        """, conn)
+        # paper_id may be an 8-byte blob (see ParameterQualityScreener.load)
+        paper_id = df['paper_id'].map(lambda v: int.from_bytes(v, 'little', signed=True) if isinstance(v, bytes) else v)
+        df['paper_key'] = 'paper:' + paper_id.astype('Int64').astype(str)
+        df['weight'] = ParameterStatisticsEngine.quality_weights(df['data_quality'], df['is_validated'])
+        return df[INCIDENCE_COLUMNS]
+
+    @staticmethod
+    def load_reference_links(conn: sqlite3.Connection, code_map: Optional[dict] = None) -> pd.DataFrame:
+        """
+        Incidence rows from residue_references (provides_parameters JSON lists).
+
+        Args:
+            code_map: residuos.codigo → residue_code of the precision database
+        """
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if 'residue_references' not in tables:
+            return pd.DataFrame(columns=INCIDENCE_COLUMNS)
+        paper_column = "COALESCE('paper:' || sr.paper_id, 'sr:' || rr.reference_id)" \
+            if 'scientific_references' in tables else "'sr:' || rr.reference_id"
+        join = "LEFT JOIN scientific_references sr ON sr.id = rr.reference_id" if 'scientific_references' in tables else ""
+        links = pd.read_sql(f"""
+            SELECT rr.residue_codigo AS residue_code, rr.provides_parameters, {paper_column} AS paper_key
+            FROM residue_references rr {join}
+        """, conn)
+        links['parameter_name'] = links['provides_parameters'].map(
+            lambda v: json.loads(v) if isinstance(v, str) and v.startswith('[') else [])
+        links = links.explode('parameter_name').dropna(subset=['parameter_name'])
+        if code_map:
+            links['residue_code'] = links['residue_code'].map(lambda c: code_map.get(c, c))
+        links['weight'] = REFERENCE_LINK_WEIGHT
+        return links[INCIDENCE_COLUMNS]
+
+    @staticmethod
+    def load(precision_db: Optional[Path] = None, webapp_db: Optional[Path] = None,
+             version: str = '') -> CoverageMatrix:
+        """
+        Build the coverage matrix from CP2B_Precision_Biogas.db and, if given,
+        a webapp database with residue_references.
+        """
+        from src.adapters.precision_db_adapter import PrecisionDatabaseAdapter
+
+        conn = sqlite3.connect(str(precision_db or PrecisionDatabaseAdapter.DB_PATH))
+        try:
+            residues = pd.read_sql(
+                "SELECT DISTINCT residue_code, residue_name FROM residue_types ORDER BY residue_id", conn)
+            parts = [LiteratureCoverage.load_precision_incidence(conn)]
+            precision_codes = dict(conn.execute("SELECT residue_id, residue_code FROM residue_types").fetchall())
+        finally:
+            conn.close()
+
+        if webapp_db and Path(webapp_db).exists():
+            from src.utils.residue_resolver import precision_mapping
+
+            code_map = {codigo: precision_codes[pid] for codigo, pid in precision_mapping().items()
+                        if pid in precision_codes}
+            conn = sqlite3.connect(str(webapp_db))
+            try:
+                parts.append(LiteratureCoverage.load_reference_links(conn, code_map))
+            finally:
+                conn.close()
+
+        incidence = pd.concat([p for p in parts if not p.empty], ignore_index=True) if any(
+            not p.empty for p in parts) else pd.DataFrame(columns=INCIDENCE_COLUMNS)
+        return LiteratureCoverage.build(incidence, residues, version=version)
@@ -0,0 +1,299 @@
+"""
+Parameter Quality Service
+CP2B (Centro Paulista de Estudos em Biogás e Bioprodutos)
+
+Single Responsibility: Automatic consistency screening of chemical_parameters.
+Scans every row of CP2B_Precision_Biogas.db in one vectorized pass and writes
+flags, reasons and a status to dedicated, indexed columns (qc_*), leaving the
+manual validation_classification / validation_reason untouched.
+
+Checks (code → severity):
+- out_of_bounds       error    physical bounds (TS/VS/% ≤ 100, 0 ≤ pH ≤ 14, BMP ≤ 1200 mL/g VS, v ≥ 0)
+- range_inverted      error    value_min > value_max
+- mean_outside_range  warning  value_mean outside [value_min, value_max]
+- vs_above_ts         error    VS > TS for the same paper/residue (same unit)
+- conversion_mismatch error    value_standardized ≠ value × registry factor
+- unit_unknown        warning  raw unit not recognized by the unit registry
+- magnitude_1000x     error    ~10³ away from the group median (mg ↔ g, per kg ↔ per g)
+- bmp_per_kg          error    BMP < 1 mL/g VS (value reported in m³/kg)
+- mad_outlier         warning  modified z = 0.6745·|x - median| / MAD > k
+
+SOLID Compliance:
+- Single Responsibility: Only data-quality screening
+- Open/Closed: Bounds and thresholds are module constants
+- Dependency Inversion: Checks work on DataFrames; SQLite access is isolated
+"""
+
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.services.parameter_statistics import MAD_THRESHOLD
+from src.utils.unit_registry import conversion_factor, parse_unit
+
+
+QC_COLUMNS = {
+    'qc_status': 'TEXT',
+    'qc_flags': 'TEXT',
+    'qc_reasons': 'TEXT',
+    'qc_checked_at': 'TEXT',
+}
+
+ERROR_FLAGS = {'out_of_bounds', 'range_inverted', 'vs_above_ts', 'conversion_mismatch', 'magnitude_1000x', 'bmp_per_kg'}
+
+# (parameter, standardized unit) → (min, max); '*' matches any parameter
+PHYSICAL_BOUNDS: Dict[Tuple[str, str], Tuple[float, float]] = {
+    ('pH', 'unitless'): (0.0, 14.0),
+    ('BMP', 'mL CH₄/g VS'): (0.0, 1200.0),
+    ('CN_RATIO', 'unitless'): (0.0, 1000.0),
+    ('*', '%'): (0.0, 100.0),
+    ('*', '% DW'): (0.0, 100.0),
+    ('*', '% TS'): (0.0, 100.0),
+    ('*', '% VS'): (0.0, 100.0),
+}
+
+MIN_GROUP_SIZE = 4
+MAGNITUDE_DECADES = 3.0
+MAGNITUDE_TOLERANCE = 0.5
+CONVERSION_TOLERANCE = 1e-3
+
+
+class ParameterQualityScreener:
+    """
+    Vectorized consistency screening of literature values.
+
+    Example:
+        >>> df = ParameterQualityScreener.load(conn)
+        >>> flags = ParameterQualityScreener.screen(df)
+        >>> ParameterQualityScreener.persist(conn, flags)
+        >>> ParameterQualityScreener.run(conn)        # load + screen + persist
+    """
+
+    @staticmethod
+    def load(conn: sqlite3.Connection) -> pd.DataFrame:
+        """
+        All chemical_parameters rows with raw and standardized value/unit.
+
+        paper_id values stored as 8-byte blobs (numpy int64 written by the
+        extraction scripts) are decoded back to integers.
+        """
+        df = pd.read_sql("""
+            SELECT param_id, paper_id, residue_id, parameter_name,
+                   value_min, value_mean, value_max,
+                   COALESCE(NULLIF(unit_original, ''), unit) AS raw_unit,
+                   COALESCE(unit_standardized, unit) AS unit,
+                   COALESCE(value_standardized, value_mean) AS value,
+                   value_standardized
+            FROM chemical_parameters
+        """, conn)
+        df['paper_id'] = df['paper_id'].map(
+            lambda v: int.from_bytes(v, 'little', signed=True) if isinstance(v, bytes) else v
+        )
+        return df
+
+    @staticmethod
+    def screen(df: pd.DataFrame, k: float = MAD_THRESHOLD) -> pd.DataFrame:
+        """
+        Run all checks.
+
+        Args:
+            df: Output of load()
+            k: MAD multiplier for mad_outlier
+
+        Returns:
+            DataFrame: param_id, qc_status ('ok' | 'warning' | 'error'), qc_flags
+            (comma-separated codes), qc_reasons ('; '-separated)
+        """
+        value = pd.to_numeric(df['value'], errors='coerce')
+        parameter = df['parameter_name'].astype(str)
+        unit = df['unit'].fillna('').astype(str)
+        checks: List[Tuple[str, pd.Series, pd.Series]] = []
+
+        # Physical bounds
+        low = pd.Series(0.0, index=df.index)
+        high = pd.Series(np.inf, index=df.index)
+        for (param, bound_unit), (lo, hi) in PHYSICAL_BOUNDS.items():
+            match = (unit == bound_unit) & ((parameter == param) if param != '*' else True)
+            low = low.mask(match, lo)
+            high = high.mask(match, hi)
+        out = (value < low) | (value > high)
+        checks.append(('out_of_bounds', out, parameter + ' = ' + value.round(3).astype(str) + ' ' + unit
+                       + ' fora de [' + low.astype(str) + ', ' + high.astype(str) + ']'))
+
+        # Ranges
+        vmin = pd.to_numeric(df['value_min'], errors='coerce')
+        vmax = pd.to_numeric(df['value_max'], errors='coerce')
+        vmean = pd.to_numeric(df['value_mean'], errors='coerce')
+        checks.append(('range_inverted', vmin > vmax,
+                       'mínimo ' + vmin.astype(str) + ' > máximo ' + vmax.astype(str)))
+        checks.append(('mean_outside_range', (vmean < vmin) | (vmean > vmax),
+                       'média ' + vmean.astype(str) + ' fora de [' + vmin.astype(str) + ', ' + vmax.astype(str) + ']'))
+
+        # VS > TS for the same paper and residue
+        checks.append(ParameterQualityScreener._vs_above_ts(df, value, parameter, unit))
+
+        # Registry: unknown units and standardized values that do not match the factor
+        checks.extend(ParameterQualityScreener._unit_checks(df, parameter))
+
+        # Group-relative checks (residue × parameter × unit)
+        checks.extend(ParameterQualityScreener._group_checks(df, value, parameter, unit, k))
+
+        return ParameterQualityScreener._combine(df['param_id'], checks)
+
+    @staticmethod
+    def _vs_above_ts(df, value, parameter, unit):
+        keys = [df['paper_id'], df['residue_id'], unit]
+        ts = value.where(parameter == 'TS').groupby(keys).transform('max')
+        vs_rows = parameter == 'VS'
+        ts_for_vs = pd.Series(np.nan, index=df.index)
+        # TS of the same paper/residue/unit aligned on the VS rows
+        frame = pd.DataFrame({'paper': df['paper_id'], 'residue': df['residue_id'], 'unit': unit, 'ts': ts})
+        ts_lookup = frame[parameter == 'TS'].drop_duplicates(['paper', 'residue', 'unit'])
+        merged = frame[vs_rows].reset_index().merge(
+            ts_lookup, on=['paper', 'residue', 'unit'], how='left', suffixes=('', '_ref')
+        ).set_index('index')
+        ts_for_vs.loc[merged.index] = merged['ts_ref']
+        mask = vs_rows & (unit != '% TS') & (value > ts_for_vs * (1 + CONVERSION_TOLERANCE))
+        return ('vs_above_ts', mask, 'VS ' + value.astype(str) + ' > TS ' + ts_for_vs.astype(str) + ' ' + unit)
+
+    @staticmethod
+    def _unit_checks(df, parameter):
+        raw_unit = df['raw_unit'].fillna('').astype(str)
+        std_unit = df['unit'].fillna('').astype(str)
+        triples = pd.MultiIndex.from_arrays([raw_unit, std_unit, parameter])
+        codes, uniques = pd.factorize(triples, sort=False)
+
+        known = np.array([parse_unit(raw, param) is not None for raw, _, param in uniques] + [False])
+        factors = np.array([conversion_factor(raw, std, param) for raw, std, param in uniques] + [np.nan])
+
+        unknown = pd.Series(~known[codes], index=df.index)
+        expected = pd.to_numeric(df['value_mean'], errors='coerce') * factors[codes]
+        stored = pd.to_numeric(df['value_standardized'], errors='coerce')
+        # Only same-dimension conversions have a fixed factor (liquid/VS-basis conversions do not)
+        mismatch = (
+            stored.notna() & np.isfinite(expected)
+            & ~np.isclose(stored, expected, rtol=CONVERSION_TOLERANCE, atol=1e-12)
+        )
+        return [
+            ('unit_unknown', unknown, 'unidade não reconhecida: "' + raw_unit + '"'),
+            ('conversion_mismatch', mismatch,
+             'valor padronizado ' + stored.astype(str) + ' ≠ ' + expected.round(6).astype(str) + ' ' + std_unit),
+        ]
+
+    @staticmethod
+    def _group_checks(df, value, parameter, unit, k):
+        keys = [df['residue_id'], parameter, unit]
+        grouped = value.groupby(keys)
+        n = grouped.transform('count')
+        median = grouped.transform('median')
+        abs_dev = (value - median).abs()
+        mad = abs_dev.groupby(keys).transform('median')
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            modified_z = 0.6745 * abs_dev / mad
+            decades = np.abs(np.log10(value / median))
+        enough = n >= MIN_GROUP_SIZE
+
+        magnitude = enough & (median > 0) & (value > 0) & (np.abs(decades - MAGNITUDE_DECADES) <= MAGNITUDE_TOLERANCE)
+        mad_outlier = enough & (mad > 0) & (modified_z > k) & ~magnitude
+        bmp_per_kg = (parameter == 'BMP') & (unit == 'mL CH₄/g VS') & (value > 0) & (value < 1.0)
+
+        return [
+            ('magnitude_1000x', magnitude,
+             'valor ' + value.astype(str) + ' ~10³× a mediana do grupo (' + median.astype(str) + ')'),
+            ('bmp_per_kg', bmp_per_kg,
+             'BMP ' + value.astype(str) + ' mL/g VS sugere valor em m³/kg'),
+            ('mad_outlier', mad_outlier,
+             'z modificado ' + modified_z.round(1).astype(str) + ' > ' + str(k)
+             + ' (mediana ' + median.astype(str) + ', n=' + n.astype(str) + ')'),
+        ]
+
+    @staticmethod
+    def _combine(param_id: pd.Series, checks) -> pd.DataFrame:
+        flags = pd.Series('', index=param_id.index)
+        reasons = pd.Series('', index=param_id.index)
+        error = pd.Series(False, index=param_id.index)
+        warning = pd.Series(False, index=param_id.index)
+
+        for code, mask, reason in checks:
+            mask = mask.fillna(False).astype(bool)
+            sep = np.where(flags == '', '', ',')
+            flags = flags.where(~mask, flags + sep + code)
+            sep = np.where(reasons == '', '', '; ')
+            reasons = reasons.where(~mask, reasons + sep + reason.astype(str))
+            if code in ERROR_FLAGS:
+                error |= mask
+            else:
+                warning |= mask
+
+        status = np.select([error, warning], ['error', 'warning'], default='ok')
+        return pd.DataFrame({
+            'param_id': param_id.to_numpy(),
+            'qc_status': status,
+            'qc_flags': flags.replace('', None).to_numpy(),
+            'qc_reasons': reasons.replace('', None).to_numpy(),
+        })
+
+    @staticmethod
+    def ensure_schema(conn: sqlite3.Connection) -> None:
+        """Add the qc_* columns and their indexes to chemical_parameters."""
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(chemical_parameters)")}
+        with conn:
+            for column, sql_type in QC_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE chemical_parameters ADD COLUMN {column} {sql_type}")
+            conn.executescript("""
+                CREATE INDEX IF NOT EXISTS idx_chemical_parameters_qc_status
+                    ON chemical_parameters(qc_status);
+                CREATE INDEX IF NOT EXISTS idx_chemical_parameters_residue_param_qc
+                    ON chemical_parameters(residue_id, parameter_name, qc_status);
+            """)
+
+    @staticmethod
+    def persist(conn: sqlite3.Connection, flags: pd.DataFrame) -> Dict[str, int]:
+        """
+        Write flags of rows whose status, flags or reasons changed.
+
+        Returns:
+            dict: {'ok': n, 'warning': n, 'error': n, 'updated': n}
+        """
+        ParameterQualityScreener.ensure_schema(conn)
+        current = pd.read_sql("SELECT param_id, qc_status, qc_flags, qc_reasons FROM chemical_parameters", conn)
+        merged = flags.merge(current, on='param_id', how='left', suffixes=('', '_old'))
+        changed = (
+            (merged['qc_status'].fillna('') != merged['qc_status_old'].fillna(''))
+            | (merged['qc_flags'].fillna('') != merged['qc_flags_old'].fillna(''))
+            | (merged['qc_reasons'].fillna('') != merged['qc_reasons_old'].fillna(''))
+        )
+        now = datetime.now().isoformat(timespec='seconds')
+        rows = merged.loc[changed, ['qc_status', 'qc_flags', 'qc_reasons', 'param_id']]
+        rows = rows.astype(object).where(rows.notna(), None)
+
+        with conn:
+            conn.executemany(
+                "UPDATE chemical_parameters SET qc_status = ?, qc_flags = ?, qc_reasons = ?, "
+                f"qc_checked_at = '{now}' WHERE param_id = ?",
+                rows.itertuples(index=False, name=None)
+            )
+
+        counts = flags['qc_status'].value_counts()
+        return {
+            'ok': int(counts.get('ok', 0)),
+            'warning': int(counts.get('warning', 0)),
+            'error': int(counts.get('error', 0)),
+            'updated': int(changed.sum()),
+        }
+
+    @staticmethod
+    def run(conn: sqlite3.Connection, k: float = MAD_THRESHOLD) -> Dict[str, int]:
+        """Screen all rows and persist the flags."""
+        return ParameterQualityScreener.persist(conn, ParameterQualityScreener.screen(ParameterQualityScreener.load(conn), k))
+
+    @staticmethod
+    def summary(flags: pd.DataFrame) -> pd.DataFrame:
+        """Row count per flag code."""
+        codes = flags['qc_flags'].dropna().str.split(',').explode()
+        return codes.value_counts().rename_axis('flag').reset_index(name='linhas')
@@ -218,72 +218,48 @@ class ParameterService:
         """
         Get statistical summary for all parameters of a residue.
 
-        Useful for Page 2 parameter overview.
+        Useful for Page 2 parameter overview. Reads the precomputed robust
+        statistics (see ParameterStatisticsEngine) instead of aggregating live.
 
         Args:
             residue_codigo: Residue code
 
         Returns:
-            Dict[str, Dict]: Parameter name → statistics dict
+            Dict[str, Dict]: Parameter name → statistics dict (best-covered unit)
                 Statistics dict contains:
                 - paper_count: Number of papers
-                - min_value: Minimum across all sources
-                - mean_value: Average across all sources
-                - max_value: Maximum across all sources
-                - unit: Measurement unit
-                - avg_quality: Average quality score (High=3, Medium=2, Low=1)
+                - min_value / mean_value / max_value: Across all sources
+                - weighted_mean: Quality-weighted mean (High=3, Medium=2, Low=1)
+                - median, q1, q3, iqr, mad: Robust location/spread
+                - n_outliers: MAD-based outliers (modified z > 3.5)
+                - ci_low / ci_high: 95% bootstrap CI of the weighted mean
+                - unit: Standardized unit
+                - avg_quality: Average quality score
 
         Example:
             >>> stats = service.get_parameter_statistics('CANA_VINHACA')
-            >>> stats['BMP']
-            {
-                'paper_count': 15,
-                'min_value': 180.0,
-                'mean_value': 260.5,
-                'max_value': 350.0,
-                'unit': 'ml CH₄/g VS',
-                'avg_quality': 2.7
-            }
+            >>> stats['COD']['median'], stats['COD']['ci_low'], stats['COD']['ci_high']
+            (30.0, 33.5, 59.7)
         """
-        try:
-            query = """
-                SELECT
-                    pr.parameter_name,
-                    COUNT(DISTINCT pr.mean_reference_id) as paper_count,
-                    MIN(pr.value_mean) as min_value,
-                    AVG(pr.value_mean) as mean_value,
-                    MAX(pr.value_mean) as max_value,
-                    pr.unit,
-                    AVG(CASE pr.data_quality
-                        WHEN 'high' THEN 3
-                        WHEN 'High' THEN 3
-                        WHEN 'medium' THEN 2
-                        WHEN 'Medium' THEN 2
-                        ELSE 1 END) as avg_quality
-                FROM parameter_ranges pr
-                WHERE pr.residue_codigo = ?
-                GROUP BY pr.parameter_name, pr.unit
-                ORDER BY pr.parameter_name
-            """
-            df = pd.read_sql_query(query, self.conn, params=[residue_codigo])
+        import sqlite3
+        from src.adapters.precision_db_adapter import PrecisionDatabaseAdapter
+        from src.services.parameter_statistics import ParameterStatisticsEngine
+        from src.utils.db_deploy import resolve_db_path
 
-            stats_dict = {}
-            for _, row in df.iterrows():
-                param_name = str(row['parameter_name'])
-                stats_dict[param_name] = {
-                    'paper_count': int(row['paper_count']),
-                    'min_value': float(row['min_value']) if pd.notna(row['min_value']) else None,
-                    'mean_value': float(row['mean_value']) if pd.notna(row['mean_value']) else None,
-                    'max_value': float(row['max_value']) if pd.notna(row['max_value']) else None,
-                    'unit': str(row['unit']),
-                    'avg_quality': float(row['avg_quality']) if pd.notna(row['avg_quality']) else 2.0
-                }
-
-            return stats_dict
-        except Exception as e:
-            st.warning(f"Erro ao carregar estatísticas de parâmetros para {residue_codigo}: {str(e)}")
+        residue_id = PrecisionDatabaseAdapter.resolve_residue_id(residue_codigo)
+        if residue_id is None:
             return {}
 
+        # The table lives in the precision DB, built offline (scripts/refresh_parameter_statistics.py)
+        live = resolve_db_path(PrecisionDatabaseAdapter.DB_PATH).resolve()
+        conn = sqlite3.connect(f"{live.as_uri()}?mode=ro", uri=True)
+        try:
+            return ParameterStatisticsEngine.to_parameter_dict(
+                ParameterStatisticsEngine.read(conn, residue_id=residue_id)
+            )
+        finally:
+            conn.close()
+
     def compare_parameters_across_residues(
         self,
         parameter_name: str,
@@ -0,0 +1,326 @@
+"""
+Parameter Statistics Service
+CP2B (Centro Paulista de Estudos em Biogás e Bioprodutos)
+
+Single Responsibility: Robust summary statistics of the validated literature values.
+Computes, for every residue × parameter × unit group of chemical_parameters
+(CP2B_Precision_Biogas.db) at once, quality-weighted means, medians, IQR,
+MAD-based outlier counts and bootstrap confidence intervals on the
+standardized values (value_standardized).
+
+Methodology:
+- Weights:   w = 3 (high), 2 (medium), 1 (low); validated rows without a label count as high
+- Center:    x̄_w = Σ w·x / Σ w; median, Q1, Q3 (linear interpolation)
+- Outliers:  modified z = 0.6745·|x - median| / MAD > 3.5 (Iglewicz & Hoaglin)
+- CI:        percentile bootstrap of x̄_w (B resamples within each group, all groups
+             drawn in one matrix and reduced with np.add.reduceat)
+
+The summary table `parameter_statistics` stores one row per group with the
+content hash of its measurements; refresh() recomputes only groups whose
+measurements changed and drops groups that disappeared. refresh() runs
+offline (scripts/refresh_parameter_statistics.py); the app only read()s.
+
+SOLID Compliance:
+- Single Responsibility: Only statistics of literature values
+- Open/Closed: Quality weights and thresholds are module constants
+- Dependency Inversion: Math works on DataFrames; SQLite access is isolated
+"""
+
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+STATISTICS_TABLE = 'parameter_statistics'
+
+GROUP_KEYS = ['residue_id', 'parameter_name', 'unit']
+
+QUALITY_WEIGHTS = {'high': 3.0, 'medium': 2.0, 'low': 1.0}
+UNLABELED_VALIDATED_WEIGHT = 3.0
+
+MAD_THRESHOLD = 3.5
+BOOTSTRAP_SAMPLES = 1000
+CONFIDENCE_LEVEL = 0.95
+BOOTSTRAP_CHUNK_CELLS = 5_000_000
+
+STATISTIC_COLUMNS = [
+    'n', 'paper_count', 'min_value', 'max_value', 'mean_value', 'weighted_mean',
+    'median', 'q1', 'q3', 'iqr', 'mad', 'n_outliers', 'ci_low', 'ci_high', 'avg_quality'
+]
+
+
+class ParameterStatisticsEngine:
+    """
+    Vectorized robust statistics over all residue × parameter groups.
+
+    Example:
+        >>> measurements = ParameterStatisticsEngine.load_measurements(conn)
+        >>> summary = ParameterStatisticsEngine.compute(measurements)
+        >>> ParameterStatisticsEngine.refresh(conn)          # incremental, persisted
+        >>> ParameterStatisticsEngine.read(conn, residue_id=4)
+    """
+
+    @staticmethod
+    def quality_weights(data_quality: pd.Series, is_validated: Optional[pd.Series] = None) -> np.ndarray:
+        """Map data_quality labels to weights (3/2/1)."""
+        labels = data_quality.fillna('').astype(str).str.strip().str.lower()
+        weights = labels.map(QUALITY_WEIGHTS)
+        if is_validated is not None:
+            unlabeled = (labels == '') & (pd.to_numeric(is_validated, errors='coerce') == 1)
+            weights = weights.mask(unlabeled, UNLABELED_VALIDATED_WEIGHT)
+        return weights.fillna(QUALITY_WEIGHTS['low']).to_numpy(dtype=float)
+
+    @staticmethod
+    def load_measurements(conn: sqlite3.Connection) -> pd.DataFrame:
+        """
+        Validated measurements with standardized value/unit and quality weight.
+
+        Returns:
+            DataFrame: param_id, paper_id, residue_id, parameter_name, unit, value, weight
+        """
+        df = pd.read_sql("""
+            SELECT param_id, paper_id, residue_id, parameter_name,
+                   COALESCE(unit_standardized, unit, '') AS unit,
+                   COALESCE(value_standardized, value_mean) AS value,
+                   data_quality, is_validated
+            FROM chemical_parameters
+            WHERE is_validated = 1
+        """, conn)
+        df['weight'] = ParameterStatisticsEngine.quality_weights(df['data_quality'], df['is_validated'])
+        df = df.dropna(subset=['residue_id', 'parameter_name', 'value'])
+        return df.drop(columns=['data_quality', 'is_validated']).reset_index(drop=True)
+
+    @staticmethod
+    def group_hashes(measurements: pd.DataFrame) -> pd.Series:
+        """
+        Order-independent content hash per group (row hashes summed mod 2⁶⁴).
+
+        Returns:
+            Series indexed by GROUP_KEYS
+        """
+        row_hash = pd.util.hash_pandas_object(
+            measurements[['param_id', 'paper_id', 'value', 'weight']].apply(pd.to_numeric, errors='coerce'),
+            index=False
+        )
+        grouped = row_hash.groupby([measurements[key] for key in GROUP_KEYS])
+        total = grouped.agg(lambda h: np.add.reduce(h.to_numpy(dtype=np.uint64), dtype=np.uint64))
+        return total.map('{:016x}'.format) + ':' + grouped.size().astype(str)
+
+    @staticmethod
+    def compute(
+        measurements: pd.DataFrame,
+        n_bootstrap: int = BOOTSTRAP_SAMPLES,
+        confidence: float = CONFIDENCE_LEVEL,
+        seed: int = 42
+    ) -> pd.DataFrame:
+        """
+        Statistics for every group of `measurements`.
+
+        Args:
+            measurements: Output of load_measurements()
+            n_bootstrap: Bootstrap resamples per group
+            confidence: Confidence level of the percentile interval
+            seed: RNG seed
+
+        Returns:
+            DataFrame: GROUP_KEYS + STATISTIC_COLUMNS
+        """
+        if measurements.empty:
+            return pd.DataFrame(columns=GROUP_KEYS + STATISTIC_COLUMNS)
+
+        df = measurements.sort_values(GROUP_KEYS, kind='stable').reset_index(drop=True)
+        groups = df.groupby(GROUP_KEYS, sort=False)
+        values = df['value'].to_numpy(dtype=float)
+        weights = df['weight'].to_numpy(dtype=float)
+
+        summary = groups['value'].agg(
+            n='size', min_value='min', max_value='max', mean_value='mean', median='median'
+        )
+        summary['paper_count'] = groups['paper_id'].nunique()
+        summary['avg_quality'] = groups['weight'].mean()
+        summary['q1'] = groups['value'].quantile(0.25)
+        summary['q3'] = groups['value'].quantile(0.75)
+        summary['iqr'] = summary['q3'] - summary['q1']
+
+        # Weighted mean: contiguous groups → reduceat over the sorted rows
+        sizes = summary['n'].to_numpy()
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        summary['weighted_mean'] = np.add.reduceat(values * weights, starts) / np.add.reduceat(weights, starts)
+
+        # MAD and modified z-scores
+        median_per_row = np.repeat(summary['median'].to_numpy(), sizes)
+        abs_dev = np.abs(values - median_per_row)
+        summary['mad'] = pd.Series(abs_dev).groupby(np.repeat(np.arange(len(sizes)), sizes)).median().to_numpy()
+        mad_per_row = np.repeat(summary['mad'].to_numpy(), sizes)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            modified_z = np.where(mad_per_row > 0, 0.6745 * abs_dev / mad_per_row, 0.0)
+        summary['n_outliers'] = np.add.reduceat((modified_z > MAD_THRESHOLD).astype(int), starts)
+
+        ci_low, ci_high = ParameterStatisticsEngine._bootstrap_ci(
+            values, weights, sizes, starts, n_bootstrap, confidence, seed
+        )
+        summary['ci_low'] = ci_low
+        summary['ci_high'] = ci_high
+
+        return summary.reset_index()[GROUP_KEYS + STATISTIC_COLUMNS]
+
+    @staticmethod
+    def _bootstrap_ci(
+        values: np.ndarray,
+        weights: np.ndarray,
+        sizes: np.ndarray,
+        starts: np.ndarray,
+        n_bootstrap: int,
+        confidence: float,
+        seed: int
+    ):
+        """
+        Percentile bootstrap CI of the weighted mean for all groups at once.
+
+        Each row slot of a group is redrawn uniformly inside its group, giving a
+        (B × N) index matrix; group sums are reduceat along the row axis.
+        Groups with a single measurement get NaN.
+        """
+        rng = np.random.default_rng(seed)
+        n_rows = len(values)
+        row_start = np.repeat(starts, sizes)
+        row_size = np.repeat(sizes, sizes)
+
+        chunk = max(1, BOOTSTRAP_CHUNK_CELLS // max(n_rows, 1))
+        means = []
+        for offset in range(0, n_bootstrap, chunk):
+            b = min(chunk, n_bootstrap - offset)
+            picks = row_start + (rng.random((b, n_rows)) * row_size).astype(np.int64)
+            wx = np.add.reduceat(values[picks] * weights[picks], starts, axis=1)
+            w = np.add.reduceat(weights[picks], starts, axis=1)
+            means.append(wx / w)
+        means = np.vstack(means)
+
+        alpha = (1.0 - confidence) / 2.0
+        low, high = np.quantile(means, [alpha, 1.0 - alpha], axis=0)
+        single = sizes < 2
+        return np.where(single, np.nan, low), np.where(single, np.nan, high)
+
+    @staticmethod
+    def ensure_schema(conn: sqlite3.Connection) -> None:
+        """Create the summary table."""
+        conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS {STATISTICS_TABLE} (
+                residue_id INTEGER NOT NULL,
+                parameter_name TEXT NOT NULL,
+                unit TEXT NOT NULL,
+                n INTEGER NOT NULL,
+                paper_count INTEGER NOT NULL,
+                min_value REAL,
+                max_value REAL,
+                mean_value REAL,
+                weighted_mean REAL,
+                median REAL,
+                q1 REAL,
+                q3 REAL,
+                iqr REAL,
+                mad REAL,
+                n_outliers INTEGER,
+                ci_low REAL,
+                ci_high REAL,
+                avg_quality REAL,
+                content_hash TEXT NOT NULL,
+                updated_at TEXT,
+                PRIMARY KEY (residue_id, parameter_name, unit)
+            );
+        """)
+
+    @staticmethod
+    def refresh(conn: sqlite3.Connection, n_bootstrap: int = BOOTSTRAP_SAMPLES) -> Dict[str, int]:
+        """
+        Recompute groups whose measurements changed and persist them.
+
+        Returns:
+            dict: {'written': n, 'unchanged': n, 'dropped': n}
+        """
+        ParameterStatisticsEngine.ensure_schema(conn)
+        measurements = ParameterStatisticsEngine.load_measurements(conn)
+        current = ParameterStatisticsEngine.group_hashes(measurements)
+
+        stored = {
+            (int(row[0]), row[1], row[2]): row[3]
+            for row in conn.execute(
+                f"SELECT residue_id, parameter_name, unit, content_hash FROM {STATISTICS_TABLE}"
+            ).fetchall()
+        }
+        current_keys = {(int(key[0]), key[1], key[2]): value for key, value in current.items()}
+
+        changed = [key for key, value in current_keys.items() if stored.get(key) != value]
+        dropped = [key for key in stored if key not in current_keys]
+        stats = {'written': len(changed), 'unchanged': len(current_keys) - len(changed), 'dropped': len(dropped)}
+        if not changed and not dropped:
+            return stats
+
+        rows = []
+        if changed:
+            keys = pd.MultiIndex.from_tuples(changed, names=GROUP_KEYS)
+            subset = measurements[
+                pd.MultiIndex.from_frame(measurements[GROUP_KEYS].astype({'residue_id': int})).isin(keys)
+            ]
+            summary = ParameterStatisticsEngine.compute(subset, n_bootstrap=n_bootstrap)
+            summary['content_hash'] = [
+                current_keys[(int(r), p, u)]
+                for r, p, u in summary[GROUP_KEYS].itertuples(index=False, name=None)
+            ]
+            summary['updated_at'] = datetime.now().isoformat(timespec='seconds')
+            summary = summary.astype(object).where(summary.notna(), None)
+            rows = list(summary.itertuples(index=False, name=None))
+
+        columns = GROUP_KEYS + STATISTIC_COLUMNS + ['content_hash', 'updated_at']
+        with conn:
+            conn.executemany(
+                f"DELETE FROM {STATISTICS_TABLE} WHERE residue_id = ? AND parameter_name = ? AND unit = ?",
+                dropped
+            )
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {STATISTICS_TABLE} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                rows
+            )
+        return stats
+
+    @staticmethod
+    def has_table(conn: sqlite3.Connection) -> bool:
+        """Whether the summary table has been built."""
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (STATISTICS_TABLE,)
+        ).fetchone() is not None
+
+    @staticmethod
+    def read(conn: sqlite3.Connection, residue_id: Optional[int] = None) -> pd.DataFrame:
+        """Precomputed statistics (all residues or one residue_id; empty before the first refresh)."""
+        if not ParameterStatisticsEngine.has_table(conn):
+            return pd.DataFrame(columns=GROUP_KEYS + STATISTIC_COLUMNS + ['content_hash', 'updated_at'])
+        query = f"SELECT * FROM {STATISTICS_TABLE}"
+        params: List = []
+        if residue_id is not None:
+            query += " WHERE residue_id = ?"
+            params.append(int(residue_id))
+        return pd.read_sql(query + " ORDER BY residue_id, parameter_name, n DESC", conn, params=params)
+
+    @staticmethod
+    def to_parameter_dict(summary: pd.DataFrame) -> Dict[str, Dict]:
+        """
+        Parameter name → statistics of its best-covered unit.
+
+        Keeps the keys of ParameterService.get_parameter_statistics (paper_count,
+        min_value, mean_value, max_value, unit, avg_quality) and adds the robust ones.
+        """
+        if summary.empty:
+            return {}
+        best = summary.sort_values(['parameter_name', 'n'], ascending=[True, False]).drop_duplicates('parameter_name')
+        result = {}
+        for row in best.to_dict('records'):
+            result[str(row['parameter_name'])] = {
+                column: (None if pd.isna(row[column]) else row[column])
+                for column in ['unit'] + STATISTIC_COLUMNS
+            }
+        return result
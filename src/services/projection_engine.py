@@ -0,0 +1,415 @@
+"""
+Projection Engine Service
+CP2B (Centro Paulista de Estudos em Biogás e Bioprodutos)
+
+Single Responsibility: Project municipal biogas potential year by year through 2050.
+Applies per-crop, per-herd and per-population growth trajectories to the base-year
+municipal drivers and produces (year × municipality × driver) arrays, aggregated
+to (year × municipality × sector).
+
+Methodology:
+- Rates:   g[t, d] = piecewise annual rate of driver d in year t (scenario overlay applied)
+- Factors: F[t, d] = Π_{k ≤ t} (1 + g[k, d])             (np.cumprod over years)
+- Cube:    P[t, m, d] = base[m, d] × F[t, d]               (broadcast)
+- Sectors: S[t, m, s] = Σ_d P[t, m, d] × M[d, s]           (one-hot membership)
+
+The base year is the latest `ano` found in residuos_agricolas / residuos_pecuarios /
+residuos_urbanos; drivers without rows there fall back to the municipalities
+snapshot (2022) compounded forward to that year. Results are persisted in
+cp2b_maps.db partitioned by (cenario, ano), and only partitions whose content
+hash changed are rewritten on refresh.
+
+SOLID Compliance:
+- Single Responsibility: Only temporal projection and its persistence
+- Open/Closed: Growth assumptions live in src/data/growth_trajectories.py
+- Dependency Inversion: Core math works on arrays; SQLite access is isolated
+"""
+
+import hashlib
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data.growth_trajectories import (
+    BASE_YEAR,
+    DEFAULT_END_YEAR,
+    DEFAULT_SCENARIO,
+    DRIVERS,
+    SECTORS,
+    get_trajectory,
+)
+
+
+PROJECTION_TABLE = 'projecoes_municipais'
+PARTITION_TABLE = 'projecoes_particoes'
+
+# Yearly tables (cp2b_maps.db) → (coluna de categoria, coluna de valor)
+YEARLY_SOURCES = {
+    'residuos_agricolas': ('cultura', 'potencial_biogas_m3'),
+    'residuos_pecuarios': ('tipo_criacao', 'potencial_biogas_m3_ano'),
+}
+URBAN_SOURCE_COLUMNS = {
+    'rsu': 'potencial_biogas_rsu_m3_ano',
+    'rpo': 'potencial_biogas_poda_m3_ano',
+}
+
+
+@dataclass
+class ProjectionResult:
+    """
+    Projected potential for one scenario.
+
+    `by_driver` has shape (n_years, n_municipalities, n_drivers) and `by_sector`
+    (n_years, n_municipalities, n_sectors), both in m³ biogás/ano.
+    """
+    scenario: str
+    base_year: int
+    years: np.ndarray
+    municipality_codes: np.ndarray
+    drivers: List[str]
+    sectors: List[str]
+    by_driver: np.ndarray
+    by_sector: np.ndarray
+    metadata: Dict[str, object] = field(default_factory=dict)
+
+    def year_index(self, year: int) -> int:
+        """Position of `year` on the year axis."""
+        matches = np.flatnonzero(self.years == year)
+        if not matches.size:
+            raise ValueError(f"Year {year} outside projection range {self.years[0]}-{self.years[-1]}")
+        return int(matches[0])
+
+    def state_totals(self) -> pd.DataFrame:
+        """State total per year and sector (wide format)."""
+        totals = self.by_sector.sum(axis=1)
+        frame = pd.DataFrame(totals, columns=self.sectors)
+        frame.insert(0, 'ano', self.years)
+        frame['Total'] = totals.sum(axis=1)
+        return frame
+
+    def to_long_frame(self, year: Optional[int] = None) -> pd.DataFrame:
+        """
+        Long table (ano, codigo_municipio, setor, driver, valor_m3_ano).
+
+        Args:
+            year: Restrict to one year (default: all years)
+        """
+        year_slice = slice(None) if year is None else slice(self.year_index(year), self.year_index(year) + 1)
+        cube = self.by_driver[year_slice]
+        n_years, n_mun, n_drv = cube.shape
+        sector_of = [DRIVERS[d][1] for d in self.drivers]
+        return pd.DataFrame({
+            'ano': np.repeat(self.years[year_slice], n_mun * n_drv),
+            'codigo_municipio': np.tile(np.repeat(self.municipality_codes, n_drv), n_years),
+            'setor': np.tile(sector_of, n_years * n_mun),
+            'driver': np.tile(self.drivers, n_years * n_mun),
+            'valor_m3_ano': cube.reshape(-1),
+        })
+
+
+class ProjectionEngine:
+    """
+    Vectorized multi-year projection of municipal residue potential.
+
+    Example:
+        >>> base_year, codes, base = ProjectionEngine.load_base_year(conn, df_municipalities)
+        >>> result = ProjectionEngine.project(base, codes, base_year, 2050, 'Tendencial')
+        >>> result.state_totals().tail()
+        >>> ProjectionEngine.persist(conn, result)          # rewrites changed years only
+    """
+
+    @staticmethod
+    def growth_factors(
+        base_year: int,
+        end_year: int,
+        scenario: str = DEFAULT_SCENARIO,
+        drivers: Sequence[str] = tuple(DRIVERS)
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Cumulative growth factor of each driver relative to the base year.
+
+        Args:
+            base_year: Year of the base values (factor 1.0)
+            end_year: Last projected year
+            scenario: Scenario overlay (see SCENARIO_OVERLAYS)
+            drivers: Drivers to include (column order)
+
+        Returns:
+            tuple: (years array, factors of shape (n_years, n_drivers))
+        """
+        years = np.arange(base_year, end_year + 1)
+        rates = np.zeros((len(years), len(drivers)))
+
+        for j, driver in enumerate(drivers):
+            trajectory = sorted(get_trajectory(driver, scenario).items())
+            for change_year, rate in trajectory:
+                rates[years >= change_year, j] = rate / 100.0
+
+        rates[0] = 0.0
+        return years, np.cumprod(1.0 + rates, axis=0)
+
+    @staticmethod
+    def sector_membership(drivers: Sequence[str], sectors: Sequence[str] = SECTORS) -> np.ndarray:
+        """One-hot (driver × sector) matrix."""
+        membership = np.zeros((len(drivers), len(sectors)))
+        for i, driver in enumerate(drivers):
+            membership[i, list(sectors).index(DRIVERS[driver][1])] = 1.0
+        return membership
+
+    @staticmethod
+    def project(
+        base: np.ndarray,
+        municipality_codes: Sequence[int],
+        base_year: int = BASE_YEAR,
+        end_year: int = DEFAULT_END_YEAR,
+        scenario: str = DEFAULT_SCENARIO,
+        drivers: Sequence[str] = tuple(DRIVERS)
+    ) -> ProjectionResult:
+        """
+        Project base-year driver values through `end_year`.
+
+        Args:
+            base: (n_municipalities, n_drivers) base-year values (m³/ano)
+            municipality_codes: IBGE code per row of `base`
+            base_year: Year of `base`
+            end_year: Last projected year
+            scenario: Scenario overlay
+            drivers: Driver order of the columns of `base`
+
+        Returns:
+            ProjectionResult for the scenario
+        """
+        base = np.nan_to_num(np.asarray(base, dtype=float))
+        if base.shape[1] != len(drivers):
+            raise ValueError(f"Base has {base.shape[1]} columns, expected {len(drivers)} drivers")
+        if end_year < base_year:
+            raise ValueError(f"end_year ({end_year}) must not precede base_year ({base_year})")
+
+        years, factors = ProjectionEngine.growth_factors(base_year, end_year, scenario, drivers)
+        by_driver = base[None, :, :] * factors[:, None, :]
+        by_sector = np.tensordot(by_driver, ProjectionEngine.sector_membership(drivers), axes=([2], [0]))
+
+        return ProjectionResult(
+            scenario=scenario,
+            base_year=base_year,
+            years=years,
+            municipality_codes=np.asarray(municipality_codes),
+            drivers=list(drivers),
+            sectors=list(SECTORS),
+            by_driver=by_driver,
+            by_sector=by_sector,
+            metadata={'growth_factors': factors}
+        )
+
+    # ------------------------------------------------------------------
+    # Base year
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _driver_for_label(label: str) -> Optional[str]:
+        """Map a cultura / tipo_criacao label of the yearly tables to a driver."""
+        key = str(label).strip().lower()
+        for driver, (_, _, group) in DRIVERS.items():
+            if key in (driver, group.lower()) or key.startswith(driver):
+                return driver
+        return None
+
+    @staticmethod
+    def load_base_year(
+        conn: sqlite3.Connection,
+        df_municipalities: pd.DataFrame,
+        drivers: Sequence[str] = tuple(DRIVERS)
+    ) -> Tuple[int, np.ndarray, np.ndarray]:
+        """
+        Assemble the base-year driver matrix.
+
+        Uses the latest `ano` with rows in the yearly residue tables. Drivers,
+        municipalities and NULL values without a yearly figure in that year
+        keep the 2022 snapshot from the municipalities table, compounded
+        forward to the base year.
+
+        Args:
+            conn: Connection to cp2b_maps.db
+            df_municipalities: municipalities table (codigo_municipio + driver columns)
+            drivers: Driver order
+
+        Returns:
+            tuple: (base_year, municipality codes, (n_municipalities, n_drivers) matrix)
+        """
+        codes = df_municipalities['codigo_municipio'].to_numpy()
+        snapshot = np.column_stack([
+            pd.to_numeric(df_municipalities[DRIVERS[d][0]], errors='coerce').fillna(0.0).to_numpy()
+            for d in drivers
+        ])
+
+        yearly = ProjectionEngine._read_yearly_tables(conn)
+        if yearly.empty:
+            return BASE_YEAR, codes, snapshot
+
+        base_year = int(yearly['ano'].max())
+        _, factors = ProjectionEngine.growth_factors(BASE_YEAR, base_year, DEFAULT_SCENARIO, drivers)
+        base = snapshot * factors[-1]
+
+        # NULL cells carry no information: they must not override the snapshot
+        latest = yearly[yearly['ano'] == base_year].assign(
+            valor=lambda df: pd.to_numeric(df['valor'], errors='coerce')
+        ).dropna(subset=['valor'])
+        pivot = latest.pivot_table(index='codigo_municipio', columns='driver', values='valor', aggfunc='sum')
+        pivot = pivot.reindex(codes)
+        for j, driver in enumerate(drivers):
+            if driver in pivot.columns:
+                # Municipalities without a yearly row keep the compounded snapshot
+                base[:, j] = pivot[driver].fillna(pd.Series(base[:, j], index=pivot.index)).to_numpy()
+
+        return base_year, codes, base
+
+    @staticmethod
+    def _read_yearly_tables(conn: sqlite3.Connection) -> pd.DataFrame:
+        """Yearly residue tables as a long (codigo_municipio, ano, driver, valor) frame."""
+        frames = []
+        for table, (label_col, value_col) in YEARLY_SOURCES.items():
+            try:
+                frame = pd.read_sql(
+                    f"SELECT codigo_municipio, ano, {label_col} AS label, {value_col} AS valor FROM {table}",
+                    conn
+                )
+            except Exception:
+                continue
+            frame['driver'] = frame['label'].map(ProjectionEngine._driver_for_label)
+            frames.append(frame.dropna(subset=['driver'])[['codigo_municipio', 'ano', 'driver', 'valor']])
+
+        try:
+            urban = pd.read_sql(
+                f"SELECT codigo_municipio, ano, {', '.join(URBAN_SOURCE_COLUMNS.values())} FROM residuos_urbanos",
+                conn
+            )
+            frames.append(
+                urban.rename(columns={col: drv for drv, col in URBAN_SOURCE_COLUMNS.items()})
+                .melt(id_vars=['codigo_municipio', 'ano'], var_name='driver', value_name='valor')
+            )
+        except Exception:
+            pass
+
+        frames = [f for f in frames if not f.empty]
+        if not frames:
+            return pd.DataFrame(columns=['codigo_municipio', 'ano', 'driver', 'valor'])
+        return pd.concat(frames, ignore_index=True)
+
+    # ------------------------------------------------------------------
+    # Persistence (partitioned by cenario × ano)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def ensure_schema(conn: sqlite3.Connection) -> None:
+        """Create projection and partition tables if missing."""
+        conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS {PROJECTION_TABLE} (
+                cenario TEXT NOT NULL,
+                ano INTEGER NOT NULL,
+                codigo_municipio INTEGER NOT NULL,
+                setor TEXT NOT NULL,
+                driver TEXT NOT NULL,
+                valor_m3_ano REAL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_projecoes_cenario_ano ON {PROJECTION_TABLE}(cenario, ano);
+            CREATE INDEX IF NOT EXISTS idx_projecoes_municipio ON {PROJECTION_TABLE}(codigo_municipio);
+            CREATE TABLE IF NOT EXISTS {PARTITION_TABLE} (
+                cenario TEXT NOT NULL,
+                ano INTEGER NOT NULL,
+                ano_base INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                atualizado_em TEXT,
+                PRIMARY KEY (cenario, ano)
+            );
+        """)
+
+    @staticmethod
+    def partition_hash(result: ProjectionResult, year: int) -> str:
+        """Content hash of one year partition (values + base year + layout)."""
+        digest = hashlib.sha1()
+        digest.update(f"{result.base_year}|{','.join(result.drivers)}".encode())
+        digest.update(np.ascontiguousarray(result.municipality_codes, dtype=np.int64).tobytes())
+        digest.update(np.ascontiguousarray(result.by_driver[result.year_index(year)]).round(6).tobytes())
+        return digest.hexdigest()
+
+    @staticmethod
+    def persist(conn: sqlite3.Connection, result: ProjectionResult) -> Dict[str, int]:
+        """
+        Write the projection, rewriting only partitions whose content changed.
+
+        Partitions of years no longer covered (e.g. years before a newer base
+        year) are dropped.
+
+        Returns:
+            dict: {'written': n, 'unchanged': n, 'dropped': n}
+        """
+        ProjectionEngine.ensure_schema(conn)
+        stored = dict(conn.execute(
+            f"SELECT ano, content_hash FROM {PARTITION_TABLE} WHERE cenario = ?", (result.scenario,)
+        ).fetchall())
+
+        stats = {'written': 0, 'unchanged': 0, 'dropped': 0}
+        now = datetime.now().isoformat(timespec='seconds')
+
+        with conn:
+            for year in result.years.tolist():
+                content_hash = ProjectionEngine.partition_hash(result, year)
+                if stored.get(year) == content_hash:
+                    stats['unchanged'] += 1
+                    continue
+
+                conn.execute(
+                    f"DELETE FROM {PROJECTION_TABLE} WHERE cenario = ? AND ano = ?", (result.scenario, year)
+                )
+                frame = result.to_long_frame(year)
+                conn.executemany(
+                    f"INSERT INTO {PROJECTION_TABLE} "
+                    f"(cenario, ano, codigo_municipio, setor, driver, valor_m3_ano) VALUES (?, ?, ?, ?, ?, ?)",
+                    zip(
+                        [result.scenario] * len(frame),
+                        frame['ano'].astype(int).tolist(),
+                        frame['codigo_municipio'].astype(int).tolist(),
+                        frame['setor'].tolist(),
+                        frame['driver'].tolist(),
+                        frame['valor_m3_ano'].astype(float).tolist(),
+                    )
+                )
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {PARTITION_TABLE} (cenario, ano, ano_base, content_hash, atualizado_em) "
+                    f"VALUES (?, ?, ?, ?, ?)",
+                    (result.scenario, year, result.base_year, content_hash, now)
+                )
+                stats['written'] += 1
+
+            obsolete = [year for year in stored if year not in set(result.years.tolist())]
+            for year in obsolete:
+                conn.execute(f"DELETE FROM {PROJECTION_TABLE} WHERE cenario = ? AND ano = ?", (result.scenario, year))
+                conn.execute(f"DELETE FROM {PARTITION_TABLE} WHERE cenario = ? AND ano = ?", (result.scenario, year))
+            stats['dropped'] = len(obsolete)
+
+        return stats
+
+    @staticmethod
+    def refresh(
+        conn: sqlite3.Connection,
+        df_municipalities: pd.DataFrame,
+        scenarios: Sequence[str] = (DEFAULT_SCENARIO,),
+        end_year: int = DEFAULT_END_YEAR
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Re-project from the current base year and persist changed partitions.
+
+        Returns:
+            dict: scenario → persist() stats
+        """
+        base_year, codes, base = ProjectionEngine.load_base_year(conn, df_municipalities)
+        return {
+            scenario: ProjectionEngine.persist(
+                conn, ProjectionEngine.project(base, codes, base_year, end_year, scenario)
+            )
+            for scenario in scenarios
+        }
@@ -0,0 +1,540 @@
+"""
+Reference Deduplication Service
+CP2B (Centro Paulista de Estudos em Biogás e Bioprodutos)
+
+Single Responsibility: Find references that describe the same paper across the
+residue modules (src/data/*), scientific_papers, scientific_references and
+referencias, and group them into merge clusters with a confidence.
+
+Methodology:
+- DOI normalization: lowercase, resolver prefixes ('https://doi.org/', 'doi:')
+  and trailing punctuation removed. Extraction often glues page numbers to the
+  DOI (10.1016/j.x.2006.07.004244), so a DOI whose trailing digits extend
+  another DOI is a candidate too ('doi_prefix')
+- Text signature: MinHash (NUM_PERM permutations) over character 5-grams of
+  the accent-folded title plus author surname tokens ('a:silva')
+- Candidates: LSH banding (BANDS × ROWS); two references are compared only if
+  they share a band bucket or a DOI, so candidate generation is ~linear
+- Verification: exact Jaccard of title shingles (80%) and author overlap (20%),
+  penalized for years more than one apart and for unrelated DOIs; a shared DOI
+  scores at least 0.75, a DOI prefix lifts the text score halfway to 1
+- Clusters: connected components of verified pairs (Kruskal, strongest pairs
+  first); cluster confidence is the weakest link that joined it
+
+Incremental runs: signatures, pairs and clusters are stored in the precision
+database. Only new or changed references (content hash) are signed and
+compared against the stored ones; clusters are recomputed from the stored pairs.
+
+SOLID Compliance:
+- Single Responsibility: Only duplicate detection (merging is up to the caller)
+- Open/Closed: New sources are loaders returning reference dicts
+- Dependency Inversion: Engine works on plain dicts; data access is isolated
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import unicodedata
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+MAX_TRAILING_DIGITS = 4
+MIN_CONFIDENCE = 0.6
+SEED = 20251021
+
+TITLE_WEIGHT = 0.8
+YEAR_PENALTY = 0.8
+DOI_CONFLICT_PENALTY = 0.5
+
+SIGNATURES_TABLE = 'reference_signatures'
+PAIRS_TABLE = 'reference_duplicate_pairs'
+CLUSTERS_TABLE = 'reference_duplicate_clusters'
+
+# Preference when choosing the canonical member of a cluster
+SOURCE_PRIORITY = {'scientific_papers': 3, 'scientific_references': 2, 'referencias': 1, 'module': 0}
+
+DOI_RE = re.compile(r'^10\.\d{4,9}/\S+$')
+AUTHOR_STOPWORDS = {'et', 'al', 'and', 'e', 'de', 'da', 'do', 'dos', 'das', 'van', 'von', 'der'}
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_rng = np.random.RandomState(SEED)
+_PERM_A = _rng.randint(1, np.iinfo(np.int64).max, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+_PERM_B = _rng.randint(0, np.iinfo(np.int64).max, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+
+
+def normalize_doi(doi: Optional[str]) -> Optional[str]:
+    """
+    Canonical form of a DOI ('https://doi.org/10.1002/BBB.2461.' → '10.1002/bbb.2461').
+
+    Returns:
+        Optional[str]: Normalized DOI, or None if the value is not a DOI
+    """
+    if not doi:
+        return None
+    value = unicodedata.normalize('NFKC', str(doi)).strip().lower()
+    value = re.sub(r'^(https?://)?(dx\.)?doi\.org/', '', value)
+    value = re.sub(r'^doi:?\s*', '', value)
+    value = re.sub(r'\s+', '', value).rstrip('.,;:)]}>\'"')
+    return value if DOI_RE.match(value) else None
+
+
+def doi_stems(doi: str) -> List[str]:
+    """DOI with 1..MAX_TRAILING_DIGITS trailing digits removed (glued page numbers)."""
+    stems = []
+    for k in range(1, MAX_TRAILING_DIGITS + 1):
+        if len(doi) <= k or not doi[-k].isdigit():
+            break
+        stem = doi[:-k]
+        if DOI_RE.match(stem) and stem[-1].isalnum():
+            stems.append(stem)
+    return stems
+
+
+def fold_text(text: Optional[str]) -> str:
+    """Lowercase, accent-free, alphanumeric words separated by single spaces."""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', text).split())
+
+
+def author_tokens(authors: Optional[str]) -> Set[str]:
+    """Surname-like tokens of an author string (initials and 'et al.' dropped)."""
+    return {t for t in fold_text(authors).split() if len(t) > 2 and t not in AUTHOR_STOPWORDS and not t.isdigit()}
+
+
+def title_shingles(title: Optional[str]) -> Set[str]:
+    """Character SHINGLE_SIZE-grams of a folded title."""
+    text = fold_text(title)
+    if not text:
+        return set()
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(tokens: Iterable[str]) -> Optional[np.ndarray]:
+    """
+    MinHash signature of a token set.
+
+    Returns:
+        Optional[np.ndarray]: NUM_PERM uint32 values (None for an empty set)
+    """
+    values = np.fromiter((zlib.crc32(t.encode('utf-8')) for t in set(tokens)), dtype=np.uint64)
+    if values.size == 0:
+        return None
+    # Universal hashing (a·x + b) mod p, vectorized over permutations × tokens
+    hashed = ((_PERM_A[:, None] * values[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME) & _MAX_HASH
+    return hashed.min(axis=1).astype(np.uint32)
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """Exact Jaccard similarity of two sets (0 when both are empty)."""
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
+
+
+def content_hash(ref: Dict) -> str:
+    """Hash of the fields that take part in matching (detects changed references)."""
+    payload = [ref.get('title') or '', ref.get('authors') or '', ref.get('year'), ref.get('doi') or '']
+    return hashlib.sha1(json.dumps(payload, default=str).encode('utf-8')).hexdigest()
+
+
+class ReferenceDeduplicator:
+    """
+    Near-duplicate detection for scientific references with MinHash/LSH.
+
+    References are dicts with 'ref_key' (unique, e.g. 'paper:617'), 'source',
+    'source_id', 'title', 'authors', 'year' and 'doi'.
+    """
+
+    # ------------------------------------------------------------------ sources
+
+    @staticmethod
+    def load_module_references() -> List[Dict]:
+        """
+        References of the Python residue modules (src/data/*).
+
+        Identical entries cited by several residues are one reference; the
+        residues are listed in source_id.
+        """
+        from src.data.residue_registry import RESIDUES_REGISTRY
+
+        refs: Dict[str, Dict] = {}
+        for residue_name, residue in RESIDUES_REGISTRY.items():
+            for ref in residue.references or []:
+                item = {'title': ref.title, 'authors': ref.authors, 'year': ref.year, 'doi': ref.doi}
+                key = f"module:{content_hash(item)[:16]}"
+                if key in refs:
+                    refs[key]['residues'].append(residue_name)
+                else:
+                    refs[key] = {**item, 'ref_key': key, 'source': 'module', 'residues': [residue_name]}
+        for ref in refs.values():
+            ref['source_id'] = '; '.join(sorted(ref.pop('residues')))
+        return list(refs.values())
+
+    @staticmethod
+    def load_database_references(db_path: Path) -> List[Dict]:
+        """
+        References of the tables scientific_papers, scientific_references and
+        referencias found in a database (missing tables are skipped).
+        """
+        queries = {
+            'scientific_papers': (
+                'paper', "SELECT paper_id AS id, title, authors, publication_year AS year, doi FROM scientific_papers"),
+            'scientific_references': (
+                'sr', "SELECT id, title, authors, publication_year AS year, doi FROM scientific_references"),
+            'referencias': (
+                'ref', "SELECT rowid AS id, COALESCE(referencias_completas, resumo) AS title, "
+                       "NULL AS authors, ano AS year, doi FROM referencias"),
+        }
+        conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        try:
+            tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            refs = []
+            for table, (prefix, query) in queries.items():
+                if table not in tables:
+                    continue
+                for row in conn.execute(query):
+                    refs.append({
+                        'ref_key': f"{prefix}:{Path(db_path).stem}:{row['id']}" if prefix != 'paper' else f"paper:{row['id']}",
+                        'source': table,
+                        'source_id': str(row['id']),
+                        'title': row['title'],
+                        'authors': row['authors'],
+                        'year': row['year'],
+                        'doi': row['doi'],
+                    })
+            return refs
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------ engine
+
+    @staticmethod
+    def signature(ref: Dict) -> Optional[np.ndarray]:
+        """MinHash signature over title shingles and author tokens."""
+        tokens = title_shingles(ref.get('title')) | {f"a:{t}" for t in author_tokens(ref.get('authors'))}
+        return minhash(tokens)
+
+    @staticmethod
+    def lsh_buckets(signatures: Dict[str, np.ndarray]) -> Dict[Tuple[int, bytes], List[str]]:
+        """Band buckets: (band, band bytes) → ref keys."""
+        buckets: Dict[Tuple[int, bytes], List[str]] = defaultdict(list)
+        for key, sig in signatures.items():
+            for band in range(BANDS):
+                buckets[(band, sig[band * ROWS:(band + 1) * ROWS].tobytes())].append(key)
+        return buckets
+
+    @staticmethod
+    def candidate_pairs(refs: Dict[str, Dict], signatures: Dict[str, np.ndarray],
+                        changed: Set[str]) -> Dict[Tuple[str, str], str]:
+        """
+        Pairs to verify that involve at least one changed reference.
+
+        Returns:
+            Dict: (key_a, key_b) sorted → 'doi', 'doi_prefix' or 'lsh'
+        """
+        pairs: Dict[Tuple[str, str], str] = {}
+
+        def add(a: str, b: str, reason: str) -> None:
+            if a == b or (a not in changed and b not in changed):
+                return
+            pair = (a, b) if a < b else (b, a)
+            # DOI evidence outranks text evidence
+            if pair not in pairs or reason == 'doi' or (reason == 'doi_prefix' and pairs[pair] == 'lsh'):
+                pairs[pair] = reason
+
+        for keys in ReferenceDeduplicator.lsh_buckets(signatures).values():
+            if len(keys) > 1:
+                for a in changed.intersection(keys):
+                    for b in keys:
+                        add(a, b, 'lsh')
+
+        by_doi: Dict[str, List[str]] = defaultdict(list)
+        by_stem: Dict[str, List[str]] = defaultdict(list)
+        for key, ref in refs.items():
+            if ref.get('doi_norm'):
+                by_doi[ref['doi_norm']].append(key)
+                for stem in doi_stems(ref['doi_norm']):
+                    by_stem[stem].append(key)
+        for key in changed:
+            doi = refs[key].get('doi_norm')
+            if not doi:
+                continue
+            for other in by_doi[doi]:
+                add(key, other, 'doi')
+            for other in by_stem.get(doi, []):
+                add(key, other, 'doi_prefix')
+            for stem in doi_stems(doi):
+                for other in by_doi.get(stem, []):
+                    add(key, other, 'doi_prefix')
+        return pairs
+
+    @staticmethod
+    def score_pair(a: Dict, b: Dict, reason: str) -> float:
+        """
+        Confidence (0-1) that two references are the same paper.
+
+        Args:
+            a, b: Reference dicts (with 'doi_norm')
+            reason: How the pair was found ('doi', 'doi_prefix', 'lsh')
+        """
+        title_sim = jaccard(title_shingles(a.get('title')), title_shingles(b.get('title')))
+        authors_a, authors_b = author_tokens(a.get('authors')), author_tokens(b.get('authors'))
+        if authors_a and authors_b:
+            author_sim = len(authors_a & authors_b) / min(len(authors_a), len(authors_b))
+            confidence = TITLE_WEIGHT * title_sim + (1 - TITLE_WEIGHT) * author_sim
+        else:
+            confidence = title_sim
+
+        try:
+            if abs(int(a['year']) - int(b['year'])) > 1:
+                confidence *= YEAR_PENALTY
+        except (KeyError, TypeError, ValueError):
+            pass
+
+        # Shared DOIs are strong evidence, but the residue modules contain DOIs
+        # copied onto unrelated titles: dissimilar titles keep the pair reviewable
+        if reason == 'doi':
+            return max(confidence, 0.75 + 0.25 * title_sim)
+        # Sequential DOIs (…/bbb.246, …/bbb.2461) are prefixes of each other too,
+        # so a prefix only counts together with text evidence
+        if reason == 'doi_prefix':
+            return 0.5 + 0.5 * confidence
+        if a.get('doi_norm') and b.get('doi_norm'):
+            confidence *= DOI_CONFLICT_PENALTY
+        return confidence
+
+    @staticmethod
+    def cluster(refs: Dict[str, Dict], pairs: List[Tuple[str, str, float]]) -> List[Dict]:
+        """
+        Merge clusters from verified pairs.
+
+        Returns:
+            List[Dict]: canonical_key, members, confidence (weakest joining pair), size
+        """
+        parent = {key: key for pair in pairs for key in pair[:2]}
+        weakest: Dict[str, float] = {}
+
+        def find(key: str) -> str:
+            while parent[key] != key:
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+
+        for a, b, confidence in sorted(pairs, key=lambda p: -p[2]):
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[root_b] = root_a
+                weakest[root_a] = min(confidence, weakest.get(root_a, 1.0), weakest.get(root_b, 1.0))
+
+        groups: Dict[str, List[str]] = defaultdict(list)
+        for key in parent:
+            groups[find(key)].append(key)
+
+        def preference(key: str) -> Tuple:
+            ref = refs.get(key, {})
+            filled = sum(1 for field in ('title', 'authors', 'year', 'doi_norm') if ref.get(field))
+            return (-filled, -SOURCE_PRIORITY.get(ref.get('source'), 0), key)
+
+        clusters = []
+        for root, members in groups.items():
+            members.sort(key=preference)
+            clusters.append({
+                'canonical_key': members[0],
+                'members': members,
+                'confidence': round(weakest[root], 3),
+                'size': len(members),
+            })
+        return sorted(clusters, key=lambda c: (-c['size'], c['canonical_key']))
+
+    # ------------------------------------------------------------------ storage
+
+    @staticmethod
+    def ensure_tables(conn: sqlite3.Connection) -> None:
+        """Create the signature, pair and cluster tables if missing."""
+        conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS {SIGNATURES_TABLE} (
+                ref_key TEXT PRIMARY KEY,
+                source TEXT,
+                source_id TEXT,
+                title TEXT,
+                authors TEXT,
+                year INTEGER,
+                doi TEXT,
+                doi_norm TEXT,
+                content_hash TEXT,
+                signature BLOB,
+                updated_at TIMESTAMP
+            );
+            CREATE INDEX IF NOT EXISTS idx_{SIGNATURES_TABLE}_doi ON {SIGNATURES_TABLE}(doi_norm);
+            CREATE TABLE IF NOT EXISTS {PAIRS_TABLE} (
+                ref_a TEXT NOT NULL,
+                ref_b TEXT NOT NULL,
+                confidence REAL,
+                reason TEXT,
+                PRIMARY KEY (ref_a, ref_b)
+            );
+            CREATE INDEX IF NOT EXISTS idx_{PAIRS_TABLE}_b ON {PAIRS_TABLE}(ref_b);
+            CREATE TABLE IF NOT EXISTS {CLUSTERS_TABLE} (
+                ref_key TEXT PRIMARY KEY,
+                canonical_key TEXT NOT NULL,
+                cluster_size INTEGER,
+                confidence REAL
+            );
+        """)
+
+    @staticmethod
+    def run(db_path: Path, references: List[Dict], rebuild: bool = False,
+            prune: bool = True, min_confidence: float = MIN_CONFIDENCE) -> Dict:
+        """
+        Incremental deduplication into the given database.
+
+        Args:
+            db_path: Database holding the signature/pair/cluster tables
+                (normally CP2B_Precision_Biogas.db)
+            references: All current references (from the loaders above)
+            rebuild: Discard stored signatures and pairs first
+            prune: Forget stored references missing from `references`
+            min_confidence: Pairs below this are not stored
+
+        Returns:
+            Dict: Run counters plus 'clusters' (list from cluster())
+        """
+        conn = sqlite3.connect(str(db_path))
+        try:
+            ReferenceDeduplicator.ensure_tables(conn)
+            conn.execute("BEGIN IMMEDIATE")
+            if rebuild:
+                conn.execute(f"DELETE FROM {SIGNATURES_TABLE}")
+                conn.execute(f"DELETE FROM {PAIRS_TABLE}")
+
+            stored = {
+                row[0]: {'content_hash': row[1], 'signature': row[2]}
+                for row in conn.execute(f"SELECT ref_key, content_hash, signature FROM {SIGNATURES_TABLE}")
+            }
+
+            refs: Dict[str, Dict] = {}
+            for ref in references:
+                refs[ref['ref_key']] = {**ref, 'doi_norm': normalize_doi(ref.get('doi')),
+                                        'content_hash': content_hash(ref)}
+            changed = {key for key, ref in refs.items()
+                       if key not in stored or stored[key]['content_hash'] != ref['content_hash']}
+            removed = set(stored) - set(refs) if prune else set()
+
+            # References kept from earlier runs but not passed now stay comparable
+            if not prune:
+                for row in conn.execute(
+                        f"SELECT ref_key, source, source_id, title, authors, year, doi FROM {SIGNATURES_TABLE}"):
+                    if row[0] not in refs:
+                        ref = dict(zip(('ref_key', 'source', 'source_id', 'title', 'authors', 'year', 'doi'), row))
+                        refs[row[0]] = {**ref, 'doi_norm': normalize_doi(ref['doi'])}
+
+            stale = list(changed | removed)
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS dedup_stale (ref_key TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM dedup_stale")
+            conn.executemany("INSERT INTO dedup_stale VALUES (?)", [(k,) for k in stale])
+            conn.execute(f"DELETE FROM {PAIRS_TABLE} WHERE ref_a IN (SELECT ref_key FROM dedup_stale) "
+                         f"OR ref_b IN (SELECT ref_key FROM dedup_stale)")
+            conn.execute(f"DELETE FROM {SIGNATURES_TABLE} WHERE ref_key IN (SELECT ref_key FROM dedup_stale)")
+
+            signatures: Dict[str, np.ndarray] = {}
+            rows = []
+            now = datetime.now().isoformat()
+            for key, ref in refs.items():
+                if key in changed:
+                    sig = ReferenceDeduplicator.signature(ref)
+                    rows.append((key, ref.get('source'), ref.get('source_id'), ref.get('title'), ref.get('authors'),
+                                 ref.get('year'), ref.get('doi'), ref['doi_norm'], ref['content_hash'],
+                                 sig.tobytes() if sig is not None else None, now))
+                else:
+                    blob = stored.get(key, {}).get('signature')
+                    sig = np.frombuffer(blob, dtype=np.uint32) if blob else None
+                if sig is not None:
+                    signatures[key] = sig
+            conn.executemany(f"INSERT INTO {SIGNATURES_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+            candidates = ReferenceDeduplicator.candidate_pairs(refs, signatures, changed)
+            new_pairs = []
+            for (a, b), reason in candidates.items():
+                confidence = ReferenceDeduplicator.score_pair(refs[a], refs[b], reason)
+                if confidence >= min_confidence:
+                    new_pairs.append((a, b, round(confidence, 4), reason))
+            conn.executemany(f"INSERT OR REPLACE INTO {PAIRS_TABLE} VALUES (?, ?, ?, ?)", new_pairs)
+
+            pairs = [(a, b, c) for a, b, c in conn.execute(f"SELECT ref_a, ref_b, confidence FROM {PAIRS_TABLE}")]
+            clusters = ReferenceDeduplicator.cluster(refs, pairs)
+            conn.execute(f"DELETE FROM {CLUSTERS_TABLE}")
+            conn.executemany(
+                f"INSERT INTO {CLUSTERS_TABLE} VALUES (?, ?, ?, ?)",
+                [(key, c['canonical_key'], c['size'], c['confidence']) for c in clusters for key in c['members']],
+            )
+            conn.commit()
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        return {
+            'references': len(refs),
+            'signed': len(changed),
+            'removed': len(removed),
+            'candidate_pairs': len(candidates),
+            'pairs_added': len(new_pairs),
+            'pairs_total': len(pairs),
+            'clusters': clusters,
+            'duplicates': sum(c['size'] - 1 for c in clusters),
+        }
+
+    @staticmethod
+    def load_clusters(db_path: Path) -> List[Dict]:
+        """
+        Stored clusters with member details (for review screens and merges).
+
+        Returns:
+            List[Dict]: canonical_key, confidence, size and members
+            (ref_key, source, source_id, title, authors, year, doi)
+        """
+        conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(f"""
+                SELECT c.canonical_key, c.cluster_size, c.confidence,
+                       s.ref_key, s.source, s.source_id, s.title, s.authors, s.year, s.doi
+                FROM {CLUSTERS_TABLE} c
+                JOIN {SIGNATURES_TABLE} s ON s.ref_key = c.ref_key
+                ORDER BY c.cluster_size DESC, c.canonical_key, s.ref_key = c.canonical_key DESC, s.ref_key
+            """).fetchall()
+        except sqlite3.OperationalError:
+            return []
+        finally:
+            conn.close()
+
+        clusters: Dict[str, Dict] = {}
+        for row in rows:
+            cluster = clusters.setdefault(row['canonical_key'], {
+                'canonical_key': row['canonical_key'],
+                'confidence': row['confidence'],
+                'size': row['cluster_size'],
+                'members': [],
+            })
+            cluster['members'].append({k: row[k] for k in
+                                       ('ref_key', 'source', 'source_id', 'title', 'authors', 'year', 'doi')})
+        return list(clusters.values())
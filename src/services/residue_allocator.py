@@ -0,0 +1,391 @@
+"""
+Residue Allocator Service
+CP2B (Centro Paulista de Estudos em Biogás e Bioprodutos)
+
+Single Responsibility: Distribute each residue's state potential to municipalities.
+Each residue is allocated by its own production driver (cana ton/ano, rebanho,
+população - see src/data/residue_drivers.py) instead of the whole sector column,
+so vinhaça follows sugarcane and milho follows corn.
+
+Methodology:
+- Weights:    W[r, m] = driver_r[m] / Σ_m driver_r[m]        (sparse CSR, r × m)
+- Shares:     q[r, s] = fator_s(r) × BMP(r) / Σ_{r' ∈ setor(r)} fator_s(r') × BMP(r')
+- Totals:     T[r, s] = Σ_m CH4_s,setor(r)[m] × q[r, s]      (state potential, m³/ano)
+- Allocation: P_s = diag(T[:, s]) · W                       (one sparse product per scenario)
+
+Residues of one sector split that sector's total, so Σ_r∈setor T[r, s] equals
+the sector column of municipios and the state total is never exceeded.
+
+The long table `residuos_municipios` (cp2b_panorama.db) stores the non-zero
+cells. It is built offline by scripts/build_allocation.py (rewritten only when
+the weights or totals change); the app only reads it and ranks an in-memory
+allocation when the table is missing.
+
+SOLID Compliance:
+- Single Responsibility: Only allocation of residue totals to municipalities
+- Open/Closed: New residues only need a driver entry
+- Dependency Inversion: Math works on DataFrames/arrays; SQLite access is isolated
+"""
+
+import hashlib
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from src.data.residue_drivers import get_residue_driver
+
+
+ALLOCATION_TABLE = 'residuos_municipios'
+ALLOCATION_META_TABLE = 'residuos_municipios_meta'
+
+SCENARIOS = ['Pessimista', 'Realista', 'Otimista', 'Teórico (100%)']
+
+# Scenario → factor column of residuos (None = 100%)
+SCENARIO_FACTOR_COLUMNS = {
+    'Pessimista': 'fator_pessimista',
+    'Realista': 'fator_realista',
+    'Otimista': 'fator_otimista',
+    'Teórico (100%)': None,
+}
+
+# Scenario → prefix of the sector CH4 columns of municipios (cp2b_panorama.db)
+SCENARIO_CH4_PREFIXES = {
+    'Pessimista': 'ch4_pes',
+    'Realista': 'ch4_rea',
+    'Otimista': 'ch4_oti',
+}
+
+# Sector code → suffix of the CH4 columns of municipios. The industrial sector
+# has no column of its own: it gets whatever the total leaves to the others.
+SECTOR_CH4_SUFFIXES = {
+    'AG_AGRICULTURA': 'agricultura',
+    'PC_PECUARIA': 'pecuaria',
+    'UR_URBANO': 'urbano',
+}
+RESIDUAL_SECTOR = 'IN_INDUSTRIAL'
+
+
+@dataclass
+class ResidueAllocation:
+    """
+    Sparse per-residue municipal allocation.
+
+    `weights` is a (n_residues × n_municipalities) CSR matrix whose rows sum
+    to 1 (or 0 when the driver is empty); `totals` is (n_residues × n_scenarios).
+    """
+    residue_codes: List[str]
+    municipality_codes: np.ndarray
+    scenarios: List[str]
+    weights: sparse.csr_matrix
+    totals: np.ndarray
+    drivers: List[str]
+    metadata: Dict[str, object] = field(default_factory=dict)
+
+    def potential(self, scenario: str) -> sparse.csr_matrix:
+        """(residue × municipality) CH4 potential [m³/ano] for one scenario."""
+        s = self.scenarios.index(scenario)
+        return sparse.diags(self.totals[:, s]) @ self.weights
+
+    def municipal_cube(self, municipality_codes: Sequence[int], scenarios: Sequence[str]) -> np.ndarray:
+        """
+        Dense (municipality × residue × scenario) CH4 potential [m³/ano].
+
+        Rows follow `municipality_codes` (e.g. load_all_municipalities()
+        order); codes missing from the allocation get zeros.
+        """
+        position = pd.Index(self.municipality_codes).get_indexer(np.asarray(municipality_codes, dtype=np.int64))
+        found = position >= 0
+        cube = np.zeros((len(position), len(self.residue_codes), len(scenarios)))
+        for s, scenario in enumerate(scenarios):
+            dense = self.potential(scenario).toarray()  # (r, m)
+            cube[found, :, s] = dense[:, position[found]].T
+        return cube
+
+    def fingerprint(self) -> str:
+        """Hash of weights, totals and layout (used to skip unchanged rewrites)."""
+        digest = hashlib.sha1()
+        digest.update('|'.join(self.residue_codes).encode())
+        digest.update(np.ascontiguousarray(self.municipality_codes, dtype=np.int64).tobytes())
+        for arr in (self.weights.indptr, self.weights.indices, np.round(self.weights.data, 12), np.round(self.totals, 3)):
+            digest.update(np.ascontiguousarray(arr).tobytes())
+        return digest.hexdigest()
+
+    def to_long_frame(self) -> pd.DataFrame:
+        """Non-zero cells as (residuo_codigo, codigo_municipio, cenario, peso, ch4_m3_ano)."""
+        coo = self.weights.tocoo()
+        frames = []
+        for s, scenario in enumerate(self.scenarios):
+            frames.append(pd.DataFrame({
+                'residuo_codigo': np.asarray(self.residue_codes, dtype=object)[coo.row],
+                'codigo_municipio': self.municipality_codes[coo.col],
+                'cenario': scenario,
+                'peso': coo.data,
+                'ch4_m3_ano': coo.data * self.totals[coo.row, s],
+            }))
+        return pd.concat(frames, ignore_index=True)
+
+
+class ResidueAllocator:
+    """
+    Driver-based disaggregation of residue potentials.
+
+    Example:
+        >>> allocation = ResidueAllocator.build(df_residuos, df_municipios, df_drivers)
+        >>> realista = allocation.potential('Realista')           # sparse (r × m)
+        >>> ResidueAllocator.persist(conn, allocation)
+        >>> ResidueAllocator.top_municipalities(conn, 'VINHACA', limit=20)
+    """
+
+    @staticmethod
+    def build_weight_matrix(
+        residue_codes: Sequence[str],
+        df_drivers: pd.DataFrame
+    ) -> sparse.csr_matrix:
+        """
+        Row-normalized sparse (residue × municipality) weight matrix.
+
+        Args:
+            residue_codes: Residue codes (row order)
+            df_drivers: municipalities table of cp2b_maps.db (driver columns,
+                        rows in municipality order)
+
+        Returns:
+            CSR matrix; rows of residues whose driver sums to zero are empty
+        """
+        drivers = [get_residue_driver(code) for code in residue_codes]
+        unique = list(dict.fromkeys(drivers))
+        values = np.column_stack([
+            pd.to_numeric(df_drivers[col], errors='coerce').fillna(0.0).clip(lower=0.0).to_numpy()
+            for col in unique
+        ])
+        sums = values.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            shares = np.where(sums > 0, values / sums, 0.0)
+
+        # (driver × municipality) shares, then one row per residue via a selection matrix
+        selector = sparse.csr_matrix(
+            (np.ones(len(drivers)), (np.arange(len(drivers)), [unique.index(d) for d in drivers])),
+            shape=(len(drivers), len(unique))
+        )
+        return (selector @ sparse.csr_matrix(shares.T)).tocsr()
+
+    @staticmethod
+    def sector_totals(df_municipios: pd.DataFrame, scenario: str) -> Dict[str, float]:
+        """
+        State CH4 potential per sector for one scenario [m³/ano].
+
+        The residual sector (industrial) gets the scenario total minus the
+        explicit sectors, so the sectors add up to ch4_<cenário>_total.
+        """
+        prefix = SCENARIO_CH4_PREFIXES[scenario]
+
+        def column_sum(col: str) -> float:
+            if col not in df_municipios.columns:
+                return 0.0
+            return float(pd.to_numeric(df_municipios[col], errors='coerce').fillna(0.0).sum())
+
+        totals = {sector: column_sum(f'{prefix}_{suffix}') for sector, suffix in SECTOR_CH4_SUFFIXES.items()}
+        totals[RESIDUAL_SECTOR] = max(column_sum(f'{prefix}_total') - sum(totals.values()), 0.0)
+        return totals
+
+    @staticmethod
+    def sector_shares(df_residuos: pd.DataFrame, factor: np.ndarray) -> np.ndarray:
+        """
+        Share of each residue in its sector total.
+
+        Weighted by scenario factor × BMP (bmp_medio; missing BMPs take the
+        sector median). Within a sector the shares sum to 1; a sector whose
+        weights are all zero is split evenly.
+        """
+        sectors = df_residuos['setor'].fillna(RESIDUAL_SECTOR)
+        if 'bmp_medio' in df_residuos.columns:
+            bmp = pd.to_numeric(df_residuos['bmp_medio'], errors='coerce')
+            bmp = bmp.fillna(bmp.groupby(sectors).transform('median')).fillna(1.0).clip(lower=0.0)
+        else:
+            bmp = pd.Series(1.0, index=df_residuos.index)
+
+        weight = pd.Series(np.clip(factor, 0.0, None) * bmp.to_numpy(), index=df_residuos.index)
+        sector_weight = weight.groupby(sectors).transform('sum')
+        sector_size = weight.groupby(sectors).transform('size')
+        shares = np.where(sector_weight > 0, weight / sector_weight.where(sector_weight > 0, 1.0), 1.0 / sector_size)
+        return np.asarray(shares, dtype=float)
+
+    @staticmethod
+    def residue_totals(df_residuos: pd.DataFrame, df_municipios: pd.DataFrame) -> np.ndarray:
+        """
+        State potential per residue and scenario [m³ CH4/ano].
+
+        Each sector total of the scenario (ch4_pes/rea/oti_<setor>) is split
+        among the sector's residues by sector_shares(), so residues never
+        double-count their sector. Teórico (100%) has no sector columns: it
+        is the Realista total without the residue's availability factor.
+
+        Returns:
+            (n_residues × n_scenarios) array in SCENARIOS order
+        """
+        sectors = df_residuos['setor'].fillna(RESIDUAL_SECTOR)
+        sectors = sectors.where(sectors.isin(list(SECTOR_CH4_SUFFIXES) + [RESIDUAL_SECTOR]), RESIDUAL_SECTOR)
+
+        def factor(scenario: str) -> np.ndarray:
+            col = SCENARIO_FACTOR_COLUMNS[scenario]
+            return pd.to_numeric(df_residuos[col], errors='coerce').fillna(0.0).to_numpy(dtype=float)
+
+        totals = np.zeros((len(df_residuos), len(SCENARIOS)))
+        for s, scenario in enumerate(SCENARIOS):
+            if scenario not in SCENARIO_CH4_PREFIXES:
+                continue
+            base = sectors.map(ResidueAllocator.sector_totals(df_municipios, scenario)).to_numpy(dtype=float)
+            totals[:, s] = base * ResidueAllocator.sector_shares(df_residuos.assign(setor=sectors), factor(scenario))
+
+        realista = factor('Realista')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            theoretical = np.where(realista > 0, totals[:, SCENARIOS.index('Realista')] / realista, 0.0)
+        totals[:, SCENARIOS.index('Teórico (100%)')] = theoretical
+        return totals
+
+    @staticmethod
+    def build(
+        df_residuos: pd.DataFrame,
+        df_municipios: pd.DataFrame,
+        df_drivers: pd.DataFrame
+    ) -> ResidueAllocation:
+        """
+        Build the allocation for all residues.
+
+        Args:
+            df_residuos: residuos table (codigo, setor, bmp_medio, fator_* columns)
+            df_municipios: municipios table of cp2b_panorama.db (sector CH4 columns)
+            df_drivers: municipalities table of cp2b_maps.db (driver columns)
+        """
+        codes = df_residuos['codigo'].astype(str).tolist()
+        return ResidueAllocation(
+            residue_codes=codes,
+            municipality_codes=df_drivers['codigo_municipio'].to_numpy(dtype=np.int64),
+            scenarios=list(SCENARIOS),
+            weights=ResidueAllocator.build_weight_matrix(codes, df_drivers),
+            totals=ResidueAllocator.residue_totals(df_residuos, df_municipios),
+            drivers=[get_residue_driver(code) for code in codes],
+        )
+
+    @staticmethod
+    def load(panorama_conn: sqlite3.Connection, maps_conn: sqlite3.Connection) -> ResidueAllocation:
+        """Build the allocation from the two databases."""
+        return ResidueAllocator.build(
+            pd.read_sql("SELECT * FROM residuos", panorama_conn),
+            pd.read_sql("SELECT * FROM municipios", panorama_conn),
+            pd.read_sql("SELECT * FROM municipalities ORDER BY codigo_municipio", maps_conn),
+        )
+
+    @staticmethod
+    def persist(conn: sqlite3.Connection, allocation: ResidueAllocation) -> bool:
+        """
+        Write the long-format table when its content changed.
+
+        Returns:
+            True if the table was rewritten, False if it was already current
+        """
+        conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS {ALLOCATION_TABLE} (
+                residuo_codigo TEXT NOT NULL,
+                codigo_municipio INTEGER NOT NULL,
+                cenario TEXT NOT NULL,
+                peso REAL NOT NULL,
+                ch4_m3_ano REAL NOT NULL,
+                PRIMARY KEY (residuo_codigo, cenario, codigo_municipio)
+            );
+            CREATE INDEX IF NOT EXISTS idx_residuos_municipios_rank
+                ON {ALLOCATION_TABLE}(residuo_codigo, cenario, ch4_m3_ano DESC);
+            CREATE INDEX IF NOT EXISTS idx_residuos_municipios_municipio
+                ON {ALLOCATION_TABLE}(codigo_municipio, cenario);
+            CREATE TABLE IF NOT EXISTS {ALLOCATION_META_TABLE} (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                fingerprint TEXT NOT NULL
+            );
+        """)
+        fingerprint = allocation.fingerprint()
+        row = conn.execute(f"SELECT fingerprint FROM {ALLOCATION_META_TABLE} WHERE id = 1").fetchone()
+        if row and row[0] == fingerprint:
+            return False
+
+        frame = allocation.to_long_frame()
+        with conn:
+            conn.execute(f"DELETE FROM {ALLOCATION_TABLE}")
+            conn.executemany(
+                f"INSERT INTO {ALLOCATION_TABLE} (residuo_codigo, codigo_municipio, cenario, peso, ch4_m3_ano) "
+                f"VALUES (?, ?, ?, ?, ?)",
+                frame.itertuples(index=False, name=None)
+            )
+            conn.execute(
+                f"INSERT OR REPLACE INTO {ALLOCATION_META_TABLE} (id, fingerprint) VALUES (1, ?)", (fingerprint,)
+            )
+        return True
+
+    @staticmethod
+    def top_municipalities(
+        conn: sqlite3.Connection,
+        residue_code: str,
+        scenario: str = 'Realista',
+        limit: int = 20
+    ) -> List[Dict]:
+        """
+        Top municipalities of one residue from the persisted table.
+
+        Returns:
+            list of dicts: code, name, production_nm3, energy_mwh
+        """
+        rows = conn.execute(f"""
+            SELECT a.codigo_municipio, m.nome_municipio, a.ch4_m3_ano
+            FROM {ALLOCATION_TABLE} a
+            LEFT JOIN municipios m ON m.codigo_municipio = a.codigo_municipio
+            WHERE a.residuo_codigo = ? AND a.cenario = ? AND a.ch4_m3_ano > 0
+            ORDER BY a.ch4_m3_ano DESC
+            LIMIT ?
+        """, (residue_code, scenario, limit)).fetchall()
+        return [
+            {
+                'code': row[0],
+                'name': row[1],
+                'production_nm3': row[2],
+                'energy_mwh': row[2] * 10 / 1000,
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def rank_municipalities(
+        allocation: ResidueAllocation,
+        names: Dict[int, str],
+        residue_code: str,
+        scenario: str = 'Realista',
+        limit: int = 20
+    ) -> List[Dict]:
+        """
+        Top municipalities of one residue from an in-memory allocation.
+
+        Same output as top_municipalities(), for databases without the table.
+
+        Args:
+            allocation: Output of build()/load()
+            names: codigo_municipio → nome_municipio
+
+        Returns:
+            list of dicts: code, name, production_nm3, energy_mwh
+        """
+        if residue_code not in allocation.residue_codes:
+            return []
+        row = allocation.potential(scenario).getrow(allocation.residue_codes.index(residue_code)).toarray().ravel()
+        order = np.argsort(row, kind='stable')[::-1][:limit]
+        return [
+            {
+                'code': int(allocation.municipality_codes[j]),
+                'name': names.get(int(allocation.municipality_codes[j])),
+                'production_nm3': float(row[j]),
+                'energy_mwh': float(row[j]) * 10 / 1000,
+            }
+            for j in order
+            if row[j] > 0
+        ]
@@ -0,0 +1,315 @@
+"""
+Residue Similarity Service
+CP2B (Centro Paulista de Estudos em Biogás e Bioprodutos)
+
+Single Responsibility: Identify which known residues a measured sample resembles.
+Builds standardized parameter vectors (TS, VS, BMP, C:N, pH, DQO) for every residue
+of the knowledge base and answers top-k nearest-neighbor queries.
+
+Methodology:
+- Knowledge base: residuos (cp2b_panorama.db) means, completed with medians of the
+  validated chemical_parameters (CP2B_Precision_Biogas.db) for the mapped residues
+- Standardization: z_j = (x_j - μ_j) / σ_j over the knowledge base (σ_j from the
+  validated measurements when fewer than 3 residues have the parameter)
+- Distance (missing-aware): d² = Σ_{j∈O} (z_q,j - z_r,j)² + δ² · |Q \ O|
+  where Q are the parameters of the sample, O ⊆ Q those the residue also has
+  and δ = MISSING_PENALTY: a parameter the residue cannot confirm counts as a
+  disagreement of δ standard deviations, so low overlap never wins by default
+- Search: for each sample missingness pattern Q, residues are grouped by the
+  subset O of Q they have; one cKDTree per group over exactly those dimensions
+  (no imputation). The penalty is constant within a group, so per-group
+  candidates carry exact distances and are merged into the top-k
+- Agreement per parameter: |z_q - z_r| ≤ 1 'alta', ≤ 2 'média', else 'baixa'
+
+SOLID Compliance:
+- Single Responsibility: Only similarity search
+- Open/Closed: New parameters are entries of FEATURES
+- Dependency Inversion: Index is built from DataFrames; data access is isolated
+"""
+
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+
+# Feature → (coluna em residuos, parameter_name no banco de precisão, unidade padrão)
+FEATURES: Dict[str, Tuple[Optional[str], str, str]] = {
+    'ts': ('ts_medio', 'TS', '%'),
+    'vs': ('vs_medio', 'VS', '% TS'),
+    'bmp': ('bmp_medio', 'BMP', 'mL CH₄/g VS'),
+    'cn_ratio': ('chemical_cn_ratio', 'CN_RATIO', 'unitless'),
+    'ph': (None, 'pH', 'unitless'),
+    'cod': (None, 'COD', 'g/L'),
+}
+
+# Conversions of lab-form units to the standard units above
+INPUT_UNIT_FACTORS = {
+    'cod': 1.0 / 1000.0,  # formulário em mg/L → g/L
+}
+
+MIN_RESIDUES_FOR_SCALE = 3
+
+# Distance (z-units) charged for each sample parameter the residue lacks
+MISSING_PENALTY = 2.0
+
+
+@dataclass
+class SimilarityIndex:
+    """
+    Standardized knowledge base ready for nearest-neighbor queries.
+
+    `vectors` is (n_residues × n_features) in z-units with NaN for missing values.
+    """
+    codes: List[str]
+    names: List[str]
+    features: List[str]
+    mean: np.ndarray
+    scale: np.ndarray
+    vectors: np.ndarray
+    version: str = ''
+    _trees: Dict[Tuple[bool, ...], List[Tuple[np.ndarray, np.ndarray, cKDTree]]] = field(
+        default_factory=dict, repr=False
+    )
+
+    def standardize(self, values: np.ndarray) -> np.ndarray:
+        """Raw (n × features) values → z-units."""
+        return (np.asarray(values, dtype=float) - self.mean) / self.scale
+
+    def _trees_for(self, pattern: Tuple[bool, ...]) -> List[Tuple[np.ndarray, np.ndarray, cKDTree]]:
+        """
+        KD-trees for a query pattern (cached).
+
+        Residues are grouped by which of the pattern's dimensions they have;
+        each group gets a tree over exactly those dimensions.
+
+        Returns:
+            list of (residue rows, dimensions, tree); residues sharing no
+            dimension with the pattern are left out
+        """
+        if pattern not in self._trees:
+            dims = np.flatnonzero(pattern)
+            groups: Dict[Tuple[bool, ...], List[int]] = {}
+            for i, row in enumerate(~np.isnan(self.vectors[:, dims])):
+                groups.setdefault(tuple(row), []).append(i)
+
+            entries = []
+            for subset, members in groups.items():
+                if not any(subset):
+                    continue
+                rows = np.asarray(members)
+                sub_dims = dims[np.asarray(subset)]
+                entries.append((rows, sub_dims, cKDTree(self.vectors[np.ix_(rows, sub_dims)])))
+            self._trees[pattern] = entries
+        return self._trees[pattern]
+
+
+class ResidueSimilarity:
+    """
+    Nearest-neighbor identification of lab samples.
+
+    Example:
+        >>> index = ResidueSimilarity.build_index(df_residuos, df_precision)
+        >>> ResidueSimilarity.query(index, {'ts': 3.0, 'vs': 70, 'ph': 4.5, 'cod': 45000}, k=5)
+        >>> ResidueSimilarity.query_batch(index, samples_wide, k=3)
+    """
+
+    @staticmethod
+    def build_index(
+        df_residuos: pd.DataFrame,
+        df_precision: Optional[pd.DataFrame] = None,
+        precision_mapping: Optional[Mapping[str, int]] = None,
+        version: str = ''
+    ) -> SimilarityIndex:
+        """
+        Build the standardized knowledge base.
+
+        Args:
+            df_residuos: residuos table (codigo, nome and FEATURES columns)
+            df_precision: chemical_parameters rows with residue_id, parameter_name,
+                          unit, value (standardized) - optional
+            precision_mapping: residuos.codigo → precision residue_id
+            version: DB version tag stored with the index
+
+        Returns:
+            SimilarityIndex
+        """
+        codes = df_residuos['codigo'].astype(str).tolist()
+        raw = np.full((len(codes), len(FEATURES)), np.nan)
+        for j, (feature, (column, _, _)) in enumerate(FEATURES.items()):
+            if column and column in df_residuos.columns:
+                raw[:, j] = pd.to_numeric(df_residuos[column], errors='coerce').to_numpy()
+        raw[raw <= 0] = np.nan
+
+        measurement_std = {}
+        if df_precision is not None and not df_precision.empty and precision_mapping:
+            medians = ResidueSimilarity._precision_medians(df_precision)
+            measurement_std = df_precision.dropna(subset=['value']).groupby(['parameter_name', 'unit'])['value'].std()
+            ids = pd.Series(codes).map(precision_mapping)
+            for j, (feature, (_, parameter, unit)) in enumerate(FEATURES.items()):
+                if (parameter, unit) not in medians.columns:
+                    continue
+                filled = ids.map(medians[(parameter, unit)]).to_numpy(dtype=float)
+                raw[:, j] = np.where(np.isnan(raw[:, j]), filled, raw[:, j])
+
+        with np.errstate(invalid='ignore'):
+            known = (~np.isnan(raw)).sum(axis=0)
+            mean = np.where(known > 0, np.nansum(raw, axis=0) / np.maximum(known, 1), 0.0)
+            scale = np.sqrt(np.nansum((raw - mean) ** 2, axis=0) / np.maximum(known, 1))
+
+        # Too few residues to estimate the spread: use the spread of the measurements
+        for j, (_, (_, parameter, unit)) in enumerate(FEATURES.items()):
+            if known[j] < MIN_RESIDUES_FOR_SCALE or not scale[j] > 0:
+                fallback = measurement_std.get((parameter, unit), np.nan) if len(measurement_std) else np.nan
+                scale[j] = fallback if np.isfinite(fallback) and fallback > 0 else (abs(mean[j]) or 1.0)
+
+        return SimilarityIndex(
+            codes=codes,
+            names=df_residuos['nome'].astype(str).tolist(),
+            features=list(FEATURES),
+            mean=mean,
+            scale=scale,
+            vectors=(raw - mean) / scale,
+            version=version,
+        )
+
+    @staticmethod
+    def _precision_medians(df_precision: pd.DataFrame) -> pd.DataFrame:
+        """Median value per residue_id × (parameter, unit)."""
+        values = df_precision.dropna(subset=['value'])
+        return values.pivot_table(index='residue_id', columns=['parameter_name', 'unit'],
+                                  values='value', aggfunc='median')
+
+    @staticmethod
+    def load_index(panorama_db: Path, precision_db: Optional[Path] = None, version: str = '') -> SimilarityIndex:
+        """Build the index from cp2b_panorama.db and CP2B_Precision_Biogas.db."""
+        from src.adapters.precision_db_adapter import PrecisionDatabaseAdapter
+        from src.utils.residue_resolver import precision_mapping
+
+        conn = sqlite3.connect(str(panorama_db))
+        try:
+            df_residuos = pd.read_sql("SELECT * FROM residuos", conn)
+        finally:
+            conn.close()
+
+        df_precision = None
+        precision_db = precision_db or PrecisionDatabaseAdapter.DB_PATH
+        if Path(precision_db).exists():
+            conn = sqlite3.connect(str(precision_db))
+            try:
+                df_precision = pd.read_sql("""
+                    SELECT residue_id, parameter_name,
+                           COALESCE(unit_standardized, unit) AS unit,
+                           COALESCE(value_standardized, value_mean) AS value
+                    FROM chemical_parameters
+                """, conn)
+            finally:
+                conn.close()
+
+        return ResidueSimilarity.build_index(
+            df_residuos, df_precision, precision_mapping(), version
+        )
+
+    @staticmethod
+    def prepare_samples(samples: pd.DataFrame) -> np.ndarray:
+        """
+        Wide sample table (one column per feature, lab-form units) → raw matrix.
+
+        Missing columns and non-positive values become NaN.
+        """
+        raw = np.full((len(samples), len(FEATURES)), np.nan)
+        for j, feature in enumerate(FEATURES):
+            if feature in samples.columns:
+                raw[:, j] = pd.to_numeric(samples[feature], errors='coerce').to_numpy() * INPUT_UNIT_FACTORS.get(feature, 1.0)
+        raw[raw <= 0] = np.nan
+        return raw
+
+    @staticmethod
+    def query_batch(
+        index: SimilarityIndex,
+        samples: pd.DataFrame,
+        k: int = 5,
+        sample_ids: Optional[List] = None
+    ) -> pd.DataFrame:
+        """
+        Top-k residues for every sample.
+
+        Args:
+            index: Output of build_index()/load_index()
+            samples: Wide table, one row per sample, columns from FEATURES
+            k: Matches per sample
+            sample_ids: Identifier per row (default: 'sample_id' column or row number)
+
+        Returns:
+            DataFrame: sample_id, rank, codigo, residuo, distancia, similaridade,
+            parametros_comparados, and concordancia_<feature> per feature
+        """
+        query = index.standardize(ResidueSimilarity.prepare_samples(samples))
+        if sample_ids is None:
+            sample_ids = samples['sample_id'].tolist() if 'sample_id' in samples.columns else list(range(len(samples)))
+        k = min(k, len(index.codes))
+
+        observed = ~np.isnan(query)
+        patterns = pd.Series([tuple(row) for row in observed])
+        frames = []
+
+        for pattern, rows in patterns.groupby(patterns).groups.items():
+            rows = np.asarray(list(rows))
+            dims = np.flatnonzero(pattern)
+            if dims.size == 0:
+                continue
+
+            # Exact distances per residue group, merged into the top-k
+            cand_rows, cand_dist, cand_common = [], [], []
+            for members, sub_dims, tree in index._trees_for(pattern):
+                n_query = min(k, len(members))
+                d, pos = tree.query(query[np.ix_(rows, sub_dims)], k=n_query)
+                d = np.asarray(d).reshape(len(rows), n_query)
+                pos = np.asarray(pos).reshape(len(rows), n_query)
+                penalty = MISSING_PENALTY ** 2 * (dims.size - sub_dims.size)
+                cand_rows.append(members[pos])
+                cand_dist.append(np.sqrt(d ** 2 + penalty))
+                cand_common.append(np.full(pos.shape, sub_dims.size))
+            if not cand_rows:
+                continue
+
+            candidates = np.concatenate(cand_rows, axis=1)
+            dist = np.concatenate(cand_dist, axis=1)
+            n_common = np.concatenate(cand_common, axis=1)
+            k_pattern = min(k, candidates.shape[1])
+
+            order = np.argsort(dist, axis=1, kind='stable')[:, :k_pattern]
+            top = np.take_along_axis(candidates, order, axis=1)
+            top_dist = np.take_along_axis(dist, order, axis=1)
+            top_common = np.take_along_axis(n_common, order, axis=1)
+
+            full_diff = np.abs(query[rows][:, None, :] - index.vectors[top])  # (rows, k, features)
+            labels = np.select([full_diff <= 1.0, full_diff <= 2.0], ['alta', 'média'], default='baixa')
+            labels = np.where(np.isnan(full_diff), None, labels)
+
+            frame = pd.DataFrame({
+                'sample_id': np.repeat(np.asarray(sample_ids, dtype=object)[rows], k_pattern),
+                'rank': np.tile(np.arange(1, k_pattern + 1), len(rows)),
+                'codigo': np.asarray(index.codes, dtype=object)[top].ravel(),
+                'residuo': np.asarray(index.names, dtype=object)[top].ravel(),
+                'distancia': top_dist.ravel(),
+                'similaridade': 1.0 / (1.0 + top_dist.ravel()),
+                'parametros_comparados': top_common.ravel(),
+            })
+            for j, feature in enumerate(index.features):
+                frame[f'concordancia_{feature}'] = labels[:, :, j].ravel()
+            frames.append(frame)
+
+        if not frames:
+            return pd.DataFrame(columns=['sample_id', 'rank', 'codigo', 'residuo', 'distancia',
+                                         'similaridade', 'parametros_comparados'])
+        return pd.concat(frames, ignore_index=True).sort_values(['sample_id', 'rank']).reset_index(drop=True)
+
+    @staticmethod
+    def query(index: SimilarityIndex, values: Mapping[str, float], k: int = 5) -> pd.DataFrame:
+        """Top-k residues for a single sample given as {feature: value}."""
+        return ResidueSimilarity.query_batch(index, pd.DataFrame([dict(values)]), k=k).drop(columns='sample_id')
@@ -0,0 +1,199 @@
+"""
+Seasonality Analyzer Service
+CP2B (Centro Paulista de Estudos em Biogás e Bioprodutos)
+
+Single Responsibility: Expand annual potentials into monthly flows and size hubs by peak month.
+Annual municipal potentials (municipality × residue) are broadcast against a
+(residue × month) profile matrix into a (municipality × residue × month) cube.
+Hubs are then sized from their peak monthly flow, and the storage needed to run
+a plant at a given capacity is computed with the sequent-peak method.
+
+SOLID Compliance:
+- Single Responsibility: Only temporal disaggregation and hub sizing
+- Open/Closed: Profiles live in src/data/seasonal_profiles.py; new residues need no code change
+- Dependency Inversion: Works on arrays + residue table, not on the database
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.data.seasonal_profiles import MONTHS, get_seasonal_profile
+
+
+DAYS_PER_MONTH = np.array([31, 28.25, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+@dataclass
+class SeasonalHubSizing:
+    """
+    Monthly flows and sizing indicators per hub.
+
+    `monthly_m3` has shape (n_hubs, 12); `summary` has one row per hub.
+    """
+    hubs: np.ndarray
+    monthly_m3: np.ndarray
+    summary: pd.DataFrame
+    metadata: Dict[str, object] = field(default_factory=dict)
+
+
+class SeasonalityAnalyzer:
+    """
+    Monthly availability expansion and peak-based hub sizing.
+
+    Example:
+        >>> profiles = SeasonalityAnalyzer.build_profile_matrix(residues)
+        >>> monthly = SeasonalityAnalyzer.expand_monthly(annual_ch4, profiles)   # (m, r, 12)
+        >>> hubs = SeasonalityAnalyzer.grid_hubs(df['lat'], df['lon'], cell_km=50)
+        >>> sizing = SeasonalityAnalyzer.size_hubs(monthly, hubs)
+        >>> sizing.summary.nlargest(5, 'pico_m3_dia')
+    """
+
+    @staticmethod
+    def build_profile_matrix(residues: pd.DataFrame) -> np.ndarray:
+        """
+        Build the (residue × month) profile matrix.
+
+        Args:
+            residues: Residue table with 'name' and optionally 'subsetor' (culture)
+                      and 'fs' columns (see EnvironmentalBalanceCalculator.build_residue_profiles)
+
+        Returns:
+            np.ndarray of shape (n_residues, 12); each row sums to 1
+        """
+        cultures = residues['subsetor'] if 'subsetor' in residues.columns else [None] * len(residues)
+        fs_values = residues['fs'] if 'fs' in residues.columns else [None] * len(residues)
+
+        return np.array([
+            get_seasonal_profile(name, culture=culture, fs=fs)
+            for name, culture, fs in zip(residues['name'], cultures, fs_values)
+        ], dtype=float)
+
+    @staticmethod
+    def expand_monthly(annual: np.ndarray, profiles: np.ndarray) -> np.ndarray:
+        """
+        Broadcast annual potentials into monthly flows.
+
+        Args:
+            annual: (municipality × residue) annual amounts
+            profiles: (residue × 12) monthly shares
+
+        Returns:
+            np.ndarray of shape (municipality, residue, 12)
+        """
+        annual = np.asarray(annual, dtype=float)
+        if annual.shape[-1] != profiles.shape[0]:
+            raise ValueError(
+                f"Annual array has {annual.shape[-1]} residues, profiles have {profiles.shape[0]}"
+            )
+        return annual[..., None] * profiles[None, :, :]
+
+    @staticmethod
+    def grid_hubs(lat: Sequence[float], lon: Sequence[float], cell_km: float = 50.0) -> np.ndarray:
+        """
+        Group municipalities into square grid-cell hubs.
+
+        Args:
+            lat, lon: Municipality centroids (degrees)
+            cell_km: Cell size in km
+
+        Returns:
+            np.ndarray of hub labels ('H<row>_<col>'), one per municipality
+        """
+        lat = np.nan_to_num(np.asarray(lat, dtype=float))
+        lon = np.nan_to_num(np.asarray(lon, dtype=float))
+        cell_lat = cell_km / 111.0
+        cell_lon = cell_km / (111.0 * np.cos(np.deg2rad(np.mean(lat) if lat.size else 0.0)))
+        rows = np.floor(lat / cell_lat).astype(int)
+        cols = np.floor(lon / cell_lon).astype(int)
+        return np.char.add(np.char.add('H', rows.astype(str)), np.char.add('_', cols.astype(str)))
+
+    @staticmethod
+    def storage_required(monthly: np.ndarray, capacity_per_month: np.ndarray) -> np.ndarray:
+        """
+        Storage needed to process a seasonal inflow at constant capacity (sequent peak).
+
+        The year is simulated twice so that the carry-over from the end of one
+        season into the next is included.
+
+        Args:
+            monthly: (n, 12) inflows
+            capacity_per_month: (n,) plant throughput per month
+
+        Returns:
+            (n,) maximum stored volume, same unit as inflows
+        """
+        monthly = np.asarray(monthly, dtype=float)
+        capacity = np.asarray(capacity_per_month, dtype=float)
+        stored = np.zeros(monthly.shape[0])
+        peak = np.zeros(monthly.shape[0])
+        for month in range(24):
+            stored = np.maximum(0.0, stored + monthly[:, month % 12] - capacity)
+            peak = np.maximum(peak, stored)
+        return peak
+
+    @staticmethod
+    def size_hubs(
+        monthly: np.ndarray,
+        hub_labels: Optional[Sequence] = None,
+        design_capacity_fraction: float = 1.0
+    ) -> SeasonalHubSizing:
+        """
+        Aggregate monthly flows per hub and compute peak capacity and storage.
+
+        Args:
+            monthly: (municipality × residue × 12) cube from expand_monthly()
+            hub_labels: Hub label per municipality (default: each municipality is a hub)
+            design_capacity_fraction: Plant capacity as a fraction of the peak-month
+                flow (1.0 = sized for the peak, no storage needed; smaller values
+                trade capacity for storage)
+
+        Returns:
+            SeasonalHubSizing with (hub × month) flows and a summary table:
+                hub, anual_m3, media_mensal_m3, mes_pico, pico_mensal_m3,
+                pico_m3_dia, fator_pico, capacidade_m3_dia, armazenamento_m3,
+                armazenamento_media_m3
+        """
+        monthly = np.asarray(monthly, dtype=float)
+        n_mun = monthly.shape[0]
+        labels = np.asarray(hub_labels if hub_labels is not None else np.arange(n_mun))
+        hubs, hub_idx = np.unique(labels, return_inverse=True)
+
+        per_municipality = monthly.sum(axis=1)  # (m, 12)
+        hub_monthly = np.zeros((len(hubs), 12))
+        np.add.at(hub_monthly, hub_idx, per_municipality)
+
+        annual = hub_monthly.sum(axis=1)
+        mean_month = annual / 12.0
+        peak_idx = hub_monthly.argmax(axis=1)
+        peak_month = hub_monthly[np.arange(len(hubs)), peak_idx]
+        peak_daily = peak_month / DAYS_PER_MONTH[peak_idx]
+
+        capacity_month = peak_month * design_capacity_fraction
+        storage = SeasonalityAnalyzer.storage_required(hub_monthly, capacity_month)
+        storage_at_mean = SeasonalityAnalyzer.storage_required(hub_monthly, mean_month)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            peak_factor = np.where(mean_month > 0, peak_month / mean_month, np.nan)
+
+        summary = pd.DataFrame({
+            'hub': hubs,
+            'anual_m3': annual,
+            'media_mensal_m3': mean_month,
+            'mes_pico': np.asarray(MONTHS, dtype=object)[peak_idx],
+            'pico_mensal_m3': peak_month,
+            'pico_m3_dia': peak_daily,
+            'fator_pico': peak_factor,
+            'capacidade_m3_dia': capacity_month * 12.0 / 365.25,
+            'armazenamento_m3': storage,
+            'armazenamento_media_m3': storage_at_mean,
+        })
+
+        return SeasonalHubSizing(
+            hubs=hubs,
+            monthly_m3=hub_monthly,
+            summary=summary,
+            metadata={'design_capacity_fraction': design_capacity_fraction}
+        )
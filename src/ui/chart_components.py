@@ -18,6 +18,8 @@ import pandas as pd
 import numpy as np
 from typing import List, Dict, Optional
 
+from src.utils.figure_cache import cached_figure, theme_fingerprint
+
 
 # ============================================================================
 # COLOR SCHEMES - Standardized across all charts
@@ -38,6 +40,10 @@ SECTOR_NAMES = {
 }
 
 
+# Invalidates cached figures whenever the color schemes change
+THEME_VERSION = theme_fingerprint(SECTOR_COLORS, SECTOR_NAMES)
+
+
 def get_sector_color(sector_code: str) -> str:
     """Get color for sector code"""
     return SECTOR_COLORS.get(sector_code, '#6b7280')
@@ -52,6 +58,7 @@ def get_sector_name(sector_code: str) -> str:
 # 1. WATERFALL CHART - FDE Factor Breakdown
 # ============================================================================
 
+@cached_figure(THEME_VERSION)
 def create_waterfall_chart(
     fc: float,
     fcp: float,
@@ -124,6 +131,7 @@ def create_waterfall_chart(
 # 2. BOX PLOTS - Parameter Ranges by Sector
 # ============================================================================
 
+@cached_figure(THEME_VERSION)
 def create_parameter_boxplot(
     df: pd.DataFrame,
     parameter: str,
@@ -194,6 +202,7 @@ def create_parameter_boxplot(
 # 3. VIOLIN PLOTS - Distribution Analysis
 # ============================================================================
 
+@cached_figure(THEME_VERSION)
 def create_violin_plot(
     df: pd.DataFrame,
     parameter: str,
@@ -258,6 +267,7 @@ def create_violin_plot(
 # 4. RADAR CHART - Multi-parameter Sector Comparison
 # ============================================================================
 
+@cached_figure(THEME_VERSION)
 def create_radar_chart(
     sector_data: Dict[str, Dict[str, float]],
     parameters: List[str],
@@ -311,6 +321,7 @@ def create_radar_chart(
 # 5. CORRELATION MATRIX - Heatmap
 # ============================================================================
 
+@cached_figure(THEME_VERSION)
 def create_correlation_matrix(
     df: pd.DataFrame,
     parameters: List[str],
@@ -357,6 +368,7 @@ def create_correlation_matrix(
 # 6. HEATMAP - Geographic/Sector Analysis
 # ============================================================================
 
+@cached_figure(THEME_VERSION)
 def create_sector_heatmap(
     df: pd.DataFrame,
     value_column: str,
@@ -416,6 +428,7 @@ def create_sector_heatmap(
 # 7. 3D SCATTER - Multi-dimensional Relationships
 # ============================================================================
 
+@cached_figure(THEME_VERSION)
 def create_3d_scatter(
     df: pd.DataFrame,
     x_col: str,
@@ -499,6 +512,7 @@ def create_3d_scatter(
 # 8. BAR CHART - BMP Comparison Across All Residues
 # ============================================================================
 
+@cached_figure(THEME_VERSION)
 def create_bmp_comparison_bar(df: pd.DataFrame) -> go.Figure:
     """
     Create bar chart comparing BMP values across all residues, colored by sector.
@@ -5,11 +5,14 @@ CP2B (Centro Paulista de Estudos em Biogás e Bioprodutos)
 Converts CSV data to ResidueData objects and generates Python data files.
 """
 
+import numpy as np
 import pandas as pd
 import re
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+from .residue_ingest import parse_range_column
+
 
 def parse_range(value_str: str) -> Tuple[Optional[float], Optional[float], Optional[float]]:
     """
@@ -152,101 +155,99 @@ def get_residue_icon(residue_name: str, category: str) -> str:
         return "📊"
 
 
-def parse_csv_to_residues(csv_path: str) -> List[Dict]:
+def _prepare_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """Vectorized parsing of one CSV chunk (ranges and text columns)."""
+    df = df[df['Resíduo Principal'].notna()] if 'Resíduo Principal' in df.columns else df.iloc[0:0]
+    parsed = pd.DataFrame(index=df.index)
+
+    def column(name, default=''):
+        return df[name] if name in df.columns else pd.Series(default, index=df.index, dtype=object)
+
+    parsed['name'] = column('Resíduo Principal').astype(str).str.strip()
+    parsed['fonte'] = column('Fonte', 'Cultura').fillna('Cultura')
+    parsed['categoria'] = column('Categoria')
+
+    for prefix, source in [('bmp', 'Potencial Metanogênico (m³ CH₄/ton MS)'),
+                           ('ch4', 'Concentração CH₄ (%)'),
+                           ('cn', 'Relação C/N'),
+                           ('moisture', 'Umidade (%)'),
+                           ('trh', 'TRH (dias)')]:
+        ranges = parse_range_column(column(source, np.nan))
+        for part in ('min', 'mean', 'max'):
+            parsed[f'{prefix}_{part}'] = ranges[part].astype(object).where(ranges[part].notna(), None)
+
+    # str() of a missing cell is 'nan', as in the original row-wise parser
+    for target, source, default in [('generation', 'Produção de Resíduos', 'Dados não disponíveis'),
+                                    ('sazonalidade', 'Sazonalidade', 'Ano todo'),
+                                    ('pre_tratamento', 'Pré-tratamento', 'Não necessário'),
+                                    ('estado_fisico', 'Estado Físico', 'Variável'),
+                                    ('regiao', 'Região SP Concentrada', 'Todo o estado'),
+                                    ('referencias', 'Referências', '')]:
+        parsed[target] = column(source, default).astype(object).map(str)
+
+    return parsed[parsed['name'] != '']
+
+
+def parse_csv_to_residues(csv_path: str, chunksize: int = 5000) -> List[Dict]:
     """
     Parse CSV file and convert to list of residue dictionaries.
 
+    Reads the file in chunks and parses the range columns vectorized
+    (see src/utils/residue_ingest.py).
+
     Args:
         csv_path: Path to CSV file
+        chunksize: Rows per chunk
 
     Returns:
         List of residue data dictionaries
     """
-    df = pd.read_csv(csv_path)
-
     residues = []
 
-    for idx, row in df.iterrows():
-        # Skip empty rows
-        if pd.isna(row.get('Resíduo Principal')):
-            continue
-
-        # Extract data
-        fonte = row.get('Fonte', 'Cultura')
-        categoria = row.get('Categoria', '')
-        residue_name = row.get('Resíduo Principal', '').strip()
-        category = infer_category_from_fonte(fonte)
-
-        if not residue_name:
-            continue
-
-        # Parse BMP
-        bmp_str = str(row.get('Potencial Metanogênico (m³ CH₄/ton MS)', ''))
-        bmp_min, bmp_mean, bmp_max = parse_range(bmp_str)
-
-        # Parse CH4 content
-        ch4_str = str(row.get('Concentração CH₄ (%)', ''))
-        ch4_min, ch4_mean, ch4_max = parse_range(ch4_str)
-
-        # Parse C/N ratio
-        cn_str = str(row.get('Relação C/N', ''))
-        cn_min, cn_mean, cn_max = parse_range(cn_str)
-
-        # Parse moisture
-        moisture = parse_percentage(str(row.get('Umidade (%)', '')))
-
-        # Parse TRH
-        trh_str = str(row.get('TRH (dias)', ''))
-        trh_min, trh_mean, trh_max = parse_range(trh_str)
-
-        # Get other data
-        generation = str(row.get('Produção de Resíduos', 'Dados não disponíveis'))
-        sazonalidade = str(row.get('Sazonalidade', 'Ano todo'))
-        pre_tratamento = str(row.get('Pré-tratamento', 'Não necessário'))
-        estado_fisico = str(row.get('Estado Físico', 'Variável'))
-        regiao = str(row.get('Região SP Concentrada', 'Todo o estado'))
-        referencias = str(row.get('Referências', ''))
-
-        icon = get_residue_icon(residue_name, category)
-
-        residue_data = {
-            'name': residue_name,
-            'category': category,
-            'sub_category': categoria if categoria else category,
-            'icon': icon,
-            'generation': generation,
-            'sazonalidade': sazonalidade,
-            'pre_tratamento': pre_tratamento,
-            'estado_fisico': estado_fisico,
-            'regiao': regiao,
-            'bmp': {
-                'min': bmp_min,
-                'mean': bmp_mean,
-                'max': bmp_max,
-                'unit': 'mL CH₄/g VS'
-            },
-            'ch4_content': {
-                'min': ch4_min,
-                'mean': ch4_mean,
-                'max': ch4_max,
-                'unit': '%'
-            },
-            'cn_ratio': {
-                'min': cn_min,
-                'mean': cn_mean,
-                'max': cn_max
-            },
-            'moisture': moisture,
-            'trh': {
-                'min': trh_min,
-                'mean': trh_mean,
-                'max': trh_max,
-                'unit': 'dias'
-            },
-            'referencias': referencias.split(' e ') if referencias else []
-        }
-
-        residues.append(residue_data)
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        parsed = _prepare_chunk(chunk)
+
+        for row in parsed.to_dict('records'):
+            category = infer_category_from_fonte(row['fonte'])
+            residue_name = row['name']
+            referencias = row['referencias']
+
+            residues.append({
+                'name': residue_name,
+                'category': category,
+                'sub_category': row['categoria'] if row['categoria'] else category,
+                'icon': get_residue_icon(residue_name, category),
+                'generation': row['generation'],
+                'sazonalidade': row['sazonalidade'],
+                'pre_tratamento': row['pre_tratamento'],
+                'estado_fisico': row['estado_fisico'],
+                'regiao': row['regiao'],
+                'bmp': {
+                    'min': row['bmp_min'],
+                    'mean': row['bmp_mean'],
+                    'max': row['bmp_max'],
+                    'unit': 'mL CH₄/g VS'
+                },
+                'ch4_content': {
+                    'min': row['ch4_min'],
+                    'mean': row['ch4_mean'],
+                    'max': row['ch4_max'],
+                    'unit': '%'
+                },
+                'cn_ratio': {
+                    'min': row['cn_min'],
+                    'mean': row['cn_mean'],
+                    'max': row['cn_max']
+                },
+                'moisture': row['moisture_mean'],
+                'trh': {
+                    'min': row['trh_min'],
+                    'mean': row['trh_mean'],
+                    'max': row['trh_max'],
+                    'unit': 'dias'
+                },
+                'referencias': referencias.split(' e ') if referencias else []
+            })
 
     return residues
 
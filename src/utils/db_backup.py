@@ -0,0 +1,315 @@
+"""
+Database Backup Module
+Incremental, page-deduplicated SQLite snapshots.
+
+Snapshots are taken with the SQLite online backup API (sqlite3.Connection.backup)
+in batches of pages, so readers and writers of the live database are only
+blocked for one batch at a time. The snapshot image is split into pages and
+every page is stored once, content-addressed by its SHA-256, in a shared page
+store. A snapshot is a small JSON manifest listing its page hashes, so a new
+snapshot only costs the pages that changed since any previous one.
+
+Store layout (default: <db dir>/backups/<db name>/):
+    manifests/<snapshot_id>.json   page_size, page hashes, label, source
+    pages/<ab>/<sha256>            zlib-compressed page content
+
+Operations: create_snapshot, list_snapshots, restore_snapshot (point-in-time,
+through the backup API into the target), diff_snapshots (pages and per-table
+rows), prune_snapshots (garbage-collects unreferenced pages).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+BACKUP_PAGES_PER_STEP = 256
+BACKUP_SLEEP_SECONDS = 0.005
+MANIFEST_VERSION = 1
+
+PathLike = Union[str, Path]
+
+
+def default_store(db_path: PathLike) -> Path:
+    """Page store of a database: <db dir>/backups/<db name>."""
+    db_path = Path(db_path)
+    return db_path.parent / "backups" / db_path.stem
+
+
+def _image(db_path: PathLike, pages_per_step: int = BACKUP_PAGES_PER_STEP) -> bytes:
+    """Consistent image of a live database, copied with the online backup API."""
+    src = sqlite3.connect(str(db_path))
+    dst = sqlite3.connect(':memory:')
+    try:
+        src.backup(dst, pages=pages_per_step, sleep=BACKUP_SLEEP_SECONDS)
+        return dst.serialize()
+    finally:
+        dst.close()
+        src.close()
+
+
+def _page_path(store: Path, digest: str) -> Path:
+    return store / "pages" / digest[:2] / digest
+
+
+def _manifest_path(store: Path, snapshot_id: str) -> Path:
+    return store / "manifests" / f"{snapshot_id}.json"
+
+
+def create_snapshot(db_path: PathLike, store: Optional[PathLike] = None, label: str = '') -> Dict:
+    """
+    Snapshot a database into the page store.
+
+    Args:
+        db_path: Database to back up (may be in use)
+        store: Page store directory (default: default_store(db_path))
+        label: Free-text reason (e.g. 'pre-migration')
+
+    Returns:
+        Dict: Manifest plus 'manifest_path', 'new_pages' and 'new_bytes'
+    """
+    db_path = Path(db_path)
+    if not db_path.exists():
+        raise FileNotFoundError(f"Database file not found: {db_path}")
+    store = Path(store) if store else default_store(db_path)
+
+    image = _image(db_path)
+    page_size = int.from_bytes(image[16:18], 'big') or 65536
+    hashes = []
+    new_pages = new_bytes = 0
+
+    for offset in range(0, len(image), page_size):
+        page = image[offset:offset + page_size]
+        digest = hashlib.sha256(page).hexdigest()
+        hashes.append(digest)
+        path = _page_path(store, digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            compressed = zlib.compress(page, 6)
+            tmp = path.with_suffix('.tmp')
+            tmp.write_bytes(compressed)
+            os.replace(tmp, path)
+            new_pages += 1
+            new_bytes += len(compressed)
+
+    created = datetime.now()
+    snapshot_id = created.strftime("%Y%m%d_%H%M%S_%f")
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'snapshot_id': snapshot_id,
+        'created_at': created.isoformat(),
+        'label': label,
+        'source': str(db_path),
+        'page_size': page_size,
+        'page_count': len(hashes),
+        'image_sha256': hashlib.sha256(image).hexdigest(),
+        'pages': hashes,
+    }
+    manifest_path = _manifest_path(store, snapshot_id)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps(manifest), encoding='utf-8')
+
+    return {**manifest, 'manifest_path': str(manifest_path), 'new_pages': new_pages, 'new_bytes': new_bytes}
+
+
+def list_snapshots(store: PathLike) -> List[Dict]:
+    """
+    Snapshots in a store, oldest first (without page lists).
+
+    Args:
+        store: Page store directory
+
+    Returns:
+        List[Dict]: snapshot_id, created_at, label, page_count, size_bytes
+    """
+    manifests = sorted((Path(store) / "manifests").glob("*.json"))
+    snapshots = []
+    for path in manifests:
+        manifest = json.loads(path.read_text(encoding='utf-8'))
+        snapshots.append({
+            'snapshot_id': manifest['snapshot_id'],
+            'created_at': manifest['created_at'],
+            'label': manifest.get('label', ''),
+            'page_count': manifest['page_count'],
+            'size_bytes': manifest['page_count'] * manifest['page_size'],
+        })
+    return snapshots
+
+
+def load_manifest(store: PathLike, snapshot_id: str) -> Dict:
+    """Manifest of a snapshot ('latest' selects the newest)."""
+    store = Path(store)
+    if snapshot_id == 'latest':
+        snapshots = list_snapshots(store)
+        if not snapshots:
+            raise FileNotFoundError(f"No snapshots in {store}")
+        snapshot_id = snapshots[-1]['snapshot_id']
+    path = _manifest_path(store, snapshot_id)
+    if not path.exists():
+        raise FileNotFoundError(f"Snapshot not found: {snapshot_id}")
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def snapshot_image(store: PathLike, snapshot_id: str) -> bytes:
+    """
+    Reassemble a snapshot's database image and check it against its hash.
+
+    Raises:
+        ValueError: If a page is missing or the image is corrupt
+    """
+    store = Path(store)
+    manifest = load_manifest(store, snapshot_id)
+    cache: Dict[str, bytes] = {}
+    parts = []
+    for digest in manifest['pages']:
+        if digest not in cache:
+            path = _page_path(store, digest)
+            if not path.exists():
+                raise ValueError(f"Missing page {digest} for snapshot {manifest['snapshot_id']}")
+            cache[digest] = zlib.decompress(path.read_bytes())
+        parts.append(cache[digest])
+    image = b''.join(parts)
+    if hashlib.sha256(image).hexdigest() != manifest['image_sha256']:
+        raise ValueError(f"Snapshot {manifest['snapshot_id']} is corrupt (image hash mismatch)")
+    return image
+
+
+def restore_snapshot(store: PathLike, snapshot_id: str, target_path: PathLike,
+                     pages_per_step: int = BACKUP_PAGES_PER_STEP) -> Dict:
+    """
+    Restore a snapshot into a database file (point-in-time).
+
+    The image is loaded in memory and copied into the target with the backup
+    API, so connections already open on the target see a consistent switch.
+
+    Args:
+        store: Page store directory
+        snapshot_id: Snapshot to restore ('latest' for the newest)
+        target_path: Database file to overwrite (created if missing)
+
+    Returns:
+        Dict: snapshot_id, target, page_count
+    """
+    manifest = load_manifest(store, snapshot_id)
+    image = snapshot_image(store, manifest['snapshot_id'])
+
+    src = sqlite3.connect(':memory:')
+    dst = sqlite3.connect(str(target_path))
+    try:
+        src.deserialize(image)
+        src.backup(dst, pages=pages_per_step, sleep=BACKUP_SLEEP_SECONDS)
+    finally:
+        dst.close()
+        src.close()
+
+    return {'snapshot_id': manifest['snapshot_id'], 'target': str(target_path), 'page_count': manifest['page_count']}
+
+
+def diff_snapshots(store: PathLike, old_id: str, new_id: Optional[str] = None,
+                   db_path: Optional[PathLike] = None) -> Dict:
+    """
+    Compare two snapshots, or a snapshot with the live database.
+
+    Args:
+        store: Page store directory
+        old_id: Base snapshot
+        new_id: Snapshot to compare with (None: use db_path)
+        db_path: Live database (when new_id is None)
+
+    Returns:
+        Dict: pages_changed, page_counts, tables_added, tables_removed and
+        per-table {rows_old, rows_new, rows_added, rows_removed}
+    """
+    old_manifest = load_manifest(store, old_id)
+    old_image = snapshot_image(store, old_manifest['snapshot_id'])
+    if new_id is not None:
+        new_manifest = load_manifest(store, new_id)
+        new_image = snapshot_image(store, new_manifest['snapshot_id'])
+        new_pages = new_manifest['pages']
+    else:
+        new_image = _image(db_path)
+        page_size = old_manifest['page_size']
+        new_pages = [hashlib.sha256(new_image[i:i + page_size]).hexdigest()
+                     for i in range(0, len(new_image), page_size)]
+
+    old_pages = old_manifest['pages']
+    changed = sum(1 for a, b in zip(old_pages, new_pages) if a != b) + abs(len(old_pages) - len(new_pages))
+
+    with tempfile.TemporaryDirectory(prefix='cp2b_diff_') as tmp:
+        old_file, new_file = Path(tmp) / 'old.db', Path(tmp) / 'new.db'
+        old_file.write_bytes(old_image)
+        new_file.write_bytes(new_image)
+        conn = sqlite3.connect(str(old_file))
+        try:
+            conn.execute("ATTACH DATABASE ? AS new", (str(new_file),))
+            old_tables = {r[0] for r in conn.execute(
+                "SELECT name FROM main.sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")}
+            new_tables = {r[0] for r in conn.execute(
+                "SELECT name FROM new.sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")}
+
+            tables = {}
+            for table in sorted(old_tables & new_tables):
+                old_cols = [r[1] for r in conn.execute(f'PRAGMA main.table_info("{table}")')]
+                new_cols = [r[1] for r in conn.execute(f'PRAGMA new.table_info("{table}")')]
+                counts = {
+                    'rows_old': conn.execute(f'SELECT COUNT(*) FROM main."{table}"').fetchone()[0],
+                    'rows_new': conn.execute(f'SELECT COUNT(*) FROM new."{table}"').fetchone()[0],
+                }
+                if old_cols == new_cols:
+                    counts['rows_added'] = conn.execute(
+                        f'SELECT COUNT(*) FROM (SELECT * FROM new."{table}" EXCEPT SELECT * FROM main."{table}")'
+                    ).fetchone()[0]
+                    counts['rows_removed'] = conn.execute(
+                        f'SELECT COUNT(*) FROM (SELECT * FROM main."{table}" EXCEPT SELECT * FROM new."{table}")'
+                    ).fetchone()[0]
+                else:
+                    counts['schema_changed'] = True
+                if counts.get('rows_added') or counts.get('rows_removed') or counts.get('schema_changed'):
+                    tables[table] = counts
+        finally:
+            conn.close()
+
+    return {
+        'old': old_manifest['snapshot_id'],
+        'new': new_id or str(db_path),
+        'pages_changed': changed,
+        'page_counts': (len(old_pages), len(new_pages)),
+        'tables_added': sorted(new_tables - old_tables),
+        'tables_removed': sorted(old_tables - new_tables),
+        'tables_changed': tables,
+    }
+
+
+def prune_snapshots(store: PathLike, keep: int) -> Dict:
+    """
+    Keep the newest snapshots and delete pages no longer referenced.
+
+    Args:
+        store: Page store directory
+        keep: Number of snapshots to keep
+
+    Returns:
+        Dict: snapshots_removed, pages_removed
+    """
+    store = Path(store)
+    snapshots = list_snapshots(store)
+    removed = snapshots[:-keep] if keep > 0 else snapshots
+    for snapshot in removed:
+        _manifest_path(store, snapshot['snapshot_id']).unlink()
+
+    referenced = set()
+    for snapshot in list_snapshots(store):
+        referenced.update(load_manifest(store, snapshot['snapshot_id'])['pages'])
+
+    pages_removed = 0
+    for path in (store / "pages").glob("*/*"):
+        if path.name not in referenced:
+            path.unlink()
+            pages_removed += 1
+
+    return {'snapshots_removed': len(removed), 'pages_removed': pages_removed}
@@ -0,0 +1,341 @@
+"""
+Database Deployment Module
+Blue/green deployment of SQLite databases read by the running app.
+
+A logical database (e.g. data/cp2b_maps.db) can be served from versioned
+files under data/versions/<db name>/. Writers never touch the version readers
+are using:
+
+    1. prepare_version() copies the live version into a side file
+       (<id>.db.building) with the online backup API
+    2. the writer migrates/integrates into the side file
+    3. deploy_version() checks it (PRAGMA integrity_check, foreign keys,
+       optional validators such as verify_database_integrity), renames it to
+       <id>.db and atomically replaces the CURRENT pointer file
+
+Readers call resolve_db_path() on every request (one stat of the pointer);
+get_db_connection reopens its pooled engine when the resolved file changes.
+Superseded versions stay on disk for DRAIN_SECONDS, so in-flight readers
+finish on the file they opened, and the newest KEEP_VERSIONS are kept for
+rollback(). A pointer file is used instead of a symlink because symlinks
+need extra privileges on Windows.
+
+Without a pointer file the logical path itself is the live database.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+PathLike = Union[str, Path]
+
+POINTER_NAME = "CURRENT"
+BUILD_SUFFIX = ".building"
+DRAIN_SECONDS = 900
+KEEP_VERSIONS = 2
+STALE_BUILD_SECONDS = 24 * 3600
+COPY_PAGES_PER_STEP = 256
+
+# Pointer cache: versions dir → ((mtime_ns, size), pointer content)
+_POINTER_CACHE: Dict[str, Tuple[Tuple[int, int], Dict]] = {}
+
+
+def versions_dir(db_path: PathLike) -> Path:
+    """Version directory of a logical database: <db dir>/versions/<db name>."""
+    db_path = Path(db_path)
+    return db_path.parent / "versions" / db_path.stem
+
+
+def read_pointer(db_path: PathLike) -> Optional[Dict]:
+    """
+    Current deployment of a logical database.
+
+    Returns:
+        Dict with 'version', 'file', 'deployed_at' and 'history', or None
+        when the database has never been deployed through this module
+    """
+    pointer = versions_dir(db_path) / POINTER_NAME
+    try:
+        stat = pointer.stat()
+    except FileNotFoundError:
+        return None
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _POINTER_CACHE.get(str(pointer))
+    if cached and cached[0] == signature:
+        return cached[1]
+    content = json.loads(pointer.read_text(encoding='utf-8'))
+    _POINTER_CACHE[str(pointer)] = (signature, content)
+    return content
+
+
+def resolve_db_path(db_path: PathLike) -> Path:
+    """
+    File currently serving a logical database.
+
+    Args:
+        db_path: Logical database path (e.g. data/cp2b_maps.db)
+
+    Returns:
+        Path: Deployed version file, or db_path itself if none is deployed
+    """
+    db_path = Path(db_path)
+    pointer = read_pointer(db_path)
+    if pointer:
+        version_file = versions_dir(db_path) / pointer['file']
+        if version_file.exists():
+            return version_file
+    return db_path
+
+
+def current_version(db_path: PathLike) -> Optional[str]:
+    """Deployed version id of a logical database (None: not deployed)."""
+    pointer = read_pointer(db_path)
+    return pointer['version'] if pointer else None
+
+
+def _copy(source: PathLike, target: PathLike) -> None:
+    """Consistent copy of a live database with the online backup API."""
+    src = sqlite3.connect(str(source))
+    dst = sqlite3.connect(str(target))
+    try:
+        src.backup(dst, pages=COPY_PAGES_PER_STEP, sleep=0.005)
+    finally:
+        dst.close()
+        src.close()
+
+
+def prepare_version(db_path: PathLike) -> Path:
+    """
+    Create a side file to build the next version in.
+
+    Args:
+        db_path: Logical database path
+
+    Returns:
+        Path: Side file (<versions dir>/<id>.db.building), a copy of the live version
+    """
+    db_path = Path(db_path)
+    live = resolve_db_path(db_path)
+    if not live.exists():
+        raise FileNotFoundError(f"Database file not found: {live}")
+
+    directory = versions_dir(db_path)
+    directory.mkdir(parents=True, exist_ok=True)
+    version = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    side = directory / f"{version}.db{BUILD_SUFFIX}"
+    _copy(live, side)
+    return side
+
+
+def check_database(path: PathLike) -> Dict:
+    """
+    Structural checks of a database file.
+
+    Returns:
+        Dict: success, integrity (PRAGMA integrity_check), foreign_key_violations
+    """
+    conn = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        integrity = [row[0] for row in conn.execute("PRAGMA integrity_check")]
+        try:
+            fk_violations = len(conn.execute("PRAGMA foreign_key_check").fetchall())
+            fk_error = None
+        except sqlite3.OperationalError as e:
+            # Declared FK without a matching key in the parent table: a schema
+            # defect, not a data problem - reported, not blocking
+            fk_violations, fk_error = 0, str(e)
+    finally:
+        conn.close()
+    return {
+        'success': integrity == ['ok'] and fk_violations == 0,
+        'integrity': integrity[:10],
+        'foreign_key_violations': fk_violations,
+        'foreign_key_error': fk_error,
+    }
+
+
+def _write_pointer(db_path: Path, content: Dict) -> None:
+    directory = versions_dir(db_path)
+    tmp = directory / f"{POINTER_NAME}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(content, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, directory / POINTER_NAME)
+
+
+def _switch(db_path: Path, version_file: Path, history: List[Dict]) -> Dict:
+    """Point the logical database at a version file and retire the previous one."""
+    now = datetime.now().isoformat()
+    previous = read_pointer(db_path)
+    if previous:
+        for entry in history:
+            if entry['file'] == previous['file'] and not entry.get('retired_at'):
+                entry['retired_at'] = now
+    history = [e for e in history if e['file'] != version_file.name]
+    history.append({'version': version_file.stem, 'file': version_file.name, 'deployed_at': now})
+    pointer = {
+        'version': version_file.stem,
+        'file': version_file.name,
+        'deployed_at': now,
+        'history': history,
+    }
+    _write_pointer(db_path, pointer)
+    return pointer
+
+
+def deploy_version(db_path: PathLike, side_path: PathLike,
+                   validators: Optional[List[Callable[[Path], Dict]]] = None,
+                   collect: bool = True) -> Dict:
+    """
+    Validate a side file and make it the live version atomically.
+
+    Args:
+        db_path: Logical database path
+        side_path: File built by prepare_version (or any database file)
+        validators: Extra checks called with the file path; each returns a
+            dict with 'success' (e.g. a wrapper around verify_database_integrity)
+        collect: Garbage-collect drained versions afterwards
+
+    Returns:
+        Dict: success, version, checks, and 'error' when the deployment was refused
+        (the side file is then left in place for inspection)
+    """
+    db_path, side_path = Path(db_path), Path(side_path)
+    checks = [check_database(side_path)]
+    for validator in validators or []:
+        checks.append(validator(side_path))
+    if not all(check.get('success') for check in checks):
+        return {'success': False, 'error': 'Validation failed', 'checks': checks, 'side_path': str(side_path)}
+
+    directory = versions_dir(db_path)
+    directory.mkdir(parents=True, exist_ok=True)
+    name = side_path.name[:-len(BUILD_SUFFIX)] if side_path.name.endswith(BUILD_SUFFIX) else None
+    if name and side_path.parent == directory:
+        version_file = directory / name
+        os.replace(side_path, version_file)
+    else:
+        version_file = directory / f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.db"
+        _copy(side_path, version_file)
+    with open(version_file, 'rb+') as f:
+        os.fsync(f.fileno())
+
+    previous = read_pointer(db_path)
+    pointer = _switch(db_path, version_file, list(previous['history']) if previous else [])
+    result = {'success': True, 'version': pointer['version'], 'file': str(version_file), 'checks': checks}
+    if collect:
+        result['collected'] = collect_versions(db_path)
+    return result
+
+
+@contextmanager
+def build_version(db_path: PathLike,
+                  validators: Optional[List[Callable[[Path], Dict]]] = None) -> Iterator[Path]:
+    """
+    Build and deploy a new version in one block.
+
+        with build_version('data/cp2b_maps.db') as side:
+            migrate(side)
+
+    The side file is deployed when the block exits normally and deleted when
+    it raises. Raises RuntimeError if validation refuses the new version.
+    """
+    side = prepare_version(db_path)
+    try:
+        yield side
+    except BaseException:
+        side.unlink(missing_ok=True)
+        raise
+    result = deploy_version(db_path, side, validators)
+    if not result['success']:
+        raise RuntimeError(f"Deployment refused: {result['checks']}")
+
+
+def rollback(db_path: PathLike) -> Dict:
+    """
+    Point the logical database back at the previously deployed version.
+
+    Returns:
+        Dict: success, version (or 'error' if no previous version is on disk)
+    """
+    db_path = Path(db_path)
+    pointer = read_pointer(db_path)
+    if not pointer:
+        return {'success': False, 'error': 'No deployed version'}
+    directory = versions_dir(db_path)
+    candidates = [e for e in pointer['history'][:-1] if (directory / e['file']).exists()]
+    if not candidates:
+        return {'success': False, 'error': 'No previous version on disk'}
+    target = candidates[-1]
+    history = [e for e in pointer['history'] if e['file'] != target['file']]
+    new_pointer = _switch(db_path, directory / target['file'], history)
+    return {'success': True, 'version': new_pointer['version'], 'rolled_back_from': pointer['version']}
+
+
+def collect_versions(db_path: PathLike, keep: int = KEEP_VERSIONS,
+                     drain_seconds: int = DRAIN_SECONDS) -> List[str]:
+    """
+    Delete versions that readers no longer use.
+
+    A version is removed when it is not among the newest `keep` deployments
+    and was retired more than drain_seconds ago. Abandoned side files older
+    than STALE_BUILD_SECONDS are removed too. Files still open elsewhere
+    (Windows) are skipped and retried on the next call.
+
+    Returns:
+        List[str]: Removed file names
+    """
+    db_path = Path(db_path)
+    pointer = read_pointer(db_path)
+    if not pointer:
+        return []
+    directory = versions_dir(db_path)
+    now = time.time()
+    protected = {e['file'] for e in pointer['history'][-keep:]} | {pointer['file']}
+
+    removed, history = [], []
+    for entry in pointer['history']:
+        retired = entry.get('retired_at')
+        drained = retired and now - datetime.fromisoformat(retired).timestamp() > drain_seconds
+        if entry['file'] not in protected and drained:
+            try:
+                (directory / entry['file']).unlink(missing_ok=True)
+                removed.append(entry['file'])
+                continue
+            except PermissionError:
+                pass
+        history.append(entry)
+
+    for side in directory.glob(f"*{BUILD_SUFFIX}"):
+        if now - side.stat().st_mtime > STALE_BUILD_SECONDS:
+            try:
+                side.unlink()
+                removed.append(side.name)
+            except PermissionError:
+                pass
+
+    if len(history) != len(pointer['history']):
+        _write_pointer(db_path, {**pointer, 'history': history})
+    return removed
+
+
+def status(db_path: PathLike) -> Dict:
+    """Deployment state of a logical database (for the CLI)."""
+    db_path = Path(db_path)
+    pointer = read_pointer(db_path)
+    directory = versions_dir(db_path)
+    return {
+        'database': str(db_path),
+        'live_file': str(resolve_db_path(db_path)),
+        'version': pointer['version'] if pointer else None,
+        'history': [
+            {**entry, 'on_disk': (directory / entry['file']).exists()}
+            for entry in (pointer['history'] if pointer else [])
+        ],
+        'building': sorted(p.name for p in directory.glob(f"*{BUILD_SUFFIX}")) if directory.exists() else [],
+    }
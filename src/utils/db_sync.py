@@ -0,0 +1,345 @@
+"""
+Database Sync Module
+Row-hash incremental synchronization between SQLite databases.
+
+Every row of every table is reduced to (key, SHA-1 of its values) on both
+sides; comparing the two maps yields the rows to insert, update and delete,
+and only those are shipped to the target, in one transaction.
+
+Row keys: the declared PRIMARY KEY or a UNIQUE index when the table has one,
+else a known natural key (KEY_CANDIDATES, e.g. codigo_municipio) if it is
+unique on both sides, else the whole row (keyless tables only get inserts and
+deletes). Target rows are addressed by rowid.
+
+Schema drift (tables or columns present on one side only, type changes,
+missing indexes) is detected and reported; with apply_schema=True missing
+tables and columns are created on the target before the data sync. Nothing
+is ever dropped from the target's schema.
+"""
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+PathLike = Union[str, Path]
+
+# Natural keys of tables without a declared key (first unique match wins)
+KEY_CANDIDATES = [
+    ('codigo_municipio',),
+    ('codigo',),
+    ('id',),
+    ('setor',),
+    ('indicador',),
+    ('ranking',),
+]
+
+SAMPLE_KEYS = 10
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _tables(conn: sqlite3.Connection) -> Dict[str, str]:
+    """Table name → CREATE statement (internal sqlite_* tables excluded)."""
+    return {
+        name: sql for name, sql in conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        )
+    }
+
+
+def _indexes(conn: sqlite3.Connection) -> Dict[str, Tuple[str, str]]:
+    """Explicit index name → (table, CREATE statement)."""
+    return {
+        name: (table, sql) for name, table, sql in conn.execute(
+            "SELECT name, tbl_name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+        )
+    }
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> Dict[str, Dict]:
+    """Column name → {type, pk} in declaration order."""
+    return {
+        row[1]: {'type': (row[2] or '').upper(), 'pk': row[5]}
+        for row in conn.execute(f"PRAGMA table_info({_quote(table)})")
+    }
+
+
+def _declared_key(conn: sqlite3.Connection, table: str) -> Optional[Tuple[str, ...]]:
+    """PRIMARY KEY columns, else the columns of the first UNIQUE index."""
+    columns = _columns(conn, table)
+    pk = sorted((info['pk'], name) for name, info in columns.items() if info['pk'])
+    if pk:
+        return tuple(name for _, name in pk)
+    for row in conn.execute(f"PRAGMA index_list({_quote(table)})"):
+        if row[2]:  # unique
+            cols = tuple(r[2] for r in conn.execute(f"PRAGMA index_info({_quote(row[1])})"))
+            if all(cols):
+                return cols
+    return None
+
+
+def _is_unique(conn: sqlite3.Connection, table: str, key: Tuple[str, ...]) -> bool:
+    cols = ', '.join(_quote(c) for c in key)
+    not_null = ' AND '.join(f"{_quote(c)} IS NOT NULL" for c in key)
+    total, distinct = conn.execute(
+        f"SELECT COUNT(*), (SELECT COUNT(*) FROM (SELECT DISTINCT {cols} FROM {_quote(table)} WHERE {not_null})) "
+        f"FROM {_quote(table)}"
+    ).fetchone()
+    return total == distinct
+
+
+def resolve_key(source: sqlite3.Connection, target: sqlite3.Connection, table: str,
+                columns: List[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Row key used to match rows of a table on both sides.
+
+    Returns:
+        Tuple of key columns, or None to match whole rows
+    """
+    key = _declared_key(source, table) or _declared_key(target, table)
+    candidates = ([key] if key else []) + KEY_CANDIDATES
+    for candidate in candidates:
+        if all(c in columns for c in candidate) and \
+                _is_unique(source, table, candidate) and _is_unique(target, table, candidate):
+            return tuple(candidate)
+    return None
+
+
+def _row_hash(values: tuple) -> str:
+    payload = json.dumps(values, default=lambda v: v.hex() if isinstance(v, bytes) else str(v))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def table_hashes(conn: sqlite3.Connection, table: str, columns: List[str],
+                 key: Optional[Tuple[str, ...]]) -> Dict[tuple, List[Tuple[int, str]]]:
+    """
+    Per-row hashes of a table.
+
+    Args:
+        conn: Database connection
+        table: Table name
+        columns: Columns to hash (in this order)
+        key: Key columns (None: the row hash itself is the key)
+
+    Returns:
+        Dict: row key → [(rowid, row hash), ...] (several entries only for
+        duplicate rows of keyless tables)
+    """
+    select = ', '.join(_quote(c) for c in columns)
+    key_idx = [columns.index(c) for c in key] if key else None
+    hashes: Dict[tuple, List[Tuple[int, str]]] = {}
+    for row in conn.execute(f"SELECT rowid, {select} FROM {_quote(table)}"):
+        rowid, values = row[0], row[1:]
+        digest = _row_hash(values)
+        row_key = tuple(values[i] for i in key_idx) if key_idx else (digest,)
+        hashes.setdefault(row_key, []).append((rowid, digest))
+    return hashes
+
+
+def schema_drift(source: sqlite3.Connection, target: sqlite3.Connection) -> Dict:
+    """
+    Compare the schemas of two databases.
+
+    Returns:
+        Dict: missing_tables (source only), extra_tables (target only),
+        columns {table: {missing, extra, type_changed}}, missing_indexes
+    """
+    src_tables, dst_tables = _tables(source), _tables(target)
+    drift = {
+        'missing_tables': sorted(set(src_tables) - set(dst_tables)),
+        'extra_tables': sorted(set(dst_tables) - set(src_tables)),
+        'columns': {},
+        'missing_indexes': [],
+    }
+
+    for table in sorted(set(src_tables) & set(dst_tables)):
+        src_cols, dst_cols = _columns(source, table), _columns(target, table)
+        entry = {
+            'missing': [c for c in src_cols if c not in dst_cols],
+            'extra': [c for c in dst_cols if c not in src_cols],
+            'type_changed': {c: [src_cols[c]['type'], dst_cols[c]['type']]
+                             for c in src_cols if c in dst_cols and src_cols[c]['type'] != dst_cols[c]['type']},
+        }
+        if any(entry.values()):
+            drift['columns'][table] = entry
+
+    dst_indexes = _indexes(target)
+    drift['missing_indexes'] = sorted(
+        name for name, (table, _) in _indexes(source).items()
+        if name not in dst_indexes and table in dst_tables
+    )
+    return drift
+
+
+def _apply_schema(source: sqlite3.Connection, target: sqlite3.Connection, drift: Dict) -> List[str]:
+    """Create missing tables, columns and indexes on the target (no drops)."""
+    statements = []
+    src_tables, src_indexes = _tables(source), _indexes(source)
+    for table in drift['missing_tables']:
+        statements.append(src_tables[table])
+        statements.extend(sql for _, (t, sql) in sorted(src_indexes.items()) if t == table)
+    for table, entry in drift['columns'].items():
+        src_cols = _columns(source, table)
+        for col in entry['missing']:
+            statements.append(f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(col)} {src_cols[col]['type']}".rstrip())
+    statements.extend(src_indexes[name][1] for name in drift['missing_indexes'])
+    for sql in statements:
+        target.execute(sql)
+    return statements
+
+
+def diff_table(source: sqlite3.Connection, target: sqlite3.Connection, table: str,
+               columns: List[str]) -> Dict:
+    """
+    Row-level difference of one table.
+
+    Returns:
+        Dict: key, columns, insert/update/delete lists (internal: rowids and
+        keys) and counts
+    """
+    key = resolve_key(source, target, table, columns)
+    src = table_hashes(source, table, columns, key)
+    dst = table_hashes(target, table, columns, key)
+
+    inserts, updates, deletes = [], [], []
+    for row_key, src_rows in src.items():
+        dst_rows = dst.get(row_key, [])
+        if key:
+            if not dst_rows:
+                inserts.append(src_rows[0][0])
+            elif src_rows[0][1] != dst_rows[0][1]:
+                updates.append((src_rows[0][0], dst_rows[0][0], row_key))
+        else:
+            # Keyless: reconcile duplicate counts of identical rows
+            extra = len(src_rows) - len(dst_rows)
+            inserts.extend(rowid for rowid, _ in src_rows[:max(extra, 0)])
+            deletes.extend(rowid for rowid, _ in dst_rows[:max(-extra, 0)])
+    for row_key, dst_rows in dst.items():
+        if row_key not in src:
+            deletes.extend(rowid for rowid, _ in dst_rows)
+
+    return {
+        'table': table,
+        'key': list(key) if key else None,
+        'columns': columns,
+        'inserted': len(inserts),
+        'updated': len(updates),
+        'deleted': len(deletes),
+        'sample_updated_keys': [list(k) for _, _, k in updates[:SAMPLE_KEYS]],
+        '_inserts': inserts,
+        '_updates': updates,
+        '_deletes': deletes,
+    }
+
+
+def _ship(source: sqlite3.Connection, target: sqlite3.Connection, diff: Dict) -> None:
+    """Write one table's inserts, updates and deletes to the target."""
+    table, columns = _quote(diff['table']), diff['columns']
+    select = ', '.join(_quote(c) for c in columns)
+
+    def fetch(rowids):
+        rows = {}
+        for i in range(0, len(rowids), 500):
+            chunk = rowids[i:i + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            for row in source.execute(f"SELECT rowid, {select} FROM {table} WHERE rowid IN ({placeholders})", chunk):
+                rows[row[0]] = row[1:]
+        return rows
+
+    if diff['_deletes']:
+        target.executemany(f"DELETE FROM {table} WHERE rowid = ?", [(r,) for r in diff['_deletes']])
+    if diff['_updates']:
+        rows = fetch([src_id for src_id, _, _ in diff['_updates']])
+        assignments = ', '.join(f"{_quote(c)} = ?" for c in columns)
+        target.executemany(
+            f"UPDATE {table} SET {assignments} WHERE rowid = ?",
+            [rows[src_id] + (dst_id,) for src_id, dst_id, _ in diff['_updates']]
+        )
+    if diff['_inserts']:
+        rows = fetch(diff['_inserts'])
+        placeholders = ', '.join('?' * len(columns))
+        target.executemany(
+            f"INSERT INTO {table} ({select}) VALUES ({placeholders})",
+            [rows[r] for r in diff['_inserts']]
+        )
+
+
+def _fingerprint(conn: sqlite3.Connection, diff: Dict) -> Dict[tuple, List[str]]:
+    """Row hashes of a synced table, without rowids (for post-sync verification)."""
+    key = tuple(diff['key']) if diff['key'] else None
+    hashes = table_hashes(conn, diff['table'], diff['columns'], key)
+    return {row_key: sorted(h for _, h in rows) for row_key, rows in hashes.items()}
+
+
+def sync_databases(source_path: PathLike, target_path: PathLike, dry_run: bool = False,
+                   tables: Optional[List[str]] = None, apply_schema: bool = False) -> Dict:
+    """
+    Bring the target database in line with the source, shipping only changed rows.
+
+    Args:
+        source_path: Database to copy from (opened read-only)
+        target_path: Database to update
+        dry_run: Only compute and report the differences
+        tables: Restrict to these tables (default: all tables of the source)
+        apply_schema: Create missing tables/columns/indexes on the target first
+
+    Returns:
+        Dict: drift (schema_drift output), schema_statements, tables (per-table
+        counts), totals, applied, verified (post-sync hash check)
+    """
+    source_path, target_path = Path(source_path), Path(target_path)
+    for path in (source_path, target_path):
+        if not path.exists():
+            raise FileNotFoundError(f"Database file not found: {path}")
+
+    source = sqlite3.connect(f"{source_path.resolve().as_uri()}?mode=ro", uri=True)
+    target = sqlite3.connect(str(target_path), isolation_level=None)
+    try:
+        drift = schema_drift(source, target)
+        target.execute("BEGIN IMMEDIATE")
+        try:
+            statements = _apply_schema(source, target, drift) if apply_schema else []
+            dst_tables = _tables(target)
+
+            diffs = []
+            for table in sorted(_tables(source)):
+                if (tables and table not in tables) or table not in dst_tables:
+                    continue
+                dst_cols = _columns(target, table)
+                columns = [c for c in _columns(source, table) if c in dst_cols]
+                diffs.append(diff_table(source, target, table, columns))
+
+            if dry_run:
+                target.execute("ROLLBACK")
+            else:
+                for diff in diffs:
+                    _ship(source, target, diff)
+                target.execute("COMMIT")
+        except Exception:
+            target.execute("ROLLBACK")
+            raise
+
+        verified = None
+        if not dry_run:
+            verified = all(_fingerprint(source, d) == _fingerprint(target, d)
+                           for d in diffs if d['inserted'] or d['updated'] or d['deleted'])
+    finally:
+        target.close()
+        source.close()
+
+    report = [{k: v for k, v in d.items() if not k.startswith('_')} for d in diffs]
+    return {
+        'source': str(source_path),
+        'target': str(target_path),
+        'dry_run': dry_run,
+        'drift': drift,
+        'schema_statements': statements,
+        'tables': report,
+        'totals': {op: sum(d[op] for d in report) for op in ('inserted', 'updated', 'deleted')},
+        'applied': not dry_run,
+        'verified': verified,
+    }
@@ -4,7 +4,7 @@ Utilities for working with FDE (Fator de Disponibilidade Efetiva) data in UI and
 """
 
 from typing import Dict, List, Tuple, Optional
-from src.data.phase_5_fde_data import FDE_VALIDATION_DATA
+from src.data.phase_5_fde_data import FDE_VALIDATION_DATA, get_fde_data
 
 # Priority tier color mapping for UI
 PRIORITY_COLORS = {
@@ -54,7 +54,7 @@ def filter_residues_by_fde_threshold(residues: List[str], min_fde: float = 0.0,
     """
     filtered = []
     for residue in residues:
-        fde_data = FDE_VALIDATION_DATA.get(residue)
+        fde_data = get_fde_data(residue)
         if fde_data:
             fde = fde_data.get("fde_real", 0)
             if min_fde <= fde <= max_fde:
@@ -76,35 +76,35 @@ def sort_residues_by_fde(residues: List[str], descending: bool = True) -> List[s
         Sorted list of residues
     """
     def get_fde(residue):
-        fde_data = FDE_VALIDATION_DATA.get(residue)
+        fde_data = get_fde_data(residue)
         return fde_data.get("fde_real", -1) if fde_data else -1
 
     return sorted(residues, key=get_fde, reverse=descending)
 
 def get_priority_tier_for_residue(residue: str) -> Optional[str]:
     """Get priority tier for a residue"""
-    fde_data = FDE_VALIDATION_DATA.get(residue)
+    fde_data = get_fde_data(residue)
     if fde_data:
         return fde_data.get("priority_tier")
     return None
 
 def get_fde_real_for_residue(residue: str) -> Optional[float]:
     """Get FDE real value for a residue"""
-    fde_data = FDE_VALIDATION_DATA.get(residue)
+    fde_data = get_fde_data(residue)
     if fde_data:
         return fde_data.get("fde_real")
     return None
 
 def get_recommendation_for_residue(residue: str) -> Optional[str]:
     """Get recommendation for a residue"""
-    fde_data = FDE_VALIDATION_DATA.get(residue)
+    fde_data = get_fde_data(residue)
     if fde_data:
         return fde_data.get("recommendation")
     return None
 
 def get_culture_for_residue(residue: str) -> Optional[str]:
     """Get culture group for a residue"""
-    fde_data = FDE_VALIDATION_DATA.get(residue)
+    fde_data = get_fde_data(residue)
     if fde_data:
         return fde_data.get("culture_group")
     return None
@@ -139,7 +139,7 @@ def get_low_priority_residues(threshold: float = 1.0) -> List[str]:
 
 def create_fde_badge(residue: str) -> str:
     """Create a formatted FDE badge for display"""
-    fde_data = FDE_VALIDATION_DATA.get(residue)
+    fde_data = get_fde_data(residue)
     if not fde_data:
         return "⏭️ Not analyzed"
 
@@ -151,7 +151,7 @@ def create_fde_badge(residue: str) -> str:
 
 def get_fde_factors(residue: str) -> Optional[Dict[str, float]]:
     """Get FDE factor breakdown for a residue"""
-    fde_data = FDE_VALIDATION_DATA.get(residue)
+    fde_data = get_fde_data(residue)
     if not fde_data:
         return None
 
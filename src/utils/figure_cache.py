@@ -0,0 +1,288 @@
+"""
+Figure Cache Module
+Process-wide cache of serialized Plotly figures shared by all sessions.
+
+Figure builders decorated with cached_figure() are keyed by
+(builder, fingerprint of the inputs, theme version). The cache stores the
+figure as compact JSON (no indentation, no trace uids, numeric arrays
+base64-encoded by plotly.io as typed arrays). Every hit decodes a fresh
+go.Figure without re-running the property validators (the JSON was written
+from a validated figure), so callers may modify it without affecting other
+sessions.
+
+Entries are evicted least-recently-used once the stored JSON exceeds the byte
+budget (CP2B_FIGURE_CACHE_MB, default 64 MB). Concurrent requests for the same
+key wait for the first build instead of building the figure again, so
+identical charts are built once per process.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+
+# Byte budget for stored figures (override with CP2B_FIGURE_CACHE_MB)
+FIGURE_CACHE_MAX_BYTES = int(float(os.environ.get("CP2B_FIGURE_CACHE_MB", "64")) * 1024 * 1024)
+
+
+class _Unfingerprintable(Exception):
+    """Raised for inputs that cannot be fingerprinted reliably"""
+
+
+def _hash_pandas(obj) -> bytes:
+    """Row hashes of a DataFrame/Series (categorize=False is faster for small frames)"""
+    try:
+        return pd.util.hash_pandas_object(obj, index=True, categorize=False).to_numpy().tobytes()
+    except TypeError as e:
+        # Unhashable cells (lists, dicts)
+        raise _Unfingerprintable(str(e))
+
+
+def _feed(h, obj: Any) -> None:
+    """Feed a type-tagged, canonical encoding of obj into the hash h."""
+    if obj is None or isinstance(obj, (bool, int, float, complex)):
+        h.update(f"{type(obj).__name__}:{obj!r};".encode())
+    elif isinstance(obj, (str, Path)):
+        text = str(obj)
+        h.update(f"{type(obj).__name__}:{len(text)}:".encode())
+        h.update(text.encode('utf-8', 'surrogatepass'))
+        # File inputs (e.g. GeoJSON paths) invalidate when the file changes
+        if len(text) < 4096 and os.path.isfile(text):
+            stat = os.stat(text)
+            h.update(f"@{stat.st_mtime_ns}:{stat.st_size}".encode())
+        h.update(b";")
+    elif isinstance(obj, bytes):
+        h.update(f"bytes:{len(obj)}:".encode())
+        h.update(obj)
+    elif isinstance(obj, pd.DataFrame):
+        h.update(f"df:{obj.shape}:".encode())
+        for name, dtype in obj.dtypes.items():
+            _feed(h, str(name))
+            _feed(h, str(dtype))
+        _feed(h, obj.index.name)
+        h.update(_hash_pandas(obj))
+    elif isinstance(obj, pd.Series):
+        h.update(f"series:{len(obj)}:{obj.dtype}:".encode())
+        _feed(h, obj.name)
+        h.update(_hash_pandas(obj))
+    elif isinstance(obj, pd.Index):
+        _feed(h, obj.to_series())
+    elif isinstance(obj, np.ndarray):
+        if obj.dtype == object:
+            _feed(h, obj.tolist())
+        else:
+            h.update(f"nd:{obj.dtype.str}:{obj.shape}:".encode())
+            h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, np.generic):
+        _feed(h, obj.item())
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"{type(obj).__name__}:{len(obj)}[".encode())
+        for item in obj:
+            _feed(h, item)
+        h.update(b"]")
+    elif isinstance(obj, dict):
+        h.update(f"dict:{len(obj)}{{".encode())
+        for key in sorted(obj, key=repr):
+            _feed(h, key)
+            _feed(h, obj[key])
+        h.update(b"}")
+    elif isinstance(obj, (set, frozenset)):
+        h.update(f"set:{len(obj)}{{".encode())
+        for item in sorted(obj, key=repr):
+            _feed(h, item)
+        h.update(b"}")
+    else:
+        raise _Unfingerprintable(type(obj).__name__)
+
+
+def fingerprint(*objs: Any) -> Optional[str]:
+    """
+    Content fingerprint of builder inputs.
+
+    Args:
+        *objs: DataFrames, Series, arrays, scalars, paths and nested
+            lists/tuples/dicts of these
+
+    Returns:
+        Optional[str]: Hex digest, or None when an input type is not supported
+    """
+    h = hashlib.blake2b(digest_size=16)
+    try:
+        for obj in objs:
+            _feed(h, obj)
+    except _Unfingerprintable:
+        return None
+    return h.hexdigest()
+
+
+class FigureCache:
+    """
+    Thread-safe LRU cache of serialized figures, bounded by byte size.
+
+    Single Responsibility: Store and return serialized Plotly figures
+    """
+
+    def __init__(self, max_bytes: int = FIGURE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._build_locks: Dict[tuple, threading.Lock] = {}
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'bypassed': 0, 'oversized': 0}
+
+    def _get(self, key: tuple) -> Optional[str]:
+        with self._lock:
+            spec = self._entries.get(key)
+            if spec is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+            return spec
+
+    def _put(self, key: tuple, spec: str) -> None:
+        size = len(spec)
+        with self._lock:
+            if size > self.max_bytes:
+                self._stats['oversized'] += 1
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = spec
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._stats['evictions'] += 1
+
+    def get_or_build(self, key: tuple, build: Callable[[], go.Figure]) -> go.Figure:
+        """
+        Return the figure for key, building and storing it on a miss.
+
+        Concurrent misses on the same key build the figure once; the other
+        callers wait and read the stored JSON.
+
+        Args:
+            key: (builder name, input fingerprint, theme version)
+            build: Zero-argument callable producing the figure
+
+        Returns:
+            go.Figure: Fresh figure decoded from the cached JSON
+        """
+        spec = self._get(key)
+        if spec is None:
+            with self._lock:
+                build_lock = self._build_locks.setdefault(key, threading.Lock())
+            try:
+                with build_lock:
+                    spec = self._get(key)
+                    if spec is None:
+                        with self._lock:
+                            self._stats['misses'] += 1
+                        fig = build()
+                        if not isinstance(fig, go.Figure):
+                            return fig
+                        spec = pio.to_json(fig, validate=False, pretty=False, remove_uids=True)
+                        self._put(key, spec)
+            finally:
+                with self._lock:
+                    self._build_locks.pop(key, None)
+        # The JSON comes from a validated figure, so validation is skipped
+        return go.Figure(json.loads(spec), _validate=False)
+
+    def record_bypass(self) -> None:
+        """Count a call whose inputs could not be fingerprinted"""
+        with self._lock:
+            self._stats['bypassed'] += 1
+
+    def clear(self) -> None:
+        """Drop all stored figures (statistics are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Cache statistics.
+
+        Returns:
+            Dict: hits, misses, evictions, bypassed, oversized, hit_rate,
+                entries, bytes, max_bytes
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats['hits'] + stats['misses']
+            stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+            stats['max_bytes'] = self.max_bytes
+        return stats
+
+
+# Process-wide cache shared by every session
+FIGURE_CACHE = FigureCache()
+
+
+def cached_figure(theme_version: str = "") -> Callable:
+    """
+    Decorator caching a figure builder in FIGURE_CACHE.
+
+    Calls with inputs that cannot be fingerprinted are built directly.
+
+    Args:
+        theme_version: Version of the styling the builder depends on
+            (see theme_fingerprint)
+
+    Returns:
+        Callable: Decorator
+    """
+    def decorator(builder: Callable[..., go.Figure]) -> Callable[..., go.Figure]:
+        name = f"{builder.__module__}.{builder.__qualname__}"
+
+        @functools.wraps(builder)
+        def wrapper(*args, **kwargs):
+            digest = fingerprint(args, kwargs)
+            if digest is None:
+                FIGURE_CACHE.record_bypass()
+                return builder(*args, **kwargs)
+            return FIGURE_CACHE.get_or_build(
+                (name, digest, theme_version),
+                lambda: builder(*args, **kwargs)
+            )
+
+        wrapper.uncached = builder
+        return wrapper
+
+    return decorator
+
+
+def theme_fingerprint(*objs: Any) -> str:
+    """
+    Theme version derived from the styling constants of a module.
+
+    Args:
+        *objs: Color maps, palettes and layout dicts used by the builders
+
+    Returns:
+        str: Short hex digest that changes whenever the styling changes
+    """
+    return (fingerprint(*objs) or "")[:12]
+
+
+def get_figure_cache_stats() -> Dict[str, Any]:
+    """Statistics of the process-wide figure cache"""
+    return FIGURE_CACHE.stats()
+
+
+def clear_figure_cache() -> None:
+    """Drop all figures from the process-wide figure cache"""
+    FIGURE_CACHE.clear()
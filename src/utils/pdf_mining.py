@@ -0,0 +1,421 @@
+"""
+PDF Mining Module
+Parallel extraction of chemical parameters from the literature PDF library.
+
+Every PDF is read page by page (text and tables, with pdfplumber) in a
+process pool. Candidate values for BMP, TS, VS, C:N and CH₄ content are
+captured with their page number and a context excerpt, plus the DOI.
+
+Results are cached per file content hash (data/cache/pdf_mining/<sha256>.v<version>.json)
+and each file's rows are written as soon as it finishes into staging tables of
+CP2B_Precision_Biogas.db:
+
+    pdf_extraction_files      one row per PDF path: hash, size/mtime, pages, DOI, error
+    pdf_extraction_staging    one row per candidate value (review_status 'PENDING')
+
+Re-runs skip files whose size/mtime are unchanged, and files whose content
+hash is already staged; only new or changed PDFs are extracted. Staged
+candidates are for review - nothing is written to chemical_parameters.
+
+Requires pdfplumber (pip install pdfplumber), imported only by the workers.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+PathLike = Union[str, Path]
+
+EXTRACTOR_VERSION = 2
+CACHE_DIR = Path(__file__).parent.parent.parent / "data" / "cache" / "pdf_mining"
+CONTEXT_CHARS = 120
+
+FILES_TABLE = 'pdf_extraction_files'
+STAGING_TABLE = 'pdf_extraction_staging'
+
+_NUMBER = r'(\d+(?:[.,]\d+)?)(?:\s*(?:±|\+/-|-|–|to|a)\s*(\d+(?:[.,]\d+)?))?'
+
+# parameter_name (as in chemical_parameters) → pattern with value groups and unit
+PARAMETER_PATTERNS = {
+    'BMP': re.compile(
+        r'(?:\bBMP\b|biochemical methane potential|methane (?:yield|potential)|potencial metanog[êe]nico)'
+        r'[^0-9\n]{0,40}?' + _NUMBER +
+        r'\s*(?P<unit>(?:N?m?L|N?m[³3]|L)\s*(?:CH4|CH₄)?\s*/?\s*(?:g|kg|t)\s*(?:VS|SV|TS|MS|COD|DQO|VSadded)?)',
+        re.IGNORECASE),
+    'TS': re.compile(
+        r'(?:\bTS\b|\bST\b|total solids?|s[óo]lidos totais|dry matter)'
+        r'[^0-9%\n]{0,30}?' + _NUMBER + r'\s*(?P<unit>%|g/kg|g/L|mg/L)',
+        re.IGNORECASE),
+    'VS': re.compile(
+        r'(?:\bVS\b|\bSV\b|volatile solids?|s[óo]lidos vol[áa]teis)'
+        r'[^0-9%\n]{0,30}?' + _NUMBER + r'\s*(?P<unit>%\s*(?:TS|ST|of TS)?|g/kg|g/L|mg/L)',
+        re.IGNORECASE),
+    'CN_RATIO': re.compile(
+        r'(?:\bC\s*[:/]\s*N\b|carbon[- ]to[- ]nitrogen|rela[çc][ãa]o C/N)(?:\s*ratio)?'
+        r'[^0-9\n]{0,20}?' + _NUMBER + r'(?P<unit>)',
+        re.IGNORECASE),
+    'METHANE_CONTENT': re.compile(
+        r'(?:\bCH4\b|CH₄|methane)\s*(?:content|concentration|teor)?'
+        r'[^0-9\n]{0,20}?' + _NUMBER + r'\s*(?P<unit>%\s*(?:v/v|vol)?)',
+        re.IGNORECASE),
+}
+
+# '/' optionally followed by a mass/volume unit, right before a label ("/g VS")
+UNIT_DENOMINATOR = re.compile(r'/\s*(?:[a-zµ]{1,3}\s+)?\Z', re.IGNORECASE)
+
+DOI_PATTERN = re.compile(r'\b(10\.\d{4,9}/[^\s"<>]+)', re.IGNORECASE)
+
+
+# ============================================================================
+# EXTRACTION (runs in worker processes)
+# ============================================================================
+
+def file_hash(path: PathLike) -> str:
+    """SHA-256 of a file's content (streamed)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _to_float(text: Optional[str]) -> Optional[float]:
+    return float(text.replace(',', '.')) if text else None
+
+
+def _excerpt(text: str, start: int, end: int) -> str:
+    excerpt = text[max(0, start - CONTEXT_CHARS):end + CONTEXT_CHARS]
+    return ' '.join(excerpt.split())
+
+
+def _after_slash(text: str, start: int) -> bool:
+    """True when a label at `start` belongs to a unit denominator ('/VS', '/g VS')."""
+    return UNIT_DENOMINATOR.search(text, max(0, start - 8), start) is not None
+
+
+def _label_matches(text: str) -> Iterator[tuple]:
+    """
+    Non-overlapping (parameter_name, match) pairs in text order.
+
+    Labels inside the span of an earlier match (the 'VS' and 'CH4' of a BMP
+    unit such as 'mL CH4/g VS'), directly after a '/', or followed by another
+    label before their number are not taken; the pattern is searched again
+    right after them so the real next label is still found.
+    """
+    order = {name: i for i, name in enumerate(PARAMETER_PATTERNS)}
+    positions = {name: 0 for name in PARAMETER_PATTERNS}
+    pending = {}
+    covered_end = 0
+    while True:
+        for name, pattern in PARAMETER_PATTERNS.items():
+            if name not in pending and positions[name] is not None:
+                pending[name] = pattern.search(text, positions[name])
+                if pending[name] is None:
+                    positions[name] = None
+                    del pending[name]
+        if not pending:
+            return
+
+        # Earliest match first; on ties the first pattern (BMP) wins
+        name = min(pending, key=lambda n: (pending[n].start(), order[n]))
+        match = pending.pop(name)
+        # Another label between this label and its number: the number is not ours
+        label_in_gap = any(match.start() < other.start() < match.start(1) for other in pending.values())
+        if match.start() < covered_end or _after_slash(text, match.start()) or label_in_gap:
+            positions[name] = match.start() + 1
+            continue
+        covered_end = match.end()
+        positions[name] = match.end()
+        yield name, match
+
+
+def find_candidates(text: str, page_number: int, method: str = 'text') -> List[Dict]:
+    """
+    Parameter values mentioned in a block of text.
+
+    Args:
+        text: Page text (or a flattened table)
+        page_number: 1-based page number
+        method: 'text' or 'table' (recorded as extraction_method)
+
+    Returns:
+        List[Dict]: parameter_name, value_min, value_max, value_mean, unit,
+        page_number, context_excerpt, extraction_method
+    """
+    candidates = []
+    for name, match in _label_matches(text):
+        first, second = _to_float(match.group(1)), _to_float(match.group(2))
+        separator = text[match.end(1):match.start(2)] if second is not None else ''
+        if second is not None and ('±' in separator or '+/-' in separator):
+            # mean ± sd
+            value_min, value_max, value_mean = first - second, first + second, first
+        elif second is not None:
+            value_min, value_max = min(first, second), max(first, second)
+            value_mean = (value_min + value_max) / 2
+        else:
+            value_min = value_max = value_mean = first
+        candidates.append({
+            'parameter_name': name,
+            'value_min': value_min,
+            'value_max': value_max,
+            'value_mean': value_mean,
+            'unit': ' '.join((match.group('unit') or '').split()) or None,
+            'page_number': page_number,
+            'context_excerpt': _excerpt(text, match.start(), match.end()),
+            'extraction_method': f'pdf_{method}',
+        })
+    return candidates
+
+
+def extract_pdf(path: str, sha256: Optional[str] = None) -> Dict:
+    """
+    Extract text candidates, tables and the DOI of one PDF (worker function).
+
+    Args:
+        path: PDF file
+        sha256: Content hash if already known
+
+    Returns:
+        Dict: sha256, pages, doi, candidates, tables (page, rows), error
+    """
+    result = {'sha256': sha256 or file_hash(path), 'pages': 0, 'doi': None,
+              'candidates': [], 'tables': [], 'error': None,
+              'extractor_version': EXTRACTOR_VERSION}
+    try:
+        import pdfplumber
+    except ImportError:
+        result['error'] = 'pdfplumber not installed (pip install pdfplumber)'
+        return result
+
+    try:
+        with pdfplumber.open(path) as pdf:
+            result['pages'] = len(pdf.pages)
+            for number, page in enumerate(pdf.pages, start=1):
+                text = page.extract_text() or ''
+                if result['doi'] is None:
+                    doi = DOI_PATTERN.search(text)
+                    if doi:
+                        result['doi'] = doi.group(1).rstrip('.,;)]')
+                result['candidates'].extend(find_candidates(text, number))
+
+                for table in page.extract_tables():
+                    rows = [[cell if cell is not None else '' for cell in row] for row in table]
+                    result['tables'].append({'page': number, 'rows': rows})
+                    flat = '\n'.join(' '.join(str(cell) for cell in row) for row in rows)
+                    result['candidates'].extend(find_candidates(flat, number, method='table'))
+                page.flush_cache()
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def _cache_path(sha256: str) -> Path:
+    return CACHE_DIR / f"{sha256}.v{EXTRACTOR_VERSION}.json"
+
+
+def _extract_cached(path: str, sha256: Optional[str]) -> Dict:
+    """Worker entry point: cached result for this content, else extract and cache."""
+    sha256 = sha256 or file_hash(path)
+    cache_file = _cache_path(sha256)
+    if cache_file.exists():
+        return {**json.loads(cache_file.read_text(encoding='utf-8')), 'cached': True}
+
+    result = extract_pdf(path, sha256)
+    if result['error'] is None:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+        tmp.write_text(json.dumps(result, ensure_ascii=False), encoding='utf-8')
+        tmp.replace(cache_file)
+    return {**result, 'cached': False}
+
+
+# ============================================================================
+# STAGING TABLES
+# ============================================================================
+
+def ensure_staging_tables(conn: sqlite3.Connection) -> None:
+    """Create the staging tables in the precision database if needed."""
+    conn.executescript(f"""
+        CREATE TABLE IF NOT EXISTS {FILES_TABLE} (
+            pdf_path TEXT PRIMARY KEY,
+            pdf_filename TEXT,
+            file_sha256 TEXT NOT NULL,
+            file_size INTEGER,
+            file_mtime_ns INTEGER,
+            paper_id INTEGER,
+            pages INTEGER,
+            doi TEXT,
+            candidates INTEGER,
+            tables INTEGER,
+            error TEXT,
+            extractor_version INTEGER,
+            extracted_at TEXT
+        );
+        CREATE TABLE IF NOT EXISTS {STAGING_TABLE} (
+            staging_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            file_sha256 TEXT NOT NULL,
+            pdf_path TEXT,
+            paper_id INTEGER,
+            parameter_name TEXT NOT NULL,
+            value_min REAL,
+            value_max REAL,
+            value_mean REAL,
+            unit TEXT,
+            page_number INTEGER,
+            context_excerpt TEXT,
+            extraction_method TEXT,
+            doi TEXT,
+            review_status TEXT DEFAULT 'PENDING',
+            created_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_{STAGING_TABLE}_sha ON {STAGING_TABLE}(file_sha256);
+        CREATE INDEX IF NOT EXISTS idx_{STAGING_TABLE}_paper ON {STAGING_TABLE}(paper_id, parameter_name);
+    """)
+
+
+def _paper_lookup(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Lower-cased PDF file name / DOI → paper_id from scientific_papers."""
+    lookup = {}
+    for paper_id, pdf_filename, original_filename, doi in conn.execute(
+            "SELECT paper_id, pdf_filename, original_filename, doi FROM scientific_papers"):
+        for key in (pdf_filename, original_filename, doi):
+            if key:
+                lookup.setdefault(str(key).strip().lower(), paper_id)
+    return lookup
+
+
+def _value_key(value: Optional[float]) -> Optional[float]:
+    """Comparable form of a staged value (REAL round-trips may differ in the last digits)."""
+    return None if value is None else round(float(value), 9)
+
+
+def stage_result(conn: sqlite3.Connection, path: Path, stat: os.stat_result, result: Dict,
+                 papers: Dict[str, int]) -> int:
+    """
+    Replace the staged rows of one PDF with a new extraction result.
+
+    Reviewed rows (review_status other than 'PENDING') are kept, and candidates
+    with the same (parameter, value) as a reviewed row are not staged again.
+
+    Returns:
+        int: Candidate rows inserted
+    """
+    paper_id = papers.get(path.name.lower()) or (papers.get(result['doi'].lower()) if result['doi'] else None)
+    now = datetime.now().isoformat()
+    with conn:
+        conn.execute(f"DELETE FROM {STAGING_TABLE} WHERE pdf_path = ? AND review_status = 'PENDING'",
+                     (str(path),))
+        reviewed = {
+            (parameter, _value_key(value))
+            for parameter, value in conn.execute(
+                f"SELECT parameter_name, value_mean FROM {STAGING_TABLE} "
+                f"WHERE pdf_path = ? AND review_status != 'PENDING'", (str(path),))
+        }
+        candidates = [c for c in result['candidates']
+                      if (c['parameter_name'], _value_key(c['value_mean'])) not in reviewed]
+        conn.executemany(
+            f"""INSERT INTO {STAGING_TABLE}
+                (file_sha256, pdf_path, paper_id, parameter_name, value_min, value_max, value_mean, unit,
+                 page_number, context_excerpt, extraction_method, doi, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            [(result['sha256'], str(path), paper_id, c['parameter_name'], c['value_min'], c['value_max'],
+              c['value_mean'], c['unit'], c['page_number'], c['context_excerpt'], c['extraction_method'],
+              result['doi'], now)
+             for c in candidates]
+        )
+        conn.execute(
+            f"""INSERT OR REPLACE INTO {FILES_TABLE}
+                (pdf_path, pdf_filename, file_sha256, file_size, file_mtime_ns, paper_id, pages, doi,
+                 candidates, tables, error, extractor_version, extracted_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (str(path), path.name, result['sha256'], stat.st_size, stat.st_mtime_ns, paper_id, result['pages'],
+             result['doi'], len(result['candidates']), len(result['tables']), result['error'],
+             result['extractor_version'], now)
+        )
+    return len(candidates)
+
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+
+def iter_pdfs(root: PathLike) -> Iterator[Path]:
+    """All PDF files under a directory (recursive, sorted)."""
+    yield from sorted(p.resolve() for p in Path(root).rglob('*') if p.suffix.lower() == '.pdf' and p.is_file())
+
+
+def mine_directory(root: PathLike, db_path: PathLike, max_workers: Optional[int] = None,
+                   force: bool = False, progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Extract every new or changed PDF under root into the staging tables.
+
+    Args:
+        root: PDF library directory
+        db_path: CP2B_Precision_Biogas.db
+        max_workers: Process pool size (default: CPU count; 0/1 runs inline)
+        force: Re-stage every PDF (the per-hash cache still avoids re-extraction)
+        progress: Called with a per-file summary as each file completes
+
+    Returns:
+        Dict: files, skipped_unchanged, extracted, from_cache, errors, candidates
+    """
+    conn = sqlite3.connect(str(db_path))
+    summary = {'files': 0, 'skipped_unchanged': 0, 'extracted': 0, 'from_cache': 0,
+               'errors': 0, 'candidates': 0}
+    try:
+        ensure_staging_tables(conn)
+        papers = _paper_lookup(conn)
+        known = {row[0]: row[1:] for row in conn.execute(
+            f"SELECT pdf_path, file_size, file_mtime_ns, file_sha256, extractor_version FROM {FILES_TABLE}")}
+
+        todo = []
+        for path in iter_pdfs(root):
+            summary['files'] += 1
+            stat = path.stat()
+            previous = known.get(str(path))
+            if not force and previous and previous[3] == EXTRACTOR_VERSION:
+                if previous[:2] == (stat.st_size, stat.st_mtime_ns):
+                    summary['skipped_unchanged'] += 1
+                    continue
+                # Touched but identical content: refresh size/mtime only
+                sha256 = file_hash(path)
+                if sha256 == previous[2]:
+                    with conn:
+                        conn.execute(f"UPDATE {FILES_TABLE} SET file_size = ?, file_mtime_ns = ? WHERE pdf_path = ?",
+                                     (stat.st_size, stat.st_mtime_ns, str(path)))
+                    summary['skipped_unchanged'] += 1
+                    continue
+                todo.append((path, stat, sha256))
+            else:
+                todo.append((path, stat, None))
+
+        def handle(path, stat, result):
+            summary['extracted'] += not result['cached']
+            summary['from_cache'] += result['cached']
+            summary['errors'] += result['error'] is not None
+            summary['candidates'] += stage_result(conn, path, stat, result, papers)
+            if progress:
+                progress({'file': str(path), 'candidates': len(result['candidates']),
+                          'cached': result['cached'], 'error': result['error']})
+
+        workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+        if workers > 1 and len(todo) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(_extract_cached, str(path), sha256): (path, stat)
+                           for path, stat, sha256 in todo}
+                for future in as_completed(futures):
+                    path, stat = futures[future]
+                    handle(path, stat, future.result())
+        else:
+            for path, stat, sha256 in todo:
+                handle(path, stat, _extract_cached(str(path), sha256))
+    finally:
+        conn.close()
+
+    return summary
@@ -0,0 +1,348 @@
+"""
+Residue Ingestion Module
+Streaming, cached ingestion of residue spreadsheets (validation dossier Excel
+workbooks and CSV exports).
+
+- Sheets are read in chunks: openpyxl read-only mode for .xlsx,
+  pd.read_csv(chunksize=) for .csv, so memory stays flat as the dossiers grow
+- Range strings ("150-200", "45-60%") and literature summaries
+  ("Média: 250.5 | Min: 200.0 | Max: 300.0") are parsed column-wise with
+  vectorized Series.str.extract instead of per-cell regex calls
+- Parsed frames are cached per source-file hash (data/cache/ingest/), so an
+  unchanged workbook is never re-read
+- upsert_frame() writes to the residue tables with bulk statements
+  (TEMP staging table, UPDATE ... FROM, INSERT ... SELECT)
+"""
+
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+PathLike = Union[str, Path]
+
+CHUNK_ROWS = 5000
+CACHE_DIR = Path(__file__).parent.parent.parent / "data" / "cache" / "ingest"
+# Bump when parsing rules change, to invalidate cached frames
+PARSER_VERSION = 1
+
+# Same rules as csv_importer.parse_range: first "a-b" pair, else first number
+_RANGE_PATTERN = r'(?P<min>\d+\.?\d*)\s*-\s*(?P<max>\d+\.?\d*)'
+_NUMBER_PATTERN = r'(\d+\.?\d*)'
+
+# Dossier sheets (one per sector)
+DOSSIER_SHEETS = ['AG_AGRICULTURA', 'PC_PECUARIA', 'UR_URBANO', 'IN_INDUSTRIAL']
+
+# Literature summary columns of the dossier → prefix of the parsed columns
+RESUMO_COLUMNS = {
+    'BMP_Resumo_Literatura': 'bmp',
+    'TS_Resumo_Literatura': 'ts',
+    'VS_Resumo_Literatura': 'vs',
+    'CN_Resumo_Literatura': 'cn',
+    'CH4_CONTEUDO_Resumo_Literatura': 'ch4',
+}
+
+# Dossier column → residuos column (cp2b_panorama.db). BMP is not mapped:
+# the dossier reports it in m³ CH₄/kg MS while residuos.bmp_* are in L/kg VS
+DOSSIER_TO_RESIDUOS = {
+    'Residuo_Codigo': 'codigo',
+    'Residuo_Nome': 'nome',
+    'chemical_ts': 'ts_medio',
+    'chemical_vs': 'vs_medio',
+    'chemical_cn_ratio': 'chemical_cn_ratio',
+    'chemical_ch4_content': 'chemical_ch4_content',
+    'availability_fc': 'fc_medio',
+    'availability_fcp': 'fcp_medio',
+    'generation': 'generation',
+    'destination': 'destination',
+    'justification': 'justification',
+    'icon': 'icon',
+    'BMP_Resumo_Literatura': 'bmp_resumo_literatura',
+    'BMP_Referencias_Literatura': 'bmp_referencias_literatura',
+    'TS_Resumo_Literatura': 'ts_resumo_literatura',
+    'TS_Referencias_Literatura': 'ts_referencias_literatura',
+    'VS_Resumo_Literatura': 'vs_resumo_literatura',
+    'VS_Referencias_Literatura': 'vs_referencias_literatura',
+    'CN_Resumo_Literatura': 'cn_resumo_literatura',
+    'CN_Referencias_Literatura': 'cn_referencias_literatura',
+    'CH4_CONTEUDO_Resumo_Literatura': 'ch4_resumo_literatura',
+    'CH4_CONTEUDO_Referencias_Literatura': 'ch4_referencias_literatura',
+    'ts_min': 'ts_min',
+    'ts_max': 'ts_max',
+    'vs_min': 'vs_min',
+    'vs_max': 'vs_max',
+}
+
+
+# ============================================================================
+# VECTORIZED PARSERS
+# ============================================================================
+
+def parse_range_column(series: pd.Series) -> pd.DataFrame:
+    """
+    Parse a column of range strings ("150-200", "75%", "12") at once.
+
+    Vectorized equivalent of csv_importer.parse_range.
+
+    Args:
+        series: Column of range strings (NaN/empty → all None)
+
+    Returns:
+        pd.DataFrame: min, mean, max columns (float, NaN when unparseable)
+    """
+    text = series.astype('string').str.strip()
+    pairs = text.str.extract(_RANGE_PATTERN).astype(float)
+    single = text.str.extract(_NUMBER_PATTERN)[0].astype(float)
+
+    has_pair = pairs['min'].notna()
+    result = pd.DataFrame(index=series.index)
+    result['min'] = np.where(has_pair, pairs['min'], single)
+    result['max'] = np.where(has_pair, pairs['max'], single)
+    result['mean'] = np.where(has_pair, (pairs['min'] + pairs['max']) / 2, single)
+    return result[['min', 'mean', 'max']]
+
+
+def parse_resumo_column(series: pd.Series) -> pd.DataFrame:
+    """
+    Parse literature summaries ("Média: 250.5 | Min: 200.0 | Max: 300.0 (n=15)").
+
+    Args:
+        series: Column of summary strings
+
+    Returns:
+        pd.DataFrame: min, mean, max columns (NaN where absent; rows without a
+        mean are all-NaN, as in update_database_from_excel.parse_resumo_literatura)
+    """
+    text = series.astype('string')
+    result = pd.DataFrame({
+        'min': text.str.extract(r'Min:\s*([\d.]+)')[0],
+        'mean': text.str.extract(r'M[ée]dia:\s*([\d.]+)')[0],
+        'max': text.str.extract(r'Max:\s*([\d.]+)')[0],
+    }, index=series.index)
+    result = result.apply(pd.to_numeric, errors='coerce')
+    result.loc[result['mean'].isna(), ['min', 'max']] = np.nan
+    return result
+
+
+def add_resumo_ranges(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add <param>_min/_mean/_max columns parsed from the dossier summary columns.
+
+    Args:
+        df: Dossier frame
+
+    Returns:
+        pd.DataFrame: Same frame with the parsed columns appended
+    """
+    parsed = {}
+    for column, prefix in RESUMO_COLUMNS.items():
+        if column in df.columns:
+            ranges = parse_resumo_column(df[column])
+            for part in ('min', 'mean', 'max'):
+                parsed[f'{prefix}_{part}'] = ranges[part]
+    return df.assign(**parsed) if parsed else df
+
+
+# ============================================================================
+# CHUNKED READERS
+# ============================================================================
+
+def file_hash(path: PathLike) -> str:
+    """SHA-256 of a file's content (streamed)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_sheet_chunks(path: PathLike, sheet: Optional[str] = None,
+                      chunk_rows: int = CHUNK_ROWS, **csv_kwargs) -> Iterator[pd.DataFrame]:
+    """
+    Yield a sheet (or CSV file) as DataFrames of at most chunk_rows rows.
+
+    Args:
+        path: .xlsx/.xlsm or .csv file
+        sheet: Worksheet name (Excel only; default: first sheet)
+        chunk_rows: Rows per chunk
+        **csv_kwargs: Extra pd.read_csv arguments (CSV only)
+
+    Yields:
+        pd.DataFrame: Consecutive chunks with the header row as columns
+    """
+    path = Path(path)
+    if path.suffix.lower() == '.csv':
+        yield from pd.read_csv(path, chunksize=chunk_rows, **csv_kwargs)
+        return
+
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise ImportError("openpyxl is required to read Excel workbooks: pip install openpyxl") from e
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(c) if c is not None else f'Unnamed: {i}' for i, c in enumerate(header)]
+        buffer: List[tuple] = []
+        for row in rows:
+            if any(value is not None for value in row):
+                buffer.append(row)
+            if len(buffer) >= chunk_rows:
+                yield pd.DataFrame(buffer, columns=columns)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=columns)
+    finally:
+        workbook.close()
+
+
+def read_sheet(path: PathLike, sheet: Optional[str] = None,
+               parse: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+               cache: bool = True, chunk_rows: int = CHUNK_ROWS, **csv_kwargs) -> pd.DataFrame:
+    """
+    Read and parse a sheet chunk by chunk, cached per file content.
+
+    Args:
+        path: .xlsx or .csv file
+        sheet: Worksheet name (Excel only)
+        parse: Chunk transformation (vectorized; applied to every chunk)
+        cache: Reuse/store the parsed frame under data/cache/ingest
+        chunk_rows: Rows per chunk
+        **csv_kwargs: Extra pd.read_csv arguments
+
+    Returns:
+        pd.DataFrame: Parsed sheet
+    """
+    cache_file = None
+    if cache:
+        parser_name = f"{parse.__module__}.{parse.__qualname__}" if parse else 'raw'
+        key = hashlib.sha1(
+            f"{file_hash(path)}|{sheet}|{parser_name}|{PARSER_VERSION}|{sorted(csv_kwargs.items())}".encode()
+        ).hexdigest()
+        cache_file = CACHE_DIR / f"{key}.pkl"
+        if cache_file.exists():
+            return pd.read_pickle(cache_file)
+
+    chunks = [parse(chunk) if parse else chunk
+              for chunk in iter_sheet_chunks(path, sheet, chunk_rows, **csv_kwargs)]
+    df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+    if cache_file is not None:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix('.tmp')
+        df.to_pickle(tmp)
+        tmp.replace(cache_file)
+    return df
+
+
+def load_dossier(path: PathLike, sheets: Optional[List[str]] = None, cache: bool = True) -> pd.DataFrame:
+    """
+    Read the validation dossier workbook (all sector sheets, summaries parsed).
+
+    Args:
+        path: Dossier .xlsx
+        sheets: Sheets to read (default: DOSSIER_SHEETS)
+        cache: Use the per-file-hash cache
+
+    Returns:
+        pd.DataFrame: Concatenated sheets with a 'sheet' column and the
+        <param>_min/_mean/_max columns of add_resumo_ranges
+    """
+    frames = []
+    for sheet in sheets or DOSSIER_SHEETS:
+        df = read_sheet(path, sheet, parse=add_resumo_ranges, cache=cache)
+        frames.append(df.assign(sheet=sheet))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+# ============================================================================
+# BULK UPSERT
+# ============================================================================
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def dossier_to_residuos(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Map dossier columns onto the residuos table (cp2b_panorama.db).
+
+    Args:
+        df: Output of load_dossier
+
+    Returns:
+        pd.DataFrame: Columns of residuos that the dossier provides, one row per codigo
+    """
+    columns = {src: dst for src, dst in DOSSIER_TO_RESIDUOS.items() if src in df.columns}
+    mapped = df[list(columns)].rename(columns=columns)
+    mapped = mapped[mapped['codigo'].notna()]
+    mapped['codigo'] = mapped['codigo'].astype(str).str.strip()
+    return mapped.drop_duplicates('codigo', keep='last')
+
+
+def upsert_frame(db_path: PathLike, table: str, df: pd.DataFrame, key: str = 'codigo',
+                 insert_missing: bool = True) -> Dict:
+    """
+    Bulk upsert a DataFrame into a table, matching rows on one key column.
+
+    Only columns the table already has are written. NULLs in the frame keep
+    the current value (COALESCE), so partially filled sheets never erase data.
+
+    Args:
+        db_path: SQLite database
+        table: Target table
+        df: Rows to write (must contain the key column)
+        key: Matching column
+        insert_missing: Insert rows whose key is not in the table yet
+
+    Returns:
+        Dict: updated, inserted, columns, skipped_columns
+    """
+    conn = sqlite3.connect(str(db_path))
+    try:
+        table_columns = [row[1] for row in conn.execute(f"PRAGMA table_info({_quote(table)})")]
+        if not table_columns:
+            raise ValueError(f"Table not found: {table}")
+        columns = [c for c in df.columns if c in table_columns]
+        if key not in columns:
+            raise ValueError(f"Key column '{key}' missing from frame or table")
+        skipped = [c for c in df.columns if c not in table_columns]
+
+        staged = df[columns].astype(object).where(df[columns].notna(), None)
+        cols_sql = ', '.join(_quote(c) for c in columns)
+        with conn:
+            conn.execute("DROP TABLE IF EXISTS temp._ingest_stage")
+            conn.execute(f"CREATE TEMP TABLE _ingest_stage ({cols_sql})")
+            conn.executemany(
+                f"INSERT INTO temp._ingest_stage VALUES ({', '.join('?' * len(columns))})",
+                staged.itertuples(index=False, name=None)
+            )
+            conn.execute(f"CREATE INDEX temp._ingest_stage_key ON _ingest_stage ({_quote(key)})")
+
+            values = [c for c in columns if c != key]
+            updated = 0
+            if values:
+                assignments = ', '.join(f"{_quote(c)} = COALESCE(s.{_quote(c)}, t.{_quote(c)})" for c in values)
+                updated = conn.execute(
+                    f"UPDATE {_quote(table)} AS t SET {assignments} FROM temp._ingest_stage AS s "
+                    f"WHERE t.{_quote(key)} = s.{_quote(key)}"
+                ).rowcount
+            inserted = 0
+            if insert_missing:
+                inserted = conn.execute(
+                    f"INSERT INTO {_quote(table)} ({cols_sql}) SELECT {cols_sql} FROM temp._ingest_stage AS s "
+                    f"WHERE NOT EXISTS (SELECT 1 FROM {_quote(table)} AS t WHERE t.{_quote(key)} = s.{_quote(key)})"
+                ).rowcount
+            conn.execute("DROP TABLE temp._ingest_stage")
+    finally:
+        conn.close()
+
+    return {'updated': updated, 'inserted': inserted, 'columns': columns, 'skipped_columns': skipped}
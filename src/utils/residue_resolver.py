@@ -0,0 +1,298 @@
+"""
+Residue Resolver Module
+Single point of residue identity resolution for the whole app.
+
+Residues are named differently in every data source:
+- cp2b_panorama.db residuos.codigo / nome ('VINHACA', 'Vinhaça')
+- hierarchical webapp codes ('CANA_VINHACA', 'SUINO_DEJETO')
+- CP2B_Precision_Biogas.db residue_types.residue_code ('CITRUS_CASCA' → residue_id 8)
+- residue_registry names ('Vinhaça de Cana-de-açúcar')
+- Phase 5 FDE names ('Torta de Filtro (Filter Cake)')
+
+All of them are folded once (accents removed, case-folded, punctuation collapsed)
+into one alias hash map pointing to a canonical key (residuos.codigo when the
+residue exists there). Lookups are O(1) dict hits; a trigram inverted index
+gives a fuzzy fallback for free-text input (lab forms, spreadsheets).
+
+Canonical identity per residue: codigo, nome, registry_name, fde_name, precision_id
+"""
+
+import re
+import sqlite3
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+PANORAMA_DB_PATH = Path(__file__).parent.parent.parent / "data" / "cp2b_panorama.db"
+
+# Canonical key → aliases not derivable from the databases (webapp hierarchical
+# codes, precision DB codes, registry/FDE names that differ from residuos.nome)
+ALIASES: Dict[str, List[str]] = {
+    # Cana-de-açúcar
+    'VINHACA': ['CANA_VINHACA', 'Vinhaça de Cana-de-açúcar', 'Vinhaça de cana'],
+    'BAGACO': ['CANA_BAGACO', 'Sugarcane Bagasse'],
+    'PALHA': ['CANA_PALHA', 'PALHA_CANA', 'Palha de Cana-de-açúcar (Palhiço)', 'Palhiço', 'Sugarcane Straw/Trash'],
+    'TORTA_FILTRO': ['TORTA', 'CANA_TORTA_FILTRO', 'Torta de Filtro (Filter Cake)', 'Filter Cake'],
+    # Citros
+    'CASCAS_CITROS': ['CITRUS_CASCA', 'CITROS_CASCAS', 'CITROS_CASCA', 'Casca de citros', 'Casca de Citros/Orange Peel'],
+    'BAGACO_CITROS': ['CITRUS_BAGACO', 'CITROS_BAGACO', 'Bagaço de Citros/Orange Bagasse'],
+    'POLPA_CITROS': ['CITROS_POLPA'],
+    # Café
+    'CASCA_CAFE': ['CAFE_CASCA', 'CAFE_CASCAS', 'Casca de café (pergaminho)'],
+    'POLPA_CAFE': ['CAFE_POLPA'],
+    'MUCILAGEM_CAFE': ['CAFE_MUCILAGEM', 'Mucilagem fermentada'],
+    # Milho / Soja
+    'PALHA_MILHO': ['MILHO_PALHA'],
+    'SABUGO': ['MILHO_SABUGO', 'SABUGO_MILHO'],
+    'PALHA_SOJA': ['SOJA_PALHA'],
+    'CASCA_SOJA': ['SOJA_CASCA'],
+    'VAGEM_SOJA': ['SOJA_VAGEM', 'Vagens vazias'],
+    # Silvicultura
+    'CASCA_EUCALIPTO': ['EUCALIPTO', 'EUCALIPTO_CASCA', 'EUCALIPTO_CASCAS', 'Resíduos de eucalipto'],
+    # Pecuária
+    'CAMA_AVIARIO': ['CAMA_FRANGO', 'AVES_CAMA', 'FRANGO_CAMA', 'Cama de frango',
+                     'Dejeto de Aves (Cama de Frango)', 'Cama de frango/Dejetos de aves'],
+    'DEJETOS_AVES': ['AVES_DEJETO', 'AVES_DEJETOS', 'Dejetos de postura'],
+    'DEJETOS_SUINO': ['SUINO_DEJETO', 'SUINO_DEJETOS', 'DEJETOS_SUINOS', 'Dejetos suínos', 'Dejetos de suínos'],
+    'DEJETOS_BOVINO': ['BOVINO_DEJETO', 'BOVINO_DEJETOS', 'Dejetos bovinos',
+                       'Dejetos bovinos (confinamento)'],
+    'ESTERCO_BOVINO': ['BOVINO_ESTERCO'],
+    # Industrial
+    'VISCERAS': ['FRIGORIF_VISCERAS', 'ABATE_VISCERAS'],
+    'SANGUE': ['FRIGORIF_SANGUE', 'ABATE_SANGUE', 'Sangue bovino'],
+    'REJEITOS': ['FRIGORIF_REJEITOS'],
+    'BAGACO_MALTE': ['CERVEJA_MALTE', 'CERVEJA_BAGACO', 'Bagaço de Cervejarias'],
+    'LEVEDO_CERVEJA': ['CERVEJA_LEVEDO'],
+    'SORO_LATICINIOS': ['Soro de queijo', 'Soro de Laticínios (Leite)', 'Soro de Laticínios (Derivados)'],
+    # Urbano
+    'LODO_SECUNDARIO': ['LODO_ETE', 'ETE_LODO', 'Lodo de Esgoto (ETE)'],
+    'ORGANICO_RSU': ['RSU', 'RESIDUO_SOLIDO_URBANO', 'RSU - Resíduo Sólido Urbano', 'RSU urbano'],
+    'RPO': ['RPO - Poda Urbana', 'Poda urbana'],
+}
+
+# Residues without own measurements that borrow a precision DB residue
+PRECISION_ID_OVERRIDES: Dict[str, int] = {
+    'POLPA_CITROS': 8,  # mapped to citrus peel for now
+}
+
+FUZZY_MIN_SIMILARITY = 0.6
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def fold(text) -> str:
+    """Accent-folded, case-folded key: 'Vinhaça de Cana-de-açúcar' → 'vinhaca de cana de acucar'."""
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(char for char in text if not unicodedata.combining(char)).casefold()
+    return _NON_ALNUM.sub(' ', text).strip()
+
+
+def trigrams(folded: str) -> frozenset:
+    """Character trigrams of a folded key (padded so short words still match)."""
+    padded = f'  {folded} '
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+@dataclass
+class ResidueIdentity:
+    """Canonical residue with its name in every data source."""
+    key: str
+    codigo: Optional[str] = None
+    nome: Optional[str] = None
+    registry_name: Optional[str] = None
+    fde_name: Optional[str] = None
+    precision_id: Optional[int] = None
+
+
+@dataclass
+class ResidueIndex:
+    """Alias hash map, per-source exact names and trigram postings."""
+    entities: Dict[str, ResidueIdentity] = field(default_factory=dict)
+    aliases: Dict[str, str] = field(default_factory=dict)
+    own_names: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    alias_keys: List[str] = field(default_factory=list)
+    alias_sizes: List[int] = field(default_factory=list)
+    postings: Dict[str, List[int]] = field(default_factory=dict)
+
+    def add_alias(self, alias, key: str) -> None:
+        folded = fold(alias)
+        if folded and folded not in self.aliases:
+            self.aliases[folded] = key
+
+    def entity_for(self, name, key_if_new: Optional[str] = None) -> ResidueIdentity:
+        """Entity an alias resolves to, created under key_if_new (or the name) when unknown."""
+        key = self.aliases.get(fold(name))
+        if key is None:
+            key = key_if_new or str(name)
+            self.add_alias(name, key)
+        if key not in self.entities:
+            self.entities[key] = ResidueIdentity(key=key)
+        return self.entities[key]
+
+    def build_trigrams(self) -> None:
+        self.alias_keys = list(self.aliases)
+        self.postings = {}
+        self.alias_sizes = []
+        for i, folded in enumerate(self.alias_keys):
+            grams = trigrams(folded)
+            self.alias_sizes.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(i)
+
+
+def _read(db_path: Path, query: str) -> List[Tuple]:
+    if not Path(db_path).exists():
+        return []
+    conn = sqlite3.connect(str(db_path))
+    try:
+        return conn.execute(query).fetchall()
+    except sqlite3.Error:
+        return []
+    finally:
+        conn.close()
+
+
+def build_index(panorama_db: Optional[Path] = None, precision_db: Optional[Path] = None) -> ResidueIndex:
+    """
+    Fold all sources into one index.
+
+    Order matters: residuos codes/names and the curated ALIASES define the
+    canonical keys; precision DB codes, registry and FDE names attach to them
+    (or become their own entity when unknown).
+    """
+    from src.adapters.precision_db_adapter import PrecisionDatabaseAdapter
+    from src.data.phase_5_fde_data import FDE_VALIDATION_DATA
+    from src.data.residue_registry import RESIDUES_REGISTRY
+
+    index = ResidueIndex()
+
+    for codigo, nome in _read(panorama_db or PANORAMA_DB_PATH, "SELECT codigo, nome FROM residuos"):
+        entity = index.entity_for(codigo, key_if_new=codigo)
+        entity.codigo, entity.nome = codigo, nome
+        index.add_alias(nome, entity.key)
+
+    for key, aliases in ALIASES.items():
+        index.entity_for(key, key_if_new=key)
+        for alias in aliases:
+            index.add_alias(alias, index.aliases[fold(key)])
+
+    precision_rows = _read(precision_db or PrecisionDatabaseAdapter.DB_PATH,
+                           "SELECT residue_id, residue_code, residue_name FROM residue_types")
+    for residue_id, code, name in precision_rows:
+        entity = index.entity_for(code, key_if_new=code)
+        if entity.precision_id is None:
+            entity.precision_id = int(residue_id)
+        index.add_alias(name, entity.key)
+    for key, residue_id in PRECISION_ID_OVERRIDES.items():
+        index.entity_for(key).precision_id = residue_id
+
+    for source, names in (('registry_name', RESIDUES_REGISTRY), ('fde_name', FDE_VALIDATION_DATA)):
+        own = index.own_names.setdefault(source, {})
+        for name in names:
+            own[fold(name)] = name
+            entity = index.entity_for(name)
+            if getattr(entity, source) is None:
+                setattr(entity, source, name)
+
+    index.build_trigrams()
+    return index
+
+
+@lru_cache(maxsize=1)
+def get_index() -> ResidueIndex:
+    """Process-wide index (built on first use)."""
+    return build_index()
+
+
+def clear_cache() -> None:
+    """Rebuild the index on next use (after residue tables change)."""
+    get_index.cache_clear()
+
+
+def suggest(text, limit: int = 5, min_similarity: float = FUZZY_MIN_SIMILARITY) -> List[Tuple[str, float]]:
+    """
+    Fuzzy candidates by trigram Jaccard similarity.
+
+    Returns:
+        List of (canonical key, similarity), best first, one entry per residue
+    """
+    index = get_index()
+    grams = trigrams(fold(text))
+    shared = Counter()
+    for gram in grams:
+        shared.update(index.postings.get(gram, ()))
+
+    best: Dict[str, float] = {}
+    for i, n_shared in shared.items():
+        similarity = n_shared / (len(grams) + index.alias_sizes[i] - n_shared)
+        key = index.aliases[index.alias_keys[i]]
+        if similarity >= min_similarity and similarity > best.get(key, 0.0):
+            best[key] = similarity
+    return sorted(best.items(), key=lambda item: -item[1])[:limit]
+
+
+def resolve(text, fuzzy: bool = False, min_similarity: float = FUZZY_MIN_SIMILARITY) -> Optional[ResidueIdentity]:
+    """
+    Canonical residue for any code or name.
+
+    Args:
+        text: Code or name from any source
+        fuzzy: Fall back to the closest alias by trigram similarity
+        min_similarity: Minimum Jaccard similarity for the fuzzy fallback
+
+    Returns:
+        ResidueIdentity or None
+    """
+    if text is None:
+        return None
+    index = get_index()
+    key = index.aliases.get(fold(text))
+    if key is None and fuzzy:
+        candidates = suggest(text, limit=1, min_similarity=min_similarity)
+        key = candidates[0][0] if candidates else None
+    return index.entities.get(key) if key else None
+
+
+def _own_or_entity(source: str, text, fuzzy: bool) -> Optional[str]:
+    if text is None:
+        return None
+    own = get_index().own_names.get(source, {}).get(fold(text))
+    if own is not None:
+        return own
+    entity = resolve(text, fuzzy=fuzzy)
+    return getattr(entity, source) if entity else None
+
+
+def canonical_code(text, fuzzy: bool = False) -> Optional[str]:
+    """residuos.codigo for any alias ('CANA_VINHACA' → 'VINHACA')."""
+    entity = resolve(text, fuzzy=fuzzy)
+    return entity.codigo if entity else None
+
+
+def precision_id(text, fuzzy: bool = False) -> Optional[int]:
+    """CP2B_Precision_Biogas.db residue_id for any alias (None when not covered)."""
+    entity = resolve(text, fuzzy=fuzzy)
+    return entity.precision_id if entity else None
+
+
+def registry_name(text, fuzzy: bool = False) -> Optional[str]:
+    """residue_registry key; names that are registry keys themselves are returned as-is."""
+    return _own_or_entity('registry_name', text, fuzzy)
+
+
+def fde_name(text, fuzzy: bool = False) -> Optional[str]:
+    """FDE_VALIDATION_DATA key; names that are FDE keys themselves are returned as-is."""
+    return _own_or_entity('fde_name', text, fuzzy)
+
+
+def precision_mapping() -> Dict[str, int]:
+    """{residuos.codigo: precision residue_id} for every covered residue."""
+    return {
+        entity.codigo: entity.precision_id
+        for entity in get_index().entities.values()
+        if entity.codigo and entity.precision_id is not None
+    }
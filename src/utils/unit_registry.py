@@ -0,0 +1,423 @@
+"""
+Unit Registry Module
+Compiled unit parsing and vectorized conversion for chemical parameters.
+
+Every raw unit string found in the literature ("mL CH₄/g VS", "± 8256 mg/L",
+"g/kg", "mmolc/L", "Nm³/kg MS") is parsed once into a canonical
+(dimension, factor, basis) triple and memoized. Conversions are then a
+multiplication of whole columns by per-unit factors.
+
+Dimensions and base units:
+- concentration:   g/L           (mg/L, kg/m³, mgO₂/L, mg N/L, ...)
+- mass_fraction:   kg/kg         (%, g/kg, mg/kg) with basis wet | dry (DW/TS/MS) | vs
+- specific_yield:  m³ CH₄/kg     (mL/g, L/kg, m³/t, Nm³/kg) with basis vs | dry | wet
+- volume_fraction: m³/m³         (% v/v; plain % for METHANE_CONTENT)
+- molar_charge:    molc/L        (mmolc/L; converted with MOLAR_MASSES / VALENCES)
+- dimensionless:   unitless      (pH, C:N, ':1')
+
+Conversions across dimensions:
+- Unspecified/wet mass fractions of liquid residues (residues reported mostly as
+  concentrations, e.g. vinhaça) → concentration with ρ = 1 kg/L (1% = 10 g/L)
+- Specific yield on TS basis → VS basis with the residue's VS/TS ratio
+"""
+
+import re
+import sqlite3
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Base-unit factors per dimension (normalized unit → factor to base)
+CONCENTRATION_UNITS = {
+    'mg/l': 1e-3, 'g/l': 1.0, 'kg/m3': 1.0, 'g/m3': 1e-3, 'ug/l': 1e-6,
+    'mg/ml': 1.0, 'kg/l': 1e3, 'g/dm3': 1.0, 'mg/dm3': 1e-3, 'ppm': 1e-3,
+}
+MASS_FRACTION_UNITS = {
+    '%': 1e-2, 'wt.%': 1e-2, 'wt%': 1e-2, '%(w/w)': 1e-2, '%w/w': 1e-2, '%m/m': 1e-2,
+    'g/kg': 1e-3, 'mg/kg': 1e-6, 'g/g': 1.0, 'kg/kg': 1.0, 'kg/t': 1e-3, 'g/100g': 1e-2,
+}
+SPECIFIC_YIELD_UNITS = {
+    'ml/g': 1e-3, 'nml/g': 1e-3, 'l/kg': 1e-3, 'nl/kg': 1e-3, 'm3/t': 1e-3,
+    'nm3/t': 1e-3, 'm3/kg': 1.0, 'nm3/kg': 1.0, 'l/g': 1.0, 'nl/g': 1.0,
+}
+VOLUME_FRACTION_UNITS = {'%v/v': 1e-2, 'vol%': 1e-2, '%vol': 1e-2, '%(v/v)': 1e-2}
+MOLAR_CHARGE_UNITS = {'mmolc/l': 1e-3, 'molc/l': 1.0, 'mmol/l': 1e-3, 'mol/l': 1.0, 'meq/l': 1e-3}
+DIMENSIONLESS_UNITS = {'unitless', '', ':1', '-', 'ratio', 'adimensional', 'none'}
+
+# Placeholders that only make sense for dimensionless parameters
+DIMENSIONLESS_PLACEHOLDERS = {'n/a', 'na', 'from_table', 'nd'}
+
+# Basis tokens written after the unit ("% DW", "g/kg MS", "mL/g VS")
+BASIS_TOKENS = {
+    'dw': 'dry', 'ts': 'dry', 'ms': 'dry', 'dm': 'dry', 'db': 'dry', 'dry': 'dry', 'st': 'dry',
+    'vs': 'vs', 'sv': 'vs', 'odm': 'vs',
+    'fm': 'wet', 'wb': 'wet', 'wet': 'wet', 'mu': 'wet', 'fw': 'wet',
+}
+
+# Species annotations removed before lookup (mgO₂/L, mg N/L, mL CH₄/g)
+SPECIES_PATTERN = re.compile(r'(?<=[a-z])(o2|ch4|n|p|k)(?=/)|\b(ch4|o2|n|p|k)\b')
+
+DIMENSIONLESS_PARAMETERS = {'pH', 'CN_RATIO'}
+VOLUME_FRACTION_PARAMETERS = {'METHANE_CONTENT'}
+WET_BASIS_PARAMETERS = {'TS', 'MOISTURE'}
+VS_BASIS_PARAMETERS = {'VS'}
+
+# Target unit labels: (parameter, dimension) overrides, then per-dimension defaults
+TARGET_UNITS: Dict[tuple, str] = {
+    ('NITROGEN', 'concentration'): 'mg/L',
+    ('PHOSPHORUS', 'concentration'): 'mg/L',
+    ('POTASSIUM', 'concentration'): 'mg/L',
+    ('CARBON', 'concentration'): 'mg/L',
+    ('TAN', 'concentration'): 'mg N/L',
+}
+DEFAULT_TARGET_UNITS = {
+    'concentration': 'g/L',
+    'specific_yield': 'mL CH₄/g VS',
+    'volume_fraction': '%',
+    'dimensionless': 'unitless',
+}
+MASS_FRACTION_TARGETS = {'wet': '%', 'dry': '% DW', 'vs': '% VS'}
+
+# Molar mass [g/mol] and valence for molar/charge units
+MOLAR_MASSES = {'POTASSIUM': 39.10, 'NITROGEN': 14.01, 'TAN': 14.01, 'PHOSPHORUS': 30.97}
+VALENCES = {'POTASSIUM': 1, 'NITROGEN': 1, 'TAN': 1, 'PHOSPHORUS': 1}
+
+LIQUID_DENSITY_KG_L = 1.0
+
+
+@dataclass(frozen=True)
+class ParsedUnit:
+    """Canonical form of a unit string."""
+    dimension: str
+    factor: float
+    basis: Optional[str] = None
+    charge: bool = False
+
+
+def _normalize_unit(unit: str) -> str:
+    """Lower-case, ASCII, no spaces; drop '±' prefixes and repeated alternatives."""
+    text = str(unit).strip()
+    text = re.sub(r'^±\s*[\d.,]+\s*', '', text)
+    text = text.split(',')[0]
+    text = text.translate(str.maketrans({'₄': '4', '₂': '2', '³': '3', '²': '2', 'µ': 'u', 'μ': 'u', '·': ''}))
+    text = text.lower().strip()
+    text = re.sub(r'\s*/\s*', '/', text)
+    return re.sub(r'\s+', ' ', text)
+
+
+@lru_cache(maxsize=4096)
+def parse_unit(unit: Optional[str], parameter: Optional[str] = None) -> Optional[ParsedUnit]:
+    """
+    Parse a raw unit string into (dimension, factor to base, basis).
+
+    Memoized per (unit, parameter): the literature uses a few dozen distinct
+    strings, so each one is parsed once per process.
+
+    Args:
+        unit: Raw unit string
+        parameter: Parameter name (disambiguates '%' and placeholders)
+
+    Returns:
+        ParsedUnit or None if the unit is not recognized
+
+    Examples:
+        >>> parse_unit('mL CH₄/g VS')
+        ParsedUnit(dimension='specific_yield', factor=0.001, basis='vs', charge=False)
+        >>> parse_unit('± 8256 mg/L')
+        ParsedUnit(dimension='concentration', factor=0.001, basis=None, charge=False)
+    """
+    text = _normalize_unit('' if unit is None else unit)
+
+    if parameter in DIMENSIONLESS_PARAMETERS and (text in DIMENSIONLESS_UNITS or text in DIMENSIONLESS_PLACEHOLDERS):
+        return ParsedUnit('dimensionless', 1.0)
+    if text in DIMENSIONLESS_UNITS:
+        return ParsedUnit('dimensionless', 1.0)
+
+    compact = text.replace(' ', '')
+    if compact in VOLUME_FRACTION_UNITS:
+        return ParsedUnit('volume_fraction', VOLUME_FRACTION_UNITS[compact])
+    if compact == '%' and parameter in VOLUME_FRACTION_PARAMETERS:
+        return ParsedUnit('volume_fraction', 1e-2)
+
+    # Split a trailing basis token ("% DW", "g/kg MS", "mL/g VS")
+    basis = None
+    tokens = text.split(' ')
+    if len(tokens) > 1 and tokens[-1] in BASIS_TOKENS:
+        basis = BASIS_TOKENS[tokens[-1]]
+        text = ' '.join(tokens[:-1])
+    elif compact.startswith('%') and compact[1:] in BASIS_TOKENS:
+        basis = BASIS_TOKENS[compact[1:]]
+        text = '%'
+
+    core = SPECIES_PATTERN.sub('', text).replace(' ', '')
+
+    if core in CONCENTRATION_UNITS and basis is None:
+        return ParsedUnit('concentration', CONCENTRATION_UNITS[core])
+    if core in MOLAR_CHARGE_UNITS:
+        return ParsedUnit('molar_charge', MOLAR_CHARGE_UNITS[core], charge='c/' in core or core.startswith('meq'))
+    if core in SPECIFIC_YIELD_UNITS:
+        return ParsedUnit('specific_yield', SPECIFIC_YIELD_UNITS[core], basis)
+    if core in MASS_FRACTION_UNITS:
+        return ParsedUnit('mass_fraction', MASS_FRACTION_UNITS[core], basis)
+    return None
+
+
+def mass_fraction_basis(parsed: ParsedUnit, parameter: Optional[str]) -> str:
+    """Explicit basis, or the parameter's usual basis when the unit does not state it."""
+    if parsed.basis is not None:
+        return parsed.basis
+    if parameter in WET_BASIS_PARAMETERS:
+        return 'wet'
+    return 'dry'
+
+
+def target_unit(parameter: Optional[str], parsed: ParsedUnit) -> Optional[str]:
+    """Standard unit label for a parsed unit of a parameter."""
+    if parsed.dimension == 'mass_fraction':
+        basis = mass_fraction_basis(parsed, parameter)
+        if parameter in VS_BASIS_PARAMETERS and basis == 'dry':
+            return '% TS'
+        return MASS_FRACTION_TARGETS[basis]
+    if parsed.dimension == 'molar_charge':
+        if parameter not in MOLAR_MASSES:
+            return None
+        return TARGET_UNITS.get((parameter, 'concentration'), DEFAULT_TARGET_UNITS['concentration'])
+    if parsed.dimension == 'specific_yield' and parsed.basis not in (None, 'vs'):
+        return {'dry': 'mL CH₄/g TS', 'wet': 'mL CH₄/g FM'}[parsed.basis]
+    return TARGET_UNITS.get((parameter, parsed.dimension), DEFAULT_TARGET_UNITS.get(parsed.dimension))
+
+
+@lru_cache(maxsize=4096)
+def conversion_factor(from_unit: Optional[str], to_unit: str, parameter: Optional[str] = None) -> float:
+    """
+    Multiplicative factor from `from_unit` to `to_unit` (NaN if incompatible).
+
+    Examples:
+        >>> conversion_factor('mg/L', 'g/L')
+        0.001
+        >>> conversion_factor('m³/t', 'mL CH₄/g VS', 'BMP')
+        1.0
+        >>> conversion_factor('mmolc/L', 'mg/L', 'POTASSIUM')
+        39.1
+    """
+    source = parse_unit(from_unit, parameter)
+    target = parse_unit(to_unit, parameter)
+    if source is None or target is None:
+        return float('nan')
+
+    if source.dimension == 'molar_charge' and target.dimension == 'concentration':
+        if parameter not in MOLAR_MASSES:
+            return float('nan')
+        grams_per_mol = MOLAR_MASSES[parameter] / (VALENCES[parameter] if source.charge else 1)
+        return source.factor * grams_per_mol / target.factor
+
+    if source.dimension != target.dimension:
+        return float('nan')
+    if source.dimension == 'mass_fraction':
+        if mass_fraction_basis(source, parameter) != mass_fraction_basis(target, parameter):
+            return float('nan')
+    elif source.basis != target.basis and None not in (source.basis, target.basis):
+        return float('nan')
+    return source.factor / target.factor
+
+
+def convert(values, from_units, to_unit: str, parameter: Optional[str] = None) -> np.ndarray:
+    """
+    Convert a whole column to `to_unit`.
+
+    Factors are computed once per distinct source unit and broadcast back.
+
+    Args:
+        values: Array-like of values
+        from_units: Array-like of unit strings (same length) or a single string
+        to_unit: Target unit
+        parameter: Parameter name
+
+    Returns:
+        np.ndarray (NaN where the unit is unknown or incompatible)
+    """
+    values = np.asarray(values, dtype=float)
+    if isinstance(from_units, str) or from_units is None:
+        return values * conversion_factor(from_units, to_unit, parameter)
+
+    codes, uniques = pd.factorize(pd.Series(from_units, dtype=object).fillna(''), sort=False)
+    factors = np.array([conversion_factor(u, to_unit, parameter) for u in uniques] + [np.nan])
+    return values * factors[codes]
+
+
+def standardize(
+    df: pd.DataFrame,
+    value_column: str = 'value_mean',
+    unit_column: str = 'unit',
+    parameter_column: str = 'parameter_name',
+    residue_column: str = 'residue_id'
+) -> pd.DataFrame:
+    """
+    Standardized value and unit for every row of a chemical_parameters frame.
+
+    1. Each distinct (unit, parameter) pair is parsed once and given a target unit
+    2. value × factor, vectorized over the column
+    3. Wet/unspecified mass fractions → concentration (ρ = 1 kg/L) for residues
+       reported mostly as concentrations (liquids)
+    4. Specific yield on TS basis → VS basis with the residue's VS/TS ratio
+
+    Returns:
+        DataFrame (same index) with unit_standardized and value_standardized
+    """
+    units = df[unit_column].where(df[unit_column].notna(), '').astype(str)
+    parameters = df[parameter_column].astype(str)
+    pairs = pd.MultiIndex.from_arrays([units, parameters])
+    codes, uniques = pd.factorize(pairs, sort=False)
+
+    dims, targets, factors, explicit, fractions = [], [], [], [], []
+    for unit, parameter in uniques:
+        parsed = parse_unit(unit, parameter)
+        target = target_unit(parameter, parsed) if parsed else None
+        dims.append(parsed.dimension if parsed else None)
+        explicit.append(parsed.basis if parsed else None)
+        fractions.append(parsed.factor if parsed else np.nan)
+        targets.append(target)
+        factors.append(conversion_factor(unit, target, parameter) if target else np.nan)
+
+    dimension = np.asarray(dims, dtype=object)[codes]
+    unit_std = np.asarray(targets, dtype=object)[codes]
+    raw_values = pd.to_numeric(df[value_column], errors='coerce').to_numpy(dtype=float)
+    value_std = raw_values * np.asarray(factors)[codes]
+
+    # Liquid residues (reported mostly as concentrations): wet/unspecified mass
+    # fractions → concentration with ρ = 1 kg/L
+    if residue_column in df.columns:
+        residues = df[residue_column].to_numpy()
+        state = pd.DataFrame({
+            'conc': dimension == 'concentration',
+            'frac': dimension == 'mass_fraction',
+        }).groupby(residues).transform('sum')
+        liquid_residue = (state['conc'] > state['frac']).to_numpy()
+        basis = np.asarray(explicit, dtype=object)[codes]
+        to_conc = (
+            liquid_residue
+            & (dimension == 'mass_fraction')
+            & pd.Series(basis).isin([None, 'wet']).to_numpy()
+        )
+        if to_conc.any():
+            target = np.array([
+                TARGET_UNITS.get((p, 'concentration'), DEFAULT_TARGET_UNITS['concentration'])
+                for p in parameters[to_conc]
+            ], dtype=object)
+            target_factor = np.array([parse_unit(t).factor for t in target])
+            fraction = raw_values[to_conc] * np.asarray(fractions)[codes][to_conc]
+            value_std[to_conc] = fraction * LIQUID_DENSITY_KG_L * 1e3 / target_factor
+            unit_std[to_conc] = target
+
+    # Specific yield on TS basis → VS basis
+    on_ts = unit_std == 'mL CH₄/g TS'
+    if on_ts.any() and residue_column in df.columns:
+        vs_ts = pd.Series(value_std, index=df.index)[(unit_std == '% TS')].groupby(
+            df[residue_column][unit_std == '% TS']).median() / 100.0
+        ratio = df[residue_column].map(vs_ts).to_numpy(dtype=float)
+        convertible = on_ts & np.isfinite(ratio) & (ratio > 0)
+        value_std[convertible] = value_std[convertible] / ratio[convertible]
+        unit_std[convertible] = 'mL CH₄/g VS'
+
+    return pd.DataFrame({'unit_standardized': unit_std, 'value_standardized': value_std}, index=df.index)
+
+
+def backfill_precision_db(conn: sqlite3.Connection, only_missing: bool = False) -> Dict[str, int]:
+    """
+    Bulk-fill unit_standardized / value_standardized of chemical_parameters.
+
+    The raw unit is unit_original (falling back to unit, which is copied to
+    unit_original when empty). Only rows whose standardized value or unit
+    changes are written, in a single transaction.
+
+    Args:
+        conn: Connection to CP2B_Precision_Biogas.db
+        only_missing: Only rows without value_standardized
+
+    Returns:
+        dict: {'rows': n, 'updated': n, 'unchanged': n, 'unparsed': n}
+    """
+    query = """
+        SELECT param_id, residue_id, parameter_name, value_mean,
+               COALESCE(NULLIF(unit_original, ''), unit) AS raw_unit,
+               unit_original, unit_standardized, value_standardized
+        FROM chemical_parameters
+    """
+    df = pd.read_sql(query, conn)
+    if only_missing:
+        # Context (VS/TS ratios, dominant dimension) still comes from all rows
+        missing = df['value_standardized'].isna()
+    else:
+        missing = pd.Series(True, index=df.index)
+
+    std = standardize(df, unit_column='raw_unit')
+    unparsed = std['unit_standardized'].isna() & df['value_mean'].notna()
+
+    old_value = pd.to_numeric(df['value_standardized'], errors='coerce')
+    new_value = std['value_standardized']
+    same_value = np.isclose(old_value, new_value, rtol=1e-9, equal_nan=True)
+    same_unit = df['unit_standardized'].fillna('').to_numpy() == std['unit_standardized'].fillna('').to_numpy()
+    needs_original = df['unit_original'].isna() | (df['unit_original'] == '')
+    changed = missing.to_numpy() & ~unparsed.to_numpy() & (~same_value | ~same_unit | needs_original.to_numpy())
+
+    updates = pd.DataFrame({
+        'raw_unit': df['raw_unit'],
+        'unit_standardized': std['unit_standardized'],
+        'value_standardized': new_value,
+        'param_id': df['param_id'],
+    })[changed]
+    updates = updates.astype(object).where(updates.notna(), None)
+
+    with conn:
+        conn.executemany("""
+            UPDATE chemical_parameters
+            SET unit_original = COALESCE(NULLIF(unit_original, ''), ?),
+                unit_standardized = ?,
+                value_standardized = ?
+            WHERE param_id = ?
+        """, updates.itertuples(index=False, name=None))
+
+    return {
+        'rows': int(missing.sum()),
+        'updated': int(changed.sum()),
+        'unchanged': int((missing & ~unparsed).sum() - changed.sum()),
+        'unparsed': int((missing & unparsed).sum()),
+    }
+
+
+def standard_units_table(parameters: Iterable[str]) -> pd.DataFrame:
+    """
+    Standard display unit per parameter for liquid (vinhaça) and solid residues.
+
+    Same layout as CP2B_Unit_Standards_Reference.csv (parameter,
+    parameter_full_name, vinhaça_standard, bagaço_standard, palha_standard,
+    torta_standard, typical_range), derived from the registry targets.
+    """
+    liquid_unit = {'BMP': 'mL CH₄/g VS', 'METHANE_CONTENT': '%', 'pH': 'unitless', 'CN_RATIO': 'unitless',
+                   'VS': 'g/L', 'TS': 'g/L'}
+    solid_unit = {'BMP': 'mL CH₄/g VS', 'METHANE_CONTENT': '%', 'pH': 'unitless', 'CN_RATIO': 'unitless',
+                  'VS': '% TS', 'TS': '%'}
+    rows = []
+    for parameter in parameters:
+        liquid = liquid_unit.get(parameter) or TARGET_UNITS.get((parameter, 'concentration'), 'g/L')
+        solid = solid_unit.get(parameter, '% DW')
+        rows.append({
+            'parameter': parameter,
+            'parameter_full_name': parameter,
+            'vinhaça_standard': liquid,
+            'bagaço_standard': solid,
+            'palha_standard': solid,
+            'torta_standard': solid,
+            'typical_range': 'N/A',
+        })
+    return pd.DataFrame(rows)
+
+
+__all__ = [
+    'ParsedUnit', 'parse_unit', 'conversion_factor', 'convert', 'target_unit',
+    'standardize', 'backfill_precision_db', 'standard_units_table'
+]
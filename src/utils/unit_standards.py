@@ -4,15 +4,21 @@ Provides standardized unit display for chemical parameters based on CP2B guideli
 
 Loads unit mapping from CP2B_Unit_Standards_Reference.csv and provides
 helper functions to get standard units for each parameter/residue combination.
+When the CSV is not available, the table is derived from the unit registry
+(src/utils/unit_registry.py), which is also used to convert values.
 """
 
+import os
 import pandas as pd
 from pathlib import Path
 from typing import Dict, Optional
 
 
-# Path to unit standards CSV
-UNIT_STANDARDS_PATH = Path(r"C:\Users\Lucas\Downloads\CP2B_Unit_Standards_Reference.csv")
+# Path to unit standards CSV (override with CP2B_UNIT_STANDARDS_PATH)
+UNIT_STANDARDS_PATH = Path(os.environ.get(
+    "CP2B_UNIT_STANDARDS_PATH",
+    Path(__file__).parent.parent.parent / "data" / "CP2B_Unit_Standards_Reference.csv"
+))
 
 
 # Cache for unit standards data
@@ -23,24 +29,25 @@ def load_unit_standards() -> pd.DataFrame:
     """
     Load CP2B unit standards from CSV file.
 
+    Falls back to the table derived from the unit registry when the CSV
+    is not available.
+
     Returns:
         pd.DataFrame: Unit standards with columns for each residue type
-
-    Raises:
-        FileNotFoundError: If CSV file doesn't exist
     """
     global _UNIT_STANDARDS_CACHE
 
     if _UNIT_STANDARDS_CACHE is not None:
         return _UNIT_STANDARDS_CACHE
 
-    if not UNIT_STANDARDS_PATH.exists():
-        raise FileNotFoundError(
-            f"Unit standards file not found: {UNIT_STANDARDS_PATH}\n"
-            "Please ensure CP2B_Unit_Standards_Reference.csv is in Downloads folder."
-        )
+    if UNIT_STANDARDS_PATH.exists():
+        df = pd.read_csv(UNIT_STANDARDS_PATH)
+    else:
+        from src.utils.unit_registry import standard_units_table
+
+        df = standard_units_table(PARAMETER_DISPLAY_CONFIG)
+        df['parameter_full_name'] = [PARAMETER_DISPLAY_CONFIG[p]['full_name'] for p in df['parameter']]
 
-    df = pd.read_csv(UNIT_STANDARDS_PATH)
     _UNIT_STANDARDS_CACHE = df
 
     return df
@@ -0,0 +1,90 @@
+"""
+Tests for CoDigestionOptimizer.
+Optimal blends must stay inside the C:N, TS and OLR window, and missing
+chemistry is filled from the precision DB before sector medians.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.services.codigestion_optimizer import BlendConstraints, CoDigestionOptimizer
+
+
+def _residues():
+    # Nitrogen-rich manure, carbon-rich straw, wet vinasse
+    return pd.DataFrame({
+        'name': ['Dejetos', 'Palha', 'Vinhaça'],
+        'setor': ['Pecuária', 'Agricultura', 'Agricultura'],
+        'bmp_m3_t_vs': [250.0, 250.0, 300.0],
+        'ts_pct': [8.0, 90.0, 3.0],
+        'vs_pct_ts': [80.0, 85.0, 85.0],
+        'cn_ratio': [8.0, 100.0, 15.0],
+        'ch4_pct': [60.0, 53.0, 62.5],
+    })
+
+
+def _check_window(result, constraints):
+    ok = (result.status == 0) & (result.feed_t.sum(axis=1) > 0)
+    assert ok.any()
+    assert (result.cn_ratio[ok] >= constraints.cn_min - 1e-6).all()
+    assert (result.cn_ratio[ok] <= constraints.cn_max + 1e-6).all()
+    assert (result.ts_pct[ok] >= constraints.ts_min_pct - 1e-6).all()
+    assert (result.ts_pct[ok] <= constraints.ts_max_pct + 1e-6).all()
+    assert (result.vs_kg_m3[ok] <= constraints.olr_max_kg_vs_m3_d * constraints.hrt_days + 1e-6).all()
+
+
+def test_wet_blend_respects_cn_ts_and_olr_window():
+    residues = CoDigestionOptimizer.prepare_residues(_residues())
+    available = np.array([[1000.0, 200.0, 500.0], [5000.0, 50.0, 0.0]])
+    constraints = BlendConstraints.for_mode('umida')
+    result = CoDigestionOptimizer.optimize_batch(available, residues, constraints, n_workers=1)
+
+    _check_window(result, constraints)
+    assert (result.feed_t <= available + 1e-6).all()
+    # Neither residue alone is in the window: the optimum mixes them
+    assert (result.feed_t[0, :2] > 0).all()
+    assert np.allclose(result.fractions[result.status == 0].sum(axis=1), 1.0)
+    assert (result.biogas_m3 > result.ch4_m3).all()
+
+
+def test_dry_blend_and_cardinality_limit():
+    residues = CoDigestionOptimizer.prepare_residues(_residues())
+    available = np.array([[1000.0, 200.0, 500.0]])
+    # Dry plants run at higher loading: VS ≤ OLR × TRH must admit 20 % TS
+    constraints = BlendConstraints.for_mode('seca', olr_max_kg_vs_m3_d=8.0, hrt_days=40.0, max_residues=2)
+    result = CoDigestionOptimizer.optimize_batch(available, residues, constraints, n_workers=1)
+
+    _check_window(result, constraints)
+    assert result.water_t[0] == 0.0
+    assert (result.feed_t[0] > 0).sum() <= 2
+
+
+def test_site_outside_the_window_feeds_nothing():
+    residues = CoDigestionOptimizer.prepare_residues(_residues())
+    # Only manure: C:N 8 can never reach 20; a site without residues is flagged
+    available = np.array([[1000.0, 0.0, 0.0], [0.0, 0.0, 0.0]])
+    result = CoDigestionOptimizer.optimize_batch(available, residues, BlendConstraints(), n_workers=1)
+    assert result.status.tolist() == [0, -1]
+    assert (result.feed_t == 0).all() and (result.ch4_m3 == 0).all()
+
+
+def test_missing_chemistry_comes_from_precision_db_first():
+    table = _residues()
+    table.loc[1, 'cn_ratio'] = np.nan
+    table.loc[2, ['cn_ratio', 'ts_pct']] = np.nan
+    table['precision_id'] = [np.nan, 5, np.nan]
+    distribution = pd.DataFrame({
+        'residue_id': [5.0, 5.0, 5.0],
+        'parameter_name': ['CN_RATIO', 'TS', 'CN_RATIO'],
+        'unit': ['unitless', '% DW', 'unitless'],
+        'mean': [90.0, 85.0, 92.0],
+    })
+    residues = CoDigestionOptimizer.prepare_residues(table, distribution)
+
+    # Database values are kept; precision DB fills before the sector median
+    assert residues.loc[0, 'cn_ratio'] == 8.0 and not residues.loc[0, 'imputado']
+    assert residues.loc[1, 'cn_ratio'] == 91.0
+    assert residues.loc[1, 'imputado_de'] == 'cn_ratio ← precisao'
+    # Other units never fill a column; the sector median does
+    assert residues.loc[2, 'ts_pct'] == 90.0 and residues.loc[2, 'cn_ratio'] == 91.0
+    assert residues.loc[2, 'imputado_de'] == 'ts_pct ← setor, cn_ratio ← setor'
@@ -0,0 +1,88 @@
+"""
+Tests for incremental SQLite snapshots.
+A restored snapshot must reproduce the database as it was, and unchanged
+pages must be stored only once.
+"""
+
+import sqlite3
+
+import pytest
+
+from src.utils import db_backup
+
+
+def _database(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, payload TEXT)")
+    conn.executemany("INSERT INTO t (payload) VALUES (?)", [('x' * 500,)] * rows)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT id, payload FROM t ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def test_snapshot_restore_round_trip(tmp_path):
+    db = _database(tmp_path / 'maps.db', 200)
+    store = tmp_path / 'store'
+    before = _rows(db)
+    first = db_backup.create_snapshot(db, store, label='pre-migration')
+
+    conn = sqlite3.connect(db)
+    conn.execute("UPDATE t SET payload = 'changed' WHERE id = 1")
+    conn.execute("CREATE TABLE extra (v INTEGER)")
+    conn.commit()
+    conn.close()
+    second = db_backup.create_snapshot(db, store)
+
+    # Only the pages touched by the change are new
+    assert 0 < second['new_pages'] < first['new_pages']
+    diff = db_backup.diff_snapshots(store, first['snapshot_id'], second['snapshot_id'])
+    assert diff['tables_added'] == ['extra']
+    assert diff['tables_changed']['t']['rows_added'] == 1
+
+    # Restore over the live file, with a reader connection open
+    reader = sqlite3.connect(db)
+    result = db_backup.restore_snapshot(store, first['snapshot_id'], db)
+    assert result['page_count'] == first['page_count']
+    assert reader.execute("SELECT name FROM sqlite_master WHERE name = 'extra'").fetchone() is None
+    reader.close()
+    assert _rows(db) == before
+
+    # 'latest' restores the newest snapshot into a fresh file
+    db_backup.restore_snapshot(store, 'latest', tmp_path / 'copy.db')
+    assert _rows(tmp_path / 'copy.db')[0] == (1, 'changed')
+
+
+def test_prune_keeps_pages_of_remaining_snapshots(tmp_path):
+    db = _database(tmp_path / 'maps.db', 50)
+    store = tmp_path / 'store'
+    db_backup.create_snapshot(db, store)
+    conn = sqlite3.connect(db)
+    conn.execute("DELETE FROM t WHERE id > 10")
+    conn.commit()
+    conn.close()
+    kept = db_backup.create_snapshot(db, store)
+
+    result = db_backup.prune_snapshots(store, keep=1)
+    assert result['snapshots_removed'] == 1
+    assert [s['snapshot_id'] for s in db_backup.list_snapshots(store)] == [kept['snapshot_id']]
+    db_backup.restore_snapshot(store, 'latest', tmp_path / 'copy.db')
+    assert len(_rows(tmp_path / 'copy.db')) == 10
+
+
+def test_corrupt_page_is_detected(tmp_path):
+    db = _database(tmp_path / 'maps.db', 20)
+    store = tmp_path / 'store'
+    snapshot = db_backup.create_snapshot(db, store)
+    page = next((store / 'pages').glob('*/*'))
+    page.unlink()
+
+    with pytest.raises(ValueError):
+        db_backup.snapshot_image(store, snapshot['snapshot_id'])
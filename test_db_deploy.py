@@ -0,0 +1,79 @@
+"""
+Tests for blue/green deployment of SQLite databases.
+Readers follow the pointer file; rollback returns to the previous version.
+"""
+
+import sqlite3
+
+import pytest
+
+from src.utils import db_deploy
+
+
+def _database(path, value):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (v INTEGER)")
+    conn.execute("INSERT INTO t VALUES (?)", (value,))
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _value(db):
+    conn = sqlite3.connect(db_deploy.resolve_db_path(db))
+    try:
+        return conn.execute("SELECT v FROM t").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _set_value(path, value):
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE t SET v = ?", (value,))
+    conn.commit()
+    conn.close()
+
+
+def test_deploy_switches_readers_and_rollback_restores_previous(tmp_path):
+    db = _database(tmp_path / 'maps.db', 1)
+    assert db_deploy.resolve_db_path(db) == db
+
+    with db_deploy.build_version(db) as side:
+        _set_value(side, 2)
+    first = db_deploy.current_version(db)
+    assert _value(db) == 2
+
+    with db_deploy.build_version(db) as side:
+        _set_value(side, 3)
+    assert db_deploy.current_version(db) != first
+    assert _value(db) == 3
+
+    result = db_deploy.rollback(db)
+    assert result['success'] and result['version'] == first
+    assert _value(db) == 2
+    # The logical file is never written by deployments
+    assert sqlite3.connect(db).execute("SELECT v FROM t").fetchone()[0] == 1
+
+
+def test_failed_build_leaves_live_version_untouched(tmp_path):
+    db = _database(tmp_path / 'maps.db', 1)
+    with db_deploy.build_version(db) as side:
+        _set_value(side, 2)
+    version = db_deploy.current_version(db)
+
+    with pytest.raises(RuntimeError):
+        with db_deploy.build_version(db) as side:
+            _set_value(side, 3)
+            raise RuntimeError('migration failed')
+
+    assert db_deploy.current_version(db) == version
+    assert _value(db) == 2
+    assert not list(db_deploy.versions_dir(db).glob(f"*{db_deploy.BUILD_SUFFIX}"))
+
+
+def test_rollback_without_previous_version(tmp_path):
+    db = _database(tmp_path / 'maps.db', 1)
+    assert not db_deploy.rollback(db)['success']
+    with db_deploy.build_version(db) as side:
+        _set_value(side, 2)
+    assert not db_deploy.rollback(db)['success']
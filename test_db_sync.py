@@ -0,0 +1,74 @@
+"""
+Tests for row-hash database sync.
+Applying a sync must make the target match the source, and applying it
+again must find nothing left to ship.
+"""
+
+import sqlite3
+
+from src.utils.db_sync import sync_databases
+
+
+def _database(path, statements):
+    conn = sqlite3.connect(path)
+    conn.executescript(statements)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _dump(path, table):
+    conn = sqlite3.connect(path)
+    try:
+        return sorted(conn.execute(f"SELECT * FROM {table}").fetchall(), key=repr)
+    finally:
+        conn.close()
+
+
+def _pair(tmp_path):
+    source = _database(tmp_path / 'source.db', """
+        CREATE TABLE residuos (id INTEGER PRIMARY KEY, codigo TEXT, bmp REAL);
+        INSERT INTO residuos VALUES (1, 'VINHACA', 300), (2, 'PALHA', 250), (4, 'GORDURA', 850);
+        CREATE TABLE municipios (codigo_municipio INTEGER, nome TEXT, ch4 REAL);
+        INSERT INTO municipios VALUES (10, 'A', 1.5), (20, 'B', 2.5);
+        CREATE TABLE notas (texto TEXT);
+        INSERT INTO notas VALUES ('x'), ('y');
+        CREATE TABLE novos (v INTEGER);
+        INSERT INTO novos VALUES (7);
+    """)
+    target = _database(tmp_path / 'target.db', """
+        CREATE TABLE residuos (id INTEGER PRIMARY KEY, codigo TEXT, bmp REAL);
+        INSERT INTO residuos VALUES (1, 'VINHACA', 310), (2, 'PALHA', 250), (3, 'OBSOLETO', 1);
+        CREATE TABLE municipios (codigo_municipio INTEGER, nome TEXT);
+        INSERT INTO municipios VALUES (10, 'A');
+        CREATE TABLE notas (texto TEXT);
+        INSERT INTO notas VALUES ('x'), ('z');
+    """)
+    return source, target
+
+
+def test_dry_run_reports_without_writing(tmp_path):
+    source, target = _pair(tmp_path)
+    before = _dump(target, 'residuos')
+    result = sync_databases(source, target, dry_run=True)
+
+    assert not result['applied']
+    # Tables missing on the target are only reported without apply_schema
+    assert result['drift']['missing_tables'] == ['novos']
+    assert result['totals'] == {'inserted': 3, 'updated': 1, 'deleted': 2}
+    assert _dump(target, 'residuos') == before
+
+
+def test_apply_is_idempotent(tmp_path):
+    source, target = _pair(tmp_path)
+    first = sync_databases(source, target, apply_schema=True)
+
+    assert first['applied'] and first['verified']
+    assert any('novos' in statement for statement in first['schema_statements'])
+    for table in ('residuos', 'municipios', 'notas', 'novos'):
+        assert _dump(target, table) == _dump(source, table), table
+
+    second = sync_databases(source, target, apply_schema=True)
+    assert second['schema_statements'] == []
+    assert second['totals'] == {'inserted': 0, 'updated': 0, 'deleted': 0}
+    assert second['verified']
@@ -0,0 +1,105 @@
+"""
+Tests for EnvironmentalBalanceCalculator.
+BMPs must be brought to a VS basis according to their reported basis, and the
+default factors must credit agricultural residues with net avoided emissions.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.data.residue_registry import RESIDUES_REGISTRY, SECTORS
+from src.services.environmental_balance import EmissionFactors, EnvironmentalBalanceCalculator
+
+
+calc = EnvironmentalBalanceCalculator
+
+
+def test_bmp_basis_is_converted_to_vs():
+    # 20 % TS, 80 % VS/TS
+    assert calc.normalize_bmp(0.30, 'm³ CH₄/kg VS', 20.0, 80.0) == 300.0
+    assert calc.normalize_bmp(300.0, 'L CH₄/kg VS | Range: 250-350', 20.0, 80.0) == 300.0
+    assert np.isclose(calc.normalize_bmp(0.24, 'm³ CH₄/kg MS', 20.0, 80.0), 300.0)
+    assert np.isclose(calc.normalize_bmp(48.0, 'Nm³ CH₄/t', 20.0, 80.0), 300.0)
+    assert np.isclose(calc.normalize_bmp(48.0, 'Nm³ CH₄/ton (wet basis) | Min: 40', 20.0, 80.0), 300.0)
+
+
+def test_bmp_basis_without_solids_is_unusable():
+    assert np.isnan(calc.normalize_bmp(0.24, 'm³ CH₄/kg MS', 20.0, np.nan))
+    assert np.isnan(calc.normalize_bmp(48.0, 'Nm³ CH₄/t', np.nan, 80.0))
+
+
+def test_biogas_and_placeholder_units_are_rejected():
+    # Small values must not be scaled into plausible m³ CH4/t VS figures
+    assert np.isnan(calc.normalize_bmp(0.5, 'Nm³ biogas/m³ vinhaça | Fonte'))
+    assert np.isnan(calc.normalize_bmp(0.5, 'N/A'))
+    assert np.isnan(calc.parse_bmp(0.5, 'm³ biogas/kg VS')[0])
+
+
+def test_bmp_above_theoretical_maximum_is_unusable():
+    # 90 m³/t fresh mass with 27 % TS and 21 % VS/TS would be ~1570 m³/t VS
+    assert np.isnan(calc.normalize_bmp(90.0, 'Nm³ CH₄/t', 27.0, 21.0))
+
+
+def test_registry_bmps_stay_in_plausible_vs_range():
+    residues = calc.build_residue_profiles(RESIDUES_REGISTRY, SECTORS)
+    bmp = residues['bmp_m3_t_vs'].dropna()
+    assert not bmp.empty
+    assert bmp.between(20.0, 1014.0).all()
+
+
+def test_agriculture_net_avoided_emissions_are_positive_with_defaults():
+    residues = calc.build_residue_profiles(RESIDUES_REGISTRY, SECTORS)
+    residues = residues[residues['setor'] == 'Agricultura'].reset_index(drop=True)
+    assert not residues.empty
+
+    municipalities = pd.DataFrame({'codigo_municipio': [1], 'nome_municipio': ['A']})
+    ch4 = np.full((1, len(residues), 1), 1_000_000.0)
+    balance = calc.calculate(ch4, residues, municipalities, scenarios=['Realista'])
+
+    # No baseline emissions: energy alone must outweigh plant leakage
+    assert (balance.avoided_baseline_t_co2e == 0).all()
+    assert (balance.displaced_energy_t_co2e > balance.leakage_t_co2e).all()
+    assert (balance.net_avoided_t_co2e > 0).all()
+    assert EmissionFactors().grid_emission_factor_t_mwh > 0.1
+
+
+def test_allocation_profiles_follow_residuos_and_feed_the_allocation_cube():
+    from src.services.residue_allocator import ResidueAllocator
+
+    df_residuos = pd.DataFrame({
+        'codigo': ['VINHACA', 'DEJETOS_SUINO'],
+        'nome': ['Vinhaça', 'Dejetos líquidos de suínos'],
+        'setor': ['AG_AGRICULTURA', 'PC_PECUARIA'],
+        'subsetor_nome': ['Cana-de-açúcar', 'Suinocultura'],
+        'bmp_medio': [300.0, 1500.0],
+        'ts_medio': [3.0, 8.0],
+        'vs_medio': [85.0, 84.0],
+        'fs_medio': [0.9, 1.0],
+        'chemical_cn_ratio': [15.0, np.nan],
+        'chemical_ch4_content': [62.5, 57.0],
+        'fator_pessimista': [0.08, 0.36],
+        'fator_realista': [0.09, 0.40],
+        'fator_otimista': [0.10, 0.45],
+    })
+    registry = pd.DataFrame({'codigo': ['VINHACA', 'VINHACA', None],
+                             'n_pct_ts': [1.0, 2.0, 9.0], 'p2o5_pct_ts': [0.1, 0.3, 9.0], 'k2o_pct_ts': [5.0, 7.0, 9.0]})
+    residues = calc.build_allocation_profiles(df_residuos, registry)
+
+    assert residues['codigo'].tolist() == ['VINHACA', 'DEJETOS_SUINO']
+    assert residues['setor'].tolist() == ['Agricultura', 'Pecuária']
+    # bmp_medio is on a VS basis; values above the theoretical maximum are unusable
+    assert residues.loc[0, 'bmp_m3_t_vs'] == 300.0 and np.isnan(residues.loc[1, 'bmp_m3_t_vs'])
+    assert residues.loc[0, 'cn_ratio'] == 15.0 and np.isnan(residues.loc[1, 'cn_ratio'])
+    assert np.isclose(residues.loc[0, 'n_pct_ts'], 1.5) and np.isnan(residues.loc[1, 'n_pct_ts'])
+
+    municipios = pd.DataFrame({'ch4_rea_agricultura': [60.0, 40.0], 'ch4_rea_pecuaria': [0.0, 50.0],
+                               'ch4_rea_urbano': [0.0, 0.0], 'ch4_rea_total': [60.0, 90.0]})
+    drivers = pd.DataFrame({'codigo_municipio': [10, 20], 'residuos_cana_ton_ano': [3.0, 1.0],
+                            'biogas_suino_m_ano': [0.0, 1.0]})
+    allocation = ResidueAllocator.build(df_residuos, municipios, drivers)
+
+    # Rows follow the requested municipalities; unknown codes are zero
+    ch4 = allocation.municipal_cube([20, 99, 10], ['Realista'])
+    assert ch4.shape == (3, 2, 1)
+    assert np.allclose(ch4[:, :, 0], [[25.0, 50.0], [0.0, 0.0], [75.0, 0.0]])
+    assert np.isclose(ch4.sum(), 150.0)
@@ -0,0 +1,45 @@
+"""
+Tests for FeasibilityAnalyzer site summaries.
+Cases whose payback is never reached must weigh on the median payback
+instead of being skipped.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.services.feasibility_analyzer import FeasibilityAnalyzer, FeasibilityResult
+
+
+def _result(npv, payback):
+    npv = np.asarray(npv, dtype=float)
+    n_sites, n_cases = npv.shape
+    return FeasibilityResult(
+        site_codes=np.arange(n_sites),
+        site_names=np.array([f'M{i}' for i in range(n_sites)]),
+        ch4_m3_year=np.ones(n_sites),
+        energy_mwh_year=np.ones(n_sites),
+        capacity_kw=np.ones(n_sites),
+        cases=pd.DataFrame({'case': np.arange(n_cases)}),
+        capex=np.ones_like(npv),
+        opex=np.ones_like(npv),
+        npv=npv,
+        lcoe=np.ones_like(npv),
+        payback_years=np.asarray(payback, dtype=float),
+    )
+
+
+def test_unreached_payback_counts_in_the_median():
+    result = _result(
+        npv=[[10.0, -5.0, -5.0], [10.0, 8.0, 6.0], [np.nan, np.nan, np.nan]],
+        payback=[[4.0, np.nan, np.nan], [9.0, 10.0, 11.0], [np.nan, np.nan, np.nan]],
+    )
+    summary = result.site_summary()
+
+    # Site 0 pays back in one case out of three: median is "never"
+    assert np.isinf(summary.loc[0, 'payback_mediano'])
+    assert summary.loc[1, 'payback_mediano'] == 10.0
+    # Sites without evaluated cases stay without a value
+    assert np.isnan(summary.loc[2, 'payback_mediano'])
+
+    ranked = FeasibilityAnalyzer.rank_sites(result, 'payback_mediano')
+    assert [site['nome_municipio'] for site in ranked] == ['M1', 'M0']
@@ -0,0 +1,160 @@
+"""
+Tests for IntegrationRunner deployment and resume.
+Only runs in which every step succeeded may become the live database version,
+and checkpoints must survive a discarded side file so --resume can pick up.
+"""
+
+import sqlite3
+from collections import Counter
+
+import pandas as pd
+
+from scripts.database_integration import integration_runner, integration_state
+from scripts.database_integration.integration_runner import IntegrationRunner
+from src.utils import db_deploy
+
+SECTOR_TABLES = ('residuos_agricolas', 'residuos_pecuarios', 'residuos_urbanos', 'residuos_industriais')
+
+
+def _database(tmp_path):
+    path = tmp_path / 'maps.db'
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE municipalities (codigo_municipio INTEGER PRIMARY KEY, ch4_realistic_total REAL)")
+    conn.executemany("INSERT INTO municipalities VALUES (?, NULL)", [(1,), (2,)])
+    for table in SECTOR_TABLES:
+        conn.execute(f"CREATE TABLE {table} (codigo_municipio INTEGER NOT NULL, ano INTEGER NOT NULL, valor REAL)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _runner(tmp_path, monkeypatch, db, valid=True, **kwargs):
+    """Runner whose file-level steps are stubbed; database writes are real."""
+    files = {}
+    for key in ('scenarios', 'factors'):
+        files[key] = str(tmp_path / f'{key}.csv')
+        if not (tmp_path / f'{key}.csv').exists():
+            (tmp_path / f'{key}.csv').write_text(key)
+
+    runner = IntegrationRunner(validation_base_dir=str(tmp_path), db_path=str(db), **kwargs)
+    runner.calls = Counter()
+
+    def discover_files():
+        runner.files = files
+        runner.report['steps']['discovery'] = {'success': True}
+        return files
+
+    def validate_data(todo):
+        runner.calls['validate'] += 1
+        runner.report['steps']['validation'] = {'success': valid}
+        return {key: {'overall_valid': valid} for key in todo}
+
+    def check_municipality_codes(todo):
+        runner.calls['municipality_check'] += 1
+        runner.report['steps']['municipality_check'] = {'success': True}
+        return {'is_valid': True}
+
+    def transform_data(todo):
+        runner.calls['transform'] += 1
+        transformed = {}
+        if 'scenarios' in todo:
+            transformed['scenarios'] = pd.DataFrame({'codigo_municipio': [1, 2], 'ch4_realistic_total': [10.0, 20.0]})
+        if 'factors' in todo:
+            transformed['factors'] = pd.DataFrame({'x': [1]})
+            transformed['sectors'] = {
+                'residuos_agricolas': pd.DataFrame({'codigo_municipio': [1], 'ano': [2024], 'valor': [5.0]})
+            }
+        return transformed
+
+    monkeypatch.setattr(runner, 'discover_files', discover_files)
+    monkeypatch.setattr(runner, 'validate_data', validate_data)
+    monkeypatch.setattr(runner, 'check_municipality_codes', check_municipality_codes)
+    monkeypatch.setattr(runner, 'transform_data', transform_data)
+    return runner
+
+
+def _live_totals(db):
+    conn = sqlite3.connect(db_deploy.resolve_db_path(db))
+    try:
+        return [row[0] for row in conn.execute(
+            "SELECT ch4_realistic_total FROM municipalities ORDER BY codigo_municipio")]
+    finally:
+        conn.close()
+
+
+def _building(db):
+    return list(db_deploy.versions_dir(db).glob(f"*{db_deploy.BUILD_SUFFIX}"))
+
+
+def test_successful_run_is_deployed(tmp_path, monkeypatch):
+    db = _database(tmp_path)
+    report = _runner(tmp_path, monkeypatch, db).run()
+
+    assert report['summary']['overall_success']
+    assert report['deployment']['success']
+    assert db_deploy.current_version(db) == report['deployment']['version']
+    assert _live_totals(db) == [10.0, 20.0]
+
+
+def test_step_that_caught_its_error_is_not_deployed(tmp_path, monkeypatch):
+    db = _database(tmp_path)
+    monkeypatch.setattr(integration_runner.database_inserters, 'insert_residues_by_sector',
+                        lambda engine, sector_dfs, backup=False: {'success': False, 'error': 'boom'})
+    report = _runner(tmp_path, monkeypatch, db).run()
+
+    assert 'error' not in report
+    assert not report['summary']['overall_success']
+    assert not report['deployment']['success']
+    assert db_deploy.current_version(db) is None
+    assert _live_totals(db) == [None, None]
+    assert not _building(db)
+
+
+def test_validation_failure_is_not_deployed(tmp_path, monkeypatch):
+    db = _database(tmp_path)
+    runner = _runner(tmp_path, monkeypatch, db, valid=False)
+    report = runner.run()
+
+    assert not report['summary']['overall_success']
+    assert runner.calls['transform'] == 0
+    assert db_deploy.current_version(db) is None
+    assert not _building(db)
+
+
+def test_resume_after_crash_skips_validation_and_redoes_discarded_writes(tmp_path, monkeypatch):
+    db = _database(tmp_path)
+    insert = integration_runner.database_inserters.insert_residues_by_sector
+    crash = {'on': True}
+
+    def insert_residues_by_sector(engine, sector_dfs, backup=False):
+        if crash['on']:
+            raise RuntimeError('disk full')
+        return insert(engine, sector_dfs, backup=backup)
+
+    monkeypatch.setattr(integration_runner.database_inserters, 'insert_residues_by_sector',
+                        insert_residues_by_sector)
+
+    report = _runner(tmp_path, monkeypatch, db).run()
+    assert 'error' in report and not report['deployment']['success']
+    assert db_deploy.current_version(db) is None
+
+    # Checkpoints survive the discarded side file; the discarded write is not recorded
+    state = integration_state.load_checkpoints(
+        integration_runner.database_inserters.get_database_engine(str(integration_state.state_file(db)))
+    )
+    assert state[('scenarios', 'validate')]['status'] == 'done'
+    assert ('scenarios', 'integrate') not in state
+
+    crash['on'] = False
+    runner = _runner(tmp_path, monkeypatch, db, resume=True)
+    report = runner.run()
+    assert report['summary']['overall_success'] and report['deployment']['success']
+    assert runner.calls['validate'] == 0 and runner.calls['municipality_check'] == 0
+    assert runner.calls['transform'] == 1
+    assert _live_totals(db) == [10.0, 20.0]
+
+    # Both inputs are now current: the next incremental run does nothing
+    runner = _runner(tmp_path, monkeypatch, db)
+    report = runner.run()
+    assert report['steps']['change_detection']['pending'] == []
+    assert 'deployment' not in report and not runner.calls
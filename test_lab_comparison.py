@@ -0,0 +1,84 @@
+"""
+Tests for batch lab comparison: decimal-comma CSVs and unit-aware z-scores.
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+
+from src.lab_comparison import BatchLabComparison, read_lab_batch
+
+
+def test_semicolon_csv_with_decimal_comma():
+    csv = io.StringIO("amostra;residuo;ts;ph;cod\nA-001;Vinhaça;3,5;4,2;45.000,5\n")
+    batch = read_lab_batch(csv, filename='lote.csv').set_index('parameter')
+
+    assert batch.loc['ts', 'measured'] == 3.5
+    assert batch.loc['ph', 'measured'] == 4.2
+    assert batch.loc['cod', 'measured'] == 45000.5
+
+
+def test_z_scores_convert_to_reference_units(monkeypatch):
+    samples = pd.DataFrame({
+        'sample_id': ['A-001'] * 3,
+        'residue': ['Vinhaça'] * 3,
+        'residue_code': ['VINHACA'] * 3,
+        'parameter': ['cod', 'ph', 'nitrogen'],
+        'measured': [45000.0, 4.5, 400.0],
+        'unit': [None, None, 'mg/L'],
+        'lab_name': None,
+        'measurement_date': None,
+    })
+    distribution = pd.DataFrame({
+        'residue_id': [1.0, 1.0, 1.0, 1.0],
+        'parameter_name': ['COD', 'pH', 'NITROGEN', 'NITROGEN'],
+        'unit': ['g/L', 'unitless', 'mg/L', '% DW'],
+        'mean': [40.0, 4.0, 300.0, 2.0],
+        'std': [5.0, 0.5, 50.0, 0.5],
+        'n': [10, 10, 5, 20],
+    })
+    monkeypatch.setattr(BatchLabComparison, 'resolve_precision_ids',
+                        staticmethod(lambda frame: pd.Series(1.0, index=frame.index)))
+    references = pd.DataFrame(columns=['residue', 'parameter', 'parameter_label', 'reference', 'reference_unit'])
+
+    scored = BatchLabComparison.score(samples, references, distribution).set_index('parameter')
+
+    # COD entered in mg/L (form default) is compared in g/L
+    assert np.isclose(scored.loc['cod', 'z_score'], 1.0)
+    assert scored.loc['cod', 'precision_unit'] == 'g/L'
+    assert np.isclose(scored.loc['ph', 'z_score'], 1.0)
+    # mg/L cannot be compared with % DW: the concentration series is used
+    assert np.isclose(scored.loc['nitrogen', 'z_score'], 2.0)
+    assert scored.loc['nitrogen', 'precision_unit'] == 'mg/L'
+
+
+def test_deviation_converts_to_the_reference_unit():
+    samples = pd.DataFrame({
+        'sample_id': ['A-001', 'A-001', 'B-001'],
+        'residue': ['Bagaço de cana', 'Bagaço de cana', 'Vinhaça'],
+        'residue_code': ['BAGACO', 'BAGACO', 'VINHACA'],
+        'parameter': ['bmp', 'ts', 'bmp'],
+        'measured': [250.0, 600.0, 0.33],
+        'unit': [None, 'g/kg', 'm³ CH₄/kg VS'],
+        'lab_name': None,
+        'measurement_date': None,
+    })
+    references = pd.DataFrame({
+        'residue': ['Bagaço de cana', 'Bagaço de cana', 'Vinhaça'],
+        'parameter': ['bmp', 'ts', 'bmp'],
+        'parameter_label': ['BMP', 'ST', 'BMP'],
+        'reference': [85.0, 50.0, 300.0],
+        'reference_unit': ['Nm³ CH₄/t', '', 'L CH₄/kg VS | Range: 250-350'],
+    })
+
+    scored = BatchLabComparison.score(samples, references).set_index(['sample_id', 'parameter'])
+
+    # mL CH₄/g VS cannot be compared with a fresh-mass BMP (was +194 % ❌)
+    assert np.isnan(scored.loc[('A-001', 'bmp'), 'deviation_pct'])
+    assert scored.loc[('A-001', 'bmp'), 'status'] == "— Sem referência"
+    # 600 g/kg = 60 % against 50 %
+    assert np.isclose(scored.loc[('A-001', 'ts'), 'deviation_pct'], 20.0)
+    # 0.33 m³/kg VS = 330 L/kg VS against 300
+    assert np.isclose(scored.loc[('B-001', 'bmp'), 'measured_reference_unit'], 330.0)
+    assert np.isclose(scored.loc[('B-001', 'bmp'), 'deviation_pct'], 10.0)
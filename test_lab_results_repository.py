@@ -0,0 +1,86 @@
+"""
+Tests for LabResultsRepository upserts and read-only access.
+Saving a sample again must replace its measurements, not duplicate them,
+and the app-side repository must read the deployed version without writing.
+"""
+
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from scripts.migrate_lab_results import build
+from src.services.lab_results_repository import LabResultsRepository
+from src.utils import db_deploy
+
+
+def _sample(bmp, ts):
+    return pd.DataFrame({
+        'residue': ['Vinhaça', 'Vinhaça'],
+        'parameter': ['bmp', 'ts'],
+        'measured': [bmp, ts],
+        'sample_id': ['A-001', 'A-001'],
+        'measurement_date': ['2025-01-10', '2025-01-10'],
+    })
+
+
+def test_saving_sample_twice_replaces_rows(tmp_path):
+    build(tmp_path / 'lab.db', [])
+    repo = LabResultsRepository(tmp_path / 'lab.db')
+    repo.insert_results(_sample(300.0, 3.0))
+    repo.insert_results(_sample(320.0, 3.2))
+
+    assert repo.get_sample('Vinhaça', 'A-001') == {'bmp': 320.0, 'ts': 3.2}
+    assert len(repo.get_results('Vinhaça', 'bmp')) == 1
+
+    chart = repo.get_control_chart('Vinhaça', 'bmp')
+    assert chart['n'].tolist() == [1]
+    assert chart['valor'].tolist() == [320.0]
+
+
+def test_other_samples_are_kept(tmp_path):
+    build(tmp_path / 'lab.db', [])
+    repo = LabResultsRepository(tmp_path / 'lab.db')
+    repo.insert_results(_sample(300.0, 3.0))
+    other = _sample(280.0, 2.8).assign(sample_id='A-002')
+    repo.insert_results(other)
+    repo.insert_results(_sample(310.0, 3.1))
+
+    chart = repo.get_control_chart('Vinhaça', 'bmp')
+    assert sorted(chart['valor'].tolist()) == [280.0, 310.0]
+    assert chart['n'].max() == 2
+
+
+def _tables(path):
+    conn = sqlite3.connect(path)
+    try:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+    finally:
+        conn.close()
+
+
+def test_read_only_repository_never_creates_schema(tmp_path):
+    db = tmp_path / 'maps.db'
+    sqlite3.connect(db).execute("CREATE TABLE municipalities (codigo_municipio INTEGER)").connection.close()
+
+    repo = LabResultsRepository(db, read_only=True)
+    assert not repo.has_schema()
+    assert _tables(db) == {'municipalities'}
+
+
+def test_read_only_repository_reads_deployed_version(tmp_path):
+    db = tmp_path / 'maps.db'
+    sqlite3.connect(db).execute("CREATE TABLE municipalities (codigo_municipio INTEGER)").connection.close()
+    batch = tmp_path / 'lote.csv'
+    batch.write_text("amostra;residuo;bmp;ts\nA-001;Vinhaça;310,5;3,1\n", encoding='utf-8')
+
+    with db_deploy.build_version(db) as side:
+        assert build(side, [batch]) == 2
+
+    repo = LabResultsRepository(db, read_only=True)
+    assert repo.has_schema()
+    assert repo.get_sample('Vinhaça', 'A-001') == {'bmp': 310.5, 'ts': 3.1}
+    # The logical file is untouched and the live version cannot be written
+    assert _tables(db) == {'municipalities'}
+    with pytest.raises(sqlite3.OperationalError):
+        repo.insert_results(_sample(300.0, 3.0))
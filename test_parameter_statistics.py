@@ -0,0 +1,60 @@
+"""
+Tests for ParameterStatisticsEngine persistence.
+The summary table is built offline; reading before the first refresh is empty.
+"""
+
+import sqlite3
+
+from scripts.refresh_parameter_statistics import refresh
+from src.services.parameter_statistics import ParameterStatisticsEngine, STATISTICS_TABLE
+
+
+def _database(path):
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE chemical_parameters (
+            param_id INTEGER PRIMARY KEY, paper_id INTEGER, residue_id INTEGER, parameter_name TEXT,
+            unit TEXT, unit_standardized TEXT, value_mean REAL, value_standardized REAL,
+            data_quality TEXT, is_validated INTEGER
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO chemical_parameters VALUES (?, ?, 4, 'BMP', 'mL/g VS', 'mL/g VS', ?, ?, 'High', 1)",
+        [(i, i, value, value) for i, value in enumerate([280.0, 300.0, 310.0, 320.0, 900.0], start=1)]
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _tables(path):
+    conn = sqlite3.connect(path)
+    try:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    finally:
+        conn.close()
+
+
+def test_read_before_refresh_is_empty_and_writes_nothing(tmp_path):
+    db = _database(tmp_path / 'precision.db')
+    conn = sqlite3.connect(f"{db.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        table = ParameterStatisticsEngine.read(conn)
+    finally:
+        conn.close()
+
+    assert table.empty and 'weighted_mean' in table.columns
+    assert STATISTICS_TABLE not in _tables(db)
+
+
+def test_offline_refresh_is_incremental(tmp_path):
+    db = _database(tmp_path / 'precision.db')
+    assert refresh(db, n_bootstrap=50) == {'written': 1, 'unchanged': 0, 'dropped': 0}
+    assert refresh(db, n_bootstrap=50) == {'written': 0, 'unchanged': 1, 'dropped': 0}
+
+    conn = sqlite3.connect(db)
+    try:
+        row = ParameterStatisticsEngine.read(conn, residue_id=4).iloc[0]
+    finally:
+        conn.close()
+    assert row['n'] == 5 and row['median'] == 310.0 and row['n_outliers'] == 1
@@ -0,0 +1,40 @@
+"""
+Tests for PDF mining: parameter label matching and re-staging of reviewed rows.
+"""
+
+import sqlite3
+
+from src.utils.pdf_mining import STAGING_TABLE, ensure_staging_tables, find_candidates, stage_result
+
+
+def _found(text):
+    return [(c['parameter_name'], c['value_mean'], c['unit']) for c in find_candidates(text, 1)]
+
+
+def test_labels_inside_bmp_unit_are_ignored():
+    assert _found("BMP was 300 mL CH4/g VS and TS 12 %") == [
+        ('BMP', 300.0, 'mL CH4/g VS'),
+        ('TS', 12.0, '%'),
+    ]
+
+
+def test_label_after_unit_slash_is_ignored():
+    assert _found("…/g VS. Total solids (TS) were 2.5%") == [('TS', 2.5, '%')]
+
+
+def test_restaging_skips_reviewed_candidates(tmp_path):
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE scientific_papers (paper_id, pdf_filename, original_filename, doi)")
+    ensure_staging_tables(conn)
+
+    pdf = tmp_path / 'paper.pdf'
+    pdf.write_bytes(b'%PDF')
+    result = {'sha256': 'abc', 'pages': 1, 'doi': None, 'tables': [], 'error': None, 'extractor_version': 2,
+              'candidates': find_candidates("BMP was 300 mL CH4/g VS and TS 12 %", 1)}
+
+    assert stage_result(conn, pdf, pdf.stat(), result, {}) == 2
+    conn.execute(f"UPDATE {STAGING_TABLE} SET review_status = 'APPROVED' WHERE parameter_name = 'BMP'")
+
+    assert stage_result(conn, pdf, pdf.stat(), result, {}) == 1
+    rows = conn.execute(f"SELECT parameter_name, review_status FROM {STAGING_TABLE} ORDER BY 1").fetchall()
+    assert rows == [('BMP', 'APPROVED'), ('TS', 'PENDING')]
@@ -0,0 +1,50 @@
+"""
+Tests for the base-year assembly of ProjectionEngine.
+Yearly rows must only replace the snapshot where they actually carry a value.
+"""
+
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from src.data.growth_trajectories import BASE_YEAR, DEFAULT_SCENARIO, DRIVERS
+from src.services.projection_engine import ProjectionEngine
+
+
+def _municipalities():
+    df = pd.DataFrame({'codigo_municipio': [1, 2, 3]})
+    for column, _, _ in DRIVERS.values():
+        df[column] = [100.0, 200.0, 300.0]
+    return df
+
+
+def _connection():
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE residuos_agricolas (codigo_municipio, ano, cultura, potencial_biogas_m3)")
+    conn.execute(
+        "CREATE TABLE residuos_urbanos (codigo_municipio, ano, "
+        "potencial_biogas_rsu_m3_ano, potencial_biogas_poda_m3_ano)"
+    )
+    return conn
+
+
+def test_partial_yearly_rows_keep_snapshot_for_other_municipalities():
+    conn = _connection()
+    conn.execute("INSERT INTO residuos_agricolas VALUES (2, 2024, 'Cana-de-Açúcar', 123.0)")
+    conn.execute("INSERT INTO residuos_urbanos VALUES (1, 2024, NULL, NULL)")
+
+    drivers = list(DRIVERS)
+    base_year, codes, base = ProjectionEngine.load_base_year(conn, _municipalities(), drivers)
+    _, factors = ProjectionEngine.growth_factors(BASE_YEAR, base_year, DEFAULT_SCENARIO, drivers)
+    compounded = np.array([100.0, 200.0, 300.0])[:, None] * factors[-1][None, :]
+
+    assert base_year == 2024
+    cana = drivers.index('cana')
+    assert base[1, cana] == 123.0
+    np.testing.assert_allclose(base[[0, 2], cana], compounded[[0, 2], cana])
+
+    # NULL urban values keep the snapshot instead of zeroing rsu/rpo
+    for driver in ('rsu', 'rpo'):
+        j = drivers.index(driver)
+        np.testing.assert_allclose(base[:, j], compounded[:, j])
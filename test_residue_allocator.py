@@ -0,0 +1,77 @@
+"""
+Tests for ResidueAllocator.
+Residues of one sector split that sector's CH4 total: the residue potentials
+of each scenario must add up to the sector columns of municipios.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.services.residue_allocator import ResidueAllocator, SCENARIOS
+
+
+def _residuos():
+    return pd.DataFrame({
+        'codigo': ['VINHACA', 'PALHA', 'BAGACO', 'DEJETOS_SUINO', 'FORSU', 'GORDURA'],
+        'setor': ['AG_AGRICULTURA', 'AG_AGRICULTURA', 'AG_AGRICULTURA', 'PC_PECUARIA', 'UR_URBANO', 'IN_INDUSTRIAL'],
+        'bmp_medio': [300.0, 250.0, np.nan, 175.0, 88.0, 850.0],
+        'fator_pessimista': [0.08, 0.03, 0.12, 0.36, 0.19, 0.44],
+        'fator_realista': [0.09, 0.03, 0.14, 0.40, 0.32, 0.49],
+        'fator_otimista': [0.10, 0.03, 0.15, 0.45, 0.48, 0.54],
+    })
+
+
+def _municipios():
+    frame = pd.DataFrame({'codigo_municipio': [1, 2, 3]})
+    for prefix, scale in (('ch4_pes', 0.5), ('ch4_rea', 1.0), ('ch4_oti', 2.0)):
+        frame[f'{prefix}_agricultura'] = np.array([100.0, 50.0, 0.0]) * scale
+        frame[f'{prefix}_pecuaria'] = np.array([0.0, 30.0, 20.0]) * scale
+        frame[f'{prefix}_urbano'] = np.array([5.0, 5.0, 10.0]) * scale
+        frame[f'{prefix}_total'] = np.array([110.0, 90.0, 40.0]) * scale
+    return frame
+
+
+def _drivers():
+    return pd.DataFrame({
+        'codigo_municipio': [1, 2, 3],
+        'residuos_cana_ton_ano': [10.0, 0.0, 30.0],
+        'biogas_suino_m_ano': [1.0, 1.0, 2.0],
+        'biogas_bovinos_m_ano': [0.0, 4.0, 1.0],
+        'populacao_2022': [100.0, 200.0, 300.0],
+    })
+
+
+def test_residues_add_up_to_their_sector_total():
+    residuos, municipios = _residuos(), _municipios()
+    totals = ResidueAllocator.residue_totals(residuos, municipios)
+
+    for s, scenario in enumerate(SCENARIOS[:3]):
+        expected = ResidueAllocator.sector_totals(municipios, scenario)
+        by_sector = pd.Series(totals[:, s]).groupby(residuos['setor']).sum()
+        for sector, value in by_sector.items():
+            assert np.isclose(value, expected[sector]), (scenario, sector)
+        # Sectors never exceed the state total
+        prefix = {'Pessimista': 'ch4_pes', 'Realista': 'ch4_rea', 'Otimista': 'ch4_oti'}[scenario]
+        assert np.isclose(totals[:, s].sum(), municipios[f'{prefix}_total'].sum())
+
+
+def test_industrial_sector_gets_the_remainder_of_the_total():
+    expected = ResidueAllocator.sector_totals(_municipios(), 'Realista')
+    assert expected['AG_AGRICULTURA'] == 150.0
+    assert expected['IN_INDUSTRIAL'] == 240.0 - 150.0 - 50.0 - 20.0
+
+
+def test_shares_follow_factor_times_bmp():
+    totals = ResidueAllocator.residue_totals(_residuos(), _municipios())
+    realista = totals[:, SCENARIOS.index('Realista')]
+    # VINHACA 0.09 × 300 vs PALHA 0.03 × 250
+    assert np.isclose(realista[0] / realista[1], (0.09 * 300.0) / (0.03 * 250.0))
+    # Theoretical potential drops the availability factor
+    assert np.isclose(totals[0, SCENARIOS.index('Teórico (100%)')], realista[0] / 0.09)
+
+
+def test_allocation_conserves_residue_totals_across_municipalities():
+    allocation = ResidueAllocator.build(_residuos(), _municipios(), _drivers())
+    for s, scenario in enumerate(allocation.scenarios):
+        allocated = np.asarray(allocation.potential(scenario).sum(axis=1)).ravel()
+        assert np.allclose(allocated, allocation.totals[:, s])
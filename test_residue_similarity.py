@@ -0,0 +1,58 @@
+"""
+Tests for ResidueSimilarity ranking with partially known residues.
+A residue that matches every parameter of a sample must outrank residues that
+only share a couple of them.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services.residue_similarity import ResidueSimilarity
+
+VINHACA_QUERY = {'ts': 3.0, 'vs': 70.0, 'ph': 4.5, 'cod': 45000}
+PANORAMA_DB = Path(__file__).parent / 'data' / 'cp2b_panorama.db'
+
+
+def _index():
+    df_residuos = pd.DataFrame({
+        'codigo': ['VINHACA', 'DEJETOS_AVES', 'ESTERCO_BOVINO', 'BAGACO'],
+        'nome': ['Vinhaça', 'Dejetos de aves', 'Esterco bovino', 'Bagaço'],
+        'ts_medio': [2.5, 3.1, 3.4, 50.0],
+        'vs_medio': [65.0, 70.5, 69.0, 92.0],
+        'bmp_medio': [250.0, 300.0, 200.0, 180.0],
+    })
+    df_precision = pd.DataFrame({
+        'residue_id': [1, 1, 4, 4],
+        'parameter_name': ['pH', 'COD', 'pH', 'COD'],
+        'unit': ['unitless', 'g/L', 'unitless', 'g/L'],
+        'value': [4.2, 40.0, 6.5, 1.0],
+    })
+    return ResidueSimilarity.build_index(df_residuos, df_precision, {'VINHACA': 1, 'BAGACO': 4})
+
+
+def test_full_overlap_outranks_partial_overlap():
+    result = ResidueSimilarity.query(_index(), VINHACA_QUERY, k=4)
+
+    assert result.iloc[0]['codigo'] == 'VINHACA'
+    assert result.iloc[0]['parametros_comparados'] == 4
+    assert set(result['codigo']) == {'VINHACA', 'DEJETOS_AVES', 'ESTERCO_BOVINO', 'BAGACO'}
+
+
+def test_missing_dimensions_are_not_imputed():
+    index = _index()
+    result = ResidueSimilarity.query(index, {'ph': 4.5, 'cod': 45000}, k=4)
+
+    # Residues without pH/COD share nothing with the sample and are not returned
+    assert set(result['codigo']) == {'VINHACA', 'BAGACO'}
+    assert np.isfinite(result['distancia']).all()
+
+
+@pytest.mark.skipif(not PANORAMA_DB.exists(), reason="cp2b_panorama.db not available")
+def test_vinhaca_query_on_knowledge_base():
+    index = ResidueSimilarity.load_index(PANORAMA_DB)
+    result = ResidueSimilarity.query(index, VINHACA_QUERY, k=5)
+
+    assert result.iloc[0]['codigo'] == 'VINHACA'
@@ -9,10 +9,13 @@ Source: dossie_final_residuos_20251020_112818_v9_CITROS_VALIDADO.xlsx
 
 import pandas as pd
 import re
+import argparse
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 import json
 
+from src.utils.residue_ingest import load_dossier, dossier_to_residuos, upsert_frame
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -20,6 +23,21 @@ import json
 EXCEL_PATH = r'C:\Users\Lucas\Documents\CP2B\Validacao_dados\dossie_final_residuos_20251020_112818_v9_CITROS_VALIDADO.xlsx'
 PROJECT_ROOT = Path(r'C:\Users\Lucas\Documents\CP2B\PanoramaCP2B')
 DATA_DIR = PROJECT_ROOT / 'src' / 'data'
+PANORAMA_DB = Path(__file__).parent / 'data' / 'cp2b_panorama.db'
+
+_DOSSIER: Optional[pd.DataFrame] = None
+
+
+def load_dossier_data() -> pd.DataFrame:
+    """
+    All dossier sheets, read once per run (streamed, cached per file hash).
+
+    Literature summaries are already parsed into bmp_min/bmp_mean/bmp_max, ...
+    """
+    global _DOSSIER
+    if _DOSSIER is None:
+        _DOSSIER = load_dossier(EXCEL_PATH)
+    return _DOSSIER
 
 # ============================================================================
 # PHASE 1: MAPPING & CODE MATCHING
@@ -255,19 +273,22 @@ def parse_resumo_literatura(resumo_str: str) -> Optional[Tuple[float, float, flo
     return None
 
 
+def resumo_range(row: pd.Series, prefix: str, column: str) -> Optional[Tuple[float, float, float]]:
+    """(min, mean, max) of a summary column, from the pre-parsed columns when available."""
+    if f'{prefix}_mean' not in row:
+        return parse_resumo_literatura(safe_str(row.get(column)))
+    if pd.isna(row[f'{prefix}_mean']):
+        return None
+    return (safe_float(row[f'{prefix}_min']), float(row[f'{prefix}_mean']), safe_float(row[f'{prefix}_max']))
+
+
 def build_mapping_report():
     """Generate a report of which residues will be updated."""
     print("=" * 80)
     print("RESIDUE MAPPING REPORT")
     print("=" * 80)
 
-    # Load Excel
-    df_ag = pd.read_excel(EXCEL_PATH, sheet_name='AG_AGRICULTURA')
-    df_pc = pd.read_excel(EXCEL_PATH, sheet_name='PC_PECUARIA')
-    df_ur = pd.read_excel(EXCEL_PATH, sheet_name='UR_URBANO')
-    df_in = pd.read_excel(EXCEL_PATH, sheet_name='IN_INDUSTRIAL')
-
-    all_df = pd.concat([df_ag, df_pc, df_ur, df_in], ignore_index=True)
+    all_df = load_dossier_data()
     excel_codes = set(all_df['Residuo_Codigo'].unique())
 
     print(f"\nTotal residues in Excel: {len(excel_codes)}")
@@ -360,12 +381,9 @@ def generate_updated_residue_code(row: pd.Series, references: List[Dict]) -> str
     otimista = safe_float(row.get('scenarios_otimista'), 0.0)
     teorico = safe_float(row.get('scenarios_teorico'), 0.0)
 
-    # Parse literature summaries for ranges
-    bmp_resumo = parse_resumo_literatura(safe_str(row.get('BMP_Resumo_Literatura')))
-    ts_resumo = parse_resumo_literatura(safe_str(row.get('TS_Resumo_Literatura')))
-    vs_resumo = parse_resumo_literatura(safe_str(row.get('VS_Resumo_Literatura')))
-    cn_resumo = parse_resumo_literatura(safe_str(row.get('CN_Resumo_Literatura')))
-    ch4_resumo = parse_resumo_literatura(safe_str(row.get('CH4_CONTEUDO_Resumo_Literatura')))
+    # Literature summary ranges (parsed column-wise by load_dossier)
+    bmp_resumo = resumo_range(row, 'bmp', 'BMP_Resumo_Literatura')
+    ts_resumo = resumo_range(row, 'ts', 'TS_Resumo_Literatura')
 
     # Build code
     code_lines = []
@@ -517,13 +535,7 @@ def update_single_residue(excel_code: str, sector: str, filename: str, var_name:
         filename: Python filename
         var_name: Variable name in Python file
     """
-    # Load all Excel sheets
-    df_ag = pd.read_excel(EXCEL_PATH, sheet_name='AG_AGRICULTURA')
-    df_pc = pd.read_excel(EXCEL_PATH, sheet_name='PC_PECUARIA')
-    df_ur = pd.read_excel(EXCEL_PATH, sheet_name='UR_URBANO')
-    df_in = pd.read_excel(EXCEL_PATH, sheet_name='IN_INDUSTRIAL')
-
-    all_df = pd.concat([df_ag, df_pc, df_ur, df_in], ignore_index=True)
+    all_df = load_dossier_data()
 
     # Find the row
     rows = all_df[all_df['Residuo_Codigo'] == excel_code]
@@ -550,14 +562,42 @@ def update_single_residue(excel_code: str, sector: str, filename: str, var_name:
     return True
 
 
+# ============================================================================
+# PHASE 5: DATABASE UPSERT
+# ============================================================================
+
+def upsert_residue_table(db_path: Path = PANORAMA_DB) -> Dict:
+    """
+    Write the dossier values into the residuos table in bulk (matched on codigo).
+
+    Only residues already in the table are updated; empty dossier cells keep
+    the current database value.
+    """
+    residuos = dossier_to_residuos(load_dossier_data())
+    result = upsert_frame(db_path, 'residuos', residuos, key='codigo', insert_missing=False)
+    print(f"  [DB] residuos: {result['updated']} rows updated ({len(result['columns']) - 1} columns)")
+    return result
+
+
 # ============================================================================
 # MAIN
 # ============================================================================
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Update residue data from the validation dossier")
+    parser.add_argument('--db', nargs='?', const=str(PANORAMA_DB),
+                        help="Also upsert the residuos table (default: data/cp2b_panorama.db)")
+    parser.add_argument('--db-only', action='store_true', help="Only upsert the database, skip the Python files")
+    args = parser.parse_args()
+
     print("PanoramaCP2B Database Update Script")
     print("=" * 80)
 
+    if args.db or args.db_only:
+        upsert_residue_table(Path(args.db or PANORAMA_DB))
+        if args.db_only:
+            raise SystemExit(0)
+
     # Phase 1: Generate mapping report
     matched_residues = build_mapping_report()
 